@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CombatLog(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "combatlog"
+
+    def ready(self):
+        import combatlog.signals  # pylint: disable=unused-import, import-outside-toplevel
@@ -1,10 +1,19 @@
-from typing import Dict, List
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+import io
 import logging
+import re
 
 from pydantic import BaseModel
 
 log = logging.getLogger(__name__)
 
+# Bump whenever a change alters the LogAnalysis produced for the same log,
+# so that analyses cached against saved logs are recomputed.
+ANALYZER_VERSION = 1
+
+_TAG_RE = re.compile(r"<[^>]*>")
+_HEADER_RE = re.compile(r"\[([^\]]*)\]\s*\(([^)]*)\)(.*)", re.DOTALL)
+
 
 class LogEvent(BaseModel):
     raw_log: str = None
@@ -125,17 +134,20 @@ def parse_line(line: str) -> LogEvent:
 
 
 def update_location(event: LogEvent, previous_location: str) -> str:
-    if event.text.find("Jumping from ") >= 0:
-        split = event.text.find(" to ")
-        event.location = event.text[split + 4 :]
-    elif event.text.find("Undocking from ") >= 0:
-        split = event.text.find(" to ")
-        event.location = event.text[split + 4 :].replace(" solar system.", "")
-    else:
-        event.location = previous_location
+    event.location = next_location(event.text, previous_location)
     return event.location
 
 
+def next_location(text: str, previous_location: str) -> str:
+    if text.find("Jumping from ") >= 0:
+        split = text.find(" to ")
+        return text[split + 4 :]
+    if text.find("Undocking from ") >= 0:
+        split = text.find(" to ")
+        return text[split + 4 :].replace(" solar system.", "")
+    return previous_location
+
+
 def parse(text: str) -> List[LogEvent]:
     location = "{unknown}"
     events = []
@@ -159,17 +171,7 @@ def character_name(events: List[LogEvent]) -> str:
 
 
 def strip_html(text):
-    text = text.strip()
-    start = text.find("<")
-    while start >= 0:
-        end = text.find(">")
-        if start > 0:
-            text = text[0:start] + text[end + 1 :]
-        else:
-            text = text[end + 1 :]
-        start = text.find("<")
-
-    return text
+    return _TAG_RE.sub("", text.strip())
 
 
 def repair_events(events: List[LogEvent]) -> List[RepairEvent]:
@@ -496,9 +498,8 @@ def update_repair_analysis(analysis: RepairAnalysis, event: RepairEvent):
     analysis.last = max(analysis.last, event.event_time)
 
 
-def analyze_parsed_log(content: str) -> LogAnalysis:
-
-    events = parse(content)
+def analyze_events(events: List[LogEvent]) -> LogAnalysis:
+    """Multi-pass analysis of an already parsed list of log events"""
 
     analysis = LogAnalysis()
     analysis.logged_events = len(events)
@@ -528,3 +529,424 @@ def analyze_parsed_log(content: str) -> LogAnalysis:
     update_combat_time(dmg_events, repairs, analysis)
 
     return analysis
+
+
+def analyze_parsed_log(content: str) -> LogAnalysis:
+    return analyze_log_lines(content.splitlines())
+
+
+def iter_log_lines(stream: BinaryIO) -> Iterator[str]:
+    """Incrementally decode a binary log stream (plain, zip or gzip member)"""
+    with io.TextIOWrapper(stream, encoding="utf-8") as text:
+        yield from text
+
+
+def analyze_log_lines(lines: Iterable[str]) -> LogAnalysis:
+    """
+    Single-pass analysis of raw log lines.
+
+    Produces the same result as analyze_events(parse(...)) without
+    building the intermediate event lists, so large logs can be streamed.
+    """
+    accumulator = _LogAccumulator()
+    for line in lines:
+        try:
+            accumulator.add_line(line)
+        except Exception:
+            log.error("Error parsing combat log entry: %s", line)
+    return accumulator.result()
+
+
+def split_line(line: str) -> Tuple[str, str, str]:
+    """Returns the (event_time, event_type, text) of a raw log line"""
+    line = line.strip()
+    match = _HEADER_RE.match(line)
+    if match:
+        return (
+            match.group(1)[:-1].strip(),
+            match.group(2).strip(),
+            strip_html(match.group(3)),
+        )
+    event = parse_line(line)
+    return event.event_time, event.event_type, event.text
+
+
+class _DamageRecord:
+    __slots__ = (
+        "event_time",
+        "damage",
+        "direction",
+        "entity",
+        "weapon",
+        "outcome",
+        "location",
+        "text",
+    )
+
+    def to_model(self) -> DamageEvent:
+        return DamageEvent(
+            event_time=self.event_time,
+            damage=self.damage,
+            direction=self.direction,
+            entity=self.entity,
+            weapon=self.weapon,
+            outcome=self.outcome,
+            location=self.location,
+            text=self.text,
+        )
+
+
+def _parse_damage(event_time: str, location: str, text: str) -> _DamageRecord:
+    """Equivalent of damage_events() for a single combat line"""
+    record = _DamageRecord()
+    record.event_time = event_time
+    record.location = location
+    record.damage = 0
+    record.direction = ""
+    record.weapon = ""
+    record.outcome = ""
+
+    pos = text.find(" to ")
+    if pos >= 0:
+        record.damage = int(text[0:pos])
+        record.direction = "to"
+        text = text[pos + 4 :]
+
+    pos = text.find(" from ")
+    if pos >= 0:
+        record.damage = int(text[0:pos])
+        record.direction = "from"
+        text = text[pos + 6 :]
+
+    parts = text.split(" - ")
+    record.entity = parts[0].strip()
+    if len(parts) >= 3:
+        record.weapon = parts[1].strip()
+        record.outcome = parts[2].strip()
+    elif len(parts) == 2:
+        record.outcome = parts[1].strip()
+
+    if record.damage <= 0:
+        return None
+    record.text = text
+    return record
+
+
+def _parse_repair(text: str) -> Tuple[int, str, str, str]:
+    """Equivalent of repair_events() for a single combat line"""
+    repaired = 0
+    rep_type = ""
+
+    pos = text.find(" remote armor repaired")
+    if pos >= 0:
+        repaired = int(text[0:pos])
+        rep_type = "armor"
+        text = text[pos + 26 :]
+
+    pos = text.find(" remote shield boosted")
+    if pos >= 0:
+        repaired = int(text[0:pos])
+        rep_type = "shield"
+        text = text[pos + 26 :]
+
+    if rep_type == "":
+        return None
+
+    mod_split = text.rfind(" - ")
+    return repaired, rep_type, text[0:mod_split], text[mod_split + 3 :]
+
+
+class _DamageStats:
+    __slots__ = (
+        "category",
+        "name",
+        "location",
+        "first",
+        "last",
+        "volleys_from",
+        "damage_from",
+        "max_from",
+        "volleys_to",
+        "damage_to",
+        "max_to",
+        "reps_to",
+    )
+
+    def __init__(self, category: str, name: str, event_time: str, location):
+        self.category = category
+        self.name = name
+        self.first = event_time
+        self.last = event_time
+        self.location = location if location not in ("", "{unknown}") else ""
+        self.volleys_from = 0
+        self.damage_from = 0
+        self.max_from = 0
+        self.volleys_to = 0
+        self.damage_to = 0
+        self.max_to = 0
+        self.reps_to = 0
+
+    def add(self, record: _DamageRecord):
+        if record.direction == "to":
+            self.volleys_to += 1
+            self.damage_to += record.damage
+            self.max_to = max(self.max_to, record.damage)
+        elif record.direction == "from":
+            self.volleys_from += 1
+            self.damage_from += record.damage
+            self.max_from = max(self.max_from, record.damage)
+
+        self.first = min(self.first, record.event_time)
+        self.last = max(self.last, record.event_time)
+
+    def to_model(self) -> DamageAnalysis:
+        return DamageAnalysis(
+            name=self.name,
+            category=self.category,
+            volleys_from=self.volleys_from,
+            damage_from=self.damage_from,
+            max_from=self.max_from,
+            avg_from=(
+                round(self.damage_from / self.volleys_from)
+                if self.volleys_from
+                else 0
+            ),
+            volleys_to=self.volleys_to,
+            damage_to=self.damage_to,
+            reps_to=self.reps_to,
+            max_to=self.max_to,
+            avg_to=(
+                round(self.damage_to / self.volleys_to)
+                if self.volleys_to
+                else 0
+            ),
+            first=self.first,
+            last=self.last,
+            location=self.location,
+        )
+
+
+class _RepairStats:
+    __slots__ = (
+        "category",
+        "name",
+        "ship",
+        "rep_type",
+        "cycles_to",
+        "repairs_to",
+        "max_to",
+        "first",
+        "last",
+    )
+
+    def __init__(self, category, name, ship, rep_type, event_time):
+        self.category = category
+        self.name = name
+        self.ship = ship
+        self.rep_type = rep_type
+        self.cycles_to = 0
+        self.repairs_to = 0
+        self.max_to = 0
+        self.first = event_time
+        self.last = event_time
+
+    def add(self, repaired: int, event_time: str):
+        self.cycles_to += 1
+        self.repairs_to += repaired
+        self.max_to = max(self.max_to, repaired)
+        self.first = min(self.first, event_time)
+        self.last = max(self.last, event_time)
+
+    def to_model(self) -> RepairAnalysis:
+        analysis = RepairAnalysis(
+            name=self.name,
+            category=self.category,
+            rep_type=self.rep_type,
+            cycles_to=self.cycles_to,
+            repairs_to=self.repairs_to,
+            max_to=self.max_to,
+            avg_to=round(self.repairs_to / self.cycles_to),
+            first=self.first,
+            last=self.last,
+        )
+        if self.ship is not None:
+            analysis.ship = self.ship
+        return analysis
+
+
+class _LogAccumulator:
+    """Running state for analyze_log_lines()"""
+
+    __slots__ = (
+        "logged_events",
+        "location",
+        "character_name",
+        "final_system",
+        "damage_done",
+        "damage_taken",
+        "enemies",
+        "weapons",
+        "damage_times",
+        "repair_times",
+        "max_from",
+        "max_to",
+        "armor_repaired",
+        "shield_repaired",
+        "repairs",
+        "rep_modules",
+        "start",
+        "end",
+    )
+
+    def __init__(self):
+        self.logged_events = 0
+        self.location = "{unknown}"
+        self.character_name = None
+        self.final_system = ""
+        self.damage_done = 0
+        self.damage_taken = 0
+        self.enemies: Dict[str, _DamageStats] = {}
+        self.weapons: Dict[str, _DamageStats] = {}
+        self.damage_times: Dict[str, _DamageStats] = {}
+        self.repair_times: Dict[str, _DamageStats] = {}
+        self.max_from = None
+        self.max_to = None
+        self.armor_repaired = 0
+        self.shield_repaired = 0
+        self.repairs: Dict[str, _RepairStats] = {}
+        self.rep_modules: Dict[str, _RepairStats] = {}
+        self.start = None
+        self.end = None
+
+    def add_line(self, line: str):
+        event_time, event_type, text = split_line(line)
+        self.location = next_location(text, self.location)
+        self.logged_events += 1
+
+        if self.character_name is None:
+            split = text.find("Listener: ")
+            if split >= 0:
+                self.character_name = text[split + 10 :]
+
+        if event_type != "combat" or not text or not "0" <= text[0] <= "9":
+            return
+
+        if (
+            text.find("remote armor repaired") < 0
+            and text.find("remote shield boosted") < 0
+            and text.find("remote capacitor transmitted") < 0
+        ):
+            record = _parse_damage(event_time, self.location, text)
+            if record:
+                self._add_damage(record)
+        else:
+            repair = _parse_repair(text)
+            if repair:
+                self._add_repair(event_time, *repair)
+
+    def _add_damage(self, record: _DamageRecord):
+        if record.location:
+            self.final_system = record.location
+
+        if record.direction == "to":
+            self.damage_done += record.damage
+            if self.max_to is None or record.damage > self.max_to.damage:
+                self.max_to = record
+        elif record.direction == "from":
+            self.damage_taken += record.damage
+            if self.max_from is None or record.damage > self.max_from.damage:
+                self.max_from = record
+
+        _damage_stats(self.enemies, "Enemy", record.entity, record).add(record)
+        if record.weapon != "":
+            _damage_stats(self.weapons, "Weapon", record.weapon, record).add(
+                record
+            )
+        time_bucket = record.event_time[0:-1] + "0"
+        _damage_stats(
+            self.damage_times, "TimeBucket", time_bucket, record
+        ).add(record)
+
+        self._update_combat_time(record.event_time)
+
+    def _add_repair(self, event_time, repaired, rep_type, entity, module):
+        if rep_type == "armor":
+            self.armor_repaired += repaired
+        elif rep_type == "shield":
+            self.shield_repaired += repaired
+
+        if entity not in self.repairs:
+            self.repairs[entity] = _RepairStats(
+                "Entity", entity, "", rep_type, event_time
+            )
+        self.repairs[entity].add(repaired, event_time)
+
+        if module not in self.rep_modules:
+            self.rep_modules[module] = _RepairStats(
+                "Module", module, None, rep_type, event_time
+            )
+        self.rep_modules[module].add(repaired, event_time)
+
+        time_bucket = event_time[0:-1] + "0"
+        if time_bucket not in self.repair_times:
+            self.repair_times[time_bucket] = _DamageStats(
+                "TimeBucket", time_bucket, event_time, self.location
+            )
+        self.repair_times[time_bucket].reps_to += repaired
+
+        self._update_combat_time(event_time)
+
+    def _update_combat_time(self, event_time: str):
+        if self.start is None or event_time < self.start:
+            self.start = event_time
+        if self.end is None or event_time > self.end:
+            self.end = event_time
+
+    def result(self) -> LogAnalysis:
+        # Time buckets are ordered damage-first, then repair-only buckets,
+        # matching time_analysis()
+        times = list(self.damage_times.values())
+        for time_bucket, stats in self.repair_times.items():
+            if time_bucket in self.damage_times:
+                self.damage_times[time_bucket].reps_to += stats.reps_to
+            else:
+                times.append(stats)
+
+        analysis = LogAnalysis()
+        analysis.logged_events = self.logged_events
+        analysis.character_name = self.character_name or ""
+        analysis.final_system = self.final_system
+        analysis.damage_done = self.damage_done
+        analysis.damage_taken = self.damage_taken
+        analysis.enemies = [s.to_model() for s in self.enemies.values()]
+        analysis.weapons = [s.to_model() for s in self.weapons.values()]
+        analysis.times = [s.to_model() for s in times]
+        if self.max_from:
+            analysis.max_from = self.max_from.to_model()
+        if self.max_to:
+            analysis.max_to = self.max_to.to_model()
+        analysis.armor_repaired = self.armor_repaired or None
+        analysis.shield_repaired = self.shield_repaired or None
+        analysis.repairs = [s.to_model() for s in self.repairs.values()]
+        analysis.rep_modules = [
+            s.to_model() for s in self.rep_modules.values()
+        ]
+        if self.start is not None:
+            analysis.start = self.start
+            analysis.end = self.end
+        return analysis
+
+
+def _damage_stats(
+    buckets: Dict[str, _DamageStats],
+    category: str,
+    name: str,
+    record: _DamageRecord,
+) -> _DamageStats:
+    stats = buckets.get(name)
+    if stats is None:
+        stats = _DamageStats(
+            category, name, record.event_time, record.location
+        )
+        buckets[name] = stats
+    return stats
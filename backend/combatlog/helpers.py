@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import zlib
+
+from django.db import IntegrityError, transaction
+
+from .combatlog import ANALYZER_VERSION, LogAnalysis, analyze_parsed_log
+from .models import CombatLog, CombatLogContent
+
+log = logging.getLogger(__name__)
+
+# Per-row identifiers filled in by the router, never cached with the content
+_ROW_FIELDS = {"db_id", "user_id", "fitting_id", "fleet_id"}
+
+
+def store_log_content(text: str) -> CombatLogContent:
+    """Returns the shared content row for this log text, creating if new"""
+    data = text.encode("utf-8")
+    content_hash = hashlib.sha256(data).hexdigest()
+
+    content = CombatLogContent.objects.filter(
+        content_hash=content_hash
+    ).first()
+    if content:
+        return content
+
+    try:
+        with transaction.atomic():
+            return CombatLogContent.objects.create(
+                content_hash=content_hash,
+                compressed_text=zlib.compress(data),
+                text_size=len(data),
+            )
+    except IntegrityError:
+        # Identical log stored concurrently by another request
+        return CombatLogContent.objects.get(content_hash=content_hash)
+
+
+def content_text(content: CombatLogContent) -> str:
+    return zlib.decompress(content.compressed_text).decode("utf-8")
+
+
+def content_analysis(
+    content: CombatLogContent, text: str | None = None
+) -> LogAnalysis:
+    """
+    Returns the cached analysis of the content, re-analyzing (and updating
+    the cache) only if it was produced by a different analyzer version.
+    """
+    if (
+        content.analysis is not None
+        and content.analyzer_version == ANALYZER_VERSION
+    ):
+        return LogAnalysis.model_validate(content.analysis)
+
+    if text is None:
+        text = content_text(content)
+
+    analysis = analyze_parsed_log(text)
+
+    # Optional fields are declared as "int = None", so leave Nones to defaults
+    content.analysis = analysis.model_dump(
+        mode="json", exclude=_ROW_FIELDS, exclude_none=True
+    )
+    content.analyzer_version = ANALYZER_VERSION
+    content.save(update_fields=["analysis", "analyzer_version"])
+
+    return analysis
+
+
+def saved_log_analysis(combat_log: CombatLog) -> LogAnalysis:
+    if combat_log.content_id:
+        return content_analysis(combat_log.content)
+    return analyze_parsed_log(combat_log.log_text)
+
+
+def release_log_content(content_id: int | None):
+    """Deletes the content row once no saved log references it"""
+    if not content_id:
+        return
+    deleted, _ = CombatLogContent.objects.filter(
+        id=content_id, logs__isnull=True
+    ).delete()
+    if deleted:
+        log.info("Combat log content %d no longer referenced", content_id)
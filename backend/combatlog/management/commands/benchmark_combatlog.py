@@ -0,0 +1,130 @@
+"""
+Benchmark the single-pass combat log analyzer against the multi-pass path.
+
+Example:
+
+    pipenv run python manage.py benchmark_combatlog --lines 500000
+"""
+
+from __future__ import annotations
+
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+
+from combatlog.combatlog import analyze_events, analyze_parsed_log, parse
+
+_ENEMIES = (
+    "Angel Ambusher",
+    "Guristas Anarchist",
+    "[P-1]Bad Guy",
+    "Drifter Battleship",
+)
+_WEAPONS = (
+    "Inferno Rage Compiler Error",
+    "Nova Rage Heavy Assault Missile",
+    "Small Focused Pulse Laser II",
+)
+_OUTCOMES = ("Hits", "Grazes", "Penetrates", "Smashes", "Glances Off")
+
+
+def synthetic_log(lines: int, seed: int = 1) -> str:
+    """Builds a tag-heavy Gamelog with a realistic mix of entries"""
+    rng = random.Random(seed)
+    out = [
+        "------------------------------------------------------------",
+        "  Gamelog",
+        "  Listener: Benchmark Pilot",
+        "  Session Started: 2024.01.01 16:00:00",
+        "------------------------------------------------------------",
+    ]
+    for n in range(lines - len(out)):
+        stamp = (
+            f"[ 2024.01.01 {16 + n // 360000 % 8:02d}:"
+            f"{n // 6000 % 60:02d}:{n // 100 % 60:02d} ]"
+        )
+        roll = rng.random()
+        enemy = rng.choice(_ENEMIES)
+        if roll < 0.4:
+            out.append(
+                f"{stamp} (combat) <color=0xff00ffff><b>{rng.randint(1, 900)}"
+                "</b> <color=0x77ffffff><font size=10>to</font> "
+                f"<b><color=0xffffffff>{enemy}</b><font size=10>"
+                f"<color=0x77ffffff> - {rng.choice(_WEAPONS)} - "
+                f"{rng.choice(_OUTCOMES)}"
+            )
+        elif roll < 0.75:
+            out.append(
+                f"{stamp} (combat) <color=0xffcc0000><b>{rng.randint(1, 600)}"
+                "</b> <color=0x77ffffff><font size=10>from</font> "
+                f"<b><color=0xffffffff>{enemy}</b><font size=10>"
+                f"<color=0x77ffffff> - {rng.choice(_OUTCOMES)}"
+            )
+        elif roll < 0.85:
+            out.append(
+                f"{stamp} (combat) {rng.randint(50, 500)} remote armor "
+                "repaired to Big Duck - Tankface - "
+                "Small Remote Armor Repairer II"
+            )
+        elif roll < 0.95:
+            out.append(f"{stamp} (combat) {enemy} misses you completely")
+        elif roll < 0.999:
+            out.append(f"{stamp} (notify) Your systems are recalibrating.")
+        else:
+            out.append(f"{stamp} (None) Jumping from Nowhere to Somewhere")
+    return "\n".join(out)
+
+
+def _measure(func, content: str, trace_memory: bool):
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    result = func(content)
+    elapsed = time.perf_counter() - started
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class Command(BaseCommand):
+    help = "Compare single-pass and multi-pass combat log analysis"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, default=500000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--memory",
+            action="store_true",
+            help="Report peak allocations (tracemalloc slows both runs)",
+        )
+
+    def handle(self, *args, **options):
+        content = synthetic_log(options["lines"], options["seed"])
+        self.stdout.write(
+            f"Synthetic log: {options['lines']:,} lines, "
+            f"{len(content) / 1_000_000:.1f} MB"
+        )
+
+        legacy, legacy_secs, legacy_peak = _measure(
+            lambda c: analyze_events(parse(c)), content, options["memory"]
+        )
+        single, single_secs, single_peak = _measure(
+            analyze_parsed_log, content, options["memory"]
+        )
+
+        if legacy != single:
+            raise CommandError("Single-pass analysis differs from multi-pass")
+
+        for label, secs, peak in (
+            ("multi-pass", legacy_secs, legacy_peak),
+            ("single-pass", single_secs, single_peak),
+        ):
+            line = f"  {label}\t{secs:.2f}s"
+            if options["memory"]:
+                line += f"\tpeak {peak / 1_000_000:.0f} MB"
+            self.stdout.write(line)
+        self.stdout.write(f"  speed-up\t{legacy_secs / single_secs:.1f}x")
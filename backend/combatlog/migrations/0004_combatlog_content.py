@@ -0,0 +1,78 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:55
+
+import hashlib
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def move_log_text_to_content(apps, schema_editor):
+    """Compress existing log text into shared, deduplicated content rows."""
+    CombatLog = apps.get_model("combatlog", "CombatLog")
+    CombatLogContent = apps.get_model("combatlog", "CombatLogContent")
+
+    pending = CombatLog.objects.filter(content__isnull=True).exclude(
+        log_text=""
+    )
+    for combat_log in pending.only("id", "log_text").iterator(chunk_size=100):
+        data = combat_log.log_text.encode("utf-8")
+        content, _ = CombatLogContent.objects.get_or_create(
+            content_hash=hashlib.sha256(data).hexdigest(),
+            defaults={
+                "compressed_text": zlib.compress(data),
+                "text_size": len(data),
+            },
+        )
+        CombatLog.objects.filter(id=combat_log.id).update(
+            content=content, log_text=""
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("combatlog", "0003_combatlog_updated_at"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CombatLogContent",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("content_hash", models.CharField(max_length=64, unique=True)),
+                ("compressed_text", models.BinaryField()),
+                ("text_size", models.PositiveIntegerField(default=0)),
+                ("analysis", models.JSONField(blank=True, null=True)),
+                ("analyzer_version", models.PositiveIntegerField(default=0)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="combatlog",
+            name="log_text",
+            field=models.TextField(blank=True, default=""),
+        ),
+        migrations.AddField(
+            model_name="combatlog",
+            name="content",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="logs",
+                to="combatlog.combatlogcontent",
+            ),
+        ),
+        migrations.RunPython(
+            move_log_text_to_content, migrations.RunPython.noop
+        ),
+    ]
@@ -5,6 +5,22 @@ from fittings.models import EveFitting
 from fleets.models import EveFleet
 
 
+class CombatLogContent(models.Model):
+    """
+    Compressed text of an uploaded combat log, stored once per distinct
+    content, with the analysis cached for the analyzer version that made it.
+    """
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    compressed_text = models.BinaryField()
+    text_size = models.PositiveIntegerField(default=0)
+
+    analysis = models.JSONField(null=True, blank=True)
+    analyzer_version = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class CombatLog(models.Model):
     """
     A combat log relating to a fleet or fitting.
@@ -25,7 +41,16 @@ class CombatLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
-    log_text = models.TextField()
+    content = models.ForeignKey(
+        CombatLogContent,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name="logs",
+    )
+
+    # Uncompressed text of logs saved before CombatLogContent existed
+    log_text = models.TextField(blank=True, default="")
 
     character_name = models.CharField(max_length=255, blank=True)
     solar_system_name = models.CharField(max_length=255, blank=True)
@@ -2,7 +2,7 @@ import gzip
 import io
 import logging
 import zipfile
-from typing import List
+from typing import BinaryIO, List
 
 from ninja import Router
 from pydantic import BaseModel
@@ -12,7 +12,12 @@ from app.errors import ErrorResponse
 from authentication import AuthBearer, AuthOptional
 from fleets.models import EveFleet
 
-from .combatlog import LogAnalysis, analyze_parsed_log
+from .combatlog import LogAnalysis, analyze_log_lines, iter_log_lines
+from .helpers import (
+    content_analysis,
+    saved_log_analysis,
+    store_log_content,
+)
 
 from .models import CombatLog
 from groups.helpers.feature_access import can_use_feature
@@ -57,28 +62,30 @@ def analyze_logs(
             detail="Cannot store without user ID",
         )
 
-    if request.content_type == "text/plain":
-        content = request.body.decode("utf-8")
-    elif request.content_type == "application/zip":
-        zipdata = io.BytesIO(request.body)
-        with zipfile.ZipFile(zipdata) as z:
-            zip_bytes = z.read(z.infolist()[0])
-        content = zip_bytes.decode("utf-8")
-    elif request.content_type == "application/gzip":
-        zipdata = io.BytesIO(request.body)
-        gzip_bytes = gzip.decompress(zipdata.read())
-        content = gzip_bytes.decode("utf-8")
-    else:
+    stream = log_stream(request)
+    if stream is None:
         return 400, ErrorResponse(
             status=400,
             detail="Content type not supported: " + request.content_type,
         )
 
-    analysis = analyze_parsed_log(content)
-
-    if store:
+    with stream:
+        if not store:
+            return analyze_log_lines(iter_log_lines(stream))
+        text = stream.read().decode("utf-8")
+
+    content = store_log_content(text)
+    analysis = content_analysis(content, text)
+
+    combat_log = CombatLog.objects.filter(
+        content=content,
+        created_by_id=request.user.id,
+        fleet_id=fleet_id if fleet_id > 0 else None,
+        fitting_id=fitting_id if fitting_id > 0 else None,
+    ).first()
+    if combat_log is None:
         combat_log = CombatLog(
-            log_text=content,
+            content=content,
             created_by_id=request.user.id,
             character_name=analysis.character_name,
             solar_system_name=analysis.final_system,
@@ -90,7 +97,7 @@ def analyze_logs(
 
         combat_log.save()
 
-        set_ids(analysis, combat_log)
+    set_ids(analysis, combat_log)
 
     return analysis
 
@@ -164,7 +171,9 @@ def query_saved_logs(request, user_id: int = None, fleet_id: int = None):
 )
 def get_saved_log(request, log_id: int):
     try:
-        db_log = CombatLog.objects.get(id=log_id)
+        db_log = CombatLog.objects.select_related("fleet", "content").get(
+            id=log_id
+        )
 
         if db_log.fleet:
             fc_id = db_log.fleet.created_by_id
@@ -176,7 +185,7 @@ def get_saved_log(request, log_id: int):
                 detail="Not authorised to see this combat log"
             )
 
-        analysis = analyze_parsed_log(db_log.log_text)
+        analysis = saved_log_analysis(db_log)
         analysis.db_id = log_id
         set_ids(analysis, db_log)
         return analysis
@@ -218,6 +227,20 @@ def delete_saved_log(request, log_id: int):
         )
 
 
+def log_stream(request) -> BinaryIO | None:
+    """Returns a binary stream of the uploaded log, decompressing lazily"""
+    if request.content_type == "text/plain":
+        return io.BytesIO(request.body)
+    if request.content_type == "application/zip":
+        # The member stream keeps the archive's buffer open after the
+        # ZipFile itself is closed
+        with zipfile.ZipFile(io.BytesIO(request.body)) as z:
+            return z.open(z.infolist()[0])
+    if request.content_type == "application/gzip":
+        return gzip.GzipFile(fileobj=io.BytesIO(request.body))
+    return None
+
+
 def set_ids(analysis, db_rec):
     if db_rec.id:
         analysis.db_id = db_rec.id
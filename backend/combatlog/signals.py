@@ -0,0 +1,15 @@
+from django.db.models import signals
+from django.dispatch import receiver
+
+from .helpers import release_log_content
+from .models import CombatLog
+
+
+@receiver(
+    signals.post_delete,
+    sender=CombatLog,
+    dispatch_uid="release_combat_log_content",
+)
+def release_combat_log_content(sender, instance, **kwargs):
+    # Covers router, admin and cascade (e.g. user) deletes alike
+    release_log_content(instance.content_id)
@@ -1,9 +1,19 @@
+import gzip
+import io
+import zipfile
+from pathlib import Path
+from unittest.mock import patch
+
 from django.test import Client, SimpleTestCase
 from app.test import TestCase
 
+from combatlog.helpers import content_analysis, store_log_content
+from combatlog.models import CombatLog, CombatLogContent
 from .combatlog import (
     DamageEvent,
     LogEvent,
+    analyze_events,
+    analyze_parsed_log,
     character_name,
     damage_events,
     parse,
@@ -236,6 +246,46 @@ class RemoteRepsParseTest(SimpleTestCase):
         )
 
 
+class SinglePassAnalysisTest(SimpleTestCase):
+    """The streaming analyzer must match the multi-pass pipeline"""
+
+    def assert_same_analysis(self, content: str):
+        self.assertEqual(
+            analyze_events(parse(content)).model_dump(),
+            analyze_parsed_log(content).model_dump(),
+        )
+
+    def test_pve_log(self):
+        content = (
+            Path(__file__).parent / "testdata" / "PveTest.txt"
+        ).read_text()
+        self.assert_same_analysis(content)
+
+    def test_repairs_and_time_buckets(self):
+        content = (
+            "Listener: Logi Pilot\n"
+            "[ 2024.01.01 09:00:01 ] (combat) 220 remote armor repaired to Big Duck - Tankface - Small Remote Armor Repairer II\n"
+            "[ 2024.01.01 09:00:05 ] (None) Jumping from Sys to Anywhere\n"
+            "[ 2024.01.01 09:00:12 ] (combat) 50 remote shield boosted to Red Muppet - Wolf NANO - Small Remote Shield Booster II\n"
+            "[ 2024.01.01 09:00:13 ] (combat) 123 from Rat - Sharp Teeth - Hits\n"
+            "[ 2024.01.01 09:00:14 ] (combat) 567 to Rat - Pea Shooter - Hits\n"
+            "[ 2024.01.01 09:00:15 ] (combat) 567 remote capacitor transmitted to YourFriend\n"
+            "[ 2024.01.01 09:00:21 ] (combat) 220 remote armor repaired to Big Duck - Tankface - Small Remote Armor Repairer II\n"
+        )
+        self.assert_same_analysis(content)
+
+        analysis = analyze_parsed_log(content)
+        self.assertEqual("Logi Pilot", analysis.character_name)
+        self.assertEqual(440, analysis.armor_repaired)
+        self.assertEqual(50, analysis.shield_repaired)
+        self.assertEqual("Anywhere", analysis.final_system)
+        self.assertEqual("2024.01.01 09:00:01", analysis.start)
+        self.assertEqual("2024.01.01 09:00:21", analysis.end)
+
+    def test_unclosed_tag(self):
+        self.assertEqual("hello <b", strip_html("hello <b"))
+
+
 class CombatLogRouterTest(TestCase):
     """Test the CombatLog API endpoints"""
 
@@ -261,6 +311,38 @@ class CombatLogRouterTest(TestCase):
         self.assertEqual(567, analysis["damage_done"])
         self.assertEqual(456, analysis["damage_taken"])
 
+    def test_analyse_gzip_log_endpoint(self):
+        log = (
+            "Listener: EvePlayer 123\n"
+            "[ 2024.01.01 09:00:00 ] (combat) 567 to [P-1]Bad Guy - Inferno Rage Compiler Error - Hits\n"
+        )
+        response = self.client.post(
+            "/api/combatlog",
+            gzip.compress(log.encode("utf-8")),
+            "application/gzip",
+        )
+        self.assertEqual(200, response.status_code)
+        analysis = response.json()
+        self.assertEqual(2, analysis["logged_events"])
+        self.assertEqual("EvePlayer 123", analysis["character_name"])
+        self.assertEqual(567, analysis["damage_done"])
+
+    def test_analyse_zip_log_endpoint(self):
+        log = (
+            "Listener: EvePlayer 123\n"
+            "[ 2024.01.01 09:00:00 ] (combat) 567 to [P-1]Bad Guy - Inferno Rage Compiler Error - Hits\n"
+        )
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as z:
+            z.writestr("combat.txt", log)
+        response = self.client.post(
+            "/api/combatlog", archive.getvalue(), "application/zip"
+        )
+        self.assertEqual(200, response.status_code)
+        analysis = response.json()
+        self.assertEqual(2, analysis["logged_events"])
+        self.assertEqual(567, analysis["damage_done"])
+
     def test_save_logs(self):
         log = "[ 2024.01.01 09:00:00 ] (combat) 567 to [P-1]Bad Guy - Inferno Rage Compiler Error - Hits\n"
         response = self.client.post(
@@ -292,3 +374,92 @@ class CombatLogRouterTest(TestCase):
             HTTP_AUTHORIZATION=f"Bearer {self.token}",
         )
         self.assertEqual(200, response.status_code)
+
+
+class SavedLogStorageTest(TestCase):
+    """Saved logs are compressed, deduplicated and analysis is cached"""
+
+    log = "[ 2024.01.01 09:00:00 ] (combat) 567 to [P-1]Bad Guy - Inferno Rage Compiler Error - Hits\n"
+
+    def save_log(self, text, fitting_id=0):
+        return self.client.post(
+            f"/api/combatlog?store=true&fitting_id={fitting_id}",
+            text,
+            "text/plain",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+    def test_identical_uploads_stored_once(self):
+        first = self.save_log(self.log).json()
+        second = self.save_log(self.log).json()
+
+        self.assertEqual(first["db_id"], second["db_id"])
+        self.assertEqual(1, CombatLog.objects.count())
+        self.assertEqual(1, CombatLogContent.objects.count())
+
+        content = CombatLogContent.objects.get()
+        self.assertEqual(len(self.log.encode("utf-8")), content.text_size)
+        self.assertEqual("", CombatLog.objects.get().log_text)
+
+    def test_saved_log_view_uses_cached_analysis(self):
+        log_id = self.save_log(self.log).json()["db_id"]
+
+        with patch("combatlog.helpers.analyze_parsed_log") as analyze:
+            response = self.client.get(
+                f"/api/combatlog/{log_id}",
+                HTTP_AUTHORIZATION=f"Bearer {self.token}",
+            )
+            analyze.assert_not_called()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(567, response.json()["damage_done"])
+        self.assertEqual(log_id, response.json()["db_id"])
+
+    def test_analysis_recomputed_for_new_analyzer_version(self):
+        content = store_log_content(self.log)
+        content_analysis(content)
+
+        with patch("combatlog.helpers.ANALYZER_VERSION", 999):
+            analysis = content_analysis(content)
+
+        content.refresh_from_db()
+        self.assertEqual(999, content.analyzer_version)
+        self.assertEqual(567, analysis.damage_done)
+
+    def test_legacy_uncompressed_log(self):
+        combat_log = CombatLog.objects.create(
+            created_by=self.user, log_text=self.log
+        )
+        response = self.client.get(
+            f"/api/combatlog/{combat_log.id}",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(567, response.json()["damage_done"])
+
+    def test_delete_releases_unreferenced_content(self):
+        log_id = self.save_log(self.log).json()["db_id"]
+
+        self.client.delete(
+            f"/api/combatlog/{log_id}",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+        self.assertEqual(0, CombatLogContent.objects.count())
+
+    def test_orm_delete_releases_content_after_last_log(self):
+        content = store_log_content(self.log)
+        first = CombatLog.objects.create(created_by=self.user, content=content)
+        second = CombatLog.objects.create(
+            created_by=self.user, content=content
+        )
+
+        first.delete()
+        self.assertTrue(
+            CombatLogContent.objects.filter(id=content.id).exists()
+        )
+
+        CombatLog.objects.filter(id=second.id).delete()
+        self.assertFalse(
+            CombatLogContent.objects.filter(id=content.id).exists()
+        )
@@ -1,5 +1,7 @@
 import logging
 import requests
+from datetime import datetime
+from email.utils import parsedate_to_datetime
 from typing import Any, List
 
 from django.conf import settings
@@ -17,6 +19,10 @@ from eveuniverse.models import (
     EveStation,
 )
 
+from eveonline.esi_pages import EsiPageEtags, fetch_esi_pages
+from eveonline.esi_prefetch import prefetchable
+from eveonline.token_broker import active_character_tokens, valid_access_token
+
 logger = logging.getLogger(__name__)
 
 SUCCESS = 0
@@ -67,17 +73,32 @@ def _esi_to_python(data: Any) -> Any:
     return data
 
 
+def _response_expires(response: Any) -> datetime | None:
+    """Parse the ESI ``Expires`` header (cache window end), if present."""
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("Expires")
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
 class EsiResponse:
     """Represents a response from the ESI API"""
 
     data: any
     response: any
     response_code: int
+    # End of the ESI cache window, for calls that ask for it.
+    expires: datetime | None
 
-    def __init__(self, response_code, data=None, response=None):
+    def __init__(self, response_code, data=None, response=None, expires=None):
         self.data = data
         self.response = response
         self.response_code = response_code
+        self.expires = expires
 
     def success(self):
         """Returns true of the ESI call was successful."""
@@ -149,12 +170,16 @@ class EsiClient:
         if self.character_esi_suspended:
             return None, CHAR_ESI_SUSPENDED
 
-        token = Token.get_token(self.character_id, required_scopes)
+        tokens = active_character_tokens(self.character_id)
+        if tokens:
+            token = tokens.token(required_scopes)
+        else:
+            token = Token.get_token(self.character_id, required_scopes)
         if not token:
             return None, NO_VALID_ESI_TOKEN
 
         try:
-            token.valid_access_token()
+            valid_access_token(token)
             return token, SUCCESS
         except (InvalidGrantError, TokenInvalidError):
             # Import here to avoid circular import (eveonline.models loads client)
@@ -177,11 +202,22 @@ class EsiClient:
     def _bearer_headers(token: Token) -> dict:
         return {"Authorization": f"Bearer {token.valid_access_token()}"}
 
-    def _operation_results(self, operation, **kwargs) -> EsiResponse:
+    def _operation_results(
+        self, operation, *, with_expires: bool = False, **kwargs
+    ) -> EsiResponse:
         # django-esi raises HTTPNotModified on 304 instead of returning the
         # cached body, which surfaces as opaque 906. Default off for sync paths.
         kwargs.setdefault("use_etag", False)
         try:
+            if with_expires:
+                data, response = operation.results(
+                    return_response=True, **kwargs
+                )
+                return EsiResponse(
+                    response_code=SUCCESS,
+                    data=_esi_to_python(data),
+                    expires=_response_expires(response),
+                )
             return EsiResponse(
                 response_code=SUCCESS,
                 data=_esi_to_python(operation.results(**kwargs)),
@@ -224,6 +260,7 @@ class EsiClient:
         # Single-object endpoint: result(), not results().
         return self._operation_result(operation)
 
+    @prefetchable
     def get_character_skills(self) -> EsiResponse:
         """Returns the skills for the character this ESI client was created for."""
 
@@ -245,6 +282,7 @@ class EsiClient:
         except Exception as e:
             return EsiResponse(response_code=ERROR_CALLING_ESI, response=e)
 
+    @prefetchable
     def get_character_assets(self) -> EsiResponse:
         """Returns the assets of the character this ESI client was created for."""
 
@@ -264,6 +302,7 @@ class EsiClient:
         except Exception as e:
             return EsiResponse(response_code=ERROR_CALLING_ESI, response=e)
 
+    @prefetchable
     def get_recent_killmails(self) -> EsiResponse:
         """Returns a character's recent killmails"""
 
@@ -290,6 +329,7 @@ class EsiClient:
         # Single-object endpoint: result(), not results().
         return self._operation_result(operation)
 
+    @prefetchable
     def get_character_blueprints(self) -> EsiResponse:
         """
         Returns all blueprints for the character. Paginated; fetches all pages.
@@ -333,8 +373,13 @@ class EsiClient:
             page_data = page_resp.json() if page_resp.content else []
             all_blueprints.extend(page_data)
 
-        return EsiResponse(response_code=SUCCESS, data=all_blueprints)
+        return EsiResponse(
+            response_code=SUCCESS,
+            data=all_blueprints,
+            expires=_response_expires(resp),
+        )
 
+    @prefetchable
     def get_character_industry_jobs(
         self, include_completed: bool = True
     ) -> EsiResponse:
@@ -362,6 +407,7 @@ class EsiClient:
             return EsiResponse(response_code=ERROR_CALLING_ESI, response=e)
         return EsiResponse(response_code=SUCCESS, data=jobs or [])
 
+    @prefetchable
     def get_character_contracts(self) -> EsiResponse:
         """Returns the contracts for the character this ESI client was created for"""
 
@@ -702,13 +748,13 @@ class EsiClient:
 
     def get_structure_market_orders_pages(self, structure_id: int):
         """
-        Yields all market orders for the structure in one chunk (requires
+        Yields market orders for the structure one page at a time (requires
         character with esi-markets.structure_markets.v1 and docking access).
-        Uses django-esi's results(), which fetches all pages internally.
-        Yields None once if token is invalid.
+        Pages after the first are fetched concurrently and yielded as they
+        arrive. Yields None once if the token is invalid or a page fails.
         """
         logger.info(
-            "get_structure_market_orders_pages: structure_id=%s character_id=%s — fetching all pages via results()",
+            "get_structure_market_orders_pages: structure_id=%s character_id=%s",
             structure_id,
             self.character_id,
         )
@@ -722,19 +768,10 @@ class EsiClient:
             yield None
             return
 
-        operation = esi_provider.client.Market.GetMarketsStructuresStructureId(
-            structure_id=structure_id,
-            token=token,
-        )
-        all_orders = _esi_to_python(operation.results(use_etag=False))
-        count = len(all_orders) if all_orders else 0
-        logger.info(
-            "get_structure_market_orders_pages: structure_id=%s — received all pages, orders_count=%s",
-            structure_id,
-            count,
+        yield from fetch_esi_pages(
+            f"{ESI_BASE_URL}/markets/structures/{structure_id}/",
+            headers=self._bearer_headers(token),
         )
-        if all_orders:
-            yield all_orders
 
     def get_active_fleet(self) -> EsiResponse:
         token, status = self._valid_token(["esi-fleets.read_fleet.v1"])
@@ -760,7 +797,7 @@ class EsiClient:
             fleet_id=fleet_id, token=token
         )
 
-        return self._operation_results(operation)
+        return self._operation_results(operation, with_expires=True)
 
     def get_alliance(self, alliance_id: int) -> EsiResponse:
         operation = esi_provider.client.Alliance.GetAlliancesAllianceId(
@@ -894,6 +931,7 @@ class EsiClient:
         # 204 No Content: result(), not results() (which wraps None as [None])
         return self._operation_result(operation, use_etag=False)
 
+    @prefetchable
     def get_character_planets(self) -> EsiResponse:
         """Returns the list of planetary colonies for the character."""
         token, status = self._valid_token(["esi-planets.manage_planets.v1"])
@@ -906,7 +944,11 @@ class EsiClient:
             headers=self._bearer_headers(token),
         )
         if response.status_code == 200:
-            return EsiResponse(response_code=SUCCESS, data=response.json())
+            return EsiResponse(
+                response_code=SUCCESS,
+                data=response.json(),
+                expires=_response_expires(response),
+            )
         return EsiResponse(response_code=response.status_code)
 
     def get_character_planet_details(self, planet_id: int) -> EsiResponse:
@@ -938,6 +980,7 @@ class EsiClient:
             return EsiResponse(response_code=SUCCESS, data=response.json())
         return EsiResponse(response_code=response.status_code)
 
+    @prefetchable
     def get_character_clones(self) -> EsiResponse:
         """Returns jump clones and medical clone location for the character."""
         token, status = self._valid_token(["esi-clones.read_clones.v1"])
@@ -950,9 +993,14 @@ class EsiClient:
             headers=self._bearer_headers(token),
         )
         if response.status_code == 200:
-            return EsiResponse(response_code=SUCCESS, data=response.json())
+            return EsiResponse(
+                response_code=SUCCESS,
+                data=response.json(),
+                expires=_response_expires(response),
+            )
         return EsiResponse(response_code=response.status_code)
 
+    @prefetchable
     def get_character_implants(self) -> EsiResponse:
         """Returns active implant type IDs for the character."""
         token, status = self._valid_token(["esi-clones.read_implants.v1"])
@@ -965,9 +1013,14 @@ class EsiClient:
             headers=self._bearer_headers(token),
         )
         if response.status_code == 200:
-            return EsiResponse(response_code=SUCCESS, data=response.json())
+            return EsiResponse(
+                response_code=SUCCESS,
+                data=response.json(),
+                expires=_response_expires(response),
+            )
         return EsiResponse(response_code=response.status_code)
 
+    @prefetchable
     def get_character_mining_ledger(self) -> EsiResponse:
         """Returns the personal mining ledger for the character (last 30 days)."""
         token, status = self._valid_token(
@@ -982,7 +1035,11 @@ class EsiClient:
             headers=self._bearer_headers(token),
         )
         if response.status_code == 200:
-            return EsiResponse(response_code=SUCCESS, data=response.json())
+            return EsiResponse(
+                response_code=SUCCESS,
+                data=response.json(),
+                expires=_response_expires(response),
+            )
         return EsiResponse(response_code=response.status_code)
 
     def get_character_notifications(self) -> EsiResponse:
@@ -1172,64 +1229,42 @@ class EsiClient:
         return station
 
 
-def get_region_market_orders_pages(region_id: int, type_id: int | None = None):
+def region_market_orders_etags(region_id: int, scope: str) -> EsiPageEtags:
+    """ETags for a region's full order book, kept per caller scope"""
+    return EsiPageEtags(
+        url=f"{ESI_BASE_URL}/markets/{region_id}/orders/", scope=scope
+    )
+
+
+def get_region_market_orders_pages(
+    region_id: int,
+    type_id: int | None = None,
+    etags: EsiPageEtags | None = None,
+):
     """
     Yields one page of market orders at a time for a region (public endpoint,
     no auth). Each order includes location_id, type_id, price, is_buy_order,
     range, etc. Use this for NPC station locations; filter by location_id.
     If type_id is set, only orders for that type are returned (fewer pages).
+
+    Pages after the first are fetched concurrently and yielded as they
+    arrive; yields None once if any page fails. With etags (see
+    region_market_orders_etags), raises EsiPagesNotModified if the order
+    book is unchanged since they were last saved.
     """
     logger.info(
         "get_region_market_orders_pages: region_id=%s type_id=%s — starting",
         region_id,
         type_id,
     )
-    page = 1
-    page_size = 1000
-    params: dict = {"page": page}
+    params: dict = {}
     if type_id is not None:
         params["type_id"] = type_id
-    while True:
-        logger.info(
-            "get_region_market_orders_pages: region_id=%s — requesting page %s",
-            region_id,
-            page,
-        )
-        url = f"{ESI_BASE_URL}/markets/{region_id}/orders/"
-        try:
-            resp = requests.get(url, params=params, timeout=30)
-        except Exception as e:
-            logger.exception(
-                "ESI request failed for region %s page %s: %s",
-                region_id,
-                page,
-                e,
-            )
-            yield None
-            return
-        if resp.status_code >= 400:
-            logger.warning(
-                "get_region_market_orders_pages: region_id=%s page=%s — status %s",
-                region_id,
-                page,
-                resp.status_code,
-            )
-            yield None
-            return
-        page_data = resp.json() if resp.content else []
-        logger.info(
-            "get_region_market_orders_pages: region_id=%s — page %s received, orders_count=%s",
-            region_id,
-            page,
-            len(page_data),
-        )
-        if not page_data:
-            break
-        yield page_data
-        if len(page_data) < page_size:
-            break
-        page += 1
-        params["page"] = page
+    yield from fetch_esi_pages(
+        f"{ESI_BASE_URL}/markets/{region_id}/orders/",
+        params=params,
+        etags=etags,
+    )
 
 
 def esi_for(character) -> EsiClient:
@@ -0,0 +1,315 @@
+"""Concurrent, ETag-aware fetching of paginated ESI endpoints.
+
+Page 1 is fetched first to read the X-Pages header, then the remaining
+pages are fetched concurrently over a shared keep-alive session with a
+bounded number of workers. Pages are yielded as they arrive (not in page
+order), so callers must aggregate order-independently. A short or empty
+page ends the walk even if X-Pages promised more.
+
+Given an EsiPageEtags, only the pages' ETags are kept, in the Django
+cache. The fetch sends If-None-Match for every page with the ETags the
+caller last saved and raises EsiPagesNotModified if none changed, so an
+unchanged result set is neither re-downloaded nor re-aggregated. If any
+page changed, all pages are fetched in full. The caller saves the new
+ETags only once it has stored what it built from the pages.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Generator, Iterator
+
+import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+ESI_PAGE_WORKERS = 8
+ESI_PAGE_TIMEOUT_SECONDS = 30
+ESI_PAGE_ETAG_TTL_SECONDS = 6 * 60 * 60
+ESI_USER_AGENT = "MinmatarOrg/1.0.0 (+https://minmatar.org)"
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+class EsiPagesNotModified(Exception):
+    """No page changed since the caller last saved its EsiPageEtags"""
+
+
+@dataclass
+class _Page:
+    data: list
+    total_pages: int
+    etag: str | None
+
+
+def esi_session() -> requests.Session:
+    """Returns the process-wide pooled session used for paged ESI fetches"""
+    global _session  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=4, pool_maxsize=ESI_PAGE_WORKERS * 2
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["User-Agent"] = ESI_USER_AGENT
+            _session = session
+        return _session
+
+
+@dataclass
+class EsiPageEtags:
+    """
+    One caller's ETags for a paged endpoint. fetch_esi_pages revalidates
+    against the saved ETags and fills in fetched after a complete walk;
+    save() stores them once the caller has used the pages. scope tells
+    callers of the same URL apart whose results depend on more than the
+    pages (e.g. which locations they were aggregated for).
+    """
+
+    url: str
+    params: dict = field(default_factory=dict)
+    scope: str = ""
+    fetched: list = field(default_factory=list)
+
+    @property
+    def cache_key(self) -> str:
+        identity = json.dumps(
+            [self.url, sorted(self.params.items()), self.scope], default=str
+        )
+        digest = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+        return f"esi:pages:{digest}:etags"
+
+    def saved(self) -> list | None:
+        return cache.get(self.cache_key)
+
+    def save(self) -> None:
+        if self.fetched:
+            cache.set(
+                self.cache_key,
+                self.fetched,
+                timeout=ESI_PAGE_ETAG_TTL_SECONDS,
+            )
+
+
+def _fetch_page(
+    url: str, params: dict, headers: dict, page: int
+) -> _Page | None:
+    """Fetch one page in full, or None if the request failed"""
+    try:
+        resp = esi_session().get(
+            url,
+            params={**params, "page": page},
+            headers=headers,
+            timeout=ESI_PAGE_TIMEOUT_SECONDS,
+        )
+    except Exception as e:
+        logger.exception("ESI request failed for %s page %s: %s", url, page, e)
+        return None
+
+    if resp.status_code >= 400:
+        logger.warning(
+            "ESI request for %s page %s — status %s",
+            url,
+            page,
+            resp.status_code,
+        )
+        return None
+
+    return _Page(
+        data=resp.json() if resp.content else [],
+        total_pages=int(resp.headers.get("X-Pages", 1)),
+        etag=resp.headers.get("ETag"),
+    )
+
+
+def _page_not_modified(
+    url: str, params: dict, headers: dict, page: int, etag: str
+) -> tuple[bool, int]:
+    """
+    Conditional request for one page. Returns (not_modified, total_pages);
+    the body of a changed page is never read.
+    """
+    try:
+        with esi_session().get(
+            url,
+            params={**params, "page": page},
+            headers={**headers, "If-None-Match": etag},
+            timeout=ESI_PAGE_TIMEOUT_SECONDS,
+            stream=True,
+        ) as resp:
+            return resp.status_code == 304, int(resp.headers.get("X-Pages", 1))
+    except Exception as e:
+        logger.exception("ESI request failed for %s page %s: %s", url, page, e)
+        return False, 0
+
+
+def _all_pages_not_modified(
+    url: str, params: dict, headers: dict, etags: list, max_workers: int
+) -> bool:
+    """True if every cached page answers 304 and the page count is unchanged"""
+    not_modified, total_pages = _page_not_modified(
+        url, params, headers, 1, etags[0]
+    )
+    if not not_modified or total_pages != len(etags):
+        return False
+    if total_pages == 1:
+        return True
+
+    workers = max(1, min(max_workers, total_pages - 1))
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="esi-pages"
+    ) as pool:
+        futures = [
+            pool.submit(
+                _page_not_modified, url, params, headers, page, etags[page - 1]
+            )
+            for page in range(2, total_pages + 1)
+        ]
+        for future in futures:
+            if not future.result()[0]:
+                pool.shutdown(wait=True, cancel_futures=True)
+                return False
+    return True
+
+
+def _failure_confirmed(
+    failed_page: int | None, last_page: int, arrived: set
+) -> bool:
+    """
+    A failed page only fails the walk once every lower page has arrived
+    without one of them turning out short.
+    """
+    return (
+        failed_page is not None
+        and failed_page <= last_page
+        and arrived.issuperset(range(2, failed_page))
+    )
+
+
+def _fetch_remaining_pages(
+    url: str,
+    params: dict,
+    headers: dict,
+    first: _Page,
+    max_workers: int,
+    page_etags: dict,
+) -> Generator[list | None, None, int | None]:
+    """
+    Yields pages 2.. as they arrive, recording their ETags in page_etags.
+    Returns the last page number, or None after yielding None on failure.
+
+    Pages past a short page are ignored, even failed ones that came back
+    first: a failure is held back until every lower page has arrived.
+    """
+    page_size = len(first.data)
+    last_page = first.total_pages if page_size else 1
+    workers = max(1, min(max_workers, last_page - 1))
+    next_page = 2
+    pending = {}
+    arrived = set()
+    failed_page = None
+    pool = ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="esi-pages"
+    )
+    try:
+        while pending or next_page <= min(last_page, failed_page or last_page):
+            while (
+                next_page <= min(last_page, failed_page or last_page)
+                and len(pending) < workers * 2
+            ):
+                future = pool.submit(
+                    _fetch_page, url, params, headers, next_page
+                )
+                pending[future] = next_page
+                next_page += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for page, future in sorted(
+                ((pending.pop(future), future) for future in done),
+                key=lambda item: item[0],
+            ):
+                result = future.result()
+                arrived.add(page)
+                if page > last_page:
+                    # Past a short page; X-Pages overstated the count
+                    continue
+                if result is None:
+                    failed_page = min(page, failed_page or page)
+                    continue
+                page_etags[page] = result.etag
+                if len(result.data) < page_size:
+                    last_page = page
+                if result.data:
+                    yield result.data
+
+            if _failure_confirmed(failed_page, last_page, arrived):
+                yield None
+                return None
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return last_page
+
+
+def fetch_esi_pages(
+    url: str,
+    params: dict | None = None,
+    headers: dict | None = None,
+    max_workers: int = ESI_PAGE_WORKERS,
+    etags: EsiPageEtags | None = None,
+) -> Iterator[list | None]:
+    """
+    Yields every page of a paginated ESI endpoint as it arrives.
+
+    Yields None once and stops if any page fails. At most max_workers
+    requests are in flight, and at most twice that many fetched pages wait
+    to be consumed, so memory stays bounded for slow consumers.
+
+    With etags, raises EsiPagesNotModified before yielding anything if no
+    page changed since the caller last saved them, and sets etags.fetched
+    after a complete walk for the caller to save.
+    """
+    params = dict(params or {})
+    headers = dict(headers or {})
+
+    saved = etags.saved() if etags else None
+    if saved and _all_pages_not_modified(
+        url, params, headers, saved, max_workers
+    ):
+        logger.info(
+            "fetch_esi_pages: %s — %s page(s) not modified", url, len(saved)
+        )
+        raise EsiPagesNotModified(url)
+
+    first = _fetch_page(url, params, headers, 1)
+    if first is None:
+        yield None
+        return
+    yield first.data
+
+    page_etags = {1: first.etag}
+    last_page = yield from _fetch_remaining_pages(
+        url, params, headers, first, max_workers, page_etags
+    )
+    if last_page is None:
+        return
+
+    if last_page < first.total_pages:
+        logger.warning(
+            "fetch_esi_pages: %s — X-Pages said %s, short page %s",
+            url,
+            first.total_pages,
+            last_page,
+        )
+    logger.info("fetch_esi_pages: %s — %s page(s)", url, last_page)
+
+    fetched = [page_etags.get(page) for page in range(1, last_page + 1)]
+    if etags is not None and all(fetched):
+        etags.fetched = fetched
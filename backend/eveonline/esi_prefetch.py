@@ -0,0 +1,61 @@
+"""Hand ESI responses fetched ahead of time to the code that asks for them.
+
+The character refresh pipeline fetches a character's endpoints
+concurrently, then runs the usual update helpers one after another. Those
+helpers still call ``EsiClient(...).get_character_assets()`` and friends;
+client methods decorated with ``prefetchable`` return the matching
+prefetched response (once) instead of calling ESI again.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Iterator
+
+_prefetched: ContextVar[dict | None] = ContextVar(
+    "eveonline_prefetched_responses", default=None
+)
+
+
+def prefetch_key(
+    character_id, method_name: str, args: tuple = (), kwargs: dict = None
+) -> tuple:
+    return (
+        character_id,
+        method_name,
+        tuple(args),
+        tuple(sorted((kwargs or {}).items())),
+    )
+
+
+def prefetchable(method):
+    """Serve a prefetched response for this exact call, if there is one."""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        responses = _prefetched.get()
+        if responses:
+            response = responses.pop(
+                prefetch_key(
+                    getattr(self, "character_id", None),
+                    method.__name__,
+                    args,
+                    kwargs,
+                ),
+                None,
+            )
+            if response is not None:
+                return response
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+@contextmanager
+def prefetched_responses(responses: dict) -> Iterator[dict]:
+    """Make ``prefetch_key -> EsiResponse`` available to enclosed calls."""
+    reset = _prefetched.set(dict(responses))
+    try:
+        yield _prefetched.get()
+    finally:
+        _prefetched.reset(reset)
@@ -0,0 +1,76 @@
+"""Cross-worker pacing for character refreshes, kept in the Django cache.
+
+Counters live in one-minute windows in the shared cache (Redis in
+production), so every worker draws from the same budget. A window closes
+early to new refreshes once the character refresh quota or the ESI error
+budget for that minute is used up.
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+REFRESH_WINDOW_SECONDS = 60
+
+# Character refreshes started per minute across all workers; each one makes
+# about a dozen ESI calls.
+CHARACTER_REFRESHES_PER_MINUTE = 60
+
+# ESI blocks an IP after 100 errors in a minute; keep half for everything
+# else this site does.
+ESI_ERROR_BUDGET_PER_MINUTE = 50
+
+CHARACTER_REFRESH_KEY = "esi:character_refresh:{}"
+ESI_ERROR_KEY = "esi:errors:{}"
+
+
+def _window(now: float) -> int:
+    return int(now // REFRESH_WINDOW_SECONDS)
+
+
+def _incr(key: str, delta: int = 1) -> int:
+    cache.add(key, 0, REFRESH_WINDOW_SECONDS * 2)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, delta, REFRESH_WINDOW_SECONDS * 2)
+        return delta
+
+
+def record_esi_errors(count: int, now: float | None = None) -> None:
+    if count > 0:
+        _incr(ESI_ERROR_KEY.format(_window(now or time.time())), count)
+
+
+def character_refresh_countdown(now: float | None = None) -> int:
+    """
+    Take a character refresh slot in the current window.
+
+    Returns 0 when the caller may refresh now, otherwise the number of
+    seconds until the next window.
+    """
+    now = now or time.time()
+    window = _window(now)
+    wait = int(REFRESH_WINDOW_SECONDS - now % REFRESH_WINDOW_SECONDS) + 1
+    errors = cache.get(ESI_ERROR_KEY.format(window)) or 0
+    if errors >= ESI_ERROR_BUDGET_PER_MINUTE:
+        logger.warning(
+            "ESI error budget used (%d errors), deferring refreshes %ds",
+            errors,
+            wait,
+        )
+        return wait
+    if _incr(CHARACTER_REFRESH_KEY.format(window)) > (
+        CHARACTER_REFRESHES_PER_MINUTE
+    ):
+        return wait
+    return 0
+
+
+def refresh_shard_countdown(index: int) -> int:
+    """Countdown that spreads queued refreshes one quota per minute."""
+    return (index // CHARACTER_REFRESHES_PER_MINUTE) * REFRESH_WINDOW_SECONDS
@@ -1,9 +1,12 @@
 # Character helpers. Re-export for backward compatibility:
 #   from eveonline.helpers.characters import user_primary_character
 from eveonline.helpers.characters.affiliations import (
+    AFFILIATION_FIELDS,
+    affiliation_changes,
     update_character_with_affiliations,
 )
 from eveonline.helpers.characters.assets import (
+    asset_sync_run,
     create_character_assets,
     non_ship_location,
 )
@@ -21,9 +24,12 @@ from eveonline.helpers.characters.characters import (
     user_player,
     user_primary_character,
 )
+from eveonline.helpers.characters.skill_matrix import SkillMatrix
 from eveonline.helpers.characters.skills import (
     compare_skills_to_skillset,
     create_eve_character_skillset,
+    sync_character_skills,
+    update_character_skillsets,
     upsert_character_skill,
     upsert_character_skills,
 )
@@ -50,10 +56,13 @@ from eveonline.helpers.characters.update import (
 )
 
 __all__ = [
+    "AFFILIATION_FIELDS",
+    "affiliation_changes",
     "character_configured_scope_groups",
     "character_desired_scopes",
     "scope_groups_for_token_add",
     "character_primary",
+    "asset_sync_run",
     "create_character_assets",
     "create_eve_character_skillset",
     "compare_skills_to_skillset",
@@ -76,6 +85,9 @@ __all__ = [
     "user_characters",
     "user_player",
     "user_primary_character",
+    "SkillMatrix",
+    "sync_character_skills",
+    "update_character_skillsets",
     "upsert_character_skill",
     "upsert_character_skills",
 ]
@@ -1,5 +1,29 @@
 from eveonline.models import EveCharacter
 
+AFFILIATION_FIELDS = ("corporation_id", "alliance_id", "faction_id")
+
+
+def affiliation_changes(
+    current: dict,
+    corporation_id: int | None,
+    alliance_id: int | None = None,
+    faction_id: int | None = None,
+) -> dict:
+    """
+    Affiliation fields that differ from ``current`` (a character or a
+    ``values()`` row), with missing ESI ids normalised to None.
+    """
+    new_values = {
+        "corporation_id": corporation_id or None,
+        "alliance_id": alliance_id or None,
+        "faction_id": faction_id or None,
+    }
+    return {
+        field: value
+        for field, value in new_values.items()
+        if current[field] != value
+    }
+
 
 def update_character_with_affiliations(
     character_id: int,
@@ -8,22 +32,15 @@ def update_character_with_affiliations(
     faction_id: int | None = None,
 ) -> bool:
     character = EveCharacter.objects.get(character_id=character_id)
-    updated = False
-    if (corporation_id and character.corporation_id != corporation_id) or (
-        not corporation_id and character.corporation_id is not None
-    ):
-        character.corporation_id = corporation_id
-        updated = True
-    if (alliance_id and character.alliance_id != alliance_id) or (
-        not alliance_id and character.alliance_id is not None
-    ):
-        character.alliance_id = alliance_id
-        updated = True
-    if (faction_id and character.faction_id != faction_id) or (
-        not faction_id and character.faction_id is not None
-    ):
-        character.faction_id = faction_id
-        updated = True
-    if updated:
-        character.save()
-    return updated
+    changes = affiliation_changes(
+        {field: getattr(character, field) for field in AFFILIATION_FIELDS},
+        corporation_id,
+        alliance_id,
+        faction_id,
+    )
+    if not changes:
+        return False
+    for field, value in changes.items():
+        setattr(character, field, value)
+    character.save()
+    return True
@@ -1,10 +1,14 @@
 import logging
-from typing import Dict, List, Optional
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
 
 import pydantic
+from django.utils import timezone
 
 from eveonline.client import EsiClient
-from eveonline.helpers.db_sync import replace_with_bulk_create
+from eveonline.helpers.db_sync import apply_bulk_changes
 from eveonline.models import EveCharacter, EveCharacterAsset, EveLocation
 from eveuniverse.models import EveStation, EveType
 
@@ -12,6 +16,12 @@ logger = logging.getLogger(__name__)
 
 BULK_CREATE_BATCH = 500
 
+# Name lookups are shared by every character synced in one run; a run
+# matches one update_alliance_characters cycle.
+ASSET_SYNC_RUN_SECONDS = 4 * 60 * 60
+
+ASSET_FIELDS = ("type_id", "type_name", "location_id", "location_name")
+
 
 class EveAssetResponse(pydantic.BaseModel):
     is_blueprint_copy: Optional[bool] = None
@@ -133,10 +143,92 @@ def _item_location_names_by_id(location_ids: set[int]) -> Dict[int, str]:
     return names
 
 
+@dataclass
+class AssetSyncRun:
+    """Name lookups and row churn counters for one asset sync run."""
+
+    started: float = field(default_factory=time.monotonic)
+    ship_names: Dict[int, Optional[str]] = field(default_factory=dict)
+    station_names: Dict[int, str] = field(default_factory=dict)
+    # Only names found in EveLocation; unknown locations are looked up
+    # again in case they have been added since.
+    location_names: Dict[int, str] = field(default_factory=dict)
+    characters: int = 0
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+    def record(self, created: int, updated: int, deleted: int, unchanged: int):
+        self.characters += 1
+        self.created += created
+        self.updated += updated
+        self.deleted += deleted
+        self.unchanged += unchanged
+
+    @property
+    def writes_avoided(self) -> int:
+        """Row writes saved over deleting and re-inserting every asset."""
+        return 2 * self.unchanged + self.updated
+
+    def summary(self) -> str:
+        return (
+            f"{self.characters} character(s), {self.created} created, "
+            f"{self.updated} updated, {self.deleted} deleted, "
+            f"{self.unchanged} unchanged, {self.writes_avoided} row writes "
+            "avoided"
+        )
+
+
+_run: Optional[AssetSyncRun] = None
+_run_lock = threading.Lock()
+
+
+def asset_sync_run() -> AssetSyncRun:
+    """This process's current sync run, starting a new one when it is stale."""
+    global _run  # pylint: disable=global-statement
+    with _run_lock:
+        if (
+            _run is None
+            or time.monotonic() - _run.started > ASSET_SYNC_RUN_SECONDS
+        ):
+            if _run is not None and _run.characters:
+                logger.info("Asset sync run finished: %s", _run.summary())
+            _run = AssetSyncRun()
+        return _run
+
+
+def reset_asset_sync_run() -> AssetSyncRun:
+    """Start a new sync run (tests)."""
+    global _run  # pylint: disable=global-statement
+    with _run_lock:
+        _run = AssetSyncRun()
+        return _run
+
+
+def _memoized(
+    memo: Dict[int, object],
+    ids: set[int],
+    resolve: Callable[[set[int]], Dict[int, object]],
+    keep: Callable[[int, object], bool] = lambda _id, _value: True,
+) -> Dict[int, object]:
+    missing = ids - set(memo)
+    resolved = resolve(missing) if missing else {}
+    memo.update(
+        (key, value) for key, value in resolved.items() if keep(key, value)
+    )
+    return {key: memo[key] if key in memo else resolved[key] for key in ids}
+
+
 def create_character_assets(character: EveCharacter, assets_data: List[dict]):
-    """Create assets for a character from ESI assets data"""
-    logger.debug("Creating assets for character %s", character.character_id)
+    """
+    Sync a character's ship assets with ESI assets data, keyed on item_id.
+    Only new, changed and removed rows are written.
+    Returns (created, updated, deleted).
+    """
+    logger.debug("Syncing assets for character %s", character.character_id)
     esi = EsiClient(None)
+    run = asset_sync_run()
     assets: List[EveAssetResponse] = [
         EveAssetResponse(**asset) for asset in assets_data
     ]
@@ -150,22 +242,39 @@ def create_character_assets(character: EveCharacter, assets_data: List[dict]):
     ]
 
     type_ids = {asset.type_id for asset in candidate_assets}
-    station_ids = {
-        asset.location_id
-        for asset in candidate_assets
-        if asset.location_type == "station"
-    }
     item_location_ids = {
         asset.location_id
         for asset in candidate_assets
         if asset.location_type == "item"
     }
 
-    ship_names_by_type_id = _ship_type_names_by_id(type_ids, esi)
-    station_names = _station_names_by_id(station_ids, esi)
-    item_location_names = _item_location_names_by_id(item_location_ids)
+    ship_names_by_type_id = _memoized(
+        run.ship_names,
+        type_ids,
+        lambda ids: _ship_type_names_by_id(ids, esi),
+    )
+    ship_type_ids = {
+        type_id for type_id, name in ship_names_by_type_id.items() if name
+    }
+    station_names = _memoized(
+        run.station_names,
+        {
+            asset.location_id
+            for asset in candidate_assets
+            if asset.location_type == "station"
+            and asset.type_id in ship_type_ids
+        },
+        lambda ids: _station_names_by_id(ids, esi),
+    )
+    item_location_names = _memoized(
+        run.location_names,
+        item_location_ids,
+        _item_location_names_by_id,
+        keep=lambda location_id, name: name
+        != "Unknown Location - " + str(location_id),
+    )
 
-    instances = []
+    wanted = {}
     for asset in candidate_assets:
         type_name = ship_names_by_type_id.get(asset.type_id)
         if not type_name:
@@ -176,21 +285,60 @@ def create_character_assets(character: EveCharacter, assets_data: List[dict]):
         else:
             location_name = item_location_names[asset.location_id]
 
-        instances.append(
-            EveCharacterAsset(
-                type_id=asset.type_id,
-                type_name=type_name,
-                location_id=asset.location_id,
-                location_name=location_name,
-                character=character,
-                item_id=asset.item_id,
-            )
+        wanted[asset.item_id] = (
+            asset.type_id,
+            type_name,
+            asset.location_id,
+            location_name,
         )
 
-    deleted_queryset = EveCharacterAsset.objects.filter(character=character)
-    deleted_count = deleted_queryset.count()
-    created = replace_with_bulk_create(
-        delete_queryset=deleted_queryset,
-        instances=instances,
-    )
-    return (created, 0, deleted_count)
+    existing = {}
+    delete_ids = []
+    for pk, item_id, *values in EveCharacterAsset.objects.filter(
+        character=character
+    ).values_list("id", "item_id", *ASSET_FIELDS):
+        if item_id is None or item_id in existing:
+            delete_ids.append(pk)
+        else:
+            existing[item_id] = (pk, tuple(values))
+
+    now = timezone.now()
+    create = []
+    update = []
+    unchanged = 0
+    for item_id, values in wanted.items():
+        current = existing.pop(item_id, None)
+        if current is None:
+            create.append(
+                EveCharacterAsset(
+                    character=character,
+                    item_id=item_id,
+                    **dict(zip(ASSET_FIELDS, values)),
+                )
+            )
+        elif current[1] != values:
+            update.append(
+                EveCharacterAsset(
+                    id=current[0],
+                    character=character,
+                    item_id=item_id,
+                    updated=now,
+                    **dict(zip(ASSET_FIELDS, values)),
+                )
+            )
+        else:
+            unchanged += 1
+    delete_ids.extend(pk for pk, _ in existing.values())
+
+    if create or update or delete_ids:
+        counts = apply_bulk_changes(
+            model=EveCharacterAsset,
+            create=create,
+            update=update,
+            update_fields=(*ASSET_FIELDS, "updated"),
+            delete_ids=delete_ids,
+        )
+    else:
+        counts = (0, 0, 0)
+    run.record(*counts, unchanged)
+    return counts
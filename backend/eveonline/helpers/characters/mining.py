@@ -8,6 +8,7 @@ from eveuniverse.models import EveType, EveTypeMaterial
 from eveonline.client import EsiClient
 from eveonline.models import EveCharacter
 from eveonline.models.characters import EveCharacterMiningEntry
+from tribes.reports.rollups import refresh_mining_rollups
 
 logger = logging.getLogger(__name__)
 
@@ -62,10 +63,12 @@ def update_character_mining(eve_character_id: int) -> int:
 
     entries = response.results() or []
     seen_type_ids: set[int] = set()
+    days: set[date] = set()
 
     for entry in entries:
         type_id = entry["type_id"]
         entry_date = date.fromisoformat(entry["date"])
+        days.add(entry_date)
         quantity = entry["quantity"]
         solar_system_id = entry["solar_system_id"]
 
@@ -83,6 +86,8 @@ def update_character_mining(eve_character_id: int) -> int:
             defaults={"quantity": quantity},
         )
 
+    refresh_mining_rollups(character, days=days)
+
     logger.info(
         "Synced %s mining entry(ies) for character %s",
         len(entries),
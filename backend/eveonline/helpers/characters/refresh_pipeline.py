@@ -0,0 +1,161 @@
+"""
+Pipelined character refresh: fetch a character's due ESI endpoints
+concurrently, then run the update helpers one after another.
+
+Each step names the client calls its helper makes. Fetches run on a small
+thread pool (network only, no database access); the helpers then run on
+the calling thread with those responses prefetched, so all writes happen
+in order on one connection. A step whose last successful fetch is still
+inside its ESI cache window (``Expires``) is skipped, since ESI would
+return the same data.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from eveonline.client import EsiClient, EsiResponse
+from eveonline.esi_prefetch import prefetch_key, prefetched_responses
+from eveonline.esi_rate_limit import record_esi_errors
+from eveonline.token_broker import CharacterTokens, valid_access_token
+
+logger = logging.getLogger(__name__)
+
+CHARACTER_FETCH_WORKERS = 4
+
+REFRESHED_KEY = "eveonline:character_refreshed:{}:{}"
+
+
+@dataclass(frozen=True)
+class RefreshStep:
+    name: str
+    # Every scope list must be granted for the step to run.
+    scopes: Tuple[Tuple[str, ...], ...]
+    refresh: Callable[[int], object]
+    # (EsiClient method name, kwargs) the helper calls for this character.
+    fetches: Tuple[Tuple[str, tuple], ...]
+    # ESI cache time, used when the response carries no Expires header.
+    cache_seconds: int
+
+
+def refresh_due(character_id: int, step: RefreshStep) -> bool:
+    return cache.get(REFRESHED_KEY.format(character_id, step.name)) is None
+
+
+def _mark_refreshed(
+    character_id: int, step: RefreshStep, expires: List[datetime]
+) -> None:
+    if expires:
+        seconds = int((min(expires) - timezone.now()).total_seconds())
+    else:
+        seconds = step.cache_seconds
+    if seconds > 0:
+        cache.set(REFRESHED_KEY.format(character_id, step.name), 1, seconds)
+
+
+def _fetch_key(character_id: int, fetch: Tuple[str, tuple]) -> tuple:
+    method_name, kwargs = fetch
+    return prefetch_key(character_id, method_name, kwargs=dict(kwargs))
+
+
+def _prepare_tokens(
+    tokens: CharacterTokens, steps: Iterable[RefreshStep]
+) -> List[RefreshStep]:
+    """
+    Steps whose access tokens are valid now. Refreshing a token writes to
+    the database, so it happens here rather than in a fetch thread; steps
+    left out fall back to fetching from their helper.
+    """
+    ready = []
+    for step in steps:
+        try:
+            for scopes in step.scopes:
+                valid_access_token(tokens.token(list(scopes)))
+        except Exception:
+            continue
+        ready.append(step)
+    return ready
+
+
+def fetch_concurrently(
+    client: EsiClient, fetches: Iterable[Tuple[str, tuple]]
+) -> Dict[tuple, EsiResponse]:
+    """Run client calls on the fetch pool; ``prefetch_key -> response``."""
+    fetches = list(dict.fromkeys(fetches))
+    if not fetches:
+        return {}
+
+    def fetch(method_name, kwargs):
+        return getattr(client, method_name)(**dict(kwargs))
+
+    with ThreadPoolExecutor(
+        max_workers=min(CHARACTER_FETCH_WORKERS, len(fetches))
+    ) as executor:
+        # Each call runs in a copy of this context so it sees the active
+        # character tokens.
+        futures = {
+            _fetch_key(client.character_id, item): executor.submit(
+                copy_context().run, fetch, *item
+            )
+            for item in fetches
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def run_refresh_pipeline(
+    character, tokens: CharacterTokens, steps: Iterable[RefreshStep]
+) -> List[str]:
+    """
+    Refresh the due steps the character has scopes for; returns the names
+    of the steps that ran.
+    """
+    character_id = character.character_id
+    due = [
+        step
+        for step in steps
+        if all(tokens.has_scopes(list(scopes)) for scopes in step.scopes)
+        and refresh_due(character_id, step)
+    ]
+    if not due:
+        return []
+
+    responses = fetch_concurrently(
+        EsiClient(character),
+        (
+            fetch
+            for step in _prepare_tokens(tokens, due)
+            for fetch in step.fetches
+        ),
+    )
+    record_esi_errors(
+        sum(1 for response in responses.values() if not response.success())
+    )
+
+    with prefetched_responses(responses):
+        for step in due:
+            step.refresh(character_id)
+            step_responses = [
+                responses.get(_fetch_key(character_id, fetch))
+                for fetch in step.fetches
+            ]
+            if all(
+                response is not None and response.success()
+                for response in step_responses
+            ):
+                _mark_refreshed(
+                    character_id,
+                    step,
+                    [r.expires for r in step_responses if r.expires],
+                )
+    logger.debug(
+        "Refreshed %s for character %s",
+        ", ".join(step.name for step in due),
+        character_id,
+    )
+    return [step.name for step in due]
@@ -0,0 +1,182 @@
+"""
+Character x skill level matrix for skillset readiness checks.
+
+Skill rows for any number of characters are read in one query into one
+dense ``bytearray`` per character, indexed by skill column (one column per
+skill id). Skillset text is parsed once per distinct text, and its lines
+are resolved to columns once per matrix, so "can fly / missing skills /
+progress" for every skillset and every character is a flat scan over
+small integer arrays.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+from eveonline.models import EveCharacterSkill
+
+# Progress weight per required level (matches the original comparison).
+SKILL_LEVEL_WEIGHT = 12
+
+# Cell value for a skill the character does not have; trained levels are
+# stored as level + 1 so an injected level 0 skill is still "present".
+NO_SKILL = 0
+
+
+@dataclass(frozen=True)
+class SkillRequirement:
+    line: str
+    skill_name: str
+    level: int
+
+
+@lru_cache(maxsize=256)
+def parse_skillset_skills(skills: str) -> Tuple[SkillRequirement, ...]:
+    """Distinct ``<name> <level>`` lines of a skillset, in order."""
+    lines = dict.fromkeys(line.strip() for line in skills.split("\n"))
+    return tuple(
+        SkillRequirement(
+            line=line, skill_name=line[:-1].strip(), level=int(line[-1])
+        )
+        for line in lines
+        if line
+    )
+
+
+def skill_readiness(
+    requirements: Iterable[Tuple[SkillRequirement, Optional[int]]],
+) -> Tuple[List[str], int]:
+    """
+    Missing skill lines and progress from (requirement, trained level or
+    None) pairs, with the same arithmetic as compare_skills_to_skillset.
+    """
+    missing_skills = []
+    player_skill_count = 0
+    total_skill_count = 0
+    for requirement, trained_level in requirements:
+        weight = requirement.level * SKILL_LEVEL_WEIGHT
+        if trained_level is None or trained_level < requirement.level:
+            missing_skills.append(requirement.line)
+            total_skill_count += weight
+        if trained_level is not None:
+            player_skill_count += weight
+    if missing_skills:
+        progress = player_skill_count / total_skill_count
+    else:
+        progress = 100
+    return missing_skills, int(progress)
+
+
+def skill_levels_readiness(
+    skill_levels: Mapping[str, int], skills: str
+) -> Tuple[List[str], int]:
+    """Readiness for one character given ``skill_name -> level``."""
+    return skill_readiness(
+        (requirement, skill_levels.get(requirement.skill_name))
+        for requirement in parse_skillset_skills(skills)
+    )
+
+
+class SkillMatrix:
+    """Dense per-character skill levels, loaded in one query."""
+
+    def __init__(self, rows: Iterable[Tuple[int, int, str, int]]):
+        rows = list(rows)
+        self.skill_ids = sorted({skill_id for _, skill_id, _, _ in rows})
+        self.character_ids = sorted(
+            {character_id for character_id, *_ in rows}
+        )
+        columns = {skill_id: i for i, skill_id in enumerate(self.skill_ids)}
+        # Names resolve to every column carrying them, in case stored rows
+        # disagree on a skill's id.
+        self._name_columns: dict[str, tuple[int, ...]] = {}
+        self._rows = {
+            character_id: bytearray(len(self.skill_ids))
+            for character_id in self.character_ids
+        }
+        for character_id, skill_id, skill_name, skill_level in rows:
+            column = columns[skill_id]
+            if column not in self._name_columns.get(skill_name, ()):
+                self._name_columns[skill_name] = (
+                    *self._name_columns.get(skill_name, ()),
+                    column,
+                )
+            self._rows[character_id][column] = skill_level + 1
+
+    @classmethod
+    def for_characters(
+        cls, character_ids=None, skill_names=None
+    ) -> "SkillMatrix":
+        """
+        Matrix for the given EveCharacter character_ids (default: all),
+        holding only skill_names when given.
+        """
+        skills = EveCharacterSkill.objects.all()
+        if character_ids is not None:
+            skills = skills.filter(character__character_id__in=character_ids)
+        if skill_names is not None:
+            skills = skills.filter(skill_name__in=skill_names)
+        return cls(
+            skills.values_list(
+                "character__character_id",
+                "skill_id",
+                "skill_name",
+                "skill_level",
+            )
+        )
+
+    def _compile(
+        self, skills: str
+    ) -> List[Tuple[SkillRequirement, Tuple[int, ...]]]:
+        return [
+            (requirement, self._name_columns.get(requirement.skill_name, ()))
+            for requirement in parse_skillset_skills(skills)
+        ]
+
+    @staticmethod
+    def _trained_level(row, columns) -> Optional[int]:
+        if row is None:
+            return None
+        cell = max((row[column] for column in columns), default=NO_SKILL)
+        return None if cell == NO_SKILL else cell - 1
+
+    @classmethod
+    def _readiness(cls, row, compiled) -> Tuple[List[str], int]:
+        return skill_readiness(
+            (requirement, cls._trained_level(row, columns))
+            for requirement, columns in compiled
+        )
+
+    def readiness(
+        self, character_id: int, skills: str
+    ) -> Tuple[List[str], int]:
+        """(missing skill lines, progress) for one character."""
+        return self._readiness(
+            self._rows.get(character_id), self._compile(skills)
+        )
+
+    def readiness_by_character(
+        self, skills: str, character_ids: Iterable[int] = None
+    ) -> dict:
+        """character_id -> (missing skill lines, progress)."""
+        compiled = self._compile(skills)
+        if character_ids is None:
+            character_ids = self.character_ids
+        return {
+            character_id: self._readiness(
+                self._rows.get(character_id), compiled
+            )
+            for character_id in character_ids
+        }
+
+    def characters_with(
+        self, skills: str, character_ids: Iterable[int] = None
+    ) -> List[int]:
+        """Character ids missing none of the skillset's skills."""
+        return [
+            character_id
+            for character_id, (missing, _) in self.readiness_by_character(
+                skills, character_ids
+            ).items()
+            if not missing
+        ]
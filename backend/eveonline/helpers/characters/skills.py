@@ -1,9 +1,14 @@
 import json
 import logging
-from typing import List
 
 import pydantic
+from django.db import transaction
+from django.utils import timezone
+from eveuniverse.models import EveType
+
 from eveonline.client import EsiClient
+from eveonline.helpers.characters.skill_matrix import skill_levels_readiness
+from eveonline.helpers.db_sync import replace_with_bulk_create
 
 from eveonline.models import (
     EveCharacter,
@@ -14,6 +19,8 @@ from eveonline.models import (
 
 logger = logging.getLogger(__name__)
 
+SKILL_SYNC_BATCH_SIZE = 500
+
 
 class EveCharacterSkillResponse(pydantic.BaseModel):
     skill_id: int
@@ -34,87 +41,149 @@ def upsert_character_skills(character_id: int):
             character.summary(),
         )
         return
-    for skill in response.results():
-        upsert_character_skill(character, skill)
+    sync_character_skills(character, response.results())
 
 
 def upsert_character_skill(character: EveCharacter, esi_skill):
-    skill_type = EsiClient(None).get_eve_type(esi_skill["skill_id"])
-    qry = EveCharacterSkill.objects.filter(
-        character=character, skill_id=esi_skill["skill_id"]
-    ).order_by("-skill_points")
-    logger.debug("Query count %d", qry.count())
-    if qry.count() == 0:
-        skill = EveCharacterSkill(
-            character=character,
-            skill_id=esi_skill["skill_id"],
-            skill_name=skill_type.name,
-            skill_points=esi_skill["skillpoints_in_skill"],
-            skill_level=esi_skill["trained_skill_level"],
-        )
-    else:
-        skill = qry.first()
-        skill.skill_points = esi_skill["skillpoints_in_skill"]
-        skill.skill_level = esi_skill["trained_skill_level"]
-    skill.save()
-    if qry.count() > 1:
-        logger.error(
-            "Duplicate skill %d for character %d, deleting one",
-            esi_skill["skill_id"],
-            character.character_id,
+    sync_character_skills(character, [esi_skill])
+
+
+def _skill_names(skill_ids) -> dict[int, str]:
+    """Skill type names from the local SDE, falling back to ESI."""
+    names = dict(
+        EveType.objects.filter(id__in=skill_ids).values_list("id", "name")
+    )
+    for skill_id in skill_ids:
+        if skill_id not in names:
+            names[skill_id] = EsiClient(None).get_eve_type(skill_id).name
+    return names
+
+
+def sync_character_skills(
+    character: EveCharacter, esi_skills
+) -> tuple[int, int, int]:
+    """
+    Diff ESI skills against the character's stored skills and write the
+    changes in bulk. Duplicate rows for a skill keep the one with the most
+    skill points. Returns (created, updated, deleted).
+    """
+    existing = {}
+    duplicate_ids = []
+    for skill in EveCharacterSkill.objects.filter(
+        character=character
+    ).order_by("skill_id", "-skill_points", "id"):
+        if skill.skill_id in existing:
+            duplicate_ids.append(skill.id)
+        else:
+            existing[skill.skill_id] = skill
+
+    now = timezone.now()
+    new_skills = {}
+    changed = []
+    for esi_skill in esi_skills:
+        skill_id = esi_skill["skill_id"]
+        skill_points = esi_skill["skillpoints_in_skill"]
+        skill_level = esi_skill["trained_skill_level"]
+        skill = existing.get(skill_id)
+        if skill is None:
+            new_skills[skill_id] = (skill_points, skill_level)
+        elif (
+            skill.skill_points != skill_points
+            or skill.skill_level != skill_level
+        ):
+            skill.skill_points = skill_points
+            skill.skill_level = skill_level
+            # bulk_update does not apply auto_now
+            skill.updated_at = now
+            changed.append(skill)
+
+    if not (new_skills or changed or duplicate_ids):
+        return 0, 0, 0
+
+    # Resolved before the transaction; unknown types may need ESI.
+    names = _skill_names(list(new_skills)) if new_skills else {}
+    with transaction.atomic():
+        if duplicate_ids:
+            logger.error(
+                "Deleting %d duplicate skill(s) for character %d",
+                len(duplicate_ids),
+                character.character_id,
+            )
+            EveCharacterSkill.objects.filter(id__in=duplicate_ids).delete()
+        if new_skills:
+            EveCharacterSkill.objects.bulk_create(
+                [
+                    EveCharacterSkill(
+                        character=character,
+                        skill_id=skill_id,
+                        skill_name=names[skill_id],
+                        skill_points=skill_points,
+                        skill_level=skill_level,
+                    )
+                    for skill_id, (
+                        skill_points,
+                        skill_level,
+                    ) in new_skills.items()
+                ],
+                batch_size=SKILL_SYNC_BATCH_SIZE,
+            )
+        if changed:
+            EveCharacterSkill.objects.bulk_update(
+                changed,
+                ["skill_points", "skill_level", "updated_at"],
+                batch_size=SKILL_SYNC_BATCH_SIZE,
+            )
+
+    logger.debug(
+        "Synced skills for character %s: %d created, %d updated, %d deleted",
+        character.character_id,
+        len(new_skills),
+        len(changed),
+        len(duplicate_ids),
+    )
+    return len(new_skills), len(changed), len(duplicate_ids)
+
+
+def character_skill_levels(character: EveCharacter) -> dict[str, int]:
+    """skill_name -> trained level for one character."""
+    return dict(
+        EveCharacterSkill.objects.filter(character=character).values_list(
+            "skill_name", "skill_level"
         )
-        qry.last().delete()
+    )
 
 
 def compare_skills_to_skillset(character_id: int, skillset: EveSkillset):
     """Compare a character's skills to a skillset"""
     character = EveCharacter.objects.get(character_id=character_id)
-    character_skills = EveCharacterSkill.objects.filter(character=character)
-    skills: List[EveCharacterSkillResponse] = []
-    for skill in character_skills:
-        skills.append(
-            EveCharacterSkillResponse(
-                skill_id=skill.skill_id,
-                skill_name=skill.skill_name,
-                skillpoints_in_skill=skill.skill_points,
-                trained_skill_level=skill.skill_level,
-            )
+    return skill_levels_readiness(
+        character_skill_levels(character), skillset.skills
+    )
+
+
+def update_character_skillsets(character_id: int) -> int:
+    """Recompute every skillset for a character from one skills read."""
+    character = EveCharacter.objects.get(character_id=character_id)
+    skill_levels = character_skill_levels(character)
+    skillsets = []
+    for skillset in EveSkillset.objects.all():
+        missing_skills, progress = skill_levels_readiness(
+            skill_levels, skillset.skills
         )
-    skillset_lookup = {}
-    for skill in skillset.skills.split("\n"):
-        skill = skill.strip()
-        skillset_lookup[skill] = True
-    hydrated_skills = {}
-    for skill in skills:
-        hydrated_skills[skill.skill_name] = skill.model_dump()
-    missing_skills = []
-    player_skill_count = 0
-    total_skill_count = 0
-    for skill in skillset_lookup:
-        logger.debug("Checking skill %s", skill)
-        skill_name = skill[:-1].strip()
-        skill_level = int(skill[-1])
-        if skill_name not in hydrated_skills:
-            missing_skills.append(skill)
-            total_skill_count += skill_level * 12
-        else:
-            logger.debug(
-                "Player has skill %s at level %s",
-                skill_name,
-                hydrated_skills[skill_name]["trained_skill_level"],
+        skillsets.append(
+            EveCharacterSkillset(
+                character=character,
+                eve_skillset=skillset,
+                progress=progress,
+                missing_skills=json.dumps(missing_skills),
             )
-            if (
-                hydrated_skills[skill_name]["trained_skill_level"]
-                < skill_level
-            ):
-                missing_skills.append(skill)
-                total_skill_count += skill_level * 12
-            player_skill_count += skill_level * 12
-    if missing_skills:
-        progress = player_skill_count / total_skill_count
-    else:
-        progress = 100
-    return missing_skills, int(progress)
+        )
+    return replace_with_bulk_create(
+        delete_queryset=EveCharacterSkillset.objects.filter(
+            character=character
+        ),
+        instances=skillsets,
+    )
 
 
 def create_eve_character_skillset(character_id: int, skillset: EveSkillset):
@@ -16,13 +16,12 @@ from eveonline.models import (
     EveCharacterIndustryJob,
     EveCharacterKillmail,
     EveCharacterKillmailAttacker,
-    EveSkillset,
 )
 
 from eveonline.helpers.characters.assets import create_character_assets
 from eveonline.helpers.db_sync import replace_with_bulk_create
 from eveonline.helpers.characters.skills import (
-    create_eve_character_skillset,
+    update_character_skillsets,
     upsert_character_skills,
 )
 
@@ -86,8 +85,7 @@ def update_character_skills(eve_character_id: int) -> None:
 
     logger.info("Updating skills for character %s", eve_character_id)
     upsert_character_skills(eve_character_id)
-    for skillset in EveSkillset.objects.all():
-        create_eve_character_skillset(eve_character_id, skillset)
+    update_character_skillsets(eve_character_id)
 
 
 def update_character_killmails(eve_character_id: int) -> None:
@@ -1,8 +1,8 @@
-"""Shared helpers for atomic delete-and-bulk-insert sync patterns."""
+"""Shared helpers for atomic bulk sync patterns."""
 
 import time
 
-from django.db import OperationalError, transaction
+from django.db import OperationalError, connections, router, transaction
 
 DEADLOCK_MAX_ATTEMPTS = 3
 BULK_CREATE_BATCH = 500
@@ -34,3 +34,64 @@ def replace_with_bulk_create(*, delete_queryset, instances):
                 raise
             time.sleep(0.1 * (attempt + 1))
     return 0
+
+
+def apply_bulk_changes(
+    *, model, create=(), update=(), update_fields=(), delete_ids=()
+):
+    """
+    bulk_create / bulk_update / delete-by-pk for one model inside one
+    transaction, retrying on MySQL deadlock (1213) like
+    replace_with_bulk_create. Updates and deletes run in primary key order
+    so concurrent syncs lock rows in the same order.
+    Returns (created, updated, deleted).
+    """
+    update = sorted(update, key=lambda instance: instance.pk)
+    delete_ids = sorted(delete_ids)
+    for attempt in range(DEADLOCK_MAX_ATTEMPTS):
+        try:
+            with transaction.atomic():
+                for offset in range(0, len(delete_ids), BULK_CREATE_BATCH):
+                    model.objects.filter(
+                        pk__in=delete_ids[offset : offset + BULK_CREATE_BATCH]
+                    ).delete()
+                if update:
+                    model.objects.bulk_update(
+                        update, update_fields, batch_size=BULK_CREATE_BATCH
+                    )
+                if create:
+                    model.objects.bulk_create(
+                        create, batch_size=BULK_CREATE_BATCH
+                    )
+            return len(create), len(update), len(delete_ids)
+        except OperationalError as exc:
+            errno = exc.args[0] if exc.args else None
+            if errno != MYSQL_DEADLOCK_ERRNO or attempt >= (
+                DEADLOCK_MAX_ATTEMPTS - 1
+            ):
+                raise
+            time.sleep(0.1 * (attempt + 1))
+    return 0, 0, 0
+
+
+def bulk_upsert(
+    *, model, instances, unique_fields, update_fields, batch_size=None
+):
+    """
+    bulk_create(update_conflicts=True) that works on every backend.
+    unique_fields is only passed where the backend supports a conflict
+    target; MySQL rejects it and resolves conflicts against any unique key
+    (ON DUPLICATE KEY UPDATE), so there unique_fields must be the model's
+    only unique constraint besides the primary key.
+    Returns the instances passed to bulk_create.
+    """
+    connection = connections[router.db_for_write(model)]
+    if not connection.features.supports_update_conflicts_with_target:
+        unique_fields = None
+    return model.objects.bulk_create(
+        instances,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields,
+    )
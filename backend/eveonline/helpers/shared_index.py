@@ -0,0 +1,146 @@
+"""
+Process-wide indexes over SDE tables, kept in step across workers.
+
+Each process holds its own copy of an index (the industry recipe graph,
+the fittings variant families) and re-reads a version from the shared
+cache at most every check_seconds. invalidate() drops the local copy and
+bumps the version, so every other worker rebuilds on its next check.
+
+EveTypeFieldsWatch connects EveType save/delete signals to an index's
+invalidate, skipping saves that leave the columns the index reads alone
+(most saves are ESI refreshes of descriptions, dogma and the like).
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, Generic, Iterable, Optional, TypeVar
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from eveuniverse.models import EveType
+
+# Index objects carry the version they were built for and when a process
+# last confirmed it (time.monotonic())
+IndexT = TypeVar("IndexT")
+
+
+class SharedIndex(Generic[IndexT]):
+    """A process-wide index rebuilt when its shared cache version changes"""
+
+    def __init__(
+        self,
+        version_key: str,
+        load: Callable[[str], IndexT],
+        check_seconds: float,
+    ):
+        self.version_key = version_key
+        self.check_seconds = check_seconds
+        self._load = load
+        self._index: Optional[IndexT] = None
+        self._lock = threading.Lock()
+
+    def current_version(self) -> str:
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, str(time.time_ns()), timeout=None)
+            version = cache.get(self.version_key)
+        return version
+
+    def get(self) -> IndexT:
+        """The index, (re)built when missing or out of date."""
+        index = self._index
+        now = time.monotonic()
+        if index is not None and now - index.checked_at < self.check_seconds:
+            return index
+
+        version = self.current_version()
+        with self._lock:
+            if self._index is not None and self._index.version == version:
+                self._index.checked_at = now
+                return self._index
+            self._index = self._load(version)
+            return self._index
+
+    def invalidate(self) -> None:
+        """Drop the local index and tell other processes to rebuild theirs."""
+        with self._lock:
+            self._index = None
+        cache.set(self.version_key, str(time.time_ns()), timeout=None)
+
+
+class EveTypeFieldsWatch:
+    """
+    Invalidates an index on EveType saves that change any of fields, and on
+    every EveType delete.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fields: Iterable[str],
+        update_fields: Iterable[str],
+    ):
+        self.name = name
+        self.fields = tuple(fields)
+        # save(update_fields=...) names that can touch fields
+        self.update_fields = frozenset(update_fields)
+        self._attr = f"_{name}_snapshot"
+
+    def _values(self, eve_type: EveType) -> tuple:
+        return tuple(getattr(eve_type, name) for name in self.fields)
+
+    def snapshot(self, eve_type: EveType, update_fields=None) -> None:
+        """
+        Before an EveType save: remember the stored values of fields so
+        changed() can compare after the save.
+        """
+        if update_fields is not None and self.update_fields.isdisjoint(
+            update_fields
+        ):
+            values = self._values(eve_type)
+        else:
+            values = (
+                EveType.objects.filter(pk=eve_type.pk)
+                .values_list(*self.fields)
+                .first()
+            )
+        setattr(eve_type, self._attr, values)
+
+    def changed(self, eve_type: EveType) -> bool:
+        """After an EveType save: whether any of fields changed."""
+        values = getattr(eve_type, self._attr, None)
+        return values is None or tuple(values) != self._values(eve_type)
+
+    def connect(self, invalidate: Callable[[], None]) -> None:
+        """Connect the EveType signals to invalidate (from AppConfig.ready)"""
+
+        def _snapshot(sender, instance, update_fields=None, **kwargs):
+            self.snapshot(instance, update_fields)
+
+        def _saved(sender, instance, **kwargs):
+            if self.changed(instance):
+                invalidate()
+
+        def _deleted(*args, **kwargs):
+            invalidate()
+
+        pre_save.connect(
+            _snapshot,
+            sender=EveType,
+            weak=False,
+            dispatch_uid=f"{self.name}_snapshot",
+        )
+        post_save.connect(
+            _saved,
+            sender=EveType,
+            weak=False,
+            dispatch_uid=f"{self.name}_saved",
+        )
+        post_delete.connect(
+            _deleted,
+            sender=EveType,
+            weak=False,
+            dispatch_uid=f"{self.name}_deleted",
+        )
@@ -2,7 +2,6 @@ import logging
 from typing import List
 
 from django.db import models
-from django.db.models import Q
 from django.contrib.auth.models import User
 from esi.models import Token
 
@@ -478,32 +477,30 @@ class EveSkillset(models.Model):
     def get_number_of_characters_with_skillset(
         self, alliance_name: str = None
     ) -> List[str]:
-        character_names = []
-        skills = self.skills.split("\n")
-        q = Q()
-        skill_dict = {}
-        for skill in skills:
-            skill_name = skill[:-1].strip()
-            skill_level = int(skill[-1])
-            if (
-                skill_name not in skill_dict
-                or skill_dict[skill_name] < skill_level
-            ):
-                skill_dict[skill_name] = skill_level
-        for skill_name, skill_level in skill_dict.items():
-            q |= Q(skill_name=skill_name, skill_level__gte=skill_level)
+        # Deferred import: the helpers package imports these models.
+        from eveonline.helpers.characters.skill_matrix import (  # pylint: disable=import-outside-toplevel
+            SkillMatrix,
+            parse_skillset_skills,
+        )
+
         characters = EveCharacter.objects.all()
         if alliance_name:
             alliance_ids = EveAlliance.objects.filter(
                 name=alliance_name
             ).values_list("alliance_id", flat=True)
             characters = characters.filter(alliance_id__in=alliance_ids)
-        for character in characters:
-            if EveCharacterSkill.objects.filter(q).filter(
-                character=character
-            ).count() == len(skill_dict.keys()):
-                character_names.append(character.character_name)
-        return character_names
+        names = dict(characters.values_list("character_id", "character_name"))
+        matrix = SkillMatrix.for_characters(
+            None if not alliance_name else list(names),
+            skill_names={
+                requirement.skill_name
+                for requirement in parse_skillset_skills(self.skills)
+            },
+        )
+        return [
+            names[character_id]
+            for character_id in matrix.characters_with(self.skills, names)
+        ]
 
     def get_missing_skills_for_character_id(
         self, character_id: int
@@ -1,10 +1,16 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.utils import timezone
 
 from app.celery import app
 from eveonline.client import EsiClient
-from eveonline.helpers.characters import update_character_with_affiliations
+from eveonline.helpers.characters import (
+    AFFILIATION_FIELDS,
+    affiliation_changes,
+)
 from eveonline.models import EveCharacter
-from groups.tasks import update_affiliation
+from groups.tasks import update_user_affiliations
 
 logger = logging.getLogger(__name__)
 
@@ -12,71 +18,129 @@ task_config = {
     "async_apply_affiliations": True,
 }
 
+# ESI accepts at most 1000 ids per affiliation request.
+AFFILIATION_BATCH_SIZE = 1000
+AFFILIATION_FETCH_WORKERS = 4
+
+
+def _fetch_affiliations(character_ids: list[int]):
+    return EsiClient(None).get_character_affiliations(character_ids)
+
+
+def _apply_affiliation_batch(results, characters: dict[int, dict]):
+    """
+    Diff one ESI batch against the snapshot and write changed characters
+    with a single bulk_update. Returns (updated count, changed user ids).
+    """
+    now = timezone.now()
+    updated = []
+    user_ids = set()
+    for result in results:
+        current = characters.get(result["character_id"])
+        if current is None:
+            continue
+        changes = affiliation_changes(
+            current,
+            corporation_id=result.get("corporation_id"),
+            alliance_id=result.get("alliance_id"),
+            faction_id=result.get("faction_id"),
+        )
+        if not changes:
+            continue
+        logger.info(
+            "Update character affiliations, character updated: %s (%s)",
+            current["character_id"],
+            current["user_id"],
+        )
+        values = {field: current[field] for field in AFFILIATION_FIELDS}
+        values.update(changes)
+        # bulk_update does not apply auto_now
+        updated.append(
+            EveCharacter(id=current["id"], updated_at=now, **values)
+        )
+        if current["user_id"]:
+            user_ids.add(current["user_id"])
+
+    if updated:
+        EveCharacter.objects.bulk_update(
+            updated, [*AFFILIATION_FIELDS, "updated_at"]
+        )
+    return len(updated), user_ids
+
 
 @app.task
 def update_character_affilliations() -> int:
-    character_ids = EveCharacter.objects.values_list("character_id", flat=True)
+    """
+    Refresh corp/alliance/faction for every character from ESI.
+
+    Current values are read in one query and the ESI batches are fetched
+    concurrently; each batch is diffed in memory and written with one
+    bulk_update. Users whose characters changed are reconciled together by
+    a single downstream affiliation task.
+    """
+    characters = {
+        row["character_id"]: row
+        for row in EveCharacter.objects.values(
+            "id", "character_id", "user_id", *AFFILIATION_FIELDS
+        )
+    }
     logger.info(
         "Update character affiliations, %d characters found",
-        len(character_ids),
+        len(characters),
     )
 
-    character_id_batches = []
-    # batch in groups of 1000
-    for i in range(0, len(character_ids), 1000):
-        character_id_batches.append(character_ids[i : i + 1000])
+    character_ids = list(characters)
+    character_id_batches = [
+        character_ids[i : i + AFFILIATION_BATCH_SIZE]
+        for i in range(0, len(character_ids), AFFILIATION_BATCH_SIZE)
+    ]
 
     update_count = 0
-
-    for character_ids_batch in character_id_batches:
-        response = EsiClient(None).get_character_affiliations(
-            character_ids_batch
-        )
-        if not response.success():
-            logger.warning(
-                "Skipping affiliations batch of %d characters, ESI error %s",
-                len(character_ids_batch),
-                response.response_code,
-            )
-            continue
-        results = response.results()
-        logger.info(
-            "Update character affiliations, processing %d characters, %d results",
-            len(character_ids_batch),
-            len(results),
-        )
-        for result in results:
-            character_id = result["character_id"]
-            corporation_id = result.get("corporation_id")
-            alliance_id = result.get("alliance_id")
-            faction_id = result.get("faction_id")
-
-            character = EveCharacter.objects.get(character_id=character_id)
-
-            updated = update_character_with_affiliations(
-                character_id=character_id,
-                corporation_id=corporation_id,
-                alliance_id=alliance_id,
-                faction_id=faction_id,
-            )
-
-            if updated:
+    changed_user_ids = set()
+    if character_id_batches:
+        with ThreadPoolExecutor(
+            max_workers=min(
+                AFFILIATION_FETCH_WORKERS, len(character_id_batches)
+            ),
+            thread_name_prefix="esi-affiliations",
+        ) as pool:
+            futures = {
+                pool.submit(_fetch_affiliations, batch): batch
+                for batch in character_id_batches
+            }
+            # Writes stay on this thread; workers only call ESI.
+            for future in as_completed(futures):
+                batch = futures[future]
+                response = future.result()
+                if not response.success():
+                    logger.warning(
+                        "Skipping affiliations batch of %d characters, ESI error %s",
+                        len(batch),
+                        response.response_code,
+                    )
+                    continue
+                results = response.results()
                 logger.info(
-                    "Update character affiliations, character updated: %s (%s)",
-                    character_id,
-                    character.user_id,
+                    "Update character affiliations, processing %d characters, %d results",
+                    len(batch),
+                    len(results),
                 )
-                update_count += 1
-                if character.user:
-                    if task_config["async_apply_affiliations"]:
-                        update_affiliation.apply_async(
-                            args=[character.user.id]
-                        )
-                    else:
-                        update_affiliation(character.user.id)
+                updated, user_ids = _apply_affiliation_batch(
+                    results, characters
+                )
+                update_count += updated
+                changed_user_ids |= user_ids
+
+    if changed_user_ids:
+        user_ids = sorted(changed_user_ids)
+        if task_config["async_apply_affiliations"]:
+            update_user_affiliations.apply_async(args=[user_ids])
+        else:
+            update_user_affiliations(user_ids)
 
     logger.info(
-        "Update character affiliations complete with %d changes",
+        "Update character affiliations complete with %d changes (%d users)",
         update_count,
+        len(changed_user_ids),
     )
     return update_count
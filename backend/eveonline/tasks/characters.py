@@ -1,7 +1,6 @@
 import logging
 
 from django.contrib.auth.models import User
-from esi.models import Token
 
 from app.celery import app
 from eveonline.helpers.characters import (
@@ -16,7 +15,16 @@ from eveonline.helpers.characters import (
     update_character_planets as refresh_character_planets,
     update_character_skills as refresh_character_skills,
 )
+from eveonline.helpers.characters.refresh_pipeline import (
+    RefreshStep,
+    run_refresh_pipeline,
+)
+from eveonline.esi_rate_limit import (
+    character_refresh_countdown,
+    refresh_shard_countdown,
+)
 from eveonline.models import EveCharacter, EveAlliance
+from eveonline.token_broker import character_tokens
 from eveonline.utils import get_esi_downtime_countdown
 
 logger = logging.getLogger(__name__)
@@ -33,9 +41,87 @@ SCOPE_CLONES = ["esi-clones.read_clones.v1"]
 SCOPE_IMPLANTS = ["esi-clones.read_implants.v1"]
 
 
-@app.task(rate_limit="5/m")
+def _refresh_steps() -> tuple[RefreshStep, ...]:
+    """Per-character refresh steps, in the order their helpers run."""
+    return (
+        RefreshStep(
+            "assets",
+            (tuple(SCOPE_ASSETS),),
+            refresh_character_assets,
+            (("get_character_assets", ()),),
+            3600,
+        ),
+        RefreshStep(
+            "skills",
+            (tuple(SCOPE_SKILLS),),
+            refresh_character_skills,
+            (("get_character_skills", ()),),
+            120,
+        ),
+        RefreshStep(
+            "killmails",
+            (tuple(SCOPE_KILLMAILS),),
+            refresh_character_killmails,
+            (("get_recent_killmails", ()),),
+            300,
+        ),
+        RefreshStep(
+            "contracts",
+            (tuple(SCOPE_CONTRACTS),),
+            refresh_character_contracts,
+            (("get_character_contracts", ()),),
+            300,
+        ),
+        RefreshStep(
+            "industry_jobs",
+            (tuple(SCOPE_INDUSTRY_JOBS),),
+            refresh_character_industry_jobs,
+            (
+                (
+                    "get_character_industry_jobs",
+                    (("include_completed", True),),
+                ),
+            ),
+            300,
+        ),
+        RefreshStep(
+            "mining",
+            (tuple(SCOPE_MINING),),
+            refresh_character_mining,
+            (("get_character_mining_ledger", ()),),
+            600,
+        ),
+        RefreshStep(
+            "planets",
+            (tuple(SCOPE_PLANETS),),
+            refresh_character_planets,
+            (("get_character_planets", ()),),
+            600,
+        ),
+        RefreshStep(
+            "blueprints",
+            (tuple(SCOPE_BLUEPRINTS),),
+            refresh_character_blueprints,
+            (("get_character_blueprints", ()),),
+            3600,
+        ),
+        RefreshStep(
+            "clones",
+            (tuple(SCOPE_CLONES), tuple(SCOPE_IMPLANTS)),
+            refresh_character_clones,
+            (("get_character_clones", ()), ("get_character_implants", ())),
+            120,
+        ),
+    )
+
+
+@app.task()
 def update_character(eve_character_id):
     """Update a character's assets, skills, killmails, contracts, and industry jobs."""
+    _update_character(eve_character_id, rate_limited=True)
+
+
+def _update_character(eve_character_id, rate_limited: bool):
     countdown = get_esi_downtime_countdown()
     if countdown > 0:
         update_character.apply_async(
@@ -50,6 +136,21 @@ def update_character(eve_character_id):
         )
         return
 
+    # Shared across workers, unlike a per-worker Celery rate_limit
+    countdown = character_refresh_countdown() if rate_limited else 0
+    if countdown > 0:
+        update_character.apply_async(
+            args=[eve_character_id],
+            countdown=countdown,
+            queue="eveonline",
+        )
+        logger.debug(
+            "Deferring character update for %s by %s s (refresh rate limit)",
+            eve_character_id,
+            countdown,
+        )
+        return
+
     character = EveCharacter.objects.get(character_id=eve_character_id)
     logger.info(
         "Updating character %s (%s)",
@@ -63,32 +164,16 @@ def update_character(eve_character_id):
             eve_character_id,
         )
         return
-    if Token.get_token(eve_character_id, SCOPE_ASSETS):
-        refresh_character_assets(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_SKILLS):
-        refresh_character_skills(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_KILLMAILS):
-        refresh_character_killmails(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_CONTRACTS):
-        refresh_character_contracts(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_INDUSTRY_JOBS):
-        refresh_character_industry_jobs(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_MINING):
-        refresh_character_mining(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_PLANETS):
-        refresh_character_planets(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_BLUEPRINTS):
-        refresh_character_blueprints(eve_character_id)
-    if Token.get_token(eve_character_id, SCOPE_CLONES) and Token.get_token(
-        eve_character_id, SCOPE_IMPLANTS
-    ):
-        refresh_character_clones(eve_character_id)
+    # One token/scope load for every helper below; each ESI call reuses the
+    # same tokens and refreshes the access token at most once.
+    with character_tokens(eve_character_id) as tokens:
+        run_refresh_pipeline(character, tokens, _refresh_steps())
 
 
 @app.task()
 def update_character_urgent(eve_character_id):
     """No rate limit for urgent updates."""
-    update_character(eve_character_id)
+    _update_character(eve_character_id, rate_limited=False)
 
 
 @app.task
@@ -128,7 +213,11 @@ def update_alliance_characters():
         "Queuing update_character for %d alliance character(s)",
         all_characters.count(),
     )
-    for character in all_characters:
+    # Spread the queue so workers start about one rate limit's worth of
+    # refreshes per minute.
+    for index, character in enumerate(all_characters):
         update_character.apply_async(
-            args=[character.character_id], queue="eveonline"
+            args=[character.character_id],
+            countdown=refresh_shard_countdown(index),
+            queue="eveonline",
         )
@@ -2,8 +2,13 @@
 
 from unittest.mock import MagicMock, patch
 
+from django.db.models import signals
+
 from app.test import TestCase
-from eveonline.helpers.characters.assets import create_character_assets
+from eveonline.helpers.characters.assets import (
+    create_character_assets,
+    reset_asset_sync_run,
+)
 from eveonline.models import EveCharacter, EveCharacterAsset, EveLocation
 from eveuniverse.models import EveCategory, EveGroup, EveType
 
@@ -213,3 +218,117 @@ class CreateCharacterAssetsTestCase(TestCase):
         self.assertEqual(19722, assets[1].type_id)
         self.assertEqual("Naglfar", assets[0].type_name)
         self.assertEqual("Naglfar", assets[1].type_name)
+
+
+def _hangar_asset(item_id: int, type_id: int, location_id: int) -> dict:
+    return {
+        "is_singleton": True,
+        "item_id": item_id,
+        "location_flag": "Hangar",
+        "location_id": location_id,
+        "location_type": "station",
+        "quantity": 1,
+        "type_id": type_id,
+    }
+
+
+class AssetSyncTestCase(TestCase):
+    """Tests for the item_id keyed asset sync"""
+
+    def setUp(self):
+        signals.post_save.disconnect(
+            sender=EveCharacter,
+            dispatch_uid="populate_eve_character_public_data",
+        )
+        signals.post_save.disconnect(
+            sender=EveCharacter,
+            dispatch_uid="populate_eve_character_private_data",
+        )
+        category = EveCategory.objects.create(
+            id=9101, name="Ship", published=True
+        )
+        group = EveGroup.objects.create(
+            id=9101, name="Frigate", published=True, eve_category=category
+        )
+        for type_id, name in ((9101, "Rifter"), (9102, "Slasher")):
+            EveType.objects.create(
+                id=type_id, name=name, published=True, eve_group=group
+            )
+        self.character = EveCharacter.objects.create(
+            character_id=5101, character_name="Sync Pilot"
+        )
+        self.run = reset_asset_sync_run()
+        super().setUp()
+
+    def station(self, esi_cls):
+        def get_station(station_id):
+            station = MagicMock()
+            station.name = f"Station {station_id}"
+            return station
+
+        esi_cls.return_value.get_station.side_effect = get_station
+        return esi_cls.return_value.get_station
+
+    @patch("eveonline.helpers.characters.assets.EsiClient")
+    def test_only_changed_rows_are_written(self, esi_cls):
+        self.station(esi_cls)
+        assets = [
+            _hangar_asset(item_id, 9101, 60001) for item_id in range(1, 11)
+        ]
+        self.assertEqual(
+            (10, 0, 0), create_character_assets(self.character, assets)
+        )
+        pks = dict(
+            EveCharacterAsset.objects.filter(
+                character=self.character
+            ).values_list("item_id", "id")
+        )
+
+        assets[0] = _hangar_asset(1, 9101, 60002)  # moved
+        assets[1] = _hangar_asset(11, 9102, 60001)  # 2 sold, 11 bought
+        self.assertEqual(
+            (1, 1, 1), create_character_assets(self.character, assets)
+        )
+
+        saved = {
+            asset.item_id: asset
+            for asset in EveCharacterAsset.objects.filter(
+                character=self.character
+            )
+        }
+        self.assertEqual(set(range(1, 12)) - {2}, set(saved))
+        self.assertEqual("Station 60002", saved[1].location_name)
+        self.assertEqual("Slasher", saved[11].type_name)
+        for item_id in range(3, 11):
+            self.assertEqual(pks[item_id], saved[item_id].id)
+
+        # Names come from the run; only the existing assets are read
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                (0, 0, 0), create_character_assets(self.character, assets)
+            )
+
+        self.assertEqual(3, self.run.characters)
+        self.assertEqual(8 + 10, self.run.unchanged)
+        self.assertEqual(2 * 18 + 1, self.run.writes_avoided)
+
+    @patch("eveonline.helpers.characters.assets.EsiClient")
+    def test_names_are_resolved_once_per_run(self, esi_cls):
+        get_station = self.station(esi_cls)
+        other = EveCharacter.objects.create(
+            character_id=5102, character_name="Other Pilot"
+        )
+        create_character_assets(
+            self.character, [_hangar_asset(1, 9101, 60001)]
+        )
+
+        # Existing assets plus the insert (and its savepoint pair); ship and
+        # station names come from the run
+        with self.assertNumQueries(1 + 3):
+            create_character_assets(other, [_hangar_asset(2, 9101, 60001)])
+
+        get_station.assert_called_once_with(60001)
+        self.assertEqual(
+            "Station 60001",
+            EveCharacterAsset.objects.get(character=other).location_name,
+        )
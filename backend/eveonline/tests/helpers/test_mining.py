@@ -13,6 +13,7 @@ from eveonline.client import EsiClient, EsiResponse
 from eveonline.models import EveCharacter
 from eveonline.models.characters import EveCharacterMiningEntry
 from eveonline.helpers.characters.mining import update_character_mining
+from tribes.models import MiningDailyRollup
 
 MINING_LEDGER = [
     {
@@ -174,6 +175,10 @@ class UpdateCharacterMiningTest(TestCase):
             solar_system_id=30002324,
         )
         self.assertEqual(entry.quantity, 9999)
+        rollup = MiningDailyRollup.objects.get(
+            character=char, eve_type_id=1228, day=date(2026, 2, 10)
+        )
+        self.assertEqual(rollup.quantity, 9999)
 
     @factory.django.mute_signals(signals.pre_save, signals.post_save)
     @patch("eveonline.helpers.characters.mining.EsiClient")
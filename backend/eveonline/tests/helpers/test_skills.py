@@ -1,11 +1,19 @@
 from django.db.models import signals
+from eveuniverse.models import EveCategory, EveGroup, EveType
+
 from app.test import TestCase
 from eveonline.models import (
     EveCharacter,
     EveCharacterSkill,
+    EveCharacterSkillset,
     EveSkillset,
 )
-from eveonline.helpers.characters import compare_skills_to_skillset
+from eveonline.helpers.characters import (
+    SkillMatrix,
+    compare_skills_to_skillset,
+    sync_character_skills,
+    update_character_skillsets,
+)
 
 
 class EveSkillsHelperTestCase(TestCase):
@@ -59,3 +67,156 @@ class EveSkillsHelperTestCase(TestCase):
             skillset2,
         )
         self.assertEqual(1, len(missing))
+
+
+class EveSkillSyncTestCase(TestCase):
+    """Tests for bulk skill sync and the skill matrix"""
+
+    def setUp(self):
+        signals.post_save.disconnect(
+            sender=EveCharacter,
+            dispatch_uid="populate_eve_character_public_data",
+        )
+        signals.post_save.disconnect(
+            sender=EveCharacter,
+            dispatch_uid="populate_eve_character_private_data",
+        )
+        category = EveCategory.objects.create(
+            id=16, name="Skill", published=True
+        )
+        group = EveGroup.objects.create(
+            id=255, name="Gunnery", published=True, eve_category=category
+        )
+        for skill_id in range(3300, 3340):
+            EveType.objects.create(
+                id=skill_id,
+                name=f"Skill {skill_id}",
+                published=True,
+                eve_group=group,
+            )
+        self.char = EveCharacter.objects.create(
+            character_id=1234, character_name="Test Char"
+        )
+
+    @staticmethod
+    def esi_skills(skill_ids, level=3):
+        return [
+            {
+                "skill_id": skill_id,
+                "skillpoints_in_skill": level * 1000,
+                "trained_skill_level": level,
+            }
+            for skill_id in skill_ids
+        ]
+
+    def test_sync_query_count_does_not_grow_with_skills(self):
+        # Read, type names, and one insert (plus the savepoint pair)
+        with self.assertNumQueries(5):
+            result = sync_character_skills(
+                self.char, self.esi_skills(range(3300, 3340))
+            )
+        self.assertEqual((40, 0, 0), result)
+        self.assertEqual(
+            "Skill 3310",
+            EveCharacterSkill.objects.get(skill_id=3310).skill_name,
+        )
+
+        with self.assertNumQueries(1):
+            result = sync_character_skills(
+                self.char, self.esi_skills(range(3300, 3340))
+            )
+        self.assertEqual((0, 0, 0), result)
+
+        with self.assertNumQueries(4):
+            result = sync_character_skills(
+                self.char, self.esi_skills(range(3300, 3340), level=4)
+            )
+        self.assertEqual((0, 40, 0), result)
+        self.assertEqual(
+            {4},
+            set(
+                EveCharacterSkill.objects.values_list("skill_level", flat=True)
+            ),
+        )
+
+    def test_sync_removes_duplicates(self):
+        sync_character_skills(self.char, self.esi_skills([3300]))
+        EveCharacterSkill.objects.create(
+            character=self.char,
+            skill_id=3300,
+            skill_name="Duplicate",
+            skill_points=0,
+            skill_level=0,
+        )
+
+        result = sync_character_skills(self.char, self.esi_skills([3300], 5))
+
+        self.assertEqual((0, 1, 1), result)
+        skill = EveCharacterSkill.objects.get(character=self.char)
+        self.assertEqual(
+            (5, "Skill 3300"), (skill.skill_level, skill.skill_name)
+        )
+
+    def test_matrix_matches_single_character_comparison(self):
+        sync_character_skills(self.char, self.esi_skills(range(3300, 3303)))
+        other = EveCharacter.objects.create(
+            character_id=1235, character_name="Other Char"
+        )
+        sync_character_skills(other, self.esi_skills([3300], level=5))
+        EveCharacter.objects.create(
+            character_id=1236, character_name="No Skills"
+        )
+        skillsets = [
+            EveSkillset.objects.create(
+                name="Easy", total_skill_points=1, skills="Skill 3300 II"
+            ),
+            EveSkillset.objects.create(
+                name="Hard",
+                total_skill_points=1,
+                skills="Skill 3300 IV\nSkill 3301 III\nSkill 3339 I",
+            ),
+        ]
+
+        with self.assertNumQueries(1):
+            matrix = SkillMatrix.for_characters()
+        for skillset in skillsets:
+            for character_id in (1234, 1235, 1236):
+                self.assertEqual(
+                    compare_skills_to_skillset(character_id, skillset),
+                    matrix.readiness(character_id, skillset.skills),
+                )
+        self.assertEqual(
+            [1234, 1235], matrix.characters_with(skillsets[0].skills)
+        )
+        self.assertEqual(
+            ["Test Char", "Other Char"],
+            skillsets[0].get_number_of_characters_with_skillset(),
+        )
+
+    def test_matrix_loads_only_requested_skills(self):
+        sync_character_skills(self.char, self.esi_skills(range(3300, 3303)))
+
+        matrix = SkillMatrix.for_characters(skill_names={"Skill 3301"})
+
+        self.assertEqual([3301], matrix.skill_ids)
+        missing, _ = matrix.readiness(1234, "Skill 3300 1\nSkill 3301 1")
+        self.assertEqual(["Skill 3300 1"], missing)
+
+    def test_update_character_skillsets(self):
+        sync_character_skills(self.char, self.esi_skills([3300]))
+        EveSkillset.objects.create(
+            name="Easy", total_skill_points=1, skills="Skill 3300 II"
+        )
+        EveSkillset.objects.create(
+            name="Hard", total_skill_points=1, skills="Skill 3301 I"
+        )
+
+        self.assertEqual(2, update_character_skillsets(1234))
+        self.assertEqual(2, update_character_skillsets(1234))
+
+        progress = dict(
+            EveCharacterSkillset.objects.filter(
+                character=self.char
+            ).values_list("eve_skillset__name", "missing_skills")
+        )
+        self.assertEqual({"Easy": "[]", "Hard": '["Skill 3301 1"]'}, progress)
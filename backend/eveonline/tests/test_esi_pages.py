@@ -0,0 +1,204 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from eveonline.esi_pages import (
+    EsiPageEtags,
+    EsiPagesNotModified,
+    fetch_esi_pages,
+)
+
+FAKE_PAGES = 12
+FAKE_PAGE_SIZE = 50
+FAKE_LATENCY_SECONDS = 0.05
+
+
+class FakeEsiHandler(BaseHTTPRequestHandler):
+    """Serves paginated market orders with X-Pages and ETag headers"""
+
+    requests_seen: list = []
+    fail_page: int | None = None
+    short_page: int | None = None
+    changed_page: int | None = None
+    slow_page: int | None = None
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        query = parse_qs(urlparse(self.path).query)
+        page = int(query.get("page", ["1"])[0])
+        FakeEsiHandler.requests_seen.append(
+            (page, self.headers.get("If-None-Match"))
+        )
+        time.sleep(FAKE_LATENCY_SECONDS)
+        if page == FakeEsiHandler.slow_page:
+            time.sleep(FAKE_LATENCY_SECONDS * 6)
+
+        short_page = FakeEsiHandler.short_page
+        if page == FakeEsiHandler.fail_page or (
+            short_page and page > short_page
+        ):
+            self.send_response(502 if short_page is None else 404)
+            self.end_headers()
+            return
+
+        etag = f'"page-{page}"'
+        if page == FakeEsiHandler.changed_page:
+            etag = f'"page-{page}-changed"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("X-Pages", str(FAKE_PAGES))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        body = json.dumps(
+            [
+                {"order_id": page * 1000 + n, "type_id": n, "price": 1.0}
+                for n in range(10 if page == short_page else FAKE_PAGE_SIZE)
+            ]
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("X-Pages", str(FAKE_PAGES))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class FetchEsiPagesTest(SimpleTestCase):
+    """Paged fetcher against a local fake ESI server"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeEsiHandler)
+        cls.thread = threading.Thread(
+            target=cls.server.serve_forever, daemon=True
+        )
+        cls.thread.start()
+        cls.url = (
+            f"http://127.0.0.1:{cls.server.server_address[1]}"
+            "/markets/10000002/orders/"
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        FakeEsiHandler.requests_seen = []
+        FakeEsiHandler.fail_page = None
+        FakeEsiHandler.short_page = None
+        FakeEsiHandler.changed_page = None
+        FakeEsiHandler.slow_page = None
+
+    def order_ids(self, pages):
+        return sorted(o["order_id"] for page in pages for o in page)
+
+    def test_fetches_all_pages(self):
+        pages = list(fetch_esi_pages(self.url))
+
+        self.assertEqual(FAKE_PAGES, len(pages))
+        self.assertEqual(
+            FAKE_PAGES * FAKE_PAGE_SIZE, len(self.order_ids(pages))
+        )
+        self.assertEqual(
+            list(range(1, FAKE_PAGES + 1)),
+            sorted(page for page, _ in FakeEsiHandler.requests_seen),
+        )
+
+    def test_concurrent_fetch_is_faster_than_sequential(self):
+        started = time.perf_counter()
+        sequential = list(fetch_esi_pages(self.url, max_workers=1))
+        sequential_secs = time.perf_counter() - started
+
+        started = time.perf_counter()
+        concurrent = list(fetch_esi_pages(self.url, max_workers=8))
+        concurrent_secs = time.perf_counter() - started
+
+        self.assertEqual(
+            self.order_ids(sequential), self.order_ids(concurrent)
+        )
+        self.assertLess(concurrent_secs, sequential_secs / 2)
+
+    def fetch_and_save(self, etags):
+        pages = list(fetch_esi_pages(self.url, etags=etags))
+        etags.save()
+        return pages
+
+    def test_unchanged_pages_raise_not_modified(self):
+        self.fetch_and_save(EsiPageEtags(self.url))
+        FakeEsiHandler.requests_seen = []
+
+        with self.assertRaises(EsiPagesNotModified):
+            list(fetch_esi_pages(self.url, etags=EsiPageEtags(self.url)))
+
+        self.assertEqual(FAKE_PAGES, len(FakeEsiHandler.requests_seen))
+        self.assertTrue(all(etag for _, etag in FakeEsiHandler.requests_seen))
+
+    def test_changed_page_refetches_every_page(self):
+        first = self.fetch_and_save(EsiPageEtags(self.url))
+        FakeEsiHandler.changed_page = 7
+
+        second = list(fetch_esi_pages(self.url, etags=EsiPageEtags(self.url)))
+
+        self.assertEqual(self.order_ids(first), self.order_ids(second))
+
+    def test_unsaved_etags_are_not_revalidated(self):
+        etags = EsiPageEtags(self.url)
+        list(fetch_esi_pages(self.url, etags=etags))
+        FakeEsiHandler.requests_seen = []
+
+        pages = list(fetch_esi_pages(self.url, etags=EsiPageEtags(self.url)))
+
+        self.assertEqual(FAKE_PAGES, len(etags.fetched))
+        self.assertEqual(FAKE_PAGES, len(pages))
+        self.assertFalse(any(etag for _, etag in FakeEsiHandler.requests_seen))
+
+    def test_etags_are_kept_per_scope(self):
+        self.fetch_and_save(EsiPageEtags(self.url, scope="a"))
+
+        pages = list(
+            fetch_esi_pages(self.url, etags=EsiPageEtags(self.url, scope="b"))
+        )
+
+        self.assertEqual(FAKE_PAGES, len(pages))
+
+    def test_short_page_ends_walk(self):
+        FakeEsiHandler.short_page = 6
+
+        pages = list(fetch_esi_pages(self.url, max_workers=2))
+
+        self.assertNotIn(None, pages)
+        self.assertEqual(5 * FAKE_PAGE_SIZE + 10, len(self.order_ids(pages)))
+        self.assertLess(
+            max(page for page, _ in FakeEsiHandler.requests_seen), FAKE_PAGES
+        )
+
+    def test_failure_past_short_page_arriving_first_is_ignored(self):
+        FakeEsiHandler.short_page = 6
+        FakeEsiHandler.slow_page = 6
+
+        pages = list(fetch_esi_pages(self.url, max_workers=4))
+
+        self.assertNotIn(None, pages)
+        self.assertEqual(5 * FAKE_PAGE_SIZE + 10, len(self.order_ids(pages)))
+
+    def test_failed_page_yields_none(self):
+        FakeEsiHandler.fail_page = 5
+
+        pages = list(fetch_esi_pages(self.url))
+
+        self.assertIsNone(pages[-1])
+        self.assertEqual(1, pages.count(None))
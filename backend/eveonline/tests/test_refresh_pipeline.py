@@ -0,0 +1,159 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from esi.models import Scope, Token
+
+from app.test import TestCase
+from eveonline.client import EsiClient
+from eveonline.esi_rate_limit import (
+    CHARACTER_REFRESHES_PER_MINUTE,
+    ESI_ERROR_BUDGET_PER_MINUTE,
+    character_refresh_countdown,
+    record_esi_errors,
+    refresh_shard_countdown,
+)
+from eveonline.helpers.characters.refresh_pipeline import (
+    RefreshStep,
+    run_refresh_pipeline,
+)
+from eveonline.models import EveCharacter
+from eveonline.token_broker import character_tokens, clear_access_tokens
+
+CLONES = "esi-clones.read_clones.v1"
+IMPLANTS = "esi-clones.read_implants.v1"
+PLANETS = "esi-planets.manage_planets.v1"
+
+
+def esi_response(status_code=200, data=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = data if data is not None else []
+    response.headers = {}
+    return response
+
+
+class RefreshPipelineTestCase(TestCase):
+    """Tests for the pipelined per-character refresh"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        clear_access_tokens()
+        self.user = User.objects.create(username="pipeline")
+        token = Token.objects.create(
+            user=self.user,
+            character_id=3001,
+            character_name="Pipeline Pilot",
+            access_token="access-token",
+            refresh_token="refresh-token",
+        )
+        for name in (CLONES, IMPLANTS, PLANETS):
+            token.scopes.add(Scope.objects.create(name=name, help_text=""))
+        self.character = EveCharacter(
+            character_id=3001, character_name="Pipeline Pilot"
+        )
+        self.seen = []
+
+        def refresh_clones(character_id):
+            esi = EsiClient(character_id)
+            self.seen.append(
+                (
+                    esi.get_character_clones().data,
+                    esi.get_character_implants().data,
+                )
+            )
+
+        self.steps = (
+            RefreshStep(
+                "clones",
+                ((CLONES,), (IMPLANTS,)),
+                refresh_clones,
+                (
+                    ("get_character_clones", ()),
+                    ("get_character_implants", ()),
+                ),
+                120,
+            ),
+            RefreshStep(
+                "planets",
+                ((PLANETS,),),
+                lambda character_id: EsiClient(
+                    character_id
+                ).get_character_planets(),
+                (("get_character_planets", ()),),
+                600,
+            ),
+            RefreshStep(
+                "blueprints",
+                (("esi-characters.read_blueprints.v1",),),
+                MagicMock(),
+                (("get_character_blueprints", ()),),
+                3600,
+            ),
+        )
+
+    def run_pipeline(self):
+        with character_tokens(3001) as tokens:
+            return run_refresh_pipeline(self.character, tokens, self.steps)
+
+    @patch("eveonline.client.requests.get")
+    def test_helpers_use_prefetched_responses(self, get):
+        get.side_effect = lambda url, **kwargs: esi_response(
+            data=[url.rsplit("/", 2)[-2]]
+        )
+
+        self.assertEqual(["clones", "planets"], self.run_pipeline())
+
+        # One request per endpoint; the helpers made none of their own
+        self.assertEqual(3, get.call_count)
+        self.assertEqual([(["clones"], ["implants"])], self.seen)
+        self.steps[2].refresh.assert_not_called()
+
+    @patch("eveonline.client.requests.get")
+    def test_skips_steps_inside_cache_window(self, get):
+        get.side_effect = lambda url, **kwargs: esi_response(
+            status_code=500 if url.endswith("/planets/") else 200
+        )
+
+        self.assertEqual(["clones", "planets"], self.run_pipeline())
+        # Failed fetches are retried on the next refresh
+        self.assertEqual(["planets"], self.run_pipeline())
+
+    @patch("eveonline.client.requests.get")
+    def test_failed_fetches_count_against_error_budget(self, get):
+        get.return_value = esi_response(status_code=502)
+
+        self.run_pipeline()
+        self.assertEqual(0, character_refresh_countdown())
+
+        # Three errors recorded above
+        record_esi_errors(ESI_ERROR_BUDGET_PER_MINUTE - 3)
+        self.assertGreater(character_refresh_countdown(), 0)
+
+
+class CharacterRefreshRateLimitTestCase(TestCase):
+    """Tests for the shared character refresh rate limit"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_refreshes_per_minute(self):
+        now = 60 * 28_333_334 + 10.0
+        for _ in range(CHARACTER_REFRESHES_PER_MINUTE):
+            self.assertEqual(0, character_refresh_countdown(now))
+        self.assertEqual(51, character_refresh_countdown(now))
+        # Next window
+        self.assertEqual(0, character_refresh_countdown(now + 60))
+
+    def test_error_budget(self):
+        now = 60 * 28_333_334 + 10.0
+        record_esi_errors(ESI_ERROR_BUDGET_PER_MINUTE, now)
+        self.assertEqual(51, character_refresh_countdown(now))
+
+    def test_shard_countdown(self):
+        self.assertEqual(0, refresh_shard_countdown(0))
+        self.assertEqual(
+            60, refresh_shard_countdown(CHARACTER_REFRESHES_PER_MINUTE)
+        )
@@ -325,6 +325,67 @@ class EveOnlineTaskTests(TestCase):
             EveCharacter.objects.get(character_id=10001).corporation_id
         )
 
+    @factory.django.mute_signals(signals.pre_save, signals.post_save)
+    @patch("eveonline.tasks.affiliations.update_user_affiliations")
+    @patch("eveonline.tasks.affiliations.AFFILIATION_BATCH_SIZE", 2)
+    @patch("eveonline.tasks.affiliations.EsiClient")
+    def test_update_character_affilliations_in_bulk(
+        self, esi_mock, reconcile_mock
+    ):
+        task_config["async_apply_affiliations"] = True
+        for character_id in range(10001, 10006):
+            EveCharacter.objects.create(
+                character_id=character_id,
+                character_name=f"Char{character_id}",
+                corporation_id=20001,
+                user=self.user if character_id % 2 else None,
+            )
+
+        def affiliations(character_ids):
+            return EsiResponse(
+                response_code=200,
+                data=[
+                    (
+                        {"character_id": character_id, "corporation_id": 20001}
+                        if character_id == 10005
+                        else {
+                            "character_id": character_id,
+                            "corporation_id": 20002,
+                            "alliance_id": 30001,
+                        }
+                    )
+                    for character_id in character_ids
+                ],
+            )
+
+        esi_mock.return_value.get_character_affiliations.side_effect = (
+            affiliations
+        )
+
+        # One snapshot read plus one bulk update per batch with changes
+        # (the last batch only holds the unchanged 10005)
+        with self.assertNumQueries(3):
+            updated = update_character_affilliations()
+
+        self.assertEqual(4, updated)
+        self.assertEqual(
+            3, esi_mock.return_value.get_character_affiliations.call_count
+        )
+        self.assertEqual(
+            {10001, 10002, 10003, 10004},
+            set(
+                EveCharacter.objects.filter(
+                    corporation_id=20002, alliance_id=30001
+                ).values_list("character_id", flat=True)
+            ),
+        )
+        self.assertIsNone(
+            EveCharacter.objects.get(character_id=10005).alliance_id
+        )
+        reconcile_mock.apply_async.assert_called_once_with(
+            args=[[self.user.id]]
+        )
+
     @factory.django.mute_signals(signals.pre_save, signals.post_save)
     @patch("eveonline.helpers.characters.skills.EsiClient")
     @patch("eveonline.helpers.characters.update.EsiClient")
@@ -401,13 +462,19 @@ class EveOnlineTaskTests(TestCase):
 
     @factory.django.mute_signals(signals.pre_save, signals.post_save)
     @patch("eveonline.tasks.characters.refresh_character_clones")
-    @patch("eveonline.tasks.characters.Token.get_token")
     def test_update_character_calls_clone_sync_when_scopes_present(
-        self, token_mock, clones_mock
+        self, clones_mock
     ):
-        token_mock.side_effect = lambda char_id, scopes: scopes in (
-            ["esi-clones.read_clones.v1"],
-            ["esi-clones.read_implants.v1"],
+        token = Token.objects.create(
+            user=self.user, character_id=2001, character_name="Clone Pilot"
+        )
+        token.scopes.add(
+            Scope.objects.create(
+                name="esi-clones.read_clones.v1", help_text=""
+            ),
+            Scope.objects.create(
+                name="esi-clones.read_implants.v1", help_text=""
+            ),
         )
         char = EveCharacter.objects.create(
             character_id=2001,
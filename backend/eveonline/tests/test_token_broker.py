@@ -0,0 +1,135 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.utils import timezone
+from esi.models import Scope, Token
+
+from app.test import TestCase
+from eveonline.client import SUCCESS, EsiClient
+from eveonline.token_broker import (
+    ACCESS_TOKEN_CACHE_KEY,
+    ACCESS_TOKEN_LOCK_KEY,
+    character_tokens,
+    clear_access_tokens,
+    valid_access_token,
+)
+
+
+def fake_refresh(token, *args, **kwargs):
+    token.access_token = "fresh-access-token"
+    token.created = timezone.now()
+    token.save()
+
+
+class TokenBrokerTestCase(TestCase):
+    """Tests for the request-scoped token broker"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        clear_access_tokens()
+        self.user = User.objects.create(username="token-broker")
+        assets = Scope.objects.create(
+            name="esi-assets.read_assets.v1", help_text=""
+        )
+        skills = Scope.objects.create(
+            name="esi-skills.read_skills.v1", help_text=""
+        )
+        clones = Scope.objects.create(
+            name="esi-clones.read_clones.v1", help_text=""
+        )
+        self.token = Token.objects.create(
+            user=self.user,
+            character_id=2112,
+            character_name="Broker Pilot",
+            access_token="old-access-token",
+            refresh_token="refresh-token",
+        )
+        self.token.scopes.add(assets, skills)
+        other = Token.objects.create(
+            user=self.user, character_id=2112, character_name="Broker Pilot"
+        )
+        other.scopes.add(clones)
+
+    def expire(self):
+        Token.objects.filter(pk=self.token.pk).update(
+            created=timezone.now() - timedelta(hours=1)
+        )
+
+    def test_scope_checks_are_answered_from_memory(self):
+        with self.assertNumQueries(2):
+            with character_tokens(2112) as tokens:
+                self.assertTrue(
+                    tokens.has_scopes(
+                        [
+                            "esi-assets.read_assets.v1",
+                            "esi-skills.read_skills.v1",
+                        ]
+                    )
+                )
+                self.assertTrue(
+                    tokens.has_scopes(["esi-clones.read_clones.v1"])
+                )
+                self.assertFalse(
+                    tokens.has_scopes(
+                        [
+                            "esi-assets.read_assets.v1",
+                            "esi-clones.read_clones.v1",
+                        ]
+                    )
+                )
+
+    def test_client_uses_active_tokens(self):
+        with character_tokens(2112):
+            with patch("eveonline.client.Token.get_token") as get_token:
+                with self.assertNumQueries(0):
+                    # pylint: disable-next=protected-access
+                    token, status = EsiClient(2112)._valid_token(
+                        ["esi-assets.read_assets.v1"]
+                    )
+
+        get_token.assert_not_called()
+        self.assertEqual(SUCCESS, status)
+        self.assertEqual(self.token.pk, token.pk)
+
+    @patch.object(Token, "refresh", autospec=True, side_effect=fake_refresh)
+    def test_expired_token_is_refreshed_once(self, refresh):
+        self.expire()
+        first = Token.objects.get(pk=self.token.pk)
+        second = Token.objects.get(pk=self.token.pk)
+
+        self.assertEqual("fresh-access-token", valid_access_token(first))
+        self.assertEqual("fresh-access-token", valid_access_token(second))
+
+        refresh.assert_called_once()
+        self.assertIsNone(
+            cache.get(ACCESS_TOKEN_LOCK_KEY.format(self.token.pk))
+        )
+
+    @patch.object(Token, "refresh", autospec=True, side_effect=fake_refresh)
+    def test_other_worker_refresh_is_reused(self, refresh):
+        self.expire()
+        stale = Token.objects.get(pk=self.token.pk)
+        valid_access_token(Token.objects.get(pk=self.token.pk))
+        # Another process only shares the Django cache
+        clear_access_tokens()
+
+        with self.assertNumQueries(0):
+            self.assertEqual("fresh-access-token", valid_access_token(stale))
+        refresh.assert_called_once()
+
+    @patch("eveonline.token_broker.ACCESS_TOKEN_POLL_SECONDS", 0)
+    @patch.object(Token, "refresh", autospec=True)
+    def test_waits_for_refresh_in_flight(self, refresh):
+        self.expire()
+        token = Token.objects.get(pk=self.token.pk)
+        cache.add(ACCESS_TOKEN_LOCK_KEY.format(token.pk), 1)
+        cache.set(
+            ACCESS_TOKEN_CACHE_KEY.format(token.pk),
+            ("shared-access-token", timezone.now()),
+        )
+
+        self.assertEqual("shared-access-token", valid_access_token(token))
+        refresh.assert_not_called()
@@ -0,0 +1,166 @@
+"""Request-scoped ESI token lookup and shared access-token refresh.
+
+``character_tokens(character_id)`` loads all of a character's tokens and
+their scopes in one go and makes them the active set for the current
+context, so scope checks and ``EsiClient`` token lookups for that
+character are answered from memory instead of one scope-join query each.
+
+``valid_access_token(token)`` refreshes an expired access token at most
+once per expiry: the fresh access token is published to a per-process map
+and the Django cache (Redis in production), and a cache lock makes other
+workers wait for the refresh in flight rather than hit the SSO endpoint
+with the same refresh token.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Iterator
+
+from django.core.cache import cache
+from django.utils import timezone
+from esi import app_settings as esi_settings
+from esi.models import Token
+
+logger = logging.getLogger(__name__)
+
+ACCESS_TOKEN_CACHE_KEY = "esi:access_token:{}"
+ACCESS_TOKEN_LOCK_KEY = "esi:access_token:refresh:{}"
+# Longer than an SSO round trip, so a crashed refresher only blocks briefly.
+ACCESS_TOKEN_LOCK_SECONDS = 30
+ACCESS_TOKEN_WAIT_SECONDS = 10
+ACCESS_TOKEN_POLL_SECONDS = 0.25
+
+# token pk -> (access_token, created) of the freshest refresh seen here
+_access_tokens: dict[int, tuple[str, datetime]] = {}
+_access_tokens_lock = threading.Lock()
+
+_active_tokens: ContextVar[dict | None] = ContextVar(
+    "eveonline_active_tokens", default=None
+)
+
+
+class CharacterTokens:
+    """All ESI tokens of one character with their granted scope names."""
+
+    def __init__(self, character_id: int):
+        self.character_id = character_id
+        self._tokens = [
+            (token, frozenset(scope.name for scope in token.scopes.all()))
+            for token in Token.objects.filter(character_id=character_id)
+            .order_by("pk")
+            .prefetch_related("scopes")
+        ]
+
+    def token(self, scopes: list[str]) -> Token | None:
+        """First token holding every scope, like ``Token.get_token``."""
+        required = set(scopes)
+        for token, granted in self._tokens:
+            if required <= granted:
+                return token
+        return None
+
+    def has_scopes(self, scopes: list[str]) -> bool:
+        return self.token(scopes) is not None
+
+
+@contextmanager
+def character_tokens(character_id: int) -> Iterator[CharacterTokens]:
+    """Load a character's tokens once and use them for the enclosed calls."""
+    tokens = CharacterTokens(character_id)
+    active = dict(_active_tokens.get() or {})
+    active[character_id] = tokens
+    reset = _active_tokens.set(active)
+    try:
+        yield tokens
+    finally:
+        _active_tokens.reset(reset)
+
+
+def active_character_tokens(character_id: int) -> CharacterTokens | None:
+    return (_active_tokens.get() or {}).get(character_id)
+
+
+def _expires(created: datetime) -> datetime:
+    return created + timedelta(seconds=esi_settings.ESI_TOKEN_VALID_DURATION)
+
+
+def _shared_access_token(token_pk) -> tuple[str, datetime] | None:
+    """Unexpired (access_token, created) refreshed by this or another worker."""
+    with _access_tokens_lock:
+        shared = _access_tokens.get(token_pk)
+    if shared is None:
+        shared = cache.get(ACCESS_TOKEN_CACHE_KEY.format(token_pk))
+    if shared and _expires(shared[1]) > timezone.now():
+        return shared
+    return None
+
+
+def _publish_access_token(token: Token) -> None:
+    shared = (token.access_token, token.created)
+    with _access_tokens_lock:
+        _access_tokens[token.pk] = shared
+    ttl = (_expires(token.created) - timezone.now()).total_seconds()
+    if ttl > 0:
+        cache.set(ACCESS_TOKEN_CACHE_KEY.format(token.pk), shared, int(ttl))
+
+
+def _adopt(token: Token, shared: tuple[str, datetime]) -> None:
+    # In memory only; the refreshing worker already saved the row.
+    token.access_token, token.created = shared
+
+
+def clear_access_tokens() -> None:
+    """Drop the per-process access tokens (tests)."""
+    with _access_tokens_lock:
+        _access_tokens.clear()
+
+
+def valid_access_token(token: Token) -> str:
+    """
+    ``token.valid_access_token()``, refreshing at most once per expiry.
+
+    An access token already refreshed by this process or another worker is
+    reused; otherwise one caller takes the refresh lock and the rest wait
+    for its result. Refresh errors propagate as from django-esi.
+    """
+    if token.expired:
+        shared = _shared_access_token(token.pk)
+        if shared:
+            _adopt(token, shared)
+        else:
+            _refresh_once(token)
+    return token.valid_access_token()
+
+
+def _refresh_once(token: Token) -> None:
+    lock_key = ACCESS_TOKEN_LOCK_KEY.format(token.pk)
+    if cache.add(lock_key, 1, ACCESS_TOKEN_LOCK_SECONDS):
+        try:
+            # Another worker may have refreshed (and rotated the refresh
+            # token) since this row was loaded.
+            token.refresh_from_db(
+                fields=["access_token", "refresh_token", "created"]
+            )
+            if token.expired:
+                token.refresh()
+            if not token.expired:
+                _publish_access_token(token)
+        finally:
+            cache.delete(lock_key)
+        return
+
+    deadline = time.monotonic() + ACCESS_TOKEN_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        time.sleep(ACCESS_TOKEN_POLL_SECONDS)
+        shared = _shared_access_token(token.pk)
+        if shared:
+            _adopt(token, shared)
+            return
+    logger.warning(
+        "Timed out waiting for access token refresh of token %s", token.pk
+    )
+    token.refresh_from_db(fields=["access_token", "refresh_token", "created"])
@@ -12,10 +12,26 @@ class FeedConfig(AppConfig):
         from feed.helpers.monitored_systems import (
             invalidate_monitored_systems_cache,
         )
+        from feed.helpers.system_distance import (
+            invalidate_system_coordinate_index,
+        )
         from feed.models import FeedMonitoredSystem
+        from eveuniverse.models import EveSolarSystem
 
         def _invalidate(*args, **kwargs):
             invalidate_monitored_systems_cache()
 
-        post_save.connect(_invalidate, sender=FeedMonitoredSystem)
-        post_delete.connect(_invalidate, sender=FeedMonitoredSystem)
+        post_save.connect(_invalidate, sender=FeedMonitoredSystem, weak=False)
+        post_delete.connect(
+            _invalidate, sender=FeedMonitoredSystem, weak=False
+        )
+
+        def _invalidate_positions(*args, **kwargs):
+            invalidate_system_coordinate_index()
+
+        post_save.connect(
+            _invalidate_positions, sender=EveSolarSystem, weak=False
+        )
+        post_delete.connect(
+            _invalidate_positions, sender=EveSolarSystem, weak=False
+        )
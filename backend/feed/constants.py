@@ -34,6 +34,12 @@ R2Z2_POLL_SOFT_TIME_LIMIT_SECONDS = 25
 R2Z2_LIVE_GAP_WARN = 50
 R2Z2_CATCHUP_GAP_WARN = 500
 R2Z2_BAN_PAUSE_WARN_SECONDS = 1800
+# Pipelining: after R2Z2_PIPELINE_RAMP_HITS consecutive 200s (well behind the
+# tip) keep up to R2Z2_PIPELINE_WINDOW fetches in flight. Request starts stay
+# R2Z2_SUCCESS_SLEEP_MS apart, so the request rate is unchanged.
+R2Z2_PIPELINE_WINDOW = 4
+R2Z2_PIPELINE_RAMP_HITS = 3
+R2Z2_WRITE_BATCH_SIZE = 50
 
 # Retention
 FEED_KILLMAIL_RETENTION_DAYS = 30
@@ -49,6 +55,8 @@ FEED_FW_ESI_USER_AGENT = (
 FEED_DEFAULT_HISTORY_DAYS = 7
 FEED_MAX_HISTORY_DAYS = 30
 FEED_DEFAULT_PAGE_LIMIT = 30
+# First page per (days, limit, compact); bumped by the rollup writer
+FEED_LIST_CACHE_SECONDS = 60
 
 # Rollup defaults (override via FeedRollupConfig)
 DEFAULT_ROLLUP_CONFIG: dict[str, dict] = {
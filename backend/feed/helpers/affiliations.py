@@ -108,6 +108,110 @@ def apply_killmail_affiliations(
         )
 
 
+def _killmail_participants(raw: dict[str, Any]):
+    yield from raw.get("attackers") or []
+    yield raw.get("victim") or {}
+
+
+def _killmail_snapshots(raws: list[dict[str, Any]]) -> dict[int, list]:
+    """character_id -> [(corporation_id, alliance_id, militia faction_id)]"""
+    snapshots: dict[int, list[tuple]] = {}
+    for raw in raws:
+        for participant in _killmail_participants(raw):
+            char_id = participant.get("character_id")
+            if not char_id:
+                continue
+            snapshots.setdefault(char_id, []).append(
+                (
+                    participant.get("corporation_id"),
+                    participant.get("alliance_id"),
+                    _militia_faction_id(participant.get("faction_id")),
+                )
+            )
+    return snapshots
+
+
+def _merge_killmail_snapshots(
+    row: FeedCharacterAffiliation, snapshots: list[tuple]
+) -> bool:
+    """
+    Apply snapshots to an existing row; returns whether it changed.
+    Killmail snapshots overwrite with the latest known value, except on
+    ESI-checked rows where they only fill empty corp/alliance.
+    """
+    if row.esi_checked_at is not None:
+        names = ("corporation_id", "alliance_id")
+        values = [
+            next((s[i] for s in snapshots if s[i] is not None), None)
+            for i in range(2)
+        ]
+    else:
+        names = ("corporation_id", "alliance_id", "faction_id")
+        values = [
+            next((s[i] for s in reversed(snapshots) if s[i] is not None), None)
+            for i in range(3)
+        ]
+
+    changed = False
+    for name, value in zip(names, values):
+        if value is None or getattr(row, name) == value:
+            continue
+        if row.esi_checked_at is not None and getattr(row, name) is not None:
+            continue
+        setattr(row, name, value)
+        changed = True
+    return changed
+
+
+def _new_affiliation_from_snapshots(
+    char_id: int, snapshots: list[tuple]
+) -> FeedCharacterAffiliation:
+    latest = [
+        next((s[i] for s in reversed(snapshots) if s[i] is not None), None)
+        for i in range(3)
+    ]
+    return FeedCharacterAffiliation(
+        character_id=char_id,
+        corporation_id=latest[0],
+        alliance_id=latest[1],
+        faction_id=latest[2],
+    )
+
+
+def apply_killmail_affiliations_batch(raws: list[dict[str, Any]]) -> None:
+    """
+    Same result as apply_killmail_affiliations for each killmail in order,
+    with one read and bulk writes for the whole batch.
+    """
+    snapshots = _killmail_snapshots(raws)
+    if not snapshots:
+        return
+
+    existing = {
+        row.character_id: row
+        for row in FeedCharacterAffiliation.objects.filter(
+            character_id__in=list(snapshots)
+        )
+    }
+    to_create = []
+    to_update = []
+    for char_id, rows in snapshots.items():
+        row = existing.get(char_id)
+        if row is None:
+            to_create.append(_new_affiliation_from_snapshots(char_id, rows))
+        elif _merge_killmail_snapshots(row, rows):
+            to_update.append(row)
+
+    if to_create:
+        FeedCharacterAffiliation.objects.bulk_create(
+            to_create, ignore_conflicts=True
+        )
+    if to_update:
+        FeedCharacterAffiliation.objects.bulk_update(
+            to_update, ["corporation_id", "alliance_id", "faction_id"]
+        )
+
+
 def lookup_character_militia_factions(
     character_ids: set[int],
 ) -> dict[int, int]:
@@ -31,7 +31,11 @@ from feed.helpers.eve_names import (
 )
 from feed.helpers.ingest import parse_r2z2_payload
 from feed.helpers.killmail_classify import attacker_pilot_count, is_npc_kill
-from feed.helpers.system_distance import light_years_between_systems
+from feed.helpers.system_distance import (
+    get_system_coordinate_index,
+    light_years_between_systems,
+    systems_within_light_years,
+)
 from feed.models import FeedCapitalAlert, FeedCapitalPing
 
 logger = logging.getLogger(__name__)
@@ -754,6 +758,23 @@ def _record_capital_ping(
     )
 
 
+def _light_years_from_amamake(solar_system_id: int) -> float | None:
+    """
+    Distance from Amamake using the memoized jump-range set; systems the
+    coordinate index has not seen yet fall back to a direct lookup.
+    """
+    in_range = systems_within_light_years(
+        AMAMAKE_SOLAR_SYSTEM_ID, CAPITAL_PING_MAX_LIGHT_YEARS
+    )
+    if solar_system_id in in_range:
+        return in_range[solar_system_id]
+    if solar_system_id in get_system_coordinate_index():
+        return None
+    return light_years_between_systems(
+        AMAMAKE_SOLAR_SYSTEM_ID, solar_system_id
+    )
+
+
 def maybe_notify_capital_kill(
     payload: dict[str, Any],
     *,
@@ -781,10 +802,7 @@ def maybe_notify_capital_kill(
     if not killmail_involves_capital(raw):
         return False
 
-    distance_ly = light_years_between_systems(
-        AMAMAKE_SOLAR_SYSTEM_ID,
-        int(solar_system_id),
-    )
+    distance_ly = _light_years_from_amamake(int(solar_system_id))
     if distance_ly is None or distance_ly > CAPITAL_PING_MAX_LIGHT_YEARS:
         return False
     if apply_age_gate and _age_gate_blocks(raw):
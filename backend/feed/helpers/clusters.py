@@ -1,15 +1,79 @@
 from __future__ import annotations
 
 from collections import Counter, defaultdict
+from dataclasses import dataclass
 from datetime import timedelta
 from typing import Any
 
+from django.db.models import F, Max, Min, Q
 from django.utils import timezone
 
+from eveonline.helpers.db_sync import bulk_upsert
 from feed.helpers.killmail_classify import dominant_attacker_faction
-from feed.models import FeedCluster, FeedKillmail
+from feed.models import FeedCluster, FeedClusterCursor, FeedKillmail
 from feed.rollups.config import get_rollup_config
 
+# Columns cluster detection reads; raw_killmail is never loaded.
+CLUSTER_KILLMAIL_FIELDS = (
+    "killmail_id",
+    "killmail_time",
+    "solar_system_id",
+    "victim_ship_type_id",
+    "attacker_summary",
+)
+
+# Incremental runs re-read kills ingested this long before the watermark,
+# so rows committed late by a concurrent ingest are not skipped.
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+CLUSTER_STATS_FIELDS = [
+    "dominant_faction_id",
+    "started_at",
+    "last_kill_at",
+    "kill_count",
+    "pilot_count",
+    "ship_counts",
+    "attacker_ids",
+    "killmail_ids",
+    "is_active",
+    "ended_at",
+    "updated_at",
+]
+
+
+@dataclass(frozen=True)
+class ClusterSettings:
+    """Rollup config values used by detection, read once per run."""
+
+    kb_window: int
+    kb_min_kills: int
+    fleet_window: int
+    fleet_min_kills: int
+    fleet_min_pilots: int
+    stale_minutes: int
+    dominant_faction_threshold: float
+
+    @classmethod
+    def load(cls) -> ClusterSettings:
+        kill_burst_cfg = get_rollup_config("kill_burst")
+        fleet_cfg = get_rollup_config("fleet_active")
+        return cls(
+            kb_window=kill_burst_cfg.get("window_minutes", 15),
+            kb_min_kills=kill_burst_cfg.get("min_kills", 8),
+            fleet_window=fleet_cfg.get("window_minutes", 20),
+            fleet_min_kills=fleet_cfg.get("min_kills", 5),
+            fleet_min_pilots=fleet_cfg.get("min_pilots", 8),
+            stale_minutes=fleet_cfg.get("stale_minutes", 20),
+            dominant_faction_threshold=fleet_cfg.get(
+                "dominant_faction_threshold", 0.75
+            ),
+        )
+
+    @property
+    def lookback(self) -> timedelta:
+        """How far before a kill a window containing it can start."""
+        return timedelta(minutes=max(self.kb_window, self.fleet_window))
+
 
 def _window_start(dt, minutes: int):
     return dt.replace(second=0, microsecond=0) - timedelta(
@@ -45,100 +109,6 @@ def _kill_burst_bucket_suffix(started_bucket) -> str:
     return started_bucket.strftime("%Y-%m-%dT%H:%M")
 
 
-def _upsert_kill_burst_cluster(
-    solar_system_id: int,
-    started_bucket,
-    stats: dict[str, Any],
-) -> None:
-    """One kill_burst cluster per system/time bucket regardless of faction."""
-    bucket_suffix = _kill_burst_bucket_suffix(started_bucket)
-    prefix = f"{FeedCluster.ClusterType.KILL_BURST}:{solar_system_id}:"
-    siblings = [
-        cluster
-        for cluster in FeedCluster.objects.filter(
-            cluster_type=FeedCluster.ClusterType.KILL_BURST,
-            solar_system_id=solar_system_id,
-        )
-        if cluster.cluster_key.startswith(prefix)
-        and cluster.cluster_key.endswith(f":{bucket_suffix}")
-    ]
-
-    merged_ids = set(stats["killmail_ids"])
-    for sibling in siblings:
-        merged_ids |= set(sibling.killmail_ids or [])
-
-    if len(merged_ids) > len(stats["killmail_ids"]):
-        killmails = list(
-            FeedKillmail.objects.filter(killmail_id__in=merged_ids)
-        )
-        stats = _build_cluster_stats(killmails)
-
-    canonical_key = _cluster_key(
-        FeedCluster.ClusterType.KILL_BURST,
-        solar_system_id,
-        None,
-        started_bucket,
-        include_faction=False,
-    )
-    FeedCluster.objects.update_or_create(
-        cluster_key=canonical_key,
-        defaults=_cluster_defaults(
-            FeedCluster.ClusterType.KILL_BURST,
-            solar_system_id,
-            stats,
-        ),
-    )
-
-    stale_keys = [
-        cluster.pk
-        for cluster in siblings
-        if cluster.cluster_key != canonical_key
-    ]
-    if stale_keys:
-        FeedCluster.objects.filter(pk__in=stale_keys).delete()
-
-
-def _find_active_fleet_cluster(
-    solar_system_id: int,
-    faction_id: int | None,
-    window_start,
-    *,
-    stale_minutes: int,
-) -> FeedCluster | None:
-    cutoff = window_start - timedelta(minutes=stale_minutes)
-    return (
-        FeedCluster.objects.filter(
-            cluster_type=FeedCluster.ClusterType.FLEET_ENGAGEMENT,
-            solar_system_id=solar_system_id,
-            dominant_faction_id=faction_id,
-            is_active=True,
-            last_kill_at__gte=cutoff,
-        )
-        .order_by("-last_kill_at")
-        .first()
-    )
-
-
-def _merge_fleet_cluster(
-    existing: FeedCluster, killmail_ids: list[int]
-) -> FeedCluster:
-    merged_ids = sorted(set(existing.killmail_ids or []) | set(killmail_ids))
-    killmails = list(FeedKillmail.objects.filter(killmail_id__in=merged_ids))
-    stats = _build_cluster_stats(killmails)
-    existing.dominant_faction_id = stats["dominant_faction_id"]
-    existing.started_at = stats["started_at"]
-    existing.last_kill_at = stats["last_kill_at"]
-    existing.kill_count = stats["kill_count"]
-    existing.pilot_count = stats["pilot_count"]
-    existing.ship_counts = stats["ship_counts"]
-    existing.attacker_ids = stats["attacker_ids"]
-    existing.killmail_ids = stats["killmail_ids"]
-    existing.is_active = True
-    existing.ended_at = None
-    existing.save()
-    return existing
-
-
 def _cluster_defaults(
     cluster_type: str,
     solar_system_id: int,
@@ -159,112 +129,405 @@ def _cluster_defaults(
     }
 
 
-def _build_cluster_stats(killmails: list[FeedKillmail]) -> dict[str, Any]:
+def _attacker_character_ids(killmails: list[FeedKillmail]) -> set[int]:
     attacker_ids: set[int] = set()
-    ship_counts: Counter[str] = Counter()
-    killmail_ids: list[int] = []
-    raw_kms: list[dict] = []
-
     for km in killmails:
-        killmail_ids.append(km.killmail_id)
-        raw_kms.append(km.raw_killmail)
-        ship_type = km.victim_ship_type_id
-        if ship_type:
-            ship_counts[str(ship_type)] += 1
         for attacker in km.attacker_summary or []:
             char_id = attacker.get("character_id")
             if char_id:
                 attacker_ids.add(char_id)
+    return attacker_ids
+
+
+def _build_cluster_stats(
+    killmails: list[FeedKillmail], *, dominant_faction_threshold: float
+) -> dict[str, Any]:
+    ship_counts: Counter[str] = Counter()
+    for km in killmails:
+        ship_type = km.victim_ship_type_id
+        if ship_type:
+            ship_counts[str(ship_type)] += 1
+    attacker_ids = _attacker_character_ids(killmails)
 
-    fleet_cfg = get_rollup_config("fleet_active")
+    # attacker_summary carries the attacker character/corporation/faction
+    # ids the faction check reads, so raw_killmail is not needed.
     dominant = dominant_attacker_faction(
-        raw_kms,
-        threshold=fleet_cfg.get("dominant_faction_threshold", 0.75),
+        [{"attackers": km.attacker_summary or []} for km in killmails],
+        threshold=dominant_faction_threshold,
     )
-    started_at = min(km.killmail_time for km in killmails)
-    last_kill_at = max(km.killmail_time for km in killmails)
 
     return {
         "dominant_faction_id": dominant,
-        "started_at": started_at,
-        "last_kill_at": last_kill_at,
+        "started_at": min(km.killmail_time for km in killmails),
+        "last_kill_at": max(km.killmail_time for km in killmails),
         "kill_count": len(killmails),
         "pilot_count": len(attacker_ids),
         "ship_counts": dict(ship_counts),
         "attacker_ids": sorted(attacker_ids),
-        "killmail_ids": killmail_ids,
+        "killmail_ids": [km.killmail_id for km in killmails],
     }
 
 
-def detect_clusters(*, since_hours: int = 48) -> int:
-    """Detect kill_burst and fleet_engagement clusters from FeedKillmail rows."""
-    now = timezone.now()
-    since = now - timedelta(hours=since_hours)
-    kill_burst_cfg = get_rollup_config("kill_burst")
-    fleet_cfg = get_rollup_config("fleet_active")
-
-    kb_window = kill_burst_cfg.get("window_minutes", 15)
-    kb_min_kills = kill_burst_cfg.get("min_kills", 8)
-    fleet_window = fleet_cfg.get("window_minutes", 20)
-    fleet_min_kills = fleet_cfg.get("min_kills", 5)
-    fleet_min_pilots = fleet_cfg.get("min_pilots", 8)
-    stale_minutes = fleet_cfg.get("stale_minutes", 20)
-
-    killmails = list(
-        FeedKillmail.objects.filter(killmail_time__gte=since).order_by(
-            "killmail_time"
+class _ClusterBatch:
+    """
+    Existing clusters for the scanned systems, loaded once, plus the
+    creates/updates/deletes of one detection run, written in bulk by flush().
+    """
+
+    def __init__(
+        self,
+        settings: ClusterSettings,
+        scan_from: dict[int, Any],
+        killmails: dict[int, FeedKillmail],
+    ):
+        self.settings = settings
+        self.killmails = killmails
+        self.kill_bursts: dict[int, list[FeedCluster]] = defaultdict(list)
+        self.fleets: dict[int, list[FeedCluster]] = defaultdict(list)
+        self.to_create: dict[str, FeedCluster] = {}
+        self.to_update: dict[int, FeedCluster] = {}
+        self.to_delete: set[int] = set()
+
+        if not scan_from:
+            return
+        earliest = min(scan_from.values())
+        kb_cutoff = earliest - timedelta(minutes=settings.kb_window)
+        fleet_cutoff = earliest - timedelta(
+            minutes=settings.stale_minutes + settings.fleet_window
+        )
+        existing = FeedCluster.objects.filter(
+            solar_system_id__in=list(scan_from)
+        ).filter(
+            Q(
+                cluster_type=FeedCluster.ClusterType.KILL_BURST,
+                last_kill_at__gte=kb_cutoff,
+            )
+            | Q(
+                cluster_type=FeedCluster.ClusterType.FLEET_ENGAGEMENT,
+                last_kill_at__gte=fleet_cutoff,
+            )
+        )
+        for cluster in existing:
+            if cluster.cluster_type == FeedCluster.ClusterType.KILL_BURST:
+                self.kill_bursts[cluster.solar_system_id].append(cluster)
+            else:
+                self.fleets[cluster.solar_system_id].append(cluster)
+
+    def stats(self, killmail_ids) -> dict[str, Any]:
+        missing = [kid for kid in killmail_ids if kid not in self.killmails]
+        if missing:
+            for km in FeedKillmail.objects.filter(
+                killmail_id__in=missing
+            ).only(*CLUSTER_KILLMAIL_FIELDS):
+                self.killmails[km.killmail_id] = km
+        killmails = [
+            self.killmails[kid]
+            for kid in killmail_ids
+            if kid in self.killmails
+        ]
+        return _build_cluster_stats(
+            killmails,
+            dominant_faction_threshold=self.settings.dominant_faction_threshold,
+        )
+
+    def _save(self, cluster: FeedCluster) -> None:
+        if cluster.pk is None:
+            self.to_create[cluster.cluster_key] = cluster
+        else:
+            self.to_update[cluster.pk] = cluster
+
+    def upsert_kill_burst(
+        self, solar_system_id: int, started_bucket, stats: dict[str, Any]
+    ) -> None:
+        """One kill_burst cluster per system/time bucket regardless of faction."""
+        bucket_suffix = _kill_burst_bucket_suffix(started_bucket)
+        prefix = f"{FeedCluster.ClusterType.KILL_BURST}:{solar_system_id}:"
+        system_bursts = self.kill_bursts[solar_system_id]
+        siblings = [
+            cluster
+            for cluster in system_bursts
+            if cluster.cluster_key.startswith(prefix)
+            and cluster.cluster_key.endswith(f":{bucket_suffix}")
+        ]
+
+        merged_ids = set(stats["killmail_ids"])
+        for sibling in siblings:
+            merged_ids |= set(sibling.killmail_ids or [])
+        if len(merged_ids) > len(stats["killmail_ids"]):
+            stats = self.stats(sorted(merged_ids))
+
+        canonical_key = _cluster_key(
+            FeedCluster.ClusterType.KILL_BURST,
+            solar_system_id,
+            None,
+            started_bucket,
+            include_faction=False,
+        )
+        canonical = next(
+            (c for c in siblings if c.cluster_key == canonical_key), None
+        )
+        if canonical is None:
+            canonical = FeedCluster(cluster_key=canonical_key)
+            system_bursts.append(canonical)
+        _apply_stats(
+            canonical,
+            _cluster_defaults(
+                FeedCluster.ClusterType.KILL_BURST, solar_system_id, stats
+            ),
+        )
+        self._save(canonical)
+
+        for sibling in siblings:
+            if sibling is canonical:
+                continue
+            system_bursts.remove(sibling)
+            if sibling.pk is None:
+                self.to_create.pop(sibling.cluster_key, None)
+            else:
+                self.to_update.pop(sibling.pk, None)
+                self.to_delete.add(sibling.pk)
+
+    def find_active_fleet(
+        self, solar_system_id: int, faction_id: int | None, window_start
+    ) -> FeedCluster | None:
+        cutoff = window_start - timedelta(minutes=self.settings.stale_minutes)
+        candidates = [
+            cluster
+            for cluster in self.fleets[solar_system_id]
+            if cluster.dominant_faction_id == faction_id
+            and cluster.is_active
+            and cluster.last_kill_at >= cutoff
+        ]
+        return max(candidates, key=lambda c: c.last_kill_at, default=None)
+
+    def merge_fleet(self, existing: FeedCluster, killmail_ids: list[int]):
+        merged_ids = sorted(
+            set(existing.killmail_ids or []) | set(killmail_ids)
+        )
+        stats = self.stats(merged_ids)
+        _apply_stats(
+            existing,
+            _cluster_defaults(
+                FeedCluster.ClusterType.FLEET_ENGAGEMENT,
+                existing.solar_system_id,
+                stats,
+            ),
+        )
+        existing.ended_at = None
+        self._save(existing)
+
+    def upsert_fleet(self, solar_system_id: int, stats: dict[str, Any]):
+        key = _cluster_key(
+            FeedCluster.ClusterType.FLEET_ENGAGEMENT,
+            solar_system_id,
+            stats["dominant_faction_id"],
+            stats["started_at"],
+        )
+        system_fleets = self.fleets[solar_system_id]
+        cluster = next(
+            (c for c in system_fleets if c.cluster_key == key), None
         )
+        if cluster is None:
+            cluster = FeedCluster(cluster_key=key)
+            system_fleets.append(cluster)
+        _apply_stats(
+            cluster,
+            _cluster_defaults(
+                FeedCluster.ClusterType.FLEET_ENGAGEMENT,
+                solar_system_id,
+                stats,
+            ),
+        )
+        self._save(cluster)
+
+    def flush(self) -> None:
+        now = timezone.now()
+        if self.to_delete:
+            FeedCluster.objects.filter(pk__in=self.to_delete).delete()
+        if self.to_update:
+            for cluster in self.to_update.values():
+                cluster.updated_at = now
+            FeedCluster.objects.bulk_update(
+                list(self.to_update.values()), CLUSTER_STATS_FIELDS
+            )
+        if self.to_create:
+            # A key may exist outside the preloaded range (e.g. an old,
+            # inactive fleet cluster); update it in place.
+            bulk_upsert(
+                model=FeedCluster,
+                instances=list(self.to_create.values()),
+                unique_fields=["cluster_key"],
+                update_fields=["cluster_type", "solar_system_id"]
+                + CLUSTER_STATS_FIELDS,
+            )
+
+
+def _apply_stats(cluster: FeedCluster, values: dict[str, Any]) -> None:
+    for name, value in values.items():
+        setattr(cluster, name, value)
+
+
+def _touched_systems(
+    since, settings: ClusterSettings, cursor: FeedClusterCursor
+) -> tuple[dict[int, Any], Any]:
+    """
+    Systems with kills ingested since the cursor watermark, mapped to the
+    time to rescan them from. Returns (scan_from, new_watermark).
+    """
+    new_kills = FeedKillmail.objects.filter(killmail_time__gte=since)
+    if cursor.last_killmail_created_at is not None:
+        new_kills = new_kills.filter(
+            created_at__gte=cursor.last_killmail_created_at - WATERMARK_OVERLAP
+        )
+    first_kills = {}
+    watermark = cursor.last_killmail_created_at
+    for row in new_kills.values("solar_system_id").annotate(
+        first_kill=Min("killmail_time"), last_created=Max("created_at")
+    ):
+        first_kills[row["solar_system_id"]] = row["first_kill"]
+        if watermark is None or row["last_created"] > watermark:
+            watermark = row["last_created"]
+    if not first_kills:
+        return {}, watermark
+    return (
+        _rewind_to_quiet_gap(since, first_kills, settings.lookback),
+        watermark,
     )
+
+
+def _rewind_to_quiet_gap(
+    since, first_kills: dict[int, Any], gap: timedelta
+) -> dict[int, Any]:
+    """
+    Scan start per system: the latest kill at or before its first new kill
+    that follows more than gap without kills, else since. No window spans
+    such a gap, so the sliding window always restarts at that kill and a
+    rescan from it yields the same windows (and cluster keys) as a full
+    scan from since.
+    """
+    scan_from = {}
+    previous = dict(first_kills)
+    earlier = (
+        FeedKillmail.objects.filter(
+            solar_system_id__in=list(first_kills),
+            killmail_time__gte=since,
+            killmail_time__lt=max(first_kills.values()),
+        )
+        .order_by("solar_system_id", "-killmail_time")
+        .values_list("solar_system_id", "killmail_time")
+    )
+    for system_id, kill_time in earlier.iterator():
+        if system_id in scan_from or kill_time >= previous[system_id]:
+            continue
+        if previous[system_id] - kill_time > gap:
+            scan_from[system_id] = previous[system_id]
+        else:
+            previous[system_id] = kill_time
+    for system_id in first_kills:
+        scan_from.setdefault(system_id, since)
+    return scan_from
+
+
+def _load_system_kills(
+    since, scan_from: dict[int, Any] | None
+) -> dict[int, list[FeedKillmail]]:
+    if scan_from == {}:
+        return {}
+    killmails = FeedKillmail.objects.only(*CLUSTER_KILLMAIL_FIELDS)
+    if scan_from is None:
+        killmails = killmails.filter(killmail_time__gte=since)
+    else:
+        killmails = killmails.filter(
+            solar_system_id__in=list(scan_from),
+            killmail_time__gte=min(scan_from.values()),
+        )
     by_system: dict[int, list[FeedKillmail]] = defaultdict(list)
-    for km in killmails:
-        by_system[km.solar_system_id].append(km)
+    for km in killmails.order_by("killmail_time"):
+        if (
+            scan_from is None
+            or km.killmail_time >= scan_from[km.solar_system_id]
+        ):
+            by_system[km.solar_system_id].append(km)
+    return by_system
+
+
+def detect_clusters(
+    *, since_hours: int = 48, incremental: bool = False
+) -> int:
+    """
+    Detect kill_burst and fleet_engagement clusters from FeedKillmail rows.
+
+    By default every system with kills in the last since_hours is scanned.
+    With incremental=True only systems with kills ingested since the last
+    incremental run (FeedClusterCursor) are rescanned, starting one window
+    before their earliest new kill, so work scales with new kills.
+    """
+    now = timezone.now()
+    since = now - timedelta(hours=since_hours)
+    settings = ClusterSettings.load()
+
+    cursor = None
+    scan_from = None
+    watermark = None
+    if incremental:
+        cursor = FeedClusterCursor.get_singleton()
+        scan_from, watermark = _touched_systems(since, settings, cursor)
+
+    by_system = _load_system_kills(since, scan_from)
+    if scan_from is None:
+        scan_from = {
+            system_id: kills[0].killmail_time
+            for system_id, kills in by_system.items()
+        }
+    batch = _ClusterBatch(
+        settings,
+        scan_from,
+        {km.killmail_id: km for kills in by_system.values() for km in kills},
+    )
 
     upserted = 0
     for solar_system_id, system_kills in by_system.items():
-        upserted += _detect_for_system(
-            solar_system_id,
-            system_kills,
-            kb_window,
-            kb_min_kills,
-            fleet_window,
-            fleet_min_kills,
-            fleet_min_pilots,
-        )
+        upserted += _detect_for_system(batch, solar_system_id, system_kills)
+    batch.flush()
+
+    if cursor is not None and watermark != cursor.last_killmail_created_at:
+        cursor.last_killmail_created_at = watermark
+        cursor.save(update_fields=["last_killmail_created_at", "updated_at"])
 
-    _mark_stale_fleet_clusters(stale_minutes)
+    _mark_stale_fleet_clusters(settings.stale_minutes)
     return upserted
 
 
 def _detect_for_system(
+    batch: _ClusterBatch,
     solar_system_id: int,
     kills: list[FeedKillmail],
-    kb_window: int,
-    kb_min_kills: int,
-    fleet_window: int,
-    fleet_min_kills: int,
-    fleet_min_pilots: int,
 ) -> int:
+    settings = batch.settings
     count = 0
     count += _sliding_window_clusters(
+        batch,
         kills,
         solar_system_id,
         FeedCluster.ClusterType.KILL_BURST,
-        kb_window,
-        kb_min_kills,
+        settings.kb_window,
+        settings.kb_min_kills,
         min_pilots=0,
     )
     count += _sliding_window_clusters(
+        batch,
         kills,
         solar_system_id,
         FeedCluster.ClusterType.FLEET_ENGAGEMENT,
-        fleet_window,
-        fleet_min_kills,
-        min_pilots=fleet_min_pilots,
+        settings.fleet_window,
+        settings.fleet_min_kills,
+        min_pilots=settings.fleet_min_pilots,
     )
     return count
 
 
 def _sliding_window_clusters(
+    batch: _ClusterBatch,
     kills: list[FeedKillmail],
     solar_system_id: int,
     cluster_type: str,
@@ -278,53 +541,38 @@ def _sliding_window_clusters(
 
     upserted = 0
     window_delta = timedelta(minutes=window_minutes)
+    # Two pointers: kills[i:j] is the window starting at kill i; j only
+    # moves forward, so each kill is visited a constant number of times.
     i = 0
+    j = 0
     while i < len(kills):
         window_start = kills[i].killmail_time
         window_end = window_start + window_delta
-        window_kills = [kills[i]]
-        j = i + 1
+        j = max(j, i + 1)
         while j < len(kills) and kills[j].killmail_time <= window_end:
-            window_kills.append(kills[j])
             j += 1
 
-        if len(window_kills) >= min_kills:
-            stats = _build_cluster_stats(window_kills)
-            if stats["pilot_count"] >= min_pilots:
+        if j - i >= min_kills:
+            window_kills = kills[i:j]
+            if (
+                min_pilots <= 0
+                or len(_attacker_character_ids(window_kills)) >= min_pilots
+            ):
+                stats = batch.stats([km.killmail_id for km in window_kills])
                 if cluster_type == FeedCluster.ClusterType.FLEET_ENGAGEMENT:
-                    stale_minutes = get_rollup_config("fleet_active").get(
-                        "stale_minutes", 20
-                    )
-                    existing = _find_active_fleet_cluster(
+                    existing = batch.find_active_fleet(
                         solar_system_id,
                         stats["dominant_faction_id"],
                         window_start,
-                        stale_minutes=stale_minutes,
                     )
                     if existing is not None:
-                        _merge_fleet_cluster(existing, stats["killmail_ids"])
-                        upserted += 1
-                        i = j
-                        continue
-                    key = _cluster_key(
-                        cluster_type,
-                        solar_system_id,
-                        stats["dominant_faction_id"],
-                        stats["started_at"],
-                    )
-                    FeedCluster.objects.update_or_create(
-                        cluster_key=key,
-                        defaults=_cluster_defaults(
-                            cluster_type, solar_system_id, stats
-                        ),
-                    )
+                        batch.merge_fleet(existing, stats["killmail_ids"])
+                    else:
+                        batch.upsert_fleet(solar_system_id, stats)
                 else:
-                    started_bucket = _window_start(
-                        window_start, window_minutes
-                    )
-                    _upsert_kill_burst_cluster(
+                    batch.upsert_kill_burst(
                         solar_system_id,
-                        started_bucket,
+                        _window_start(window_start, window_minutes),
                         stats,
                     )
                 upserted += 1
@@ -335,13 +583,9 @@ def _sliding_window_clusters(
 
 
 def _mark_stale_fleet_clusters(stale_minutes: int) -> None:
-    cutoff = timezone.now() - timedelta(minutes=stale_minutes)
-    stale = FeedCluster.objects.filter(
+    now = timezone.now()
+    FeedCluster.objects.filter(
         cluster_type=FeedCluster.ClusterType.FLEET_ENGAGEMENT,
         is_active=True,
-        last_kill_at__lt=cutoff,
-    )
-    for cluster in stale:
-        cluster.is_active = False
-        cluster.ended_at = cluster.last_kill_at
-        cluster.save(update_fields=["is_active", "ended_at", "updated_at"])
+        last_kill_at__lt=now - timedelta(minutes=stale_minutes),
+    ).update(is_active=False, ended_at=F("last_kill_at"), updated_at=now)
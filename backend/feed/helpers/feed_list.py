@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+from datetime import datetime
+
+from django.core.cache import cache
+
+from feed.constants import FEED_LIST_CACHE_SECONDS
+
+FEED_LIST_CACHE_PREFIX = "feed:list"
+FEED_LIST_VERSION_KEY = f"{FEED_LIST_CACHE_PREFIX}:version"
+
+
+def _feed_list_version() -> str:
+    version = cache.get(FEED_LIST_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_LIST_VERSION_KEY, str(time.time_ns()), timeout=None)
+        version = cache.get(FEED_LIST_VERSION_KEY)
+    return version
+
+
+def feed_list_cache_key(days: int, limit: int, compact: bool) -> str:
+    version = _feed_list_version()
+    mode = "compact" if compact else "full"
+    return f"{FEED_LIST_CACHE_PREFIX}:{version}:{days}:{limit}:{mode}"
+
+
+def get_cached_feed_page(days: int, limit: int, compact: bool) -> dict | None:
+    return cache.get(feed_list_cache_key(days, limit, compact))
+
+
+def set_cached_feed_page(
+    days: int,
+    limit: int,
+    compact: bool,
+    page: dict,
+    *,
+    now: datetime,
+    next_expiry: datetime | None = None,
+) -> None:
+    """
+    Cache a first page. Pages holding an event with an expiry are only kept
+    until that event would drop out of the listing.
+    """
+    timeout = FEED_LIST_CACHE_SECONDS
+    if next_expiry is not None:
+        timeout = min(timeout, int((next_expiry - now).total_seconds()))
+    if timeout <= 0:
+        return
+    cache.set(feed_list_cache_key(days, limit, compact), page, timeout)
+
+
+def invalidate_feed_list_cache() -> None:
+    """Orphan every cached first page by moving to a new key version."""
+    cache.set(FEED_LIST_VERSION_KEY, str(time.time_ns()), timeout=None)
@@ -5,7 +5,11 @@ from typing import Any
 from django.db import transaction
 from django.utils.dateparse import parse_datetime
 
-from feed.helpers.affiliations import apply_killmail_affiliations
+from eveonline.helpers.db_sync import bulk_upsert
+from feed.helpers.affiliations import (
+    apply_killmail_affiliations,
+    apply_killmail_affiliations_batch,
+)
 from feed.helpers.killmail_classify import is_npc_kill
 from feed.helpers.monitored_systems import is_monitored_system
 from feed.models import FeedKillmail
@@ -21,12 +25,24 @@ def parse_r2z2_payload(
     return raw, zkb, sequence_id
 
 
-def upsert_feed_killmail_from_r2z2(
+KILLMAIL_UPDATE_FIELDS = [
+    "hash",
+    "killmail_time",
+    "solar_system_id",
+    "victim_character_id",
+    "victim_ship_type_id",
+    "attacker_summary",
+    "raw_killmail",
+    "zkb_meta",
+    "zkill_sequence_id",
+]
+
+
+def _feed_killmail_fields(
     payload: dict[str, Any],
-    *,
-    allowlist: frozenset[int] | None = None,
-) -> FeedKillmail | None:
-    """Ingest R2Z2 payload; returns None if discarded."""
+    allowlist: frozenset[int] | None,
+) -> dict[str, Any] | None:
+    """FeedKillmail column values for an R2Z2 payload; None if discarded."""
     raw, zkb, sequence_id = parse_r2z2_payload(payload)
     if is_npc_kill(zkb):
         return None
@@ -63,26 +79,75 @@ def upsert_feed_killmail_from_r2z2(
         }
         for a in attackers
     ]
+    return {
+        "killmail_id": killmail_id,
+        "hash": killmail_hash,
+        "killmail_time": killmail_time,
+        "solar_system_id": solar_system_id,
+        "victim_character_id": victim.get("character_id"),
+        "victim_ship_type_id": victim.get("ship_type_id"),
+        "attacker_summary": attacker_summary,
+        "raw_killmail": raw,
+        "zkb_meta": zkb,
+        "zkill_sequence_id": sequence_id,
+    }
 
+
+def upsert_feed_killmail_from_r2z2(
+    payload: dict[str, Any],
+    *,
+    allowlist: frozenset[int] | None = None,
+) -> FeedKillmail | None:
+    """Ingest R2Z2 payload; returns None if discarded."""
+    fields = _feed_killmail_fields(payload, allowlist)
+    if fields is None:
+        return None
+
+    killmail_id = fields.pop("killmail_id")
     with transaction.atomic():
         killmail, _ = FeedKillmail.objects.update_or_create(
             killmail_id=killmail_id,
-            defaults={
-                "hash": killmail_hash,
-                "killmail_time": killmail_time,
-                "solar_system_id": solar_system_id,
-                "victim_character_id": victim.get("character_id"),
-                "victim_ship_type_id": victim.get("ship_type_id"),
-                "attacker_summary": attacker_summary,
-                "raw_killmail": raw,
-                "zkb_meta": zkb,
-                "zkill_sequence_id": sequence_id,
-            },
+            defaults=fields,
+        )
+        apply_killmail_affiliations(
+            fields["raw_killmail"], confirmed_at=fields["killmail_time"]
         )
-        apply_killmail_affiliations(raw, confirmed_at=killmail_time)
     return killmail
 
 
+def upsert_feed_killmails_from_r2z2(
+    payloads: list[dict[str, Any]],
+    *,
+    allowlist: frozenset[int] | None = None,
+) -> list[bool]:
+    """
+    Ingest a batch of R2Z2 payloads with one FeedKillmail upsert and one
+    batched affiliation upsert. Returns whether each payload was kept
+    (False = discarded), in payload order.
+    """
+    rows: dict[int, dict[str, Any]] = {}
+    kept = []
+    for payload in payloads:
+        fields = _feed_killmail_fields(payload, allowlist)
+        kept.append(fields is not None)
+        if fields is not None:
+            rows[fields["killmail_id"]] = fields
+    if not rows:
+        return kept
+
+    with transaction.atomic():
+        bulk_upsert(
+            model=FeedKillmail,
+            instances=[FeedKillmail(**fields) for fields in rows.values()],
+            unique_fields=["killmail_id"],
+            update_fields=KILLMAIL_UPDATE_FIELDS,
+        )
+        apply_killmail_affiliations_batch(
+            [fields["raw_killmail"] for fields in rows.values()]
+        )
+    return kept
+
+
 def upsert_feed_killmail_from_raw(
     raw: dict[str, Any],
     *,
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import timedelta
 from typing import Any, Literal
 
 import requests
 import sentry_sdk
+from requests.adapters import HTTPAdapter
 from django.db import NotSupportedError, OperationalError, transaction
 from django.utils import timezone
 
@@ -16,14 +20,17 @@ from feed.constants import (
     R2Z2_CATCHUP_GAP_WARN,
     R2Z2_LIVE_GAP_WARN,
     R2Z2_NOT_FOUND_SLEEP_MS,
+    R2Z2_PIPELINE_RAMP_HITS,
+    R2Z2_PIPELINE_WINDOW,
     R2Z2_POLL_SOFT_TIME_LIMIT_SECONDS,
     R2Z2_RATE_LIMIT_SLEEP_SECONDS,
     R2Z2_SEQUENCE_URL,
     R2Z2_SUCCESS_SLEEP_MS,
     R2Z2_USER_AGENT,
+    R2Z2_WRITE_BATCH_SIZE,
 )
 from feed.helpers.capital_pings import maybe_notify_capital_kill
-from feed.helpers.ingest import upsert_feed_killmail_from_r2z2
+from feed.helpers.ingest import upsert_feed_killmails_from_r2z2
 from feed.helpers.monitored_systems import get_monitored_system_ids
 from feed.models import FeedR2z2Cursor
 
@@ -33,6 +40,9 @@ R2Z2_BASE = "https://r2z2.zkillboard.com/ephemeral"
 
 CursorRole = Literal["live", "catchup"]
 
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
 
 class R2Z2Throttled(Exception):
     def __init__(self, status: int, pause_seconds: float):
@@ -45,6 +55,20 @@ def _headers() -> dict[str, str]:
     return {"User-Agent": R2Z2_USER_AGENT, "Accept": "application/json"}
 
 
+def r2z2_session() -> requests.Session:
+    """Process-wide keep-alive session shared by pipelined fetches."""
+    global _session  # pylint: disable=global-statement
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=R2Z2_PIPELINE_WINDOW)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(_headers())
+            _session = session
+        return _session
+
+
 def _retry_after_seconds(
     response: requests.Response,
     *,
@@ -172,7 +196,7 @@ def _warn_gaps(stats: dict[str, Any], cursor: FeedR2z2Cursor) -> None:
 
 def fetch_latest_sequence() -> int:
     """Fetch tip sequence. Raises on throttle/errors (no long sleeps)."""
-    response = requests.get(R2Z2_SEQUENCE_URL, headers=_headers(), timeout=30)
+    response = r2z2_session().get(R2Z2_SEQUENCE_URL, timeout=30)
     if response.status_code in (429, 403):
         default = (
             float(R2Z2_RATE_LIMIT_SLEEP_SECONDS)
@@ -189,7 +213,7 @@ def fetch_sequence_payload(
     sequence_id: int,
 ) -> tuple[int, dict[str, Any] | None, float | None]:
     url = f"{R2Z2_BASE}/{sequence_id}.json"
-    response = requests.get(url, headers=_headers(), timeout=30)
+    response = r2z2_session().get(url, timeout=30)
     if response.status_code == 404:
         return 404, None, None
     if response.status_code == 429:
@@ -258,20 +282,58 @@ def _advance_cursor(
         cursor.save(update_fields=["catchup_sequence_id", "updated_at"])
 
 
-def _process_payload(
-    payload: dict[str, Any],
-    *,
-    allowlist: frozenset[int],
-    apply_age_gate: bool,
-    stats: dict[str, Any],
-    pending_capital: list[tuple[dict[str, Any], bool]],
-) -> None:
-    result = upsert_feed_killmail_from_r2z2(payload, allowlist=allowlist)
-    if result:
-        stats["inserted"] += 1
-    else:
-        stats["discarded"] += 1
-    pending_capital.append((payload, apply_age_gate))
+class _IngestBuffer:
+    """
+    Sequences fetched by one poll phase, in order. Payloads are written
+    with one batched upsert and the cursor is advanced once per batch.
+    """
+
+    def __init__(
+        self,
+        cursor: FeedR2z2Cursor,
+        *,
+        role: CursorRole,
+        allowlist: frozenset[int],
+        stats: dict[str, Any],
+        apply_age_gate: bool,
+        pending_capital: list[tuple[dict[str, Any], bool]],
+    ):
+        self.cursor = cursor
+        self.role = role
+        self.allowlist = allowlist
+        self.stats = stats
+        self.apply_age_gate = apply_age_gate
+        self.pending_capital = pending_capital
+        self.payloads: list[dict[str, Any]] = []
+        self.sequences = 0
+        self.last_sequence: int | None = None
+
+    def add(self, sequence: int, payload: dict[str, Any] | None) -> None:
+        self.last_sequence = sequence
+        self.sequences += 1
+        if payload:
+            self.payloads.append(payload)
+        if self.sequences >= R2Z2_WRITE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.payloads:
+            kept = upsert_feed_killmails_from_r2z2(
+                self.payloads, allowlist=self.allowlist
+            )
+            inserted = sum(kept)
+            self.stats["inserted"] += inserted
+            self.stats["discarded"] += len(kept) - inserted
+            self.pending_capital.extend(
+                (payload, self.apply_age_gate) for payload in self.payloads
+            )
+            self.payloads = []
+        if self.last_sequence is not None:
+            _advance_cursor(
+                self.cursor, role=self.role, sequence=self.last_sequence
+            )
+            self.last_sequence = None
+        self.sequences = 0
 
 
 def _flush_capital_notifications(
@@ -292,7 +354,26 @@ def _flush_capital_notifications(
             logger.exception("Capital ping evaluation failed")
 
 
-def _poll_phase(
+def _dispatch_stop(
+    cursor: FeedR2z2Cursor,
+    *,
+    role: CursorRole,
+    sequence: int,
+    stop_before: int | None,
+    deadline: float,
+) -> str | None:
+    """Why no further sequence should be requested, or None to continue."""
+    if time.monotonic() >= deadline:
+        return "budget"
+    if stop_before is not None and sequence > stop_before:
+        return "stopped"
+    if role == "catchup" and cursor.live_idle_until is not None:
+        if timezone.now() >= cursor.live_idle_until:
+            return "stopped"
+    return None
+
+
+def _poll_phase(  # noqa: C901
     cursor: FeedR2z2Cursor,
     *,
     role: CursorRole,
@@ -306,79 +387,113 @@ def _poll_phase(
 ) -> str:
     """Fetch sequences until tip, throttle, budget, or stop_before.
 
+    Fetches one sequence at a time near the tip; once R2Z2_PIPELINE_RAMP_HITS
+    sequences in a row exist, keeps up to R2Z2_PIPELINE_WINDOW in flight.
+    Results are handled in sequence order and anything fetched past a
+    404/429/403/error is discarded.
+
     Returns: tip | budget | throttled | error | stopped
     """
-    sequence = start_sequence
     processed_key = "live_processed" if role == "live" else "catchup_processed"
+    buffer = _IngestBuffer(
+        cursor,
+        role=role,
+        allowlist=allowlist,
+        stats=stats,
+        apply_age_gate=apply_age_gate,
+        pending_capital=pending_capital,
+    )
+    in_flight: deque[tuple[int, Future]] = deque()
+    next_sequence = start_sequence
+    hits = 0
+    result = "budget"
 
-    while time.monotonic() < deadline:
-        if stop_before is not None and sequence > stop_before:
-            return "stopped"
-        if role == "catchup" and cursor.live_idle_until is not None:
-            if timezone.now() >= cursor.live_idle_until:
-                return "stopped"
-
-        _enforce_request_spacing(cursor)
-        try:
-            status, payload, retry_after = fetch_sequence_payload(sequence)
-            _mark_request(cursor)
-        except requests.RequestException as exc:
-            _mark_request(cursor)
-            logger.warning(
-                "R2Z2 fetch error at sequence %s: %s", sequence, exc
-            )
-            stats["errors"] += 1
-            return "error"
-
-        if status == 429:
-            pause = retry_after or float(R2Z2_RATE_LIMIT_SLEEP_SECONDS)
-            _set_paused(cursor, pause)
-            stats["rate_limited"] += 1
-            _warn_throttle(
-                status=429,
-                sequence=sequence,
-                pause_seconds=pause,
-                paused_until=cursor.paused_until,
-                cursor=cursor,
-            )
-            return "throttled"
-
-        if status == 403:
-            pause = retry_after or float(R2Z2_BANNED_SLEEP_SECONDS)
-            _set_paused(cursor, pause)
-            stats["banned"] += 1
-            _warn_throttle(
-                status=403,
-                sequence=sequence,
-                pause_seconds=pause,
-                paused_until=cursor.paused_until,
-                cursor=cursor,
+    pool = ThreadPoolExecutor(
+        max_workers=R2Z2_PIPELINE_WINDOW, thread_name_prefix="r2z2"
+    )
+    try:
+        while True:
+            window = (
+                R2Z2_PIPELINE_WINDOW if hits >= R2Z2_PIPELINE_RAMP_HITS else 1
             )
-            return "throttled"
-
-        if status == 404:
-            if role == "live":
-                cursor.live_idle_until = timezone.now() + timedelta(
-                    milliseconds=R2Z2_NOT_FOUND_SLEEP_MS
+            stop = None
+            while len(in_flight) < window:
+                stop = _dispatch_stop(
+                    cursor,
+                    role=role,
+                    sequence=next_sequence,
+                    stop_before=stop_before,
+                    deadline=deadline,
                 )
-                cursor.save(update_fields=["live_idle_until", "updated_at"])
-            return "tip"
-
-        stats[processed_key] += 1
-        _advance_cursor(cursor, role=role, sequence=sequence)
-        if payload:
-            _process_payload(
-                payload,
-                allowlist=allowlist,
-                apply_age_gate=apply_age_gate,
-                stats=stats,
-                pending_capital=pending_capital,
-            )
+                if stop is not None:
+                    break
+                _enforce_request_spacing(cursor)
+                cursor.last_request_at = timezone.now()
+                in_flight.append(
+                    (
+                        next_sequence,
+                        pool.submit(fetch_sequence_payload, next_sequence),
+                    )
+                )
+                next_sequence += 1
+            if not in_flight:
+                result = stop or "budget"
+                break
 
-        sequence += 1
-        time.sleep(R2Z2_SUCCESS_SLEEP_MS / 1000)
+            sequence, future = in_flight.popleft()
+            try:
+                status, payload, retry_after = future.result()
+            except requests.RequestException as exc:
+                logger.warning(
+                    "R2Z2 fetch error at sequence %s: %s", sequence, exc
+                )
+                stats["errors"] += 1
+                result = "error"
+                break
+
+            if status in (429, 403):
+                default = (
+                    R2Z2_RATE_LIMIT_SLEEP_SECONDS
+                    if status == 429
+                    else R2Z2_BANNED_SLEEP_SECONDS
+                )
+                pause = retry_after or float(default)
+                _set_paused(cursor, pause)
+                stats["rate_limited" if status == 429 else "banned"] += 1
+                _warn_throttle(
+                    status=status,
+                    sequence=sequence,
+                    pause_seconds=pause,
+                    paused_until=cursor.paused_until,
+                    cursor=cursor,
+                )
+                result = "throttled"
+                break
 
-    return "budget"
+            if status == 404:
+                if role == "live":
+                    cursor.live_idle_until = timezone.now() + timedelta(
+                        milliseconds=R2Z2_NOT_FOUND_SLEEP_MS
+                    )
+                    cursor.save(
+                        update_fields=["live_idle_until", "updated_at"]
+                    )
+                result = "tip"
+                break
+
+            stats[processed_key] += 1
+            hits += 1
+            buffer.add(sequence, payload)
+    finally:
+        for _, future in in_flight:
+            future.cancel()
+        pool.shutdown(wait=False)
+
+    # Only on success: after an error the poll's transaction rolls back, and
+    # a second database error here would hide the first
+    buffer.flush()
+    cursor.save(update_fields=["last_request_at", "updated_at"])
+    return result
 
 
 def poll_r2z2_batch(  # noqa: C901
@@ -1,15 +1,192 @@
 from __future__ import annotations
 
+import logging
 import math
+import threading
+from array import array
 
 from eveuniverse.models import EveSolarSystem
 
 from feed.constants import METERS_PER_LIGHT_YEAR
 
+logger = logging.getLogger(__name__)
+
+METERS_PER_LIGHT_YEAR_SQUARED = METERS_PER_LIGHT_YEAR * METERS_PER_LIGHT_YEAR
+
+
+class SystemCoordinateIndex:
+    """
+    Column store of solar system positions keyed by system id.
+
+    Coordinates live in three packed ``array('d')`` columns so range scans
+    walk contiguous doubles instead of model instances. Range results are
+    memoized per (origin, radius) since callers ask the same question for
+    every killmail.
+    """
+
+    def __init__(self):
+        self.ids = array("q")
+        self.xs = array("d")
+        self.ys = array("d")
+        self.zs = array("d")
+        self._rows: dict[int, int] = {}
+        self._ranges: dict[tuple[int, float], dict[int, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> SystemCoordinateIndex:
+        index = cls()
+        rows = EveSolarSystem.objects.filter(
+            position_x__isnull=False,
+            position_y__isnull=False,
+            position_z__isnull=False,
+        ).values_list("id", "position_x", "position_y", "position_z")
+        for system_id, x, y, z in rows.iterator(chunk_size=2000):
+            index._append(system_id, x, y, z)
+        logger.debug("Loaded %s solar system positions", len(index))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, solar_system_id: int) -> bool:
+        return solar_system_id in self._rows
+
+    def _append(self, system_id: int, x: float, y: float, z: float) -> None:
+        self._rows[system_id] = len(self.ids)
+        self.ids.append(system_id)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.zs.append(z)
+
+    def add(self, system_id: int, x: float, y: float, z: float) -> None:
+        """Insert or move a system, dropping memoized range results."""
+        with self._lock:
+            row = self._rows.get(system_id)
+            if row is None:
+                self._append(system_id, x, y, z)
+            else:
+                self.xs[row], self.ys[row], self.zs[row] = x, y, z
+            self._ranges.clear()
+
+    def position(
+        self, solar_system_id: int
+    ) -> tuple[float, float, float] | None:
+        row = self._rows.get(solar_system_id)
+        if row is None:
+            return None
+        return self.xs[row], self.ys[row], self.zs[row]
+
+    def light_years_between(
+        self, origin_system_id: int, target_system_id: int
+    ) -> float | None:
+        origin = self._rows.get(origin_system_id)
+        target = self._rows.get(target_system_id)
+        if origin is None or target is None:
+            return None
+        dx = self.xs[target] - self.xs[origin]
+        dy = self.ys[target] - self.ys[origin]
+        dz = self.zs[target] - self.zs[origin]
+        return math.sqrt(dx * dx + dy * dy + dz * dz) / METERS_PER_LIGHT_YEAR
+
+    def within_light_years(
+        self, origin_system_id: int, max_light_years: float
+    ) -> dict[int, float]:
+        """
+        All indexed systems within range of the origin, mapped to their
+        distance in light-years. Compares squared meters in a single pass
+        and only takes the square root for systems that are in range.
+        """
+        key = (origin_system_id, float(max_light_years))
+        cached = self._ranges.get(key)
+        if cached is not None:
+            return cached
+
+        origin = self._rows.get(origin_system_id)
+        if origin is None:
+            return {}
+
+        ox, oy, oz = self.xs[origin], self.ys[origin], self.zs[origin]
+        limit = max_light_years * max_light_years
+        limit *= METERS_PER_LIGHT_YEAR_SQUARED
+        in_range = {}
+        for system_id, x, y, z in zip(self.ids, self.xs, self.ys, self.zs):
+            dx = x - ox
+            dy = y - oy
+            dz = z - oz
+            squared = dx * dx + dy * dy + dz * dz
+            if squared <= limit:
+                in_range[system_id] = (
+                    math.sqrt(squared) / METERS_PER_LIGHT_YEAR
+                )
+
+        with self._lock:
+            self._ranges[key] = in_range
+        return in_range
+
+    def distance_matrix(
+        self, solar_system_ids: list[int]
+    ) -> list[list[float | None]]:
+        """Pairwise light-year distances; None for unindexed systems."""
+        rows = [self._rows.get(system_id) for system_id in solar_system_ids]
+        points = [
+            None if row is None else (self.xs[row], self.ys[row], self.zs[row])
+            for row in rows
+        ]
+        size = len(points)
+        matrix: list[list[float | None]] = [[None] * size for _ in points]
+        for i in range(size):
+            a = points[i]
+            if a is None:
+                continue
+            matrix[i][i] = 0.0
+            for j in range(i + 1, size):
+                b = points[j]
+                if b is None:
+                    continue
+                dx = b[0] - a[0]
+                dy = b[1] - a[1]
+                dz = b[2] - a[2]
+                distance = (
+                    math.sqrt(dx * dx + dy * dy + dz * dz)
+                    / METERS_PER_LIGHT_YEAR
+                )
+                matrix[i][j] = distance
+                matrix[j][i] = distance
+        return matrix
+
+
+_index: SystemCoordinateIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_system_coordinate_index() -> SystemCoordinateIndex:
+    """Process-wide coordinate index, built on first use."""
+    global _index  # pylint: disable=global-statement
+    index = _index
+    if index is not None:
+        return index
+    with _index_lock:
+        if _index is None:
+            _index = SystemCoordinateIndex.load()
+        return _index
+
+
+def invalidate_system_coordinate_index() -> None:
+    """Drop the index so the next query reloads it from the database."""
+    global _index  # pylint: disable=global-statement
+    with _index_lock:
+        _index = None
+
 
 def _system_position(
     solar_system_id: int,
 ) -> tuple[float, float, float] | None:
+    index = get_system_coordinate_index()
+    position = index.position(solar_system_id)
+    if position is not None:
+        return position
+
     system = EveSolarSystem.objects.filter(id=solar_system_id).first()
     if system is None:
         system, _ = EveSolarSystem.objects.get_or_create_esi(
@@ -21,6 +198,12 @@ def _system_position(
         or system.position_z is None
     ):
         return None
+    index.add(
+        solar_system_id,
+        system.position_x,
+        system.position_y,
+        system.position_z,
+    )
     return system.position_x, system.position_y, system.position_z
 
 
@@ -42,3 +225,24 @@ def light_years_between_systems(
     dz = target[2] - origin[2]
     meters = math.sqrt(dx * dx + dy * dy + dz * dz)
     return meters / METERS_PER_LIGHT_YEAR
+
+
+def systems_within_light_years(
+    origin_system_id: int,
+    max_light_years: float,
+) -> dict[int, float]:
+    """Solar system id -> light-years for every system in range of origin."""
+    if _system_position(origin_system_id) is None:
+        return {}
+    return get_system_coordinate_index().within_light_years(
+        origin_system_id, max_light_years
+    )
+
+
+def light_year_distance_matrix(
+    solar_system_ids: list[int],
+) -> list[list[float | None]]:
+    """Pairwise light-year distances between the given systems."""
+    for solar_system_id in set(solar_system_ids):
+        _system_position(solar_system_id)
+    return get_system_coordinate_index().distance_matrix(solar_system_ids)
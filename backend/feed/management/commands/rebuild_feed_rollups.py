@@ -5,6 +5,7 @@ from datetime import timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 
+from feed.helpers.feed_list import invalidate_feed_list_cache
 from feed.models import FeedEvent
 from feed.rollups.registry import ROLLUP_PROCESSORS, build_context, run_rollup
 from feed.rollups.writer import write_rollup_results
@@ -38,6 +39,7 @@ class Command(BaseCommand):
             deleted, _ = FeedEvent.objects.filter(
                 rollup_code__in=codes
             ).delete()
+            invalidate_feed_list_cache()
             self.stdout.write(f"Deleted {deleted} existing events")
 
         total = 0
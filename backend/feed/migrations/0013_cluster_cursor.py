@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feed", "0012_feedcapitalalert_systems"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FeedClusterCursor",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "last_killmail_created_at",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Latest FeedKillmail.created_at already scanned for clusters.",
+                        null=True,
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Cluster detection cursor",
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("feed", "0013_cluster_cursor"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="feedevent",
+            index=models.Index(
+                fields=["-occurred_at", "-id", "kind", "expires_at"],
+                name="feed_event_list_cursor_idx",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="feedevent",
+            name="feed_feedev_occurre_30cd72_idx",
+        ),
+    ]
@@ -123,6 +123,25 @@ class FeedCharacterAffiliation(models.Model):
         return f"Char {self.character_id} -> {self.faction_id}"
 
 
+class FeedClusterCursor(models.Model):
+    """Singleton watermark for incremental cluster detection."""
+
+    last_killmail_created_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Latest FeedKillmail.created_at already scanned for clusters.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Cluster detection cursor"
+
+    @classmethod
+    def get_singleton(cls) -> FeedClusterCursor:
+        obj, _ = cls.objects.get_or_create(pk=1)
+        return obj
+
+
 class FeedCluster(models.Model):
     class ClusterType(models.TextChoices):
         KILL_BURST = "kill_burst", "Kill burst"
@@ -205,7 +224,14 @@ class FeedEvent(models.Model):
 
     class Meta:
         indexes = [
-            models.Index(fields=["-occurred_at", "-id"]),
+            # Cursor order plus the list filters: the public listing walks
+            # this index newest first and checks kind/expiry on index
+            # entries, reading rows only for the page it returns. It is not
+            # covering; the selected columns live in the table.
+            models.Index(
+                fields=["-occurred_at", "-id", "kind", "expires_at"],
+                name="feed_event_list_cursor_idx",
+            ),
             models.Index(fields=["rollup_code", "cluster_key"]),
             models.Index(fields=["source_type", "source_id"]),
         ]
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from django.utils import timezone
 
+from feed.helpers.feed_list import invalidate_feed_list_cache
 from feed.models import (
     FeedEvent,
     FeedEventKillmailLink,
@@ -16,6 +17,8 @@ def write_rollup_results(results: list[RollupResult]) -> int:
         event = _upsert_event(result)
         _sync_killmail_links(event, result.killmail_ids)
         written += 1
+    if written:
+        invalidate_feed_list_cache()
     return written
 
 
@@ -6,11 +6,16 @@ from django.db.models import Q
 from django.utils import timezone
 from ninja import Router, Schema
 
+from app.errors import ErrorResponse
 from feed.constants import (
     FEED_DEFAULT_HISTORY_DAYS,
     FEED_DEFAULT_PAGE_LIMIT,
     FEED_MAX_HISTORY_DAYS,
 )
+from feed.helpers.feed_list import (
+    get_cached_feed_page,
+    set_cached_feed_page,
+)
 from feed.helpers.warzone_briefing import (
     WarzoneSystemRow,
     build_warzone_briefing,
@@ -27,9 +32,9 @@ class FeedEventItemSchema(Schema):
     title: str
     subheader: str
     preview: str
-    body: str
+    body: str | None = None
     accent: str
-    payload: dict
+    payload: dict | None = None
 
 
 class FeedListResponse(Schema):
@@ -70,10 +75,17 @@ def _warzone_system_schema(row: WarzoneSystemRow) -> WarzoneSystemSchema:
     )
 
 
+def _visible_feed_events(now):
+    """Events the public feed shows: not legacy militia joins, not expired"""
+    return FeedEvent.objects.exclude(kind="militia_joins").filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gte=now)
+    )
+
+
 def _parse_cursor(cursor: str | None) -> tuple[datetime | None, int | None]:
     if not cursor:
         return None, None
-    parts = cursor.split(":", 1)
+    parts = cursor.rsplit(":", 1)
     if len(parts) != 2:
         return None, None
     try:
@@ -89,26 +101,64 @@ def _encode_cursor(event: FeedEvent) -> str:
     return f"{ts}:{event.id}"
 
 
+FEED_LIST_COMPACT_FIELDS = (
+    "id",
+    "kind",
+    "occurred_at",
+    "title",
+    "subheader",
+    "preview",
+    "accent",
+    "expires_at",
+)
+
+
+def _feed_event_item(
+    event: FeedEvent, compact: bool = False
+) -> FeedEventItemSchema:
+    return FeedEventItemSchema(
+        id=str(event.id),
+        kind=event.kind,
+        occurred_at=event.occurred_at,
+        title=event.title,
+        subheader=event.subheader,
+        preview=event.preview,
+        body=None if compact else event.body,
+        accent=event.accent,
+        payload=None if compact else event.payload,
+    )
+
+
 @router.get("/", response=FeedListResponse)
 def list_feed(
     request,
     cursor: str | None = None,
     limit: int = FEED_DEFAULT_PAGE_LIMIT,
     days: int = FEED_DEFAULT_HISTORY_DAYS,
+    compact: bool = False,
 ):
+    """
+    Newest-first feed events, keyset paginated on (occurred_at, id).
+    The first page is cached until the rollup writer publishes new events;
+    compact mode leaves out body and payload (see get_feed_event).
+    """
     days = max(1, min(days, FEED_MAX_HISTORY_DAYS))
     limit = max(1, min(limit, 100))
+    cursor_time, cursor_id = _parse_cursor(cursor)
+    first_page = not (cursor_time and cursor_id)
+    if first_page:
+        cached = get_cached_feed_page(days, limit, compact)
+        if cached is not None:
+            return cached
+
     now = timezone.now()
     window_start = now - timedelta(days=days)
 
-    qs = (
-        FeedEvent.objects.filter(occurred_at__gte=window_start)
-        .exclude(kind="militia_joins")
-        .filter(Q(expires_at__isnull=True) | Q(expires_at__gte=now))
-    )
+    qs = _visible_feed_events(now).filter(occurred_at__gte=window_start)
+    if compact:
+        qs = qs.only(*FEED_LIST_COMPACT_FIELDS)
 
-    cursor_time, cursor_id = _parse_cursor(cursor)
-    if cursor_time and cursor_id:
+    if not first_page:
         qs = qs.filter(
             Q(occurred_at__lt=cursor_time)
             | Q(occurred_at=cursor_time, id__lt=cursor_id)
@@ -119,22 +169,31 @@ def list_feed(
     if has_more:
         events = events[:limit]
 
-    items = [
-        FeedEventItemSchema(
-            id=str(event.id),
-            kind=event.kind,
-            occurred_at=event.occurred_at,
-            title=event.title,
-            subheader=event.subheader,
-            preview=event.preview,
-            body=event.body,
-            accent=event.accent,
-            payload=event.payload,
-        )
-        for event in events
-    ]
+    items = [_feed_event_item(event, compact) for event in events]
     next_cursor = _encode_cursor(events[-1]) if has_more and events else None
-    return FeedListResponse(items=items, next_cursor=next_cursor)
+    response = FeedListResponse(items=items, next_cursor=next_cursor)
+    if first_page:
+        expiries = [e.expires_at for e in events if e.expires_at is not None]
+        set_cached_feed_page(
+            days,
+            limit,
+            compact,
+            response.model_dump(),
+            now=now,
+            next_expiry=min(expiries, default=None),
+        )
+    return response
+
+
+@router.get(
+    "/events/{event_id}",
+    response={200: FeedEventItemSchema, 404: ErrorResponse},
+)
+def get_feed_event(request, event_id: int):
+    event = _visible_feed_events(timezone.now()).filter(id=event_id).first()
+    if event is None:
+        return 404, ErrorResponse(detail="Feed event not found.")
+    return 200, _feed_event_item(event)
 
 
 @router.get("/warzone", response=WarzoneBriefingResponse)
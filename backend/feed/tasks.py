@@ -36,7 +36,7 @@ def poll_zkill_r2z2() -> dict:
 
 @app.task(queue="celery")
 def detect_feed_clusters() -> int:
-    count = detect_clusters(since_hours=48)
+    count = detect_clusters(since_hours=48, incremental=True)
     logger.info("Detected/updated %s feed clusters", count)
     return count
 
@@ -10,6 +10,7 @@ from eveonline.client import EsiResponse
 from feed.constants import FACTION_CALDARI, FACTION_MINMATAR
 from feed.helpers.affiliations import (
     apply_killmail_affiliations,
+    apply_killmail_affiliations_batch,
     lookup_character_militia_factions,
     populate_unchecked_character_affiliations_batch,
     refresh_character_affiliation,
@@ -204,6 +205,58 @@ class FeedCharacterAffiliationTestCase(TestCase):
         self.assertIsNone(row.faction_id)
         self.assertEqual(row.esi_checked_at, checked_at)
 
+    def test_killmail_batch_matches_sequential_apply(self):
+        checked_at = timezone.now()
+        raws = [
+            {
+                "attackers": [
+                    {"character_id": 2001, "faction_id": FACTION_MINMATAR},
+                    {"character_id": 2002},
+                    {"character_id": 2003, "corporation_id": 98000001},
+                ],
+                "victim": {"character_id": 2004, "alliance_id": 99000001},
+            },
+            {
+                "attackers": [
+                    {"character_id": 2001, "corporation_id": 98000002},
+                    {"character_id": 2003, "corporation_id": 98000003},
+                ],
+                "victim": {
+                    "character_id": 2002,
+                    "faction_id": FACTION_CALDARI,
+                },
+            },
+        ]
+
+        def snapshot():
+            return sorted(
+                FeedCharacterAffiliation.objects.values_list(
+                    "character_id",
+                    "corporation_id",
+                    "alliance_id",
+                    "faction_id",
+                )
+            )
+
+        def seed():
+            FeedCharacterAffiliation.objects.all().delete()
+            FeedCharacterAffiliation.objects.create(
+                character_id=2003, esi_checked_at=checked_at
+            )
+            FeedCharacterAffiliation.objects.create(
+                character_id=2004, corporation_id=98000009
+            )
+
+        seed()
+        for raw in raws:
+            apply_killmail_affiliations(raw)
+        sequential = snapshot()
+
+        seed()
+        apply_killmail_affiliations_batch(raws)
+
+        self.assertEqual(sequential, snapshot())
+
     def test_lookup_uses_populated_affiliations(self):
         FeedCharacterAffiliation.objects.create(
             character_id=101,
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from datetime import timedelta
 
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.utils import timezone
 
@@ -9,12 +10,15 @@ from feed.management.commands.seed_feed_monitored_systems import (
     seed_from_fixture,
 )
 from feed.models import FeedEvent
+from feed.rollups.types import RollupResult
+from feed.rollups.writer import write_rollup_results
 
 
 class FeedApiTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         seed_from_fixture()
-        FeedEvent.objects.create(
+        self.event = FeedEvent.objects.create(
             kind=FeedEvent.Kind.KILLMAIL_BATCH,
             occurred_at=timezone.now(),
             title="10 killmails in 15 min",
@@ -56,6 +60,95 @@ class FeedApiTestCase(TestCase):
         self.assertIn("Old event", titles)
         old.delete()
 
+    def test_first_page_cached_until_writer_publishes(self):
+        with self.assertNumQueries(1):
+            first = Client().get("/api/feed/").json()
+        with self.assertNumQueries(0):
+            cached = Client().get("/api/feed/").json()
+        self.assertEqual(first, cached)
+
+        write_rollup_results(
+            [
+                RollupResult(
+                    kind=FeedEvent.Kind.FLEET_ACTIVE,
+                    occurred_at=timezone.now(),
+                    title="Minmatar fleet active",
+                    subheader="Auga",
+                    preview="",
+                    body="",
+                    accent=FeedEvent.Accent.MILITIA,
+                    payload={},
+                    rollup_code="fleet_active",
+                    rollup_version=1,
+                    cluster_key="fleet_active:test",
+                )
+            ]
+        )
+
+        titles = [
+            item["title"]
+            for item in Client().get("/api/feed/").json()["items"]
+        ]
+        self.assertEqual(
+            ["Minmatar fleet active", "10 killmails in 15 min"], titles
+        )
+
+    def test_compact_mode_and_detail(self):
+        data = Client().get("/api/feed/?compact=true").json()
+        item = data["items"][0]
+        self.assertIsNone(item["payload"])
+        self.assertIsNone(item["body"])
+
+        response = Client().get(f"/api/feed/events/{item['id']}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({"system_name": "Vard"}, response.json()["payload"])
+        missing = Client().get("/api/feed/events/999999")
+        self.assertEqual(404, missing.status_code)
+        self.assertEqual("Feed event not found.", missing.json()["detail"])
+
+    def test_detail_hides_events_the_feed_hides(self):
+        hidden = [
+            FeedEvent.objects.create(
+                kind="militia_joins",
+                occurred_at=timezone.now(),
+                title="Pilots joined",
+                cluster_key="test:cluster:joins",
+            ),
+            FeedEvent.objects.create(
+                kind=FeedEvent.Kind.FLEET_ACTIVE,
+                occurred_at=timezone.now(),
+                expires_at=timezone.now() - timedelta(minutes=1),
+                title="Fleet over",
+                cluster_key="test:cluster:expired",
+            ),
+        ]
+
+        for event in hidden:
+            response = Client().get(f"/api/feed/events/{event.id}")
+            self.assertEqual(404, response.status_code)
+
+    def test_cursor_continues_after_first_page(self):
+        older = FeedEvent.objects.create(
+            kind=FeedEvent.Kind.KILLMAIL_BATCH,
+            occurred_at=timezone.now() - timedelta(hours=1),
+            title="Earlier",
+            rollup_code="kill_burst",
+            cluster_key="test:cluster:earlier",
+            payload={},
+        )
+        first = Client().get("/api/feed/?limit=1").json()
+        self.assertEqual(
+            [str(self.event.id)], [i["id"] for i in first["items"]]
+        )
+
+        second = (
+            Client()
+            .get(f"/api/feed/?limit=1&cursor={first['next_cursor']}")
+            .json()
+        )
+        self.assertEqual([str(older.id)], [i["id"] for i in second["items"]])
+        self.assertIsNone(second["next_cursor"])
+
     def test_warzone_briefing_endpoint(self):
         response = Client().get("/api/feed/warzone")
         self.assertEqual(response.status_code, 200)
@@ -16,7 +16,7 @@ from eveuniverse.models import (
     EveType,
 )
 
-from feed.constants import AMAMAKE_SOLAR_SYSTEM_ID
+from feed.constants import AMAMAKE_SOLAR_SYSTEM_ID, METERS_PER_LIGHT_YEAR
 from feed.helpers.capital_pings import (
     CAPITAL_ALERT_TITLE,
     ZKILL_CHARACTER_URL,
@@ -29,7 +29,12 @@ from feed.helpers.capital_ships import (
     is_capital_ship_type,
     killmail_involves_capital,
 )
-from feed.helpers.system_distance import light_years_between_systems
+from feed.helpers.system_distance import (
+    get_system_coordinate_index,
+    light_year_distance_matrix,
+    light_years_between_systems,
+    systems_within_light_years,
+)
 from feed.models import FeedCapitalAlert, FeedCapitalPing
 from feed.tests.helpers import make_killmail_payload
 
@@ -195,6 +200,59 @@ class SystemDistanceTestCase(TestCase):
         )
         self.assertAlmostEqual(distance, 0.8, places=1)
 
+    def test_range_query_and_matrix_use_index(self):
+        for solar_system_id, name, x_ly in (
+            (AMAMAKE_SOLAR_SYSTEM_ID, "Amamake", 0.0),
+            (30002538, "Vard", 3.0),
+            (30002539, "Far", 9.0),
+        ):
+            make_test_solar_system(
+                solar_system_id=solar_system_id,
+                name=name,
+                position_x=x_ly * METERS_PER_LIGHT_YEAR,
+                position_y=0.0,
+                position_z=0.0,
+            )
+        get_system_coordinate_index()
+
+        with self.assertNumQueries(0):
+            in_range = systems_within_light_years(AMAMAKE_SOLAR_SYSTEM_ID, 8.0)
+            matrix = light_year_distance_matrix(
+                [AMAMAKE_SOLAR_SYSTEM_ID, 30002538, 30002539]
+            )
+
+        self.assertEqual({AMAMAKE_SOLAR_SYSTEM_ID, 30002538}, set(in_range))
+        self.assertAlmostEqual(3.0, in_range[30002538])
+        self.assertAlmostEqual(6.0, matrix[1][2])
+        self.assertAlmostEqual(6.0, matrix[2][1])
+        self.assertEqual(0.0, matrix[0][0])
+
+    def test_moved_system_invalidates_index(self):
+        amamake = make_test_solar_system(
+            solar_system_id=AMAMAKE_SOLAR_SYSTEM_ID,
+            name="Amamake",
+            position_x=0.0,
+            position_y=0.0,
+            position_z=0.0,
+        )
+        make_test_solar_system(
+            solar_system_id=30002538,
+            name="Vard",
+            position_x=2 * METERS_PER_LIGHT_YEAR,
+            position_y=0.0,
+            position_z=0.0,
+        )
+        self.assertAlmostEqual(
+            2.0, light_years_between_systems(AMAMAKE_SOLAR_SYSTEM_ID, 30002538)
+        )
+
+        amamake.position_x = -METERS_PER_LIGHT_YEAR
+        amamake.save()
+
+        self.assertAlmostEqual(
+            3.0, light_years_between_systems(AMAMAKE_SOLAR_SYSTEM_ID, 30002538)
+        )
+
 
 class CapitalPingTestCase(TestCase):
     @classmethod
@@ -10,7 +10,7 @@ from feed.helpers.ingest import upsert_feed_killmail_from_r2z2
 from feed.management.commands.seed_feed_monitored_systems import (
     seed_from_fixture,
 )
-from feed.models import FeedCluster, FeedKillmail
+from feed.models import FeedCluster, FeedClusterCursor, FeedKillmail
 from feed.rollups.registry import build_context, run_rollup
 from feed.tests.helpers import make_killmail_payload
 
@@ -116,3 +116,106 @@ class ClusterRollupTestCase(TestCase):
         cluster = fleet_clusters.get()
         self.assertGreaterEqual(cluster.kill_count, 5)
         self.assertGreaterEqual(cluster.pilot_count, 8)
+
+
+class IncrementalClusterDetectionTestCase(TestCase):
+    def setUp(self):
+        seed_from_fixture()
+        self.base = timezone.now() - timedelta(minutes=30)
+
+    def _ingest(self, first_id, count, *, solar_system_id=30002538):
+        for i in range(count):
+            upsert_feed_killmail_from_r2z2(
+                make_killmail_payload(
+                    first_id + i,
+                    solar_system_id=solar_system_id,
+                    killmail_time=self.base + timedelta(seconds=i * 30),
+                )
+            )
+
+    def _age_ingested_kills(self):
+        FeedKillmail.objects.update(
+            created_at=timezone.now() - timedelta(hours=1)
+        )
+        FeedClusterCursor.objects.update(
+            last_killmail_created_at=timezone.now() - timedelta(seconds=1)
+        )
+
+    def test_second_run_without_new_kills_does_nothing(self):
+        self._ingest(600000, 10)
+        self.assertGreater(detect_clusters(incremental=True), 0)
+        self._age_ingested_kills()
+
+        self.assertEqual(0, detect_clusters(incremental=True))
+
+    def test_only_systems_with_new_kills_are_rescanned(self):
+        self._ingest(600000, 10)
+        detect_clusters(incremental=True)
+        FeedCluster.objects.filter(solar_system_id=30002538).update(
+            kill_count=0
+        )
+
+        self._age_ingested_kills()
+        self._ingest(610000, 10, solar_system_id=30003067)
+        detect_clusters(incremental=True)
+
+        self.assertFalse(
+            FeedCluster.objects.filter(
+                solar_system_id=30002538, kill_count__gt=0
+            ).exists()
+        )
+        self.assertTrue(
+            FeedCluster.objects.filter(
+                solar_system_id=30003067,
+                cluster_type=FeedCluster.ClusterType.KILL_BURST,
+                kill_count=10,
+            ).exists()
+        )
+
+    def test_incremental_matches_full_rescan(self):
+        self._ingest(600000, 6)
+        detect_clusters(incremental=True)
+        self._ingest(600006, 6)
+        detect_clusters(incremental=True)
+        incremental = sorted(
+            FeedCluster.objects.values_list("cluster_key", "kill_count")
+        )
+
+        FeedCluster.objects.all().delete()
+        detect_clusters()
+
+        self.assertEqual(
+            incremental,
+            sorted(
+                FeedCluster.objects.values_list("cluster_key", "kill_count")
+            ),
+        )
+
+    def test_burst_across_scan_boundary_matches_full_rescan(self):
+        # One kill a minute for 50 minutes: the second run's new kills
+        # continue a burst that started in the first run.
+        self.base = timezone.now() - timedelta(minutes=60)
+        for i in range(50):
+            if i == 30:
+                detect_clusters(incremental=True)
+                self._age_ingested_kills()
+            upsert_feed_killmail_from_r2z2(
+                make_killmail_payload(
+                    620000 + i,
+                    killmail_time=self.base + timedelta(minutes=i),
+                )
+            )
+        detect_clusters(incremental=True)
+        incremental = sorted(
+            FeedCluster.objects.values_list("cluster_key", "killmail_ids")
+        )
+
+        FeedCluster.objects.all().delete()
+        detect_clusters()
+
+        self.assertEqual(
+            incremental,
+            sorted(
+                FeedCluster.objects.values_list("cluster_key", "killmail_ids")
+            ),
+        )
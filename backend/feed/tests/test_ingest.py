@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+from unittest.mock import patch
+
+from django.db import connection
 from django.test import TestCase
 
-from feed.helpers.ingest import upsert_feed_killmail_from_r2z2
+from feed.helpers.ingest import (
+    upsert_feed_killmail_from_r2z2,
+    upsert_feed_killmails_from_r2z2,
+)
 from feed.helpers.killmail_classify import is_npc_kill
 from feed.management.commands.seed_feed_monitored_systems import (
     seed_from_fixture,
@@ -53,6 +59,28 @@ class IngestTestCase(TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(FeedKillmail.objects.count(), 1)
 
+    def test_batch_upsert_updates_existing_killmail(self):
+        upsert_feed_killmail_from_r2z2(make_killmail_payload(136398967))
+        payload = make_killmail_payload(136398967)
+        payload["sequence_id"] = 42
+        kept = upsert_feed_killmails_from_r2z2(
+            [payload, jita_killmail_payload()]
+        )
+        self.assertEqual(kept, [True, False])
+        self.assertEqual(FeedKillmail.objects.count(), 1)
+        self.assertEqual(FeedKillmail.objects.get().zkill_sequence_id, 42)
+
+    def test_batch_upsert_omits_unique_fields_without_conflict_target(self):
+        # MySQL (ON DUPLICATE KEY UPDATE) rejects unique_fields
+        with patch.object(
+            connection.features,
+            "supports_update_conflicts_with_target",
+            False,
+        ), patch.object(FeedKillmail.objects, "bulk_create") as bulk_create:
+            upsert_feed_killmails_from_r2z2([make_killmail_payload(136398967)])
+        self.assertIsNone(bulk_create.call_args.kwargs["unique_fields"])
+        self.assertTrue(bulk_create.call_args.kwargs["update_conflicts"])
+
     def test_is_npc_kill(self):
         self.assertTrue(is_npc_kill({"npc": True}))
         self.assertFalse(is_npc_kill({"npc": False}))
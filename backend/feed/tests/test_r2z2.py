@@ -1,6 +1,10 @@
 from __future__ import annotations
 
+import json
+import threading
+import time
 from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import patch
 
 from django.db import OperationalError
@@ -194,3 +198,95 @@ class R2z2PollTestCase(TestCase):
         remaining = (cursor.paused_until - timezone.now()).total_seconds()
         self.assertLess(remaining, 120)
         self.assertGreater(remaining, 0)
+
+
+class FakeR2z2Handler(BaseHTTPRequestHandler):
+    """Serves R2Z2 sequence files up to tip, 404 after"""
+
+    tip = 0
+    latency_seconds = 0.05
+    in_flight = 0
+    max_in_flight = 0
+    lock = threading.Lock()
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        cls = FakeR2z2Handler
+        with cls.lock:
+            cls.in_flight += 1
+            cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        time.sleep(cls.latency_seconds)
+        with cls.lock:
+            cls.in_flight -= 1
+
+        name = self.path.rsplit("/", 1)[-1].removesuffix(".json")
+        if name == "sequence":
+            body = {"sequence": cls.tip}
+        elif int(name) <= cls.tip:
+            body = make_killmail_payload(
+                900000 + int(name),
+                killmail_time=timezone.now() - timedelta(minutes=1),
+            )
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class R2z2PipelineStubServerTestCase(TestCase):
+    """Pipelined polling against a local R2Z2 stub"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeR2z2Handler)
+        cls.thread = threading.Thread(
+            target=cls.server.serve_forever, daemon=True
+        )
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        seed_from_fixture()
+        FakeR2z2Handler.max_in_flight = 0
+
+    @patch("feed.helpers.r2z2.maybe_notify_capital_kill")
+    def test_catch_up_backlog_with_pipelined_fetches(self, mock_ping):
+        mock_ping.return_value = False
+        FakeR2z2Handler.tip = 1060
+        FeedR2z2Cursor.objects.create(
+            pk=1,
+            live_sequence_id=1000,
+            catchup_sequence_id=1000,
+            last_sequence_id=1000,
+        )
+
+        with patch("feed.helpers.r2z2.R2Z2_BASE", self.base), patch(
+            "feed.helpers.r2z2.R2Z2_SEQUENCE_URL",
+            f"{self.base}/sequence.json",
+        ), patch("feed.helpers.r2z2.R2Z2_SUCCESS_SLEEP_MS", 5):
+            stats = poll_r2z2_batch(max_seconds=20)
+
+        self.assertEqual("ok", stats["outcome"])
+        # Live runs to the tip, then catch-up re-reads the gap behind it
+        self.assertEqual(60, stats["live_processed"])
+        self.assertEqual(60, stats["catchup_processed"])
+        self.assertEqual(120, stats["inserted"])
+        self.assertEqual(0, stats["live_gap"])
+        self.assertEqual(60, FeedKillmail.objects.count())
+        self.assertEqual(1060, FeedR2z2Cursor.get_singleton().live_sequence_id)
+        self.assertGreater(FakeR2z2Handler.max_in_flight, 1)
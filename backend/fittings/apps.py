@@ -8,5 +8,12 @@ class FittingsConfig(AppConfig):
     def ready(self):
         # pylint: disable=import-outside-toplevel
         from fittings.admin import apply_fittings_admin_customizations
+        from fittings.helpers.variant_families import (
+            invalidate_variant_families,
+            variant_type_watch,
+        )
 
         apply_fittings_admin_customizations()
+
+        # Only published/name/group changes alter variant families
+        variant_type_watch.connect(invalidate_variant_families)
@@ -17,6 +17,7 @@ from fittings.helpers.permissions import (
     can_propose_fitting_change,
     effective_protection_tier,
 )
+from market.helpers.fitting_signatures import invalidate_fitting_signature
 
 
 def fitting_change_request_tier(fitting: EveFitting) -> str:
@@ -236,6 +237,8 @@ def approve_fitting_change_request(
             "review_note",
         ]
     )
+    # Contract matching recompiles the fitting's item signature
+    transaction.on_commit(lambda: invalidate_fitting_signature(fitting.pk))
 
 
 @transaction.atomic
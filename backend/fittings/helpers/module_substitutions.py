@@ -5,7 +5,7 @@ from __future__ import annotations
 import re
 from collections.abc import Iterable
 
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 from eveuniverse.models import EveType
 
 from market.models.item import parse_eft_items
@@ -144,43 +144,21 @@ def types_are_variants(preferred: EveType, candidate: EveType) -> bool:
     return bool(preferred_words & candidate_words)
 
 
+def _variant_families():
+    # Import here to avoid a circular import (the index uses the word
+    # helpers above)
+    from fittings.helpers.variant_families import (  # pylint: disable=import-outside-toplevel
+        get_variant_families,
+    )
+
+    return get_variant_families()
+
+
 def variant_types_for(eve_type: EveType) -> QuerySet[EveType]:
     """Published types in the same group that look like variants of eve_type."""
     if not eve_type or not eve_type.eve_group_id:
         return EveType.objects.none()
-    candidates = EveType.objects.filter(
-        eve_group_id=eve_type.eve_group_id,
-        published=True,
-    ).exclude(pk=eve_type.pk)
-    size = size_token(eve_type.name)
-    if size:
-        # \b5MN\b must not match 50MN; allow optional space between digits and MN/GJ.
-        if size.endswith("MN"):
-            digits = size[:-2]
-            pattern = rf"(?i)\b{re.escape(digits)}\s*MN\b"
-        elif size.endswith("GJ"):
-            digits = size[:-2]
-            pattern = rf"(?i)\b{re.escape(digits)}\s*GJ\b"
-        else:
-            pattern = rf"(?i)\b{re.escape(size)}\b"
-        candidates = candidates.filter(name__regex=pattern)
-
-    preferred_words = family_words(eve_type.name)
-    distinctive = preferred_words - _GENERIC_WORDS
-    match_words = distinctive or preferred_words
-    if not match_words:
-        return EveType.objects.none()
-
-    name_q = Q()
-    for word in match_words:
-        name_q |= Q(name__icontains=word)
-    candidates = candidates.filter(name_q)
-
-    matching_ids = [
-        row.pk
-        for row in candidates.only("id", "name", "eve_group_id")
-        if types_are_variants(eve_type, row)
-    ]
+    matching_ids = _variant_families().variant_ids(eve_type)
     if not matching_ids:
         return EveType.objects.none()
     return EveType.objects.filter(pk__in=matching_ids).order_by("name")
@@ -193,9 +171,10 @@ def variant_types_for_fitting_items(
     fit_list = list(fit_types)
     if not fit_list:
         return EveType.objects.none()
+    families = _variant_families()
     ids: set[int] = set()
     for eve_type in fit_list:
-        ids.update(variant_types_for(eve_type).values_list("pk", flat=True))
+        ids.update(families.variant_ids(eve_type))
     if not ids:
         return EveType.objects.none()
     return EveType.objects.filter(pk__in=ids).order_by("name")
@@ -0,0 +1,131 @@
+"""
+Process-wide index of module variant families.
+
+Published EveTypes are read once and bucketed by (group, size token); within
+a bucket, types are posted under their family words. Two types are variants
+exactly when ``types_are_variants`` says so: same group and size, sharing a
+distinctive family word (or, when neither has one, any family word). Every
+published type's variants are precomputed, so a lookup is one dictionary
+read instead of a filtered EveType query per module.
+
+Like the industry recipe graph, the index is rebuilt when EveType rows
+change: deletes, and saves that change a column the index reads
+(VARIANT_FAMILIES_TYPE_FIELDS), call invalidate_variant_families() (see
+FittingsConfig), which drops this process's copy and bumps a version in the
+shared cache so other workers rebuild on their next version check.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from eveuniverse.models import EveType
+
+from eveonline.helpers.shared_index import EveTypeFieldsWatch, SharedIndex
+
+from fittings.helpers.module_substitutions import (
+    _GENERIC_WORDS,
+    family_words,
+    size_token,
+)
+
+VARIANT_FAMILIES_VERSION_KEY = "fittings:variant_families:version"
+# How long a process trusts its index before re-reading the shared version
+VARIANT_FAMILIES_VERSION_CHECK_SECONDS = 5
+# EveType columns the index reads; saves touching none of them keep it valid
+VARIANT_FAMILIES_TYPE_FIELDS = ("published", "name", "eve_group_id")
+VARIANT_FAMILIES_TYPE_UPDATE_FIELDS = frozenset(
+    {"published", "name", "eve_group", "eve_group_id"}
+)
+
+_Bucket = Tuple[int, Optional[str]]
+
+
+class VariantFamilyIndex:
+    """Variant type ids for every published, grouped EveType."""
+
+    def __init__(self, rows: Iterable[Tuple[int, str, int]], version=None):
+        self.version = version
+        self.checked_at = time.monotonic()
+        # (group, size) -> word -> type ids, for types with distinctive
+        # words and for types with only generic words
+        self._distinctive: Dict[_Bucket, Dict[str, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self._generic: Dict[_Bucket, Dict[str, Set[int]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        keys = {}
+        for type_id, name, group_id in rows:
+            key = self.family_key(name, group_id)
+            keys[type_id] = key
+            bucket, words, distinctive = key
+            postings = self._distinctive if distinctive else self._generic
+            for word in distinctive or words:
+                postings[bucket][word].add(type_id)
+        self._variants: Dict[int, FrozenSet[int]] = {
+            type_id: self._lookup(type_id, key)
+            for type_id, key in keys.items()
+        }
+
+    @classmethod
+    def load(cls, version=None) -> "VariantFamilyIndex":
+        return cls(
+            EveType.objects.filter(
+                published=True, eve_group_id__isnull=False
+            ).values_list("id", "name", "eve_group_id"),
+            version=version,
+        )
+
+    @staticmethod
+    def family_key(name: str, group_id: int):
+        words = family_words(name)
+        return (group_id, size_token(name)), words, words - _GENERIC_WORDS
+
+    def _lookup(self, type_id: int, key) -> FrozenSet[int]:
+        bucket, words, distinctive = key
+        if not words:
+            return frozenset()
+        postings = self._distinctive if distinctive else self._generic
+        found = set()
+        for word in distinctive or words:
+            found |= postings.get(bucket, {}).get(word, set())
+        found.discard(type_id)
+        return frozenset(found)
+
+    def variant_ids(self, eve_type: EveType) -> FrozenSet[int]:
+        """Published variants of eve_type (which need not be published)."""
+        if not eve_type or not eve_type.eve_group_id:
+            return frozenset()
+        variants = self._variants.get(eve_type.pk)
+        if variants is not None:
+            return variants
+        return self._lookup(
+            eve_type.pk,
+            self.family_key(eve_type.name, eve_type.eve_group_id),
+        )
+
+
+_variant_families: SharedIndex[VariantFamilyIndex] = SharedIndex(
+    VARIANT_FAMILIES_VERSION_KEY,
+    VariantFamilyIndex.load,
+    VARIANT_FAMILIES_VERSION_CHECK_SECONDS,
+)
+# Connected to the EveType signals in FittingsConfig
+variant_type_watch = EveTypeFieldsWatch(
+    "variant_families",
+    VARIANT_FAMILIES_TYPE_FIELDS,
+    VARIANT_FAMILIES_TYPE_UPDATE_FIELDS,
+)
+
+
+def get_variant_families() -> VariantFamilyIndex:
+    """The shared variant index, (re)built when missing or out of date."""
+    return _variant_families.get()
+
+
+def invalidate_variant_families() -> None:
+    """Drop the local index and tell other processes to rebuild theirs."""
+    _variant_families.invalidate()
@@ -9,6 +9,11 @@ from fittings.helpers.module_substitutions import (
     fitting_item_types,
     types_are_variants,
     variant_types_for,
+    variant_types_for_fitting_items,
+)
+from fittings.helpers.variant_families import (
+    get_variant_families,
+    invalidate_variant_families,
 )
 from fittings.models import EveFitting
 
@@ -84,6 +89,57 @@ class ModuleSubstitutionHelpersTestCase(TestCase):
         self.assertNotIn("50MN Microwarpdrive II", variant_names)
         self.assertNotIn("5MN Afterburner II", variant_names)
 
+    def test_variant_index_matches_pairwise_check(self):
+        _make_type(12052, "50MN Microwarpdrive I", self.propulsion)
+        _make_type(
+            35658, "5MN Quad LiF Restrained Microwarpdrive", self.propulsion
+        )
+        _make_type(439, "1MN Afterburner II", self.propulsion)
+        types = list(EveType.objects.filter(eve_group=self.propulsion))
+        families = get_variant_families()
+        for eve_type in types:
+            expected = {
+                other.pk
+                for other in types
+                if types_are_variants(eve_type, other)
+            }
+            self.assertEqual(expected, families.variant_ids(eve_type))
+
+    def test_fitting_variants_are_one_index_read(self):
+        get_variant_families()
+        fit_types = [self.mwd_t2, self.mwd_50, self.ab_t2]
+        with self.assertNumQueries(1):
+            names = list(
+                variant_types_for_fitting_items(fit_types).values_list(
+                    "name", flat=True
+                )
+            )
+        self.assertEqual(["5MN Y-T8 Compact Microwarpdrive"], names)
+
+    def test_variant_index_rebuilds_when_types_change(self):
+        get_variant_families()
+        _make_type(
+            6001, "5MN Quad LiF Restrained Microwarpdrive", self.propulsion
+        )
+        self.assertIn(6001, get_variant_families().variant_ids(self.mwd_t2))
+        EveType.objects.filter(pk=6001).update(published=False)
+        invalidate_variant_families()
+        self.assertNotIn(6001, get_variant_families().variant_ids(self.mwd_t2))
+
+    def test_only_variant_type_changes_invalidate_index(self):
+        families = get_variant_families()
+
+        self.mwd_meta.description = "Refreshed from ESI"
+        self.mwd_meta.save()
+        self.assertIs(families, get_variant_families())
+
+        self.mwd_meta.published = False
+        self.mwd_meta.save(update_fields=["published"])
+        self.assertIsNot(families, get_variant_families())
+        self.assertNotIn(
+            self.mwd_meta.pk, get_variant_families().variant_ids(self.mwd_t2)
+        )
+
 
 class ModuleSubstitutionAutocompleteViewTestCase(TestCase):
     """Admin autocomplete AJAX is scoped to the fitting / preferred module."""
@@ -6,6 +6,12 @@ from fleets.endpoints.metrics.get_fleet_commander_metrics import (
     get_fleet_commander_metrics,
     METHOD as get_fleet_commander_metrics_method,
 )
+from fleets.endpoints.metrics.get_fleet_poll_metrics import (
+    PATH as get_fleet_poll_metrics_path,
+    ROUTE_SPEC as get_fleet_poll_metrics_spec,
+    get_fleet_poll_metrics,
+    METHOD as get_fleet_poll_metrics_method,
+)
 from fleets.endpoints.metrics.get_fleet_metrics import (
     PATH as get_fleet_metrics_path,
     ROUTE_SPEC as get_fleet_metrics_spec,
@@ -14,6 +20,12 @@ from fleets.endpoints.metrics.get_fleet_metrics import (
 )
 
 _ROUTES = (
+    (
+        get_fleet_poll_metrics_method,
+        get_fleet_poll_metrics_path,
+        get_fleet_poll_metrics_spec,
+        get_fleet_poll_metrics,
+    ),
     (
         get_fleet_metrics_method,
         get_fleet_metrics_path,
@@ -0,0 +1,31 @@
+"""GET /metrics/polling — ESI poll lag for each active fleet instance."""
+
+from typing import List
+
+from authentication import AuthBearer
+
+from fleets.endpoints.schemas import EveFleetPollMetric
+from fleets.helpers.fleet_polling import fleet_poll_metrics
+from fleets.models import EveFleetInstance
+
+PATH = "/metrics/polling"
+METHOD = "get"
+ROUTE_SPEC = {
+    "auth": AuthBearer(),
+    "response": {200: List[EveFleetPollMetric]},
+    "summary": "Poll lag and duration for active fleet instances",
+}
+
+
+def get_fleet_poll_metrics(request):
+    fleet_ids = dict(
+        EveFleetInstance.objects.filter(end_time=None).values_list(
+            "id", "eve_fleet_id"
+        )
+    )
+    return 200, [
+        EveFleetPollMetric(
+            fleet_id=fleet_ids[state["fleet_instance_id"]], **state
+        )
+        for state in fleet_poll_metrics(fleet_ids)
+    ]
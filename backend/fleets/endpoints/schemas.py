@@ -108,6 +108,16 @@ class EveFleetMetric(BaseModel):
     audience_name: str
 
 
+class EveFleetPollMetric(BaseModel):
+    fleet_id: int
+    fleet_instance_id: int
+    polled_at: datetime
+    next_poll_at: datetime
+    queue_lag_seconds: Optional[float] = None
+    expiry_lag_seconds: Optional[float] = None
+    duration_seconds: float
+
+
 class EveFleetCommanderMetric(BaseModel):
     user_id: int
     primary_character_id: Optional[int] = None
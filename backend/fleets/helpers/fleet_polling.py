@@ -0,0 +1,101 @@
+"""Per-fleet poll scheduling state and lag metrics, kept in the cache."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from django.core.cache import cache
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+FLEET_POLL_STATE_KEY = "fleets:poll:{}"
+# Keep state well past any ESI cache window so a stopped poller is visible.
+FLEET_POLL_STATE_SECONDS = 60 * 60
+
+# Celery Once lock per fleet; longer than the slowest expected poll so two
+# workers never sync the same fleet at once.
+FLEET_POLL_LOCK_SECONDS = 120
+
+# Used when ESI sends no Expires header (e.g. mocked or failed calls).
+DEFAULT_FLEET_POLL_INTERVAL = timedelta(seconds=5)
+
+
+def get_fleet_poll_state(fleet_instance_id: int) -> dict | None:
+    return cache.get(FLEET_POLL_STATE_KEY.format(fleet_instance_id))
+
+
+def fleet_poll_due(
+    fleet_instance_id: int, now: datetime | None = None
+) -> bool:
+    """False while the fleet's last member response is still ESI-cached."""
+    state = get_fleet_poll_state(fleet_instance_id)
+    if not state or not state.get("next_poll_at"):
+        return True
+    return (now or timezone.now()) >= state["next_poll_at"]
+
+
+def record_fleet_poll(
+    fleet_instance_id: int,
+    *,
+    queued_at: datetime | None,
+    started_at: datetime,
+    finished_at: datetime,
+    members_expires_at: datetime | None,
+) -> dict:
+    """
+    Store when the fleet may be polled next plus lag metrics for this run.
+
+    - ``queue_lag_seconds``: fan-out to worker pickup.
+    - ``expiry_lag_seconds``: how long after the previous ESI cache window
+      ended this poll started (how stale the fleet view was allowed to get).
+    - ``duration_seconds``: ESI calls plus member sync.
+    """
+    previous = get_fleet_poll_state(fleet_instance_id) or {}
+    previous_expiry = previous.get("next_poll_at")
+    next_poll_at = members_expires_at or (
+        finished_at + DEFAULT_FLEET_POLL_INTERVAL
+    )
+    state = {
+        "fleet_instance_id": fleet_instance_id,
+        "polled_at": finished_at,
+        "next_poll_at": next_poll_at,
+        "queue_lag_seconds": (
+            max(0.0, (started_at - queued_at).total_seconds())
+            if queued_at
+            else None
+        ),
+        "expiry_lag_seconds": (
+            max(0.0, (started_at - previous_expiry).total_seconds())
+            if previous_expiry
+            else None
+        ),
+        "duration_seconds": (finished_at - started_at).total_seconds(),
+    }
+    cache.set(
+        FLEET_POLL_STATE_KEY.format(fleet_instance_id),
+        state,
+        FLEET_POLL_STATE_SECONDS,
+    )
+    logger.info(
+        "Fleet %s polled: queue_lag=%s expiry_lag=%s duration=%.2fs",
+        fleet_instance_id,
+        state["queue_lag_seconds"],
+        state["expiry_lag_seconds"],
+        state["duration_seconds"],
+    )
+    return state
+
+
+def fleet_poll_metrics(fleet_instance_ids: Iterable[int]) -> list[dict]:
+    """Latest poll state for each fleet instance that has been polled."""
+    keys = {
+        FLEET_POLL_STATE_KEY.format(fleet_instance_id): fleet_instance_id
+        for fleet_instance_id in fleet_instance_ids
+    }
+    if not keys:
+        return []
+    states = cache.get_many(keys)
+    return [states[key] for key in keys if key in states]
@@ -0,0 +1,331 @@
+"""Bulk reconcile of a fleet instance's members against one ESI poll."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterable
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from fleets.helpers.member_ships import planned_ship_snapshots
+
+if TYPE_CHECKING:
+    from fleets.models import EveFleetInstance
+
+logger = logging.getLogger(__name__)
+
+# Ship type and solar system names never change; character names are always
+# re-resolved since they can (rarely) be changed by CCP.
+UNIVERSE_NAME_CACHE_KEY = "fleets:universe_name:{}"
+UNIVERSE_NAME_CACHE_SECONDS = 7 * 24 * 60 * 60
+
+MEMBER_SYNC_BATCH_SIZE = 500
+
+# Member columns refreshed from ESI on every poll.
+ESI_MEMBER_FIELDS = (
+    "join_time",
+    "role",
+    "role_name",
+    "ship_type_id",
+    "ship_name",
+    "solar_system_id",
+    "solar_system_name",
+    "squad_id",
+    "station_id",
+    "takes_fleet_warp",
+    "wing_id",
+    "character_name",
+)
+
+
+@dataclass
+class FleetMemberSyncResult:
+    joined: int = 0
+    updated: int = 0
+    departed: int = 0
+    snapshots: int = 0
+
+
+def _fleet_models():
+    # Defer import to avoid circular import (fleets.models imports this module).
+    from fleets.models import (  # pylint: disable=import-outside-toplevel
+        EveFleetInstanceMember,
+        EveFleetInstanceMemberShipSnapshot,
+    )
+
+    return EveFleetInstanceMember, EveFleetInstanceMemberShipSnapshot
+
+
+def cached_universe_names(ids: Iterable[int]) -> dict[int, str]:
+    """Names for static universe ids (ship types, systems) already cached."""
+    keys = {UNIVERSE_NAME_CACHE_KEY.format(id_): id_ for id_ in ids}
+    if not keys:
+        return {}
+    return {keys[key]: name for key, name in cache.get_many(keys).items()}
+
+
+def cache_universe_names(names: dict[int, str]) -> None:
+    if not names:
+        return
+    cache.set_many(
+        {
+            UNIVERSE_NAME_CACHE_KEY.format(id_): name
+            for id_, name in names.items()
+        },
+        UNIVERSE_NAME_CACHE_SECONDS,
+    )
+
+
+def fleet_member_static_ids(esi_fleet_members: list[dict]) -> set[int]:
+    """Ship type and solar system ids referenced by an ESI member list."""
+    ids = set()
+    for esi_fleet_member in esi_fleet_members:
+        ids.add(esi_fleet_member["ship_type_id"])
+        ids.add(esi_fleet_member["solar_system_id"])
+    return ids
+
+
+def _esi_datetime(value):
+    """ESI date-time as an aware datetime (the client may pass strings)."""
+    if isinstance(value, str):
+        value = parse_datetime(value)
+    if value is not None and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def _esi_member_fields(
+    esi_fleet_member: dict, resolved_ids: dict[int, str]
+) -> dict:
+    ship_type_id = esi_fleet_member["ship_type_id"]
+    solar_system_id = esi_fleet_member["solar_system_id"]
+    return {
+        "join_time": _esi_datetime(esi_fleet_member["join_time"]),
+        "role": esi_fleet_member["role"],
+        "role_name": esi_fleet_member["role_name"],
+        "ship_type_id": ship_type_id,
+        "ship_name": resolved_ids[ship_type_id],
+        "solar_system_id": solar_system_id,
+        "solar_system_name": resolved_ids[solar_system_id],
+        "squad_id": esi_fleet_member["squad_id"],
+        "station_id": esi_fleet_member["station_id"],
+        "takes_fleet_warp": esi_fleet_member["takes_fleet_warp"],
+        "wing_id": esi_fleet_member["wing_id"],
+        "character_name": resolved_ids[esi_fleet_member["character_id"]],
+    }
+
+
+def _ship(fields: dict) -> tuple[int, str, int, str]:
+    return (
+        fields["ship_type_id"],
+        fields["ship_name"],
+        fields["solar_system_id"],
+        fields["solar_system_name"],
+    )
+
+
+def _member_ship(member) -> tuple[int, str, int, str]:
+    return (
+        member.ship_type_id,
+        member.ship_name,
+        member.solar_system_id,
+        member.solar_system_name,
+    )
+
+
+def _last_snapshot_ship_types(fleet_instance) -> dict[int, int]:
+    """member_id -> ship_type_id of that member's most recent snapshot."""
+    _, ship_snapshot_model = _fleet_models()
+    latest: dict[int, int] = {}
+    rows = (
+        ship_snapshot_model.objects.filter(
+            member__eve_fleet_instance=fleet_instance
+        )
+        .order_by("member_id", "-created_at", "-id")
+        .values_list("member_id", "ship_type_id")
+    )
+    for member_id, ship_type_id in rows:
+        latest.setdefault(member_id, ship_type_id)
+    return latest
+
+
+@dataclass
+class _MemberDiff:
+    joined: list = field(default_factory=list)
+    updated: list = field(default_factory=list)
+    departed: list = field(default_factory=list)
+    # (character_id, ship) pairs; new members have no pk until inserted
+    snapshots: list = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(
+            self.joined or self.updated or self.departed or self.snapshots
+        )
+
+
+def _update_member(member, fields: dict, now) -> bool:
+    """Apply ESI fields to an existing member; returns whether it changed."""
+    changed = member.left_at is not None
+    member.left_at = None
+    for name, value in fields.items():
+        if getattr(member, name) != value:
+            setattr(member, name, value)
+            changed = True
+    if changed:
+        member.updated_at = now
+    return changed
+
+
+def _diff_members(
+    fleet_instance: EveFleetInstance,
+    existing: dict,
+    esi_fleet_members: list[dict],
+    resolved_ids: dict[int, str],
+    now,
+) -> _MemberDiff:
+    member_model, _ = _fleet_models()
+    last_ship_types = _last_snapshot_ship_types(fleet_instance)
+    diff = _MemberDiff()
+    seen = set()
+    for esi_fleet_member in esi_fleet_members:
+        character_id = esi_fleet_member["character_id"]
+        if character_id in seen:
+            continue
+        seen.add(character_id)
+        fields = _esi_member_fields(esi_fleet_member, resolved_ids)
+        member = existing.get(character_id)
+
+        if member is None:
+            diff.joined.append(
+                member_model(
+                    eve_fleet_instance=fleet_instance,
+                    character_id=character_id,
+                    **fields,
+                )
+            )
+            diff.snapshots.append((character_id, _ship(fields)))
+            continue
+
+        for ship in planned_ship_snapshots(
+            last_ship_types.get(member.id),
+            previous_ship=_member_ship(member),
+            new_ship=_ship(fields),
+        ):
+            diff.snapshots.append((character_id, ship))
+        if _update_member(member, fields, now):
+            diff.updated.append(member)
+
+    for character_id, member in existing.items():
+        if character_id not in seen and member.left_at is None:
+            member.left_at = now
+            member.updated_at = now
+            diff.departed.append(member)
+    return diff
+
+
+def _insert_joined(fleet_instance: EveFleetInstance, joined: list) -> None:
+    member_model, _ = _fleet_models()
+    member_model.objects.bulk_create(joined, batch_size=MEMBER_SYNC_BATCH_SIZE)
+    if all(member.pk is not None for member in joined):
+        return
+    # MySQL does not return primary keys from bulk inserts.
+    ids = dict(
+        member_model.objects.filter(
+            eve_fleet_instance=fleet_instance,
+            character_id__in=[m.character_id for m in joined],
+        ).values_list("character_id", "id")
+    )
+    for member in joined:
+        member.pk = ids[member.character_id]
+
+
+def _write_member_diff(
+    fleet_instance: EveFleetInstance, existing: dict, diff: _MemberDiff
+) -> int:
+    """Write joins, updates and snapshots; returns the snapshot count."""
+    member_model, ship_snapshot_model = _fleet_models()
+    with transaction.atomic():
+        if diff.joined:
+            _insert_joined(fleet_instance, diff.joined)
+        if diff.updated or diff.departed:
+            member_model.objects.bulk_update(
+                diff.updated + diff.departed,
+                [*ESI_MEMBER_FIELDS, "left_at", "updated_at"],
+                batch_size=MEMBER_SYNC_BATCH_SIZE,
+            )
+
+        members = {
+            **existing,
+            **{member.character_id: member for member in diff.joined},
+        }
+        snapshots = [
+            ship_snapshot_model(
+                member=members[character_id],
+                ship_type_id=ship_type_id,
+                ship_name=ship_name,
+                solar_system_id=solar_system_id,
+                solar_system_name=solar_system_name,
+            )
+            for character_id, (
+                ship_type_id,
+                ship_name,
+                solar_system_id,
+                solar_system_name,
+            ) in diff.snapshots
+        ]
+        if snapshots:
+            ship_snapshot_model.objects.bulk_create(
+                snapshots, batch_size=MEMBER_SYNC_BATCH_SIZE
+            )
+    return len(snapshots)
+
+
+def sync_fleet_members(
+    fleet_instance: EveFleetInstance,
+    esi_fleet_members: list[dict],
+    resolved_ids: dict[int, str],
+) -> FleetMemberSyncResult:
+    """
+    Reconcile every member of ``fleet_instance`` with one ESI poll.
+
+    Existing members and their last snapshot ship are read in two queries,
+    joins/changes/departures are diffed in memory, and the results are
+    written with bulk inserts and updates, so the query count does not grow
+    with fleet size. Departed members keep their row and get ``left_at``.
+    """
+    member_model, _ = _fleet_models()
+    existing = {
+        member.character_id: member
+        for member in member_model.objects.filter(
+            eve_fleet_instance=fleet_instance
+        )
+    }
+    diff = _diff_members(
+        fleet_instance,
+        existing,
+        esi_fleet_members,
+        resolved_ids,
+        timezone.now(),
+    )
+    if not diff:
+        return FleetMemberSyncResult()
+
+    result = FleetMemberSyncResult(
+        joined=len(diff.joined),
+        updated=len(diff.updated),
+        departed=len(diff.departed),
+        snapshots=_write_member_diff(fleet_instance, existing, diff),
+    )
+    logger.debug(
+        "Fleet %s member sync: %s joined, %s updated, %s left, %s snapshots",
+        fleet_instance.id,
+        result.joined,
+        result.updated,
+        result.departed,
+        result.snapshots,
+    )
+    return result
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fleets", "0041_ehp_links_remove_dps_anchor"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evefleetinstancemember",
+            name="left_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
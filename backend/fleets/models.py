@@ -11,7 +11,12 @@ from eveonline.client import EsiClient
 from eveonline.models import EveCharacter, EveLocation
 from eveonline.helpers.characters import user_primary_character
 from fittings.models import EveDoctrine
-from fleets.helpers.member_ships import apply_esi_fleet_member
+from fleets.helpers.member_sync import (
+    cache_universe_names,
+    cached_universe_names,
+    fleet_member_static_ids,
+    sync_fleet_members,
+)
 from fleets.motd import get_motd
 from fleets.notifications import get_fleet_discord_notification
 
@@ -379,6 +384,8 @@ class EveFleetInstance(models.Model):
     def update_fleet_members(self):
         """
         Fetch the fleet members for the fleet
+
+        Returns when ESI's cached member list expires (None if unknown).
         """
         logger.info(
             "Updating members for fleet %d (%s)", self.eve_fleet.id, self.id
@@ -386,31 +393,44 @@ class EveFleetInstance(models.Model):
 
         response = self.esi_client().get_fleet_members(self.id)
         if response.success():
-            response = response.results()
+            members = response.results()
         else:
             self.handle_fleet_update_esi_failure(response)
-            return
+            return None
 
         logger.info(
-            "Fleet member count %d = %d ", self.eve_fleet.id, len(response)
+            "Fleet member count %d = %d ", self.eve_fleet.id, len(members)
         )
 
-        ids_to_resolve = set()
-        for esi_fleet_member in response:
-            ids_to_resolve.add(esi_fleet_member["character_id"])
-            ids_to_resolve.add(esi_fleet_member["ship_type_id"])
-            ids_to_resolve.add(esi_fleet_member["solar_system_id"])
-        ids_to_resolve = list(ids_to_resolve)
-        resolved_ids = (
-            EsiClient(None).resolve_universe_names(ids_to_resolve).results()
-        )
-        resolved_ids = {x["id"]: x["name"] for x in resolved_ids}
+        # Ship type / system names come from cache; only characters and
+        # never-seen static ids go to ESI.
+        static_ids = fleet_member_static_ids(members)
+        resolved_ids = cached_universe_names(static_ids)
+        ids_to_resolve = {
+            esi_fleet_member["character_id"] for esi_fleet_member in members
+        }
+        ids_to_resolve |= static_ids - resolved_ids.keys()
+        if ids_to_resolve:
+            resolved = (
+                EsiClient(None)
+                .resolve_universe_names(list(ids_to_resolve))
+                .results()
+            )
+            resolved = {x["id"]: x["name"] for x in resolved}
+            cache_universe_names(
+                {
+                    id_: name
+                    for id_, name in resolved.items()
+                    if id_ in static_ids
+                }
+            )
+            resolved_ids.update(resolved)
 
-        for esi_fleet_member in response:
-            apply_esi_fleet_member(self, esi_fleet_member, resolved_ids)
+        sync_fleet_members(self, members, resolved_ids)
 
         self.last_updated = timezone.now()
         self.save()
+        return response.expires
 
     def handle_fleet_update_esi_failure(self, esi_response):
         logger.warning(
@@ -500,6 +520,8 @@ class EveFleetInstanceMember(models.Model):
     station_id = models.BigIntegerField(null=True, blank=True)
     takes_fleet_warp = models.BooleanField(default=False)
     wing_id = models.BigIntegerField()
+    # Set when a poll no longer lists the member; cleared if they rejoin.
+    left_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
@@ -1,5 +1,9 @@
 import logging
+from datetime import datetime
 
+from celery import states
+from celery.result import EagerResult
+from celery_once import QueueOnce
 from django.utils import timezone
 from django.conf import settings
 
@@ -10,6 +14,11 @@ from fleets.helpers.active_clones import (
     members_to_poll,
     poll_fleet_member_implants as poll_member_implants_impl,
 )
+from fleets.helpers.fleet_polling import (
+    FLEET_POLL_LOCK_SECONDS,
+    fleet_poll_due,
+    record_fleet_poll,
+)
 from fleets.models import EveFleet, EveFleetInstance
 
 discord_client = DiscordClient()
@@ -29,16 +38,74 @@ def get_fleet_emoji(fleet_type):
 @app.task()
 def update_fleet_instances():
     """
-    Update fleet instances
+    Fan out one poll task per active fleet instance.
+
+    Fleets whose ESI member list is still cached are skipped, and the
+    per-fleet Celery Once lock drops a poll while the previous one for the
+    same fleet is still queued or running, so slow fleets never hold up
+    the others or pile up behind themselves.
     """
-    active_fleet_instances = EveFleetInstance.objects.filter(end_time=None)
+    now = timezone.now()
+    fleet_instance_ids = list(
+        EveFleetInstance.objects.filter(end_time=None).values_list(
+            "id", flat=True
+        )
+    )
+    queued = 0
+    for fleet_instance_id in fleet_instance_ids:
+        if not fleet_poll_due(fleet_instance_id, now):
+            continue
+        result = update_fleet_instance.apply_async(
+            args=[fleet_instance_id],
+            kwargs={"queued_at": now.isoformat()},
+        )
+        # Graceful Once answers a held lock with a local REJECTED result
+        if isinstance(result, EagerResult) and result.state == states.REJECTED:
+            continue
+        queued += 1
     logger.debug(
-        "Updating status of %s fleets", active_fleet_instances.count()
+        "Queued %s of %s active fleet polls", queued, len(fleet_instance_ids)
     )
-    for fleet_instance in active_fleet_instances:
-        logger.info("Updating fleet instance %s", fleet_instance.id)
-        fleet_instance.update_is_registered_status()
-        fleet_instance.update_fleet_members()
+    return queued
+
+
+@app.task(
+    base=QueueOnce,
+    once={
+        "graceful": True,
+        "keys": ["fleet_instance_id"],
+        "timeout": FLEET_POLL_LOCK_SECONDS,
+    },
+)
+def update_fleet_instance(fleet_instance_id: int, queued_at: str = None):
+    """Poll ESI registration and members for one active fleet instance."""
+    started_at = timezone.now()
+    if not fleet_poll_due(fleet_instance_id, started_at):
+        return None
+    fleet_instance = EveFleetInstance.objects.filter(
+        id=fleet_instance_id, end_time=None
+    ).first()
+    if fleet_instance is None:
+        return None
+
+    logger.info("Updating fleet instance %s", fleet_instance_id)
+    fleet_instance.update_is_registered_status()
+    members_expires_at = fleet_instance.update_fleet_members()
+    state = record_fleet_poll(
+        fleet_instance_id,
+        queued_at=datetime.fromisoformat(queued_at) if queued_at else None,
+        started_at=started_at,
+        finished_at=timezone.now(),
+        members_expires_at=members_expires_at,
+    )
+    return {
+        key: state[key]
+        for key in (
+            "queue_lag_seconds",
+            "expiry_lag_seconds",
+            "duration_seconds",
+        )
+    }
 
 
 @app.task()
@@ -0,0 +1,125 @@
+"""Tests for the fan-out fleet poller and its per-fleet metrics."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import Client
+from django.utils import timezone
+
+from app.test import TestCase
+from eveonline.client import EsiResponse
+from fleets.helpers.fleet_polling import get_fleet_poll_state
+from fleets.models import EveFleet, EveFleetAudience, EveFleetInstance
+from fleets.tasks import update_fleet_instance, update_fleet_instances
+from fleets.tests import disconnect_fleet_signals
+
+
+def _esi_member(character_id: int) -> dict:
+    return {
+        "character_id": character_id,
+        "join_time": timezone.now(),
+        "role": "squad_member",
+        "role_name": "Squad Member",
+        "ship_type_id": 22468,
+        "solar_system_id": 30000142,
+        "squad_id": 1,
+        "station_id": None,
+        "takes_fleet_warp": True,
+        "wing_id": 1,
+    }
+
+
+@patch("fleets.models.EsiClient")
+class FleetPollerTest(TestCase):
+    def setUp(self):
+        disconnect_fleet_signals()
+        super().setUp()
+        cache.clear()
+        audience = EveFleetAudience.objects.create(name="Poll Audience")
+        self.instances = []
+        for fleet_instance_id in (9101, 9102, 9103):
+            fleet = EveFleet.objects.create(
+                audience=audience,
+                start_time=timezone.now(),
+                type="strategic",
+                description="Poll fleet",
+            )
+            self.instances.append(
+                EveFleetInstance.objects.create(
+                    id=fleet_instance_id,
+                    eve_fleet=fleet,
+                    boss_id=fleet_instance_id,
+                )
+            )
+
+    def _mock_esi(self, esi_mock, expires=None):
+        esi = esi_mock.return_value
+        esi.get_fleet.return_value = EsiResponse(
+            response_code=200, data={"is_registered": True}
+        )
+        esi.get_fleet_members.return_value = EsiResponse(
+            response_code=200, data=[_esi_member(1)], expires=expires
+        )
+        esi.resolve_universe_names.return_value = EsiResponse(
+            response_code=200,
+            data=[
+                {"id": 1, "name": "Pilot"},
+                {"id": 22468, "name": "Apocalypse Navy Issue"},
+                {"id": 30000142, "name": "Jita"},
+            ],
+        )
+        return esi
+
+    def test_fan_out_polls_every_active_fleet(self, esi_mock):
+        esi = self._mock_esi(esi_mock)
+
+        self.assertEqual(3, update_fleet_instances())
+
+        self.assertEqual(3, esi.get_fleet_members.call_count)
+        for instance in self.instances:
+            state = get_fleet_poll_state(instance.id)
+            self.assertIsNotNone(state["queue_lag_seconds"])
+            self.assertIsNone(state["expiry_lag_seconds"])
+
+    def test_skips_fleets_inside_esi_cache_window(self, esi_mock):
+        esi = self._mock_esi(
+            esi_mock, expires=timezone.now() + timedelta(seconds=5)
+        )
+        update_fleet_instances()
+
+        self.assertEqual(0, update_fleet_instances())
+        self.assertEqual(3, esi.get_fleet_members.call_count)
+
+    def test_expired_window_reports_expiry_lag(self, esi_mock):
+        self._mock_esi(esi_mock, expires=timezone.now() - timedelta(seconds=3))
+        update_fleet_instances()
+        update_fleet_instances()
+
+        state = get_fleet_poll_state(self.instances[0].id)
+        self.assertGreaterEqual(state["expiry_lag_seconds"], 3)
+
+    def test_locked_fleet_is_not_polled_twice(self, esi_mock):
+        esi = self._mock_esi(esi_mock)
+        key = update_fleet_instance.get_key(
+            args=[self.instances[0].id], kwargs={"queued_at": None}
+        )
+        cache.add(key, "lock", 60)
+
+        self.assertEqual(2, update_fleet_instances())
+        self.assertEqual(2, esi.get_fleet_members.call_count)
+
+    def test_poll_metrics_endpoint(self, esi_mock):
+        self._mock_esi(esi_mock)
+        update_fleet_instances()
+
+        response = Client().get(
+            "/api/fleets/metrics/polling",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {(i.eve_fleet_id, i.id) for i in self.instances},
+            {(m["fleet_id"], m["fleet_instance_id"]) for m in response.json()},
+        )
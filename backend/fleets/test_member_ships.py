@@ -3,17 +3,20 @@
 import factory
 from unittest.mock import patch
 
+from django.core.cache import cache
+from django.db import connection
 from django.db.models import signals
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from app.test import TestCase
 from eveonline.client import EsiResponse
 from fleets.helpers.member_ships import (
     CAPSULE_TYPE_ID,
-    apply_esi_fleet_member,
     effective_fleet_ship,
     record_ship_snapshots_for_change,
 )
+from fleets.helpers.member_sync import sync_fleet_members
 from fleets.models import (
     EveFleet,
     EveFleetAudience,
@@ -86,9 +89,9 @@ class FleetMemberShipSnapshotTest(TestCase):
 
     @factory.django.mute_signals(signals.pre_save, signals.post_save)
     def test_new_member_gets_initial_snapshot(self):
-        apply_esi_fleet_member(
+        sync_fleet_members(
             self.instance,
-            _esi_member(99999, 22468),
+            [_esi_member(99999, 22468)],
             _resolved_ids(99999, 22468, "Apocalypse Navy Issue"),
         )
 
@@ -103,8 +106,8 @@ class FleetMemberShipSnapshotTest(TestCase):
         esi_member = _esi_member(12345, 22468)
         resolved = _resolved_ids(12345, 22468, "Apocalypse Navy Issue")
 
-        apply_esi_fleet_member(self.instance, esi_member, resolved)
-        apply_esi_fleet_member(self.instance, esi_member, resolved)
+        sync_fleet_members(self.instance, [esi_member], resolved)
+        sync_fleet_members(self.instance, [esi_member], resolved)
 
         self.assertEqual(
             EveFleetInstanceMemberShipSnapshot.objects.filter(
@@ -191,3 +194,141 @@ class FleetMemberShipSnapshotTest(TestCase):
         ship_type_id, ship_name = effective_fleet_ship(self.member)
         self.assertEqual(ship_type_id, 22468)
         self.assertEqual(ship_name, "Apocalypse Navy Issue")
+
+
+class FleetMemberSyncTest(TestCase):
+    def setUp(self):
+        disconnect_fleet_signals()
+        super().setUp()
+        cache.clear()
+        self.audience = EveFleetAudience.objects.create(name="Sync Audience")
+        self.fleet = EveFleet.objects.create(
+            audience=self.audience,
+            start_time=timezone.now(),
+            type="strategic",
+            description="Sync fleet",
+        )
+        self.instance = EveFleetInstance.objects.create(
+            id=9003,
+            eve_fleet=self.fleet,
+            start_time=timezone.now(),
+            boss_id=1,
+        )
+
+    def _poll(self, character_ids, ship_type_id=22468, instance=None):
+        members = [_esi_member(cid, ship_type_id) for cid in character_ids]
+        for member in members:
+            member["join_time"] = self.fleet.start_time
+        resolved = {cid: f"Pilot {cid}" for cid in character_ids}
+        resolved.update({ship_type_id: "Ship", 30000142: "Jita"})
+        with CaptureQueriesContext(connection) as queries:
+            result = sync_fleet_members(
+                instance or self.instance, members, resolved
+            )
+        return result, len(queries.captured_queries)
+
+    def test_poll_cost_does_not_grow_with_fleet_size(self):
+        large = EveFleetInstance.objects.create(
+            id=9004, eve_fleet=self.fleet, start_time=timezone.now()
+        )
+        _, small_join = self._poll(range(1, 6))
+        _, large_join = self._poll(range(1, 51), instance=large)
+        _, small_change = self._poll(range(1, 6), CAPSULE_TYPE_ID)
+        _, large_change = self._poll(
+            range(1, 51), CAPSULE_TYPE_ID, instance=large
+        )
+
+        self.assertEqual(small_join, large_join)
+        self.assertEqual(small_change, large_change)
+        self.assertEqual(
+            50,
+            EveFleetInstanceMember.objects.filter(
+                eve_fleet_instance=large, ship_type_id=CAPSULE_TYPE_ID
+            ).count(),
+        )
+        # Join snapshot + pod snapshot per member
+        self.assertEqual(
+            100,
+            EveFleetInstanceMemberShipSnapshot.objects.filter(
+                member__eve_fleet_instance=large
+            ).count(),
+        )
+
+    def test_unchanged_poll_writes_nothing(self):
+        self._poll([1, 2])
+        # join_time is auto_now_add, so ESI's value lands on the next poll
+        self._poll([1, 2])
+        result, queries = self._poll([1, 2])
+
+        self.assertEqual(
+            (0, 0, 0, 0),
+            (
+                result.joined,
+                result.updated,
+                result.departed,
+                result.snapshots,
+            ),
+        )
+        self.assertEqual(2, queries)
+
+    def test_string_join_time_is_not_rewritten_every_poll(self):
+        members = [_esi_member(1, 22468)]
+        members[0]["join_time"] = "2026-01-02T03:04:05Z"
+        resolved = {1: "Pilot 1", 22468: "Ship", 30000142: "Jita"}
+        sync_fleet_members(self.instance, members, resolved)
+        sync_fleet_members(self.instance, members, resolved)
+
+        result = sync_fleet_members(self.instance, members, resolved)
+
+        self.assertEqual(0, result.updated)
+        self.assertEqual(
+            "2026-01-02T03:04:05+00:00",
+            EveFleetInstanceMember.objects.get(
+                character_id=1
+            ).join_time.isoformat(),
+        )
+
+    def test_departed_members_are_marked_and_rejoin_clears(self):
+        self._poll([1, 2, 3])
+
+        result, _ = self._poll([1, 3])
+        self.assertEqual(1, result.departed)
+        departed = EveFleetInstanceMember.objects.get(character_id=2)
+        self.assertIsNotNone(departed.left_at)
+
+        self._poll([1, 2, 3])
+        departed.refresh_from_db()
+        self.assertIsNone(departed.left_at)
+        self.assertEqual(
+            1,
+            EveFleetInstanceMemberShipSnapshot.objects.filter(
+                member=departed
+            ).count(),
+        )
+
+    @patch("fleets.models.EsiClient")
+    def test_static_names_are_resolved_once(self, esi_mock):
+        esi = esi_mock.return_value
+        esi.get_fleet_members.return_value = EsiResponse(
+            response_code=200,
+            data=[_esi_member(12345, 22468)],
+        )
+        esi.resolve_universe_names.return_value = EsiResponse(
+            response_code=200,
+            data=[
+                {"id": 12345, "name": "Pilot One"},
+                {"id": 22468, "name": "Apocalypse Navy Issue"},
+                {"id": 30000142, "name": "Jita"},
+            ],
+        )
+
+        self.instance.update_fleet_members()
+        self.instance.update_fleet_members()
+
+        requested = [
+            set(call.args[0])
+            for call in esi.resolve_universe_names.call_args_list
+        ]
+        self.assertEqual([{12345, 22468, 30000142}, {12345}], requested)
+        member = EveFleetInstanceMember.objects.get(character_id=12345)
+        self.assertEqual("Apocalypse Navy Issue", member.ship_name)
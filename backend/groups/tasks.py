@@ -1,8 +1,11 @@
 import csv
 import io
 import logging
+from typing import NamedTuple
 
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import signals
 
 from app.celery import app
 from discord.client import DiscordClient
@@ -12,9 +15,14 @@ from eveonline.helpers.characters import (
 )
 from eveonline.models import EvePlayer
 
+from tribes.helpers.offboarding import (
+    offboard_tribe_memberships_without_feature,
+)
+
 from .helpers import (
     process_bulk_community_status_row,
     sync_tribe_chief_group_membership,
+    sync_user_community_groups,
 )
 from .models import (
     AffiliationType,
@@ -75,12 +83,7 @@ def bulk_update_community_status(
 
 @app.task
 def update_affiliations():
-    affiliation_rules = _load_affiliation_rules()
-    for user in User.objects.all():
-        try:
-            _update_affiliation_for_user(user, affiliation_rules)
-        except Exception as e:
-            log_affiliation_update_error(user, e)
+    return reconcile_affiliations()
 
 
 def _load_affiliation_rules():
@@ -138,81 +141,200 @@ def _user_qualifies_for_affiliation(primary_character, rule):
     return False
 
 
-def _update_affiliation_for_user(user, affiliation_rules):
-    logger.info("Checking affiliations for user %s", user)
+class _PrimaryCharacter(NamedTuple):
+    character_id: int
+    corporation_id: int | None
+    alliance_id: int | None
+    faction_id: int | None
 
-    primary_character = user_primary_character(user)
-    if not primary_character:
-        logger.info("No primary character found for user %s", user)
-        UserAffiliation.objects.filter(user=user).delete()
-        return
 
+def _target_affiliation_id(primary_character, affiliation_rules):
+    """Highest priority affiliation the primary character qualifies for."""
+    if primary_character is None:
+        return None
     for rule in affiliation_rules:
-        affiliation = rule["affiliation"]
-        logger.info("Checking if qualified for affiliation %s", affiliation)
-        is_qualifying = _user_qualifies_for_affiliation(
-            primary_character, rule
+        if _user_qualifies_for_affiliation(primary_character, rule):
+            return rule["affiliation"].id
+    return None
+
+
+def _primary_characters(user_ids=None) -> dict[int, _PrimaryCharacter]:
+    players = EvePlayer.objects.filter(primary_character__isnull=False)
+    if user_ids is not None:
+        players = players.filter(user_id__in=user_ids)
+    return {
+        user_id: _PrimaryCharacter(*fields)
+        for user_id, *fields in players.values_list(
+            "user_id",
+            "primary_character__character_id",
+            "primary_character__corporation_id",
+            "primary_character__alliance_id",
+            "primary_character__faction_id",
         )
+    }
 
-        if is_qualifying:
-            logger.info(
-                "User %s qualifies for affiliation %s",
-                user,
-                affiliation,
-            )
-            if UserAffiliation.objects.filter(
-                user=user, affiliation=affiliation
-            ).exists():
-                logger.info(
-                    "User %s already has affiliation %s",
-                    user,
-                    affiliation,
-                )
-                return
 
-            if UserAffiliation.objects.filter(user=user).exists():
-                logger.info(
-                    "User %s already has an affiliation, removing",
-                    user,
-                )
-                UserAffiliation.objects.filter(user=user).delete()
+def _current_affiliation_rows(user_ids=None) -> dict[int, dict[int, int]]:
+    """user_id -> {affiliation_id: UserAffiliation id}"""
+    rows = UserAffiliation.objects.all()
+    if user_ids is not None:
+        rows = rows.filter(user_id__in=user_ids)
+    current: dict[int, dict[int, int]] = {}
+    for row_id, user_id, affiliation_id in rows.values_list(
+        "id", "user_id", "affiliation_id"
+    ):
+        current.setdefault(user_id, {})[affiliation_id] = row_id
+    return current
 
-            logger.info(
-                "Creating affiliation for user %s with %s",
-                user,
-                affiliation,
-            )
-            UserAffiliation.objects.create(user=user, affiliation=affiliation)
-            return
 
-        logger.info(
-            "User %s does not qualify for affiliation %s",
-            user,
-            affiliation,
+def _affiliation_changes(primary_characters, current, affiliation_rules):
+    """
+    Diff each user's target affiliation against their current rows.
+    Returns (user_id -> row ids to remove, user_id -> affiliation_id to
+    create or None when only removing).
+    """
+    removals: dict[int, list[int]] = {}
+    changes: dict[int, int | None] = {}
+    for user_id in set(primary_characters) | set(current):
+        target = _target_affiliation_id(
+            primary_characters.get(user_id), affiliation_rules
         )
-        if UserAffiliation.objects.filter(
-            user=user, affiliation=affiliation
-        ).exists():
-            logger.info(
-                "User %s has affiliation %s, removing",
-                user,
-                affiliation,
-            )
-            UserAffiliation.objects.filter(
-                user=user, affiliation=affiliation
-            ).delete()
-        else:
-            logger.info(
-                "User %s does not have affiliation %s",
-                user,
-                affiliation,
+        existing = current.get(user_id, {})
+        stale = [
+            row_id
+            for affiliation_id, row_id in existing.items()
+            if affiliation_id != target
+        ]
+        missing = target is not None and target not in existing
+        if not stale and not missing:
+            continue
+        if stale:
+            removals[user_id] = stale
+        changes[user_id] = target if missing else None
+    return removals, changes
+
+
+def _remove_stale_affiliations(removals, users) -> set[int]:
+    """
+    Delete each user's stale rows in its own transaction, so a failing
+    pre_delete sync for one user does not roll back the others.
+    Returns the ids of users whose rows could not be removed.
+    """
+    failed = set()
+    for user_id, row_ids in removals.items():
+        try:
+            with transaction.atomic():
+                UserAffiliation.objects.filter(id__in=row_ids).delete()
+        except Exception as e:
+            failed.add(user_id)
+            if user_id in users:
+                log_affiliation_update_error(users[user_id], e)
+            else:
+                logger.error(
+                    "Error removing affiliations for user %s: %s", user_id, e
+                )
+    return failed
+
+
+def _apply_affiliation_changes(removals, changes, affiliations) -> set[int]:
+    """Apply the diff; returns the ids of users that could not be updated"""
+    users = User.objects.in_bulk(list(changes))
+    failed = _remove_stale_affiliations(removals, users)
+    created = [
+        UserAffiliation(user=users[user_id], affiliation=affiliations[target])
+        for user_id, target in changes.items()
+        if target is not None and user_id in users and user_id not in failed
+    ]
+    if created:
+        UserAffiliation.objects.bulk_create(created)
+
+    # bulk_create sends no post_save; run the same downstream sync (trial
+    # status, community groups, Discord roles) for the changed users only.
+    for user_affiliation in created:
+        try:
+            signals.post_save.send(
+                sender=UserAffiliation,
+                instance=user_affiliation,
+                created=True,
+                update_fields=None,
+                raw=False,
+                using=UserAffiliation.objects.db,
             )
+        except Exception as e:
+            log_affiliation_update_error(user_affiliation.user, e)
+    for user_id, target in changes.items():
+        if target is not None or user_id not in users or user_id in failed:
+            continue
+        # pre_delete synced while the old row still existed
+        try:
+            sync_user_community_groups(users[user_id])
+            offboard_tribe_memberships_without_feature(users[user_id])
+        except Exception as e:
+            log_affiliation_update_error(users[user_id], e)
+    return failed
+
+
+def reconcile_affiliations(user_ids=None) -> dict:
+    """
+    Bring UserAffiliation rows in line with each user's primary character.
+
+    Primary characters and current affiliations are read in one query each
+    and the affiliation rules are evaluated in memory, so unchanged users
+    cost nothing. Stale rows are removed per user, so one failing user does
+    not block the rest, and new rows are added with one bulk insert; the
+    community group / Discord sync then runs only for users whose
+    affiliation changed. ``user_ids`` limits the reconcile
+    to those users (default: everyone).
+    """
+    affiliation_rules = _load_affiliation_rules()
+    current = _current_affiliation_rows(user_ids)
+    removals, changes = _affiliation_changes(
+        _primary_characters(user_ids), current, affiliation_rules
+    )
+
+    result = {
+        "created": sum(1 for target in changes.values() if target),
+        "removed": sum(len(row_ids) for row_ids in removals.values()),
+        "changed_user_ids": sorted(changes),
+        "failed_user_ids": [],
+    }
+    if not changes:
+        logger.info("Affiliations up to date for %s users", len(current))
+        return result
+
+    failed = _apply_affiliation_changes(
+        removals,
+        changes,
+        {
+            rule["affiliation"].id: rule["affiliation"]
+            for rule in affiliation_rules
+        },
+    )
+    if failed:
+        result["created"] -= sum(1 for user_id in failed if changes[user_id])
+        result["removed"] -= sum(len(removals[user_id]) for user_id in failed)
+        result["failed_user_ids"] = sorted(failed)
+    logger.info(
+        "Affiliations reconciled: %s created, %s removed, %s users changed, "
+        "%s failed",
+        result["created"],
+        result["removed"],
+        len(changes),
+        len(failed),
+    )
+    return result
 
 
 @app.task
 def update_affiliation(user_id: int):
     user = User.objects.get(id=user_id)
-    _update_affiliation_for_user(user, _load_affiliation_rules())
+    return reconcile_affiliations(user_ids=[user.id])
+
+
+@app.task
+def update_user_affiliations(user_ids: list[int]):
+    """Reconcile a batch of users in one pass (e.g. after ESI changes)."""
+    return reconcile_affiliations(user_ids=user_ids)
 
 
 def log_affiliation_update_error(user: User, e):
@@ -1,3 +1,5 @@
+from unittest.mock import patch
+
 import factory
 
 from django.contrib.auth.models import Group, User
@@ -11,6 +13,7 @@ from eveonline.models import (
     EveAlliance,
     EveCharacter,
     EveCorporation,
+    EvePlayer,
 )
 from eveonline.helpers.characters import set_primary_character
 from discord.models import DiscordUser
@@ -24,6 +27,8 @@ from groups.helpers import (
     sync_tribe_chief_group_membership,
 )
 from groups.tasks import (
+    reconcile_affiliations,
+    update_affiliation,
     update_affiliations,
     sync_eve_corporation_groups,
 )
@@ -191,6 +196,161 @@ class UserAffiliationTestCase(TestCase):
         assert user_affiliation.affiliation == affiliation_type_2
 
 
+class ReconcileAffiliationsTestCase(TestCase):
+    """Set-based affiliation reconcile across all users"""
+
+    def setUp(self):
+        signals.post_save.disconnect(
+            sender=EveCharacter,
+            dispatch_uid="populate_eve_character_public_data",
+        )
+        signals.m2m_changed.disconnect(
+            sender=User.groups.through,
+            dispatch_uid="user_group_changed",
+        )
+        signals.post_save.disconnect(
+            sender=Group,
+            dispatch_uid="group_post_save",
+        )
+        self.corporation_id = 98726134
+        self.alliance = AffiliationType.objects.create(
+            name="Alliance",
+            description="Alliance",
+            image_url="https://example.com/image.png",
+            group=Group.objects.create(name="Reconcile Alliance"),
+            priority=10,
+        )
+        self.alliance.corporations.add(
+            EveCorporation.objects.create(corporation_id=self.corporation_id)
+        )
+        self.guest = AffiliationType.objects.create(
+            name="Guest",
+            description="Guest",
+            image_url="https://example.com/image.png",
+            group=Group.objects.create(name="Reconcile Guest"),
+            priority=1,
+            default=True,
+        )
+        self.next_character_id = 2110000
+        super().setUp()
+
+    def make_user(self, corporation_id=None):
+        self.next_character_id += 1
+        user = User.objects.create(username=f"user{self.next_character_id}")
+        character = EveCharacter.objects.create(
+            character_id=self.next_character_id,
+            corporation_id=corporation_id,
+            user=user,
+        )
+        EvePlayer.objects.create(
+            user=user, nickname=user.username, primary_character=character
+        )
+        return user, character
+
+    def test_assigns_highest_priority_affiliation(self):
+        member, _ = self.make_user(self.corporation_id)
+        guest, _ = self.make_user()
+        unlinked = User.objects.create(username="unlinked")
+        UserAffiliation.objects.create(user=unlinked, affiliation=self.guest)
+
+        result = reconcile_affiliations()
+
+        self.assertEqual(
+            {
+                member.id: self.alliance.id,
+                guest.id: self.guest.id,
+            },
+            dict(
+                UserAffiliation.objects.values_list(
+                    "user_id", "affiliation_id"
+                )
+            ),
+        )
+        self.assertEqual(2, result["created"])
+        self.assertEqual(1, result["removed"])
+        self.assertEqual(
+            sorted([member.id, guest.id, unlinked.id]),
+            result["changed_user_ids"],
+        )
+        self.assertTrue(
+            member.groups.filter(id=self.alliance.group_id).exists()
+        )
+
+    def test_moves_user_between_affiliations(self):
+        user, character = self.make_user(self.corporation_id)
+        reconcile_affiliations()
+
+        character.corporation_id = None
+        character.save()
+        result = update_affiliation(user.id)
+
+        self.assertEqual(
+            self.guest,
+            UserAffiliation.objects.get(user=user).affiliation,
+        )
+        self.assertEqual([user.id], result["changed_user_ids"])
+        self.assertEqual(
+            [self.guest.group_id],
+            list(user.groups.values_list("id", flat=True)),
+        )
+
+    def test_unchanged_users_are_not_synced(self):
+        for _ in range(3):
+            self.make_user(self.corporation_id)
+        reconcile_affiliations()
+        user, _ = self.make_user()
+
+        with patch("groups.signals.sync_user_community_groups") as sync:
+            result = reconcile_affiliations()
+
+        self.assertEqual([user.id], result["changed_user_ids"])
+        sync.assert_called_once()
+        self.assertEqual(user, sync.call_args.args[0])
+
+    def test_failing_user_does_not_block_others(self):
+        users = [self.make_user(self.corporation_id) for _ in range(2)]
+        reconcile_affiliations()
+        for _, character in users:
+            character.corporation_id = None
+            character.save()
+        failing = users[0][0]
+
+        def sync(user):
+            if user == failing:
+                raise RuntimeError("Discord down")
+
+        with patch(
+            "groups.signals.sync_user_community_groups", side_effect=sync
+        ):
+            result = reconcile_affiliations()
+
+        self.assertEqual([failing.id], result["failed_user_ids"])
+        self.assertEqual((1, 1), (result["created"], result["removed"]))
+        self.assertEqual(
+            {failing.id: self.alliance.id, users[1][0].id: self.guest.id},
+            dict(
+                UserAffiliation.objects.values_list(
+                    "user_id", "affiliation_id"
+                )
+            ),
+        )
+
+    def test_query_count_does_not_grow_with_users(self):
+        for _ in range(2):
+            self.make_user(self.corporation_id)
+        reconcile_affiliations()
+        with self.assertNumQueries(7):
+            reconcile_affiliations()
+
+        for _ in range(20):
+            self.make_user()
+        reconcile_affiliations()
+        with self.assertNumQueries(7):
+            result = reconcile_affiliations()
+
+        self.assertEqual([], result["changed_user_ids"])
+
+
 class GroupTasksTestCase(TestCase):
     """Unit tests for Groups tasks"""
 
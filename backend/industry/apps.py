@@ -1,4 +1,5 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class IndustryConfig(AppConfig):
@@ -6,6 +7,36 @@ class IndustryConfig(AppConfig):
 
     def ready(self):
         # pylint: disable=import-outside-toplevel
+        from eveuniverse.models import (
+            EveIndustryActivityDuration,
+            EveIndustryActivityMaterial,
+            EveIndustryActivityProduct,
+            EveTypeMaterial,
+        )
+
         from industry.admin import apply_industry_admin_customizations
+        from industry.helpers.recipe_graph import (
+            invalidate_recipe_graph,
+            recipe_type_watch,
+        )
 
         apply_industry_admin_customizations()
+
+        def _invalidate_recipe_graph(*args, **kwargs):
+            invalidate_recipe_graph()
+
+        # Most EveType saves (ESI refreshes of descriptions, dogma, ...)
+        # leave the graph's id/name/group columns alone.
+        recipe_type_watch.connect(invalidate_recipe_graph)
+        for model in (
+            EveTypeMaterial,
+            EveIndustryActivityProduct,
+            EveIndustryActivityMaterial,
+            EveIndustryActivityDuration,
+        ):
+            post_save.connect(
+                _invalidate_recipe_graph, sender=model, weak=False
+            )
+            post_delete.connect(
+                _invalidate_recipe_graph, sender=model, weak=False
+            )
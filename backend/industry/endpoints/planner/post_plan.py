@@ -17,6 +17,7 @@ from industry.helpers.blueprint_efficiency import (
 )
 from industry.helpers.build_planner import plan_build
 from industry.helpers.compressed_ore import (
+    BLEND_MODES,
     build_compressed_ore_plan,
     compression_covered_materials,
 )
@@ -127,17 +128,24 @@ def _build_compressed_ore_section(plan, facility_key, character, payload):
         )
     except ValueError as exc:
         return 400, ErrorResponse(detail=str(exc))
+    if payload.blend not in BLEND_MODES:
+        return 400, ErrorResponse(
+            detail=f"blend must be one of {', '.join(BLEND_MODES)}"
+        )
 
     materials = {name: qty for _, (name, qty) in plan.leaf_materials.items()}
     ore_plan = build_compressed_ore_plan(
         materials,
         refine_rate=refine,
         reprocessing_tax=get_facility_reprocessing_tax(facility_key),
+        blend=payload.blend,
     )
     compressed_payload = {
         "refine_rate": ore_plan.refine_rate,
         "refine_rate_source": rate_source,
         "reprocessing_tax": ore_plan.reprocessing_tax,
+        "blend": ore_plan.blend,
+        "compressed_volume_m3": ore_plan.compressed_volume_m3,
         "materials_tsv": ore_plan.multibuy(),
         "import_lines": [
             {"name": name, "quantity": qty}
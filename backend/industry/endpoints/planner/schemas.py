@@ -98,6 +98,8 @@ class PlanRequestSchema(Schema):
     character_id: Optional[int] = None
     # When true, apply RX implant bonus (character fitted, or RX-804 if max skills).
     use_reprocessing_implants: bool = False
+    # Compressed ore/ice blend: greedy, volume (min m3) or cost (min ISK).
+    blend: str = "greedy"
     # ISK per LP for navy/faction BPC acquisition cost (omit to skip).
     isk_per_lp: Optional[float] = None
 
@@ -187,6 +189,9 @@ class PlanCompressedOreSchema(Schema):
     refine_rate: float
     refine_rate_source: str
     reprocessing_tax: float
+    # Blend actually used (solver modes fall back to greedy).
+    blend: str = "greedy"
+    compressed_volume_m3: float = 0.0
     materials_tsv: str
     import_lines: List[PlanImportLineSchema]
     # Minerals/materials currently satisfied via compressed ore (allowlist).
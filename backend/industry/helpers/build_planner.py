@@ -14,13 +14,7 @@ from enum import Enum
 from math import ceil
 from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from eveuniverse.models import (
-    EveIndustryActivityDuration,
-    EveIndustryActivityMaterial,
-    EveIndustryActivityProduct,
-    EveMarketPrice,
-    EveType,
-)
+from eveuniverse.models import EveMarketPrice, EveType
 
 from industry.helpers.cost_indices import fetch_system_cost_indices
 from industry.helpers.facility_profiles import (
@@ -38,10 +32,12 @@ from industry.helpers.industry_formulas import (
     required_material_quantity,
     time_efficiency_multiplier,
 )
-from industry.helpers.type_breakdown import (
+from industry.helpers.recipe_graph import (
     ACTIVITY_MANUFACTURING,
     ACTIVITY_REACTION,
-    get_blueprint_or_reaction_type_id,
+    RecipeGraph,
+    ensure_recipe_loaded,
+    get_recipe_graph,
 )
 
 logger = logging.getLogger(__name__)
@@ -169,84 +165,41 @@ def resolve_product(name_or_id: str) -> EveType:
 
 
 def _get_recipe(product_type_id: int) -> Optional[Recipe]:
-    product = EveType.objects.filter(id=product_type_id).first()
-    if product is None:
+    if product_type_id not in get_recipe_graph():
         return None
-    # Ensures industry activity rows are loaded from SDE when available.
-    get_blueprint_or_reaction_type_id(product)
-
-    products = list(
-        EveIndustryActivityProduct.objects.filter(
-            product_eve_type_id=product_type_id,
-            activity_id__in=(ACTIVITY_MANUFACTURING, ACTIVITY_REACTION),
-        )
-    )
-    if not products:
+    # Loads industry activity rows from SDE when available.
+    graph = ensure_recipe_loaded(product_type_id)
+    recipe = graph.recipe(product_type_id)
+    if recipe is None:
         return None
-
-    manuf = [p for p in products if p.activity_id == ACTIVITY_MANUFACTURING]
-    chosen = manuf[0] if manuf else products[0]
-
-    duration = (
-        EveIndustryActivityDuration.objects.filter(
-            eve_type_id=chosen.eve_type_id,
-            activity_id=chosen.activity_id,
-        )
-        .values_list("time", flat=True)
-        .first()
-    )
-    if duration is None:
-        duration = 0
-
-    mats = list(
-        EveIndustryActivityMaterial.objects.filter(
-            eve_type_id=chosen.eve_type_id,
-            activity_id=chosen.activity_id,
-        ).select_related("material_eve_type")
-    )
-    materials = [
-        (m.material_eve_type_id, m.material_eve_type.name, m.quantity)
-        for m in mats
-    ]
     return Recipe(
-        blueprint_type_id=chosen.eve_type_id,
-        activity_id=chosen.activity_id,
+        blueprint_type_id=recipe.blueprint_type_id,
+        activity_id=recipe.activity_id,
         product_type_id=product_type_id,
-        product_name=product.name,
-        product_quantity=chosen.quantity or 1,
-        base_time=int(duration),
-        materials=materials,
+        product_name=graph.name(product_type_id),
+        product_quantity=recipe.product_quantity,
+        base_time=recipe.base_time,
+        materials=[
+            (material_id, graph.name(material_id), quantity)
+            for material_id, quantity in recipe.materials
+        ],
     )
 
 
-def _classify_job_class(recipe: Recipe, root_type_id: int) -> JobClass:
+def _classify_job_class(
+    recipe: Recipe, root_type_id: int, graph: RecipeGraph
+) -> JobClass:
     if recipe.activity_id == ACTIVITY_REACTION:
         return JobClass.REACTION
     if recipe.product_type_id == root_type_id:
         return JobClass.SHIP_MANUFACTURING
-    eve_type = (
-        EveType.objects.select_related("eve_group", "eve_group__eve_category")
-        .filter(id=recipe.product_type_id)
-        .first()
-    )
-    if eve_type is not None and eve_type.eve_group is not None:
-        category_id = (
-            eve_type.eve_group.eve_category_id
-            if eve_type.eve_group.eve_category_id
-            else None
-        )
-        if category_id == CATEGORY_SHIP:
-            return JobClass.SHIP_MANUFACTURING
+    if graph.category_id(recipe.product_type_id) == CATEGORY_SHIP:
+        return JobClass.SHIP_MANUFACTURING
     return JobClass.COMPONENT_MANUFACTURING
 
 
-def _is_advanced_component(type_id: int) -> bool:
-    eve_type = (
-        EveType.objects.filter(id=type_id).select_related("eve_group").first()
-    )
-    if eve_type is None or eve_type.eve_group_id is None:
-        return False
-    return eve_type.eve_group_id == GROUP_CONSTRUCTION_COMPONENTS
+def _is_advanced_component(type_id: int, graph: RecipeGraph) -> bool:
+    return graph.group_id(type_id) == GROUP_CONSTRUCTION_COMPONENTS
 
 
 def resolve_cost_indices(
@@ -302,6 +255,7 @@ def _adjusted_prices(type_ids: Iterable[int]) -> Dict[int, float]:
 def _assign_buckets(
     jobs_meta: Dict[int, Tuple[Recipe, int, JobClass]],
     root_type_id: int,
+    graph: RecipeGraph,
 ) -> Dict[int, JobBucket]:
     """Classify each planned product into Ravworks-style buckets."""
     reaction_ids = {
@@ -326,7 +280,7 @@ def _assign_buckets(
             buckets[pid] = JobBucket.FIRST_STAGE_REACTIONS
         elif pid in second_stage:
             buckets[pid] = JobBucket.SECOND_STAGE_REACTIONS
-        elif _is_advanced_component(pid):
+        elif _is_advanced_component(pid, graph):
             buckets[pid] = JobBucket.ADVANCED_COMPONENTS
         else:
             buckets[pid] = JobBucket.OTHER
@@ -349,6 +303,7 @@ def _stabilize_demand(
     profile: Dict[JobClass, FacilityBonuses],
     is_buildable,
     recipe_for,
+    graph: RecipeGraph,
 ) -> Tuple[Dict[int, int], Dict[int, Tuple[Recipe, int, JobClass]]]:
     """Iterate until run counts stabilize (ME can change upstream demand)."""
     demand: Dict[int, int] = defaultdict(int)
@@ -367,7 +322,7 @@ def _stabilize_demand(
             if recipe is None:
                 continue
             runs = ceil(needed / recipe.product_quantity)
-            job_class = _classify_job_class(recipe, root_id)
+            job_class = _classify_job_class(recipe, root_id, graph)
             bonuses = profile[job_class]
             bp_me = (
                 0.0
@@ -472,14 +427,13 @@ def _build_job_plan(
 def _collect_leaf_materials(
     demand: Dict[int, int],
     is_buildable,
+    graph: RecipeGraph,
 ) -> Dict[int, Tuple[str, int]]:
     leaf_materials: Dict[int, Tuple[str, int]] = {}
     for type_id, qty in demand.items():
         if is_buildable(type_id) or qty <= 0:
             continue
-        name = EveType.objects.filter(id=type_id).values_list(
-            "name", flat=True
-        ).first() or str(type_id)
+        name = graph.name(type_id) or str(type_id)
         leaf_materials[type_id] = (name, qty)
     return leaf_materials
 
@@ -530,11 +484,8 @@ def plan_build(
         )
     )
 
-    fuel_type_ids: Set[int] = set(
-        EveType.objects.filter(eve_group_id=GROUP_FUEL_BLOCK).values_list(
-            "id", flat=True
-        )
-    )
+    graph = get_recipe_graph()
+    fuel_type_ids: Set[int] = graph.type_ids_in_group(GROUP_FUEL_BLOCK)
     excluded: Set[int] = {int(tid) for tid in (exclude_type_ids or [])}
     excluded.discard(int(root.id))
     root_id = int(root.id)
@@ -566,8 +517,11 @@ def plan_build(
         profile=profile,
         is_buildable=is_buildable,
         recipe_for=recipe_for,
+        graph=graph,
     )
-    buckets = _assign_buckets(jobs_meta, root.id)
+    # Recipe lookups may have loaded SDE rows and rebuilt the graph.
+    graph = get_recipe_graph()
+    buckets = _assign_buckets(jobs_meta, root.id, graph)
 
     all_mat_ids: List[int] = []
     for recipe, _, _ in jobs_meta.values():
@@ -606,7 +560,7 @@ def plan_build(
         reaction_index=reaction_index,
         indices_from_esi=not indices_overridden,
         jobs=job_plans,
-        leaf_materials=_collect_leaf_materials(demand, is_buildable),
+        leaf_materials=_collect_leaf_materials(demand, is_buildable, graph),
     )
 
 
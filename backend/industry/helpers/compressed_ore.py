@@ -32,6 +32,11 @@ Ice blend (all Compressed ice is 100 m3; order matters for byproduct credit):
 3. Size Krystallos for remaining Strontium Clathrates.
 Isotopes are never sized into compressed ice.
 
+The fixed orders above are the default (``blend="greedy"``). Solver blends
+(``volume`` / ``cost``) drop the ordering and reserved ores and pick whole
+portions over every allowed ore (see industry.helpers.ore_blend_solver),
+falling back to greedy when they cannot cover.
+
 Moon-ore → PI P0 conversion is implemented but gated off until those materials
 are added to COMPRESSION_COVERED_OTHER. Zeolites used for Pyerite still produce
 Atmospheric Gases as refine byproduct (tracked in expected outputs).
@@ -52,6 +57,10 @@ from typing import Dict, List, Optional, Sequence, Tuple
 
 from eveuniverse.models import EveMarketPrice, EveType, EveTypeMaterial
 
+from industry.helpers.ore_blend_solver import (
+    coverable_materials,
+    solve_blend,
+)
 from industry.helpers.producers import DEFAULT_REFINE_RATE, ORE_BATCH_SIZE
 from moons.models import ore_yield_map
 
@@ -155,6 +164,16 @@ FALLBACK_ICE_YIELDS_PER_UNIT: Dict[str, Dict[str, float]] = {
 }
 
 # All Compressed ice shares 100 m3 (ranking uses yield only — volumes match).
+COMPRESSED_ICE_VOLUME_M3 = 100.0
+
+# Blend strategies for build_compressed_ore_plan. Greedy is the fixed-order
+# isolation heuristic; volume/cost solve a small integer program over every
+# allowed ore (see industry.helpers.ore_blend_solver) and fall back to greedy
+# when they cannot cover the needs.
+BLEND_GREEDY = "greedy"
+BLEND_VOLUME = "volume"
+BLEND_COST = "cost"
+BLEND_MODES: Tuple[str, ...] = (BLEND_GREEDY, BLEND_VOLUME, BLEND_COST)
 
 # Highsec moon ores that yield PI P0 (from moons.models.ore_yield_map /
 # EveTypeMaterial). Prefer base Compressed forms that trade on the market.
@@ -258,6 +277,8 @@ class CompressedOrePlan:
     mineral_needs: Dict[str, int] = field(default_factory=dict)
     # expected - need (positive = surplus from ore refine).
     mineral_delta: Dict[str, int] = field(default_factory=dict)
+    # Blend strategy that produced the ore/ice stacks (after any fallback).
+    blend: str = BLEND_GREEDY
 
     @property
     def includes_compressed_ore(self) -> bool:
@@ -282,6 +303,15 @@ class CompressedOrePlan:
             return 0
         return math.floor(output_value * self.reprocessing_tax)
 
+    @property
+    def compressed_volume_m3(self) -> float:
+        """Freighter m³ for all compressed ore and ice in the plan."""
+        ore = belt_ore_compressed_volume_m3(
+            {**self.moon_ore_compressed, **self.belt_ore_compressed}
+        )
+        ice = sum(self.ice_compressed.values()) * COMPRESSED_ICE_VOLUME_M3
+        return ore + ice
+
     def import_lines(self) -> List[Tuple[str, int]]:
         """Flat freighter list: compressed ore/ice + items bought as-is."""
         lines: Dict[str, int] = {}
@@ -1095,12 +1125,184 @@ def _mineral_delta(
     return {k: v for k, v in sorted(delta.items()) if v != 0 or k in needs}
 
 
+def compressed_market_prices(ore_names: Sequence[str]) -> Dict[str, float]:
+    """Base ore name -> average_price of its Compressed type (priced only)."""
+    rows = EveMarketPrice.objects.filter(
+        eve_type__name__in=[compressed_type_name(n) for n in ore_names],
+        average_price__gt=0,
+    ).values_list("eve_type__name", "average_price")
+    return {base_ore_name(name): float(price) for name, price in rows}
+
+
+def _blend_portion_costs(
+    ore_names: Sequence[str],
+    blend: str,
+    *,
+    batch_size: int,
+    unit_volume_m3: Dict[str, float],
+) -> Dict[str, float]:
+    """Objective cost of one reprocessing portion per ore for ``blend``."""
+    if blend == BLEND_COST:
+        prices = compressed_market_prices(ore_names)
+        return {
+            name: prices[name] * batch_size
+            for name in ore_names
+            if name in prices
+        }
+    return {name: unit_volume_m3[name] * batch_size for name in ore_names}
+
+
+def _solve_compressed_blend(
+    needs: Dict[str, int],
+    materials_per_portion: Dict[str, Dict[str, float]],
+    refine_rate: float,
+    blend: str,
+    *,
+    batch_size: int,
+    unit_volume_m3: Dict[str, float],
+    incumbent: Dict[str, int],
+) -> Optional[Dict[str, int]]:
+    """
+    Compressed stacks covering ``needs`` at minimum volume or ISK.
+
+    Coverage uses the conservative display rate like the greedy top-up.
+    Needs no allowed ore yields are left for the caller to import. Returns
+    None when the costed ores cannot cover every coverable need.
+    """
+    needs = {
+        name: needs[name]
+        for name in coverable_materials(needs, materials_per_portion)
+    }
+    costs = _blend_portion_costs(
+        list(materials_per_portion),
+        blend,
+        batch_size=batch_size,
+        unit_volume_m3=unit_volume_m3,
+    )
+    portions = solve_blend(
+        needs,
+        {name: materials_per_portion[name] for name in costs},
+        conservative_refine_rate(refine_rate),
+        costs,
+        incumbents=[
+            {
+                base_ore_name(name): qty // batch_size
+                for name, qty in incumbent.items()
+            }
+        ],
+    )
+    if portions is None:
+        return None
+    return {
+        compressed_type_name(name): count * batch_size
+        for name, count in sorted(portions.items())
+    }
+
+
+def solve_belt_blend(
+    mineral_needs: Dict[str, int],
+    moon_byproducts: Dict[str, int],
+    ore_names: Sequence[str],
+    refine_rate: float,
+    blend: str = BLEND_VOLUME,
+    *,
+    incumbent: Optional[Dict[str, int]] = None,
+) -> Optional[Tuple[Dict[str, int], Dict[str, int]]]:
+    """
+    Compressed belt ore + mineral imports from the blend solver.
+
+    Every allowed ore may cover any covered mineral (no fixed order or
+    reserved ores). Covered minerals no ore yields, and uncovered minerals
+    left after ore byproducts, stay as imports. ``incumbent`` (the greedy
+    stacks) is only ever improved on. None when the solver cannot cover.
+    """
+    remaining = {
+        mineral: max(
+            0, mineral_needs.get(mineral, 0) - moon_byproducts.get(mineral, 0)
+        )
+        for mineral in MINERAL_NAMES
+    }
+    materials_per_portion = {
+        name: ore_materials_per_portion(name) for name in ore_names
+    }
+    covered_needs = {
+        mineral: qty
+        for mineral, qty in remaining.items()
+        if mineral in COMPRESSION_COVERED_MINERALS
+    }
+    belt_compressed = _solve_compressed_blend(
+        covered_needs,
+        materials_per_portion,
+        refine_rate,
+        blend,
+        batch_size=ORE_BATCH_SIZE,
+        unit_volume_m3={
+            name: compressed_volume_m3(name) for name in ore_names
+        },
+        incumbent=incumbent or {},
+    )
+    if belt_compressed is None:
+        return None
+
+    produced = _sum_reprocess_outputs(
+        belt_compressed, conservative_refine_rate(refine_rate)
+    )
+    mineral_imports = {
+        mineral: qty - produced.get(mineral, 0)
+        for mineral, qty in sorted(remaining.items())
+        if qty > produced.get(mineral, 0)
+    }
+    return belt_compressed, mineral_imports
+
+
+def solve_ice_blend(
+    ice_needs: Dict[str, int],
+    ice_names: Sequence[str],
+    refine_rate: float,
+    blend: str = BLEND_VOLUME,
+    *,
+    incumbent: Optional[Dict[str, int]] = None,
+) -> Optional[Tuple[Dict[str, int], Dict[str, int]]]:
+    """Compressed ice + ice product imports from the blend solver."""
+    covered_needs = {
+        name: qty
+        for name, qty in ice_needs.items()
+        if name in COMPRESSION_COVERED_ICE and qty > 0
+    }
+    ice_compressed = _solve_compressed_blend(
+        covered_needs,
+        {name: ice_materials_per_unit(name) for name in ice_names},
+        refine_rate,
+        blend,
+        batch_size=ICE_BATCH_SIZE,
+        unit_volume_m3={name: COMPRESSED_ICE_VOLUME_M3 for name in ice_names},
+        incumbent=incumbent or {},
+    )
+    if ice_compressed is None:
+        return None
+
+    produced = _sum_ice_reprocess_outputs(
+        ice_compressed, conservative_refine_rate(refine_rate)
+    )
+    ice_imports: Dict[str, int] = {}
+    for name, qty in ice_needs.items():
+        if qty <= 0:
+            continue
+        if name not in COMPRESSION_COVERED_ICE:
+            # Isotopes and other non-allowlisted products stay as imports.
+            ice_imports[name] = int(qty)
+        elif qty > produced.get(name, 0):
+            ice_imports[name] = qty - produced.get(name, 0)
+    return ice_compressed, ice_imports
+
+
 def build_compressed_ore_plan(
     materials: Dict[str, int] | Dict[int, int] | MaterialBuckets,
     refine_rate: float = DEFAULT_REFINE_RATE,
     use_moon_ore: bool = True,
     reprocessing_tax: float = 0.0,
     require_market: bool = True,
+    blend: str = BLEND_GREEDY,
 ) -> CompressedOrePlan:
     """
     Reverse leaf materials into compressed moon/belt ore, compressed ice,
@@ -1108,7 +1310,14 @@ def build_compressed_ore_plan(
 
     ``require_market`` limits Compressed types to those with EveMarketPrice > 0
     when any market prices are present in the DB.
+
+    ``blend`` picks the ore/ice blend: ``greedy`` (fixed-order heuristic),
+    ``volume`` (minimum compressed m³) or ``cost`` (minimum market ISK).
+    Solver modes start from the greedy blend and fall back to it when they
+    cannot cover the needs (e.g. no prices for ``cost``).
     """
+    if blend not in BLEND_MODES:
+        raise ValueError(f"blend must be one of {', '.join(BLEND_MODES)}")
     if isinstance(materials, MaterialBuckets):
         buckets = materials
     else:
@@ -1153,6 +1362,26 @@ def build_compressed_ore_plan(
     elif pi_p0_needs:
         plan.other_imports.update(pi_p0_needs)
 
+    _plan_belt_ore(plan, mineral_needs, moon_byproducts, require_market, blend)
+    plan.pi_other_imports.update(buckets.pi_other)
+    plan.other_imports.update(buckets.other)
+    _plan_ice(plan, ice_needs, require_market, blend)
+    _plan_expected_outputs(plan, mineral_needs)
+
+    if not plan.includes_compressed_ore:
+        plan.reprocessing_tax = 0.0
+    return plan
+
+
+def _plan_belt_ore(
+    plan: CompressedOrePlan,
+    mineral_needs: Dict[str, int],
+    moon_byproducts: Dict[str, int],
+    require_market: bool,
+    blend: str,
+) -> None:
+    """Greedy belt blend, replaced by the solver blend when it covers."""
+    refine_rate = plan.refine_rate
     ore_yields = base_belt_ore_yields(
         refine_rate=refine_rate, require_market=require_market
     )
@@ -1168,42 +1397,73 @@ def build_compressed_ore_plan(
         mineral_imports,
         refine_rate,
     )
+    if blend != BLEND_GREEDY:
+        solved = solve_belt_blend(
+            mineral_needs,
+            moon_byproducts,
+            list(ore_yields),
+            refine_rate,
+            blend,
+            incumbent=plan.belt_ore_compressed,
+        )
+        if solved is not None:
+            plan.belt_ore_compressed, mineral_imports = solved
+            plan.blend = blend
     plan.mineral_imports = mineral_imports
-    plan.pi_other_imports.update(buckets.pi_other)
-    plan.other_imports.update(buckets.other)
 
+
+def _plan_ice(
+    plan: CompressedOrePlan,
+    ice_needs: Dict[str, int],
+    require_market: bool,
+    blend: str,
+) -> None:
+    """Greedy ice blend, replaced by the solver blend when it covers."""
+    if not ice_needs:
+        return
+    refine_rate = plan.refine_rate
     ice_yields = base_compression_ice_yields(
         refine_rate=refine_rate, require_market=require_market
     )
-    if ice_needs and ice_yields:
-        ice_units, ice_imports = compute_practical_ice_blend(
-            ice_needs, ice_yields
-        )
-        plan.ice_compressed = to_compressed_units(ice_units)
-        _top_up_ice_floor_coverage(
-            plan.ice_compressed,
+    if not ice_yields:
+        plan.ice_imports.update(ice_needs)
+        return
+
+    ice_units, ice_imports = compute_practical_ice_blend(ice_needs, ice_yields)
+    plan.ice_compressed = to_compressed_units(ice_units)
+    _top_up_ice_floor_coverage(
+        plan.ice_compressed,
+        ice_needs,
+        ice_imports,
+        refine_rate,
+    )
+    if blend != BLEND_GREEDY:
+        solved = solve_ice_blend(
             ice_needs,
-            ice_imports,
+            list(ice_yields),
             refine_rate,
+            blend,
+            incumbent=plan.ice_compressed,
         )
-        plan.ice_imports = ice_imports
-    elif ice_needs:
-        plan.ice_imports.update(ice_needs)
+        if solved is not None:
+            plan.ice_compressed, ice_imports = solved
+            plan.blend = blend
+    plan.ice_imports = ice_imports
+
 
+def _plan_expected_outputs(
+    plan: CompressedOrePlan, mineral_needs: Dict[str, int]
+) -> None:
     # Expected / delta at the true facility rate (in-game). Top-up used the
     # conservative display rate, so these deltas are typically a small surplus.
     plan.expected_minerals = _sum_reprocess_outputs(
         {**plan.moon_ore_compressed, **plan.belt_ore_compressed},
-        refine_rate,
+        plan.refine_rate,
     )
     plan.expected_ice_products = _sum_ice_reprocess_outputs(
-        plan.ice_compressed, refine_rate
+        plan.ice_compressed, plan.refine_rate
     )
     # Expected minerals from ore only (PI P0 counted separately in moon refine).
     plan.mineral_delta = _mineral_delta(
-        mineral_needs, plan.expected_minerals, mineral_imports
+        mineral_needs, plan.expected_minerals, plan.mineral_imports
     )
-
-    if not plan.includes_compressed_ore:
-        plan.reprocessing_tax = 0.0
-    return plan
@@ -0,0 +1,268 @@
+"""
+Minimum-cost ore/ice blend as a small integer program.
+
+Variables are whole reprocessing portions per allowed ore (100 units for
+ore, 1 unit for ice). Each covered material is one ``>=`` constraint and
+the objective is a per-portion cost (compressed m³ or market ISK).
+
+Covered material sets are tiny (three minerals, three ice products), so the
+LP relaxation is solved exactly by enumerating basic solutions: every
+optimal vertex uses at most one ore per tight constraint. The relaxed
+optimum is then rounded over floor/ceil choices, repaired against the
+in-game floor per ore stack, and trimmed back while it still covers.
+
+Pure Python on purpose — no solver or NumPy dependency, and a full belt
+blend solves in a few milliseconds.
+"""
+
+from __future__ import annotations
+
+import math
+from itertools import combinations, product
+from typing import Dict, List, Optional, Sequence
+
+# Relative slack when checking relaxed (float) constraints.
+RELAXED_TOLERANCE = 1e-9
+
+# Pivot magnitude below which a square system is treated as singular.
+PIVOT_EPSILON = 1e-12
+
+# Upper bound on repair rounds; each round adds at least one portion.
+MAX_REPAIR_ROUNDS = 1000
+
+
+def _solve_square(
+    matrix: List[List[float]], rhs: List[float]
+) -> Optional[List[float]]:
+    """Gaussian elimination with partial pivoting; None when singular."""
+    size = len(rhs)
+    rows = [list(row) + [value] for row, value in zip(matrix, rhs)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r, c=col: abs(rows[r][c]))
+        if abs(rows[pivot][col]) < PIVOT_EPSILON:
+            return None
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(size):
+            if r == col:
+                continue
+            factor = rows[r][col] / rows[col][col]
+            if factor:
+                for c in range(col, size + 1):
+                    rows[r][c] -= factor * rows[col][c]
+    return [rows[i][size] / rows[i][i] for i in range(size)]
+
+
+def coverable_materials(
+    needs: Dict[str, int],
+    materials_per_portion: Dict[str, Dict[str, float]],
+) -> List[str]:
+    """Materials with positive need that at least one ore yields."""
+    return sorted(
+        material
+        for material, need in needs.items()
+        if need > 0
+        and any(
+            yields.get(material, 0.0) > 0
+            for yields in materials_per_portion.values()
+        )
+    )
+
+
+def solve_relaxation(
+    needs: Dict[str, int],
+    coefficients: Dict[str, Dict[str, float]],
+    costs: Dict[str, float],
+) -> Optional[Dict[str, float]]:
+    """
+    Fractional portions minimizing cost with ``sum(x * coeff) >= need``.
+
+    ``coefficients`` are material outputs per portion at the refine rate.
+    Returns None when some need cannot be met by the costed ores.
+    """
+    materials = [m for m, need in needs.items() if need > 0]
+    if not materials:
+        return {}
+    ores = sorted(
+        ore
+        for ore in costs
+        if any(coefficients.get(ore, {}).get(m, 0.0) > 0 for m in materials)
+    )
+
+    best: Optional[Dict[str, float]] = None
+    best_cost = math.inf
+    for size in range(1, min(len(materials), len(ores)) + 1):
+        for subset in combinations(ores, size):
+            for tight in combinations(materials, size):
+                solution = _solve_square(
+                    [
+                        [coefficients[ore].get(m, 0.0) for ore in subset]
+                        for m in tight
+                    ],
+                    [float(needs[m]) for m in tight],
+                )
+                if solution is None or min(solution) < -RELAXED_TOLERANCE:
+                    continue
+                portions = {
+                    ore: max(0.0, x) for ore, x in zip(subset, solution)
+                }
+                if not all(
+                    sum(
+                        x * coefficients[ore].get(m, 0.0)
+                        for ore, x in portions.items()
+                    )
+                    >= needs[m] * (1 - RELAXED_TOLERANCE)
+                    for m in materials
+                ):
+                    continue
+                cost = sum(costs[ore] * x for ore, x in portions.items())
+                if cost < best_cost:
+                    best, best_cost = portions, cost
+    return best
+
+
+class BlendProblem:
+    """Integer blend feasibility and cost at the in-game floor per stack."""
+
+    def __init__(
+        self,
+        needs: Dict[str, int],
+        materials_per_portion: Dict[str, Dict[str, float]],
+        refine_rate: float,
+        costs: Dict[str, float],
+    ):
+        self.needs = {m: int(q) for m, q in needs.items() if q > 0}
+        self.materials_per_portion = materials_per_portion
+        self.refine_rate = refine_rate
+        self.costs = costs
+
+    def output(self, ore: str, portions: int) -> Dict[str, int]:
+        # Same association as compressed_ore.reprocess_output so the floor
+        # lands on the same integer.
+        return {
+            m: math.floor(portions * base * self.refine_rate)
+            for m, base in self.materials_per_portion.get(ore, {}).items()
+        }
+
+    def shortfalls(self, portions: Dict[str, int]) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for ore, count in portions.items():
+            if count <= 0:
+                continue
+            for m, produced in self.output(ore, count).items():
+                totals[m] = totals.get(m, 0) + produced
+        return {
+            m: need - totals.get(m, 0)
+            for m, need in self.needs.items()
+            if totals.get(m, 0) < need
+        }
+
+    def cost(self, portions: Dict[str, int]) -> float:
+        return sum(
+            self.costs[ore] * count
+            for ore, count in portions.items()
+            if count > 0
+        )
+
+    def repair(self, portions: Dict[str, int]) -> Optional[Dict[str, int]]:
+        """Add the cheapest portions per short unit until every need is met."""
+        portions = dict(portions)
+        for _ in range(MAX_REPAIR_ROUNDS):
+            short = self.shortfalls(portions)
+            if not short:
+                return portions
+            material, missing = max(short.items(), key=lambda item: item[1])
+            best_ore = None
+            best_rate = 0.0
+            for ore in sorted(self.costs):
+                per_portion = (
+                    self.materials_per_portion.get(ore, {}).get(material, 0.0)
+                    * self.refine_rate
+                )
+                if per_portion <= 0:
+                    continue
+                rate = per_portion / max(self.costs[ore], PIVOT_EPSILON)
+                if rate > best_rate:
+                    best_ore, best_rate = ore, rate
+            if best_ore is None:
+                return None
+            per_portion = (
+                self.materials_per_portion[best_ore][material]
+                * self.refine_rate
+            )
+            portions[best_ore] = portions.get(best_ore, 0) + max(
+                1, math.ceil(missing / per_portion)
+            )
+        return None
+
+    def trim(self, portions: Dict[str, int]) -> Dict[str, int]:
+        """Drop surplus portions, most expensive ore first, keeping cover."""
+        portions = dict(portions)
+        for ore in sorted(
+            portions, key=lambda name: (-self.costs[name], name)
+        ):
+            low, high = 0, portions[ore]
+            while low < high:
+                mid = (low + high) // 2
+                if self.shortfalls({**portions, ore: mid}):
+                    low = mid + 1
+                else:
+                    high = mid
+            portions[ore] = low
+        return {ore: count for ore, count in portions.items() if count > 0}
+
+
+def solve_blend(
+    needs: Dict[str, int],
+    materials_per_portion: Dict[str, Dict[str, float]],
+    refine_rate: float,
+    costs: Dict[str, float],
+    *,
+    incumbents: Sequence[Dict[str, int]] = (),
+) -> Optional[Dict[str, int]]:
+    """
+    Whole portions per ore covering ``needs`` at minimum ``costs``.
+
+    ``materials_per_portion`` is base output per portion at 100% yield and
+    coverage is checked as ``floor(portions * base * refine_rate)`` per ore
+    stack. ``incumbents`` (e.g. the greedy blend) are trimmed and kept when
+    they beat the rounded relaxation, so the result is never worse than any
+    of them. Returns None when the costed ores cannot cover the needs.
+    """
+    problem = BlendProblem(needs, materials_per_portion, refine_rate, costs)
+    if not problem.needs:
+        return {}
+    coefficients = {
+        ore: {
+            m: base * refine_rate
+            for m, base in materials_per_portion.get(ore, {}).items()
+        }
+        for ore in costs
+    }
+    relaxed = solve_relaxation(problem.needs, coefficients, costs)
+    if relaxed is None:
+        return None
+
+    candidates: List[Dict[str, int]] = []
+    support = sorted(ore for ore, x in relaxed.items() if x > 0)
+    for rounding in product((math.floor, math.ceil), repeat=len(support)):
+        candidates.append(
+            {
+                ore: int(round_fn(relaxed[ore]))
+                for ore, round_fn in zip(support, rounding)
+            }
+        )
+    for incumbent in incumbents:
+        if incumbent and all(ore in costs for ore in incumbent):
+            candidates.append(dict(incumbent))
+
+    best: Optional[Dict[str, int]] = None
+    best_cost = math.inf
+    for candidate in candidates:
+        repaired = problem.repair(candidate)
+        if repaired is None:
+            continue
+        trimmed = problem.trim(repaired)
+        cost = problem.cost(trimmed)
+        if cost < best_cost:
+            best, best_cost = trimmed, cost
+    return best
@@ -0,0 +1,379 @@
+"""
+Process-wide, read-only graph of SDE manufacturing/reaction recipes.
+
+Every product -> blueprint/reaction edge, its materials, run time, the
+reprocessing materials (EveTypeMaterial) and each type's name, group and
+category are loaded once with a handful of bulk queries and kept in
+integer-indexed arrays. Type breakdowns, import resolution and the build
+planner walk this graph instead of issuing ORM queries per tree node.
+
+The graph is rebuilt when the SDE tables change: saves/deletes of the
+underlying models call invalidate_recipe_graph() (see IndustryConfig), which
+drops this process's copy and bumps a version in the shared cache so other
+workers rebuild on their next version check (eveonline.helpers.shared_index).
+EveType saves only invalidate when a column the graph reads
+(RECIPE_GRAPH_TYPE_FIELDS) changed.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from array import array
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+from eveuniverse.models import (
+    EveIndustryActivityDuration,
+    EveIndustryActivityMaterial,
+    EveIndustryActivityProduct,
+    EveType,
+    EveTypeMaterial,
+)
+
+from eveonline.helpers.shared_index import EveTypeFieldsWatch, SharedIndex
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_MANUFACTURING = 1
+ACTIVITY_REACTION = 11
+
+RECIPE_GRAPH_VERSION_KEY = "industry:recipe_graph:version"
+# How long a process trusts its graph before re-reading the shared version
+RECIPE_GRAPH_VERSION_CHECK_SECONDS = 5
+# Product -> blueprint lookups derived from the eveuniverse SDE blob
+SDE_PRODUCT_MAP_TTL_SECONDS = 3600
+# EveType columns the graph reads; saves touching none of them keep it valid
+RECIPE_GRAPH_TYPE_FIELDS = ("name", "eve_group_id")
+RECIPE_GRAPH_TYPE_UPDATE_FIELDS = frozenset(
+    {"name", "eve_group", "eve_group_id"}
+)
+
+
+class GraphRecipe(NamedTuple):
+    """The preferred manufacturing (else reaction) recipe for a product."""
+
+    blueprint_type_id: int
+    activity_id: int
+    product_quantity: int
+    base_time: int
+    materials: Tuple[Tuple[int, int], ...]  # (type_id, qty_per_run)
+
+
+class RecipeGraph:
+    """
+    Immutable recipe/material adjacency over SDE type ids.
+
+    Types are numbered 0..n-1. Recipes and reprocessing materials are stored
+    CSR-style: an offsets array per owner plus flat (node, quantity) arrays.
+    """
+
+    def __init__(self, version: Optional[str] = None):
+        self.version = version
+        self.checked_at = time.monotonic()
+        self._node: Dict[int, int] = {}
+        self.type_ids = array("q")
+        self.names: List[str] = []
+        self.group_ids = array("q")
+        self.category_ids = array("q")
+
+        self.recipe_of = array("l")
+        self.recipe_blueprint = array("q")
+        self.recipe_activity = array("b")
+        self.recipe_output = array("q")
+        self.recipe_time = array("q")
+        self.recipe_offsets = array("l", [0])
+        self.material_nodes = array("l")
+        self.material_quantities = array("q")
+
+        self.type_material_offsets = array("l")
+        self.type_material_nodes = array("l")
+        self.type_material_quantities = array("q")
+
+        self._eve_types: Dict[int, EveType] = {}
+
+    @classmethod
+    def load(cls, version: Optional[str] = None) -> RecipeGraph:
+        graph = cls(version)
+        rows = EveType.objects.values_list(
+            "id", "name", "eve_group_id", "eve_group__eve_category_id"
+        )
+        for type_id, name, group_id, category_id in rows.iterator(
+            chunk_size=5000
+        ):
+            graph._node[type_id] = len(graph.type_ids)
+            graph.type_ids.append(type_id)
+            graph.names.append(name)
+            graph.group_ids.append(group_id or 0)
+            graph.category_ids.append(category_id or 0)
+        graph._load_recipes()
+        graph._load_type_materials()
+        logger.debug(
+            "Loaded recipe graph: %s types, %s recipes",
+            len(graph.type_ids),
+            len(graph.recipe_blueprint),
+        )
+        return graph
+
+    def _load_recipes(self) -> None:
+        activities = (ACTIVITY_MANUFACTURING, ACTIVITY_REACTION)
+        chosen: Dict[int, Tuple[int, int, int]] = {}
+        for blueprint_id, activity_id, product_id, quantity in (
+            EveIndustryActivityProduct.objects.filter(
+                activity_id__in=activities
+            )
+            .order_by("id")
+            .values_list(
+                "eve_type_id", "activity_id", "product_eve_type_id", "quantity"
+            )
+        ):
+            current = chosen.get(product_id)
+            if current is None or (
+                current[1] != ACTIVITY_MANUFACTURING
+                and activity_id == ACTIVITY_MANUFACTURING
+            ):
+                chosen[product_id] = (blueprint_id, activity_id, quantity or 1)
+
+        durations = {
+            (blueprint_id, activity_id): seconds
+            for blueprint_id, activity_id, seconds in (
+                EveIndustryActivityDuration.objects.filter(
+                    activity_id__in=activities
+                ).values_list("eve_type_id", "activity_id", "time")
+            )
+        }
+        materials: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        for blueprint_id, activity_id, material_id, quantity in (
+            EveIndustryActivityMaterial.objects.filter(
+                activity_id__in=activities
+            )
+            .order_by("id")
+            .values_list(
+                "eve_type_id",
+                "activity_id",
+                "material_eve_type_id",
+                "quantity",
+            )
+        ):
+            materials.setdefault((blueprint_id, activity_id), []).append(
+                (material_id, quantity)
+            )
+
+        self.recipe_of = array("l", [-1]) * len(self.type_ids)
+        for product_id, (blueprint_id, activity_id, output) in chosen.items():
+            product_node = self._node.get(product_id)
+            if product_node is None:
+                continue
+            self.recipe_of[product_node] = len(self.recipe_blueprint)
+            self.recipe_blueprint.append(blueprint_id)
+            self.recipe_activity.append(activity_id)
+            self.recipe_output.append(output)
+            self.recipe_time.append(
+                int(durations.get((blueprint_id, activity_id)) or 0)
+            )
+            for material_id, quantity in materials.get(
+                (blueprint_id, activity_id), ()
+            ):
+                material_node = self._node.get(material_id)
+                if material_node is None:
+                    continue
+                self.material_nodes.append(material_node)
+                self.material_quantities.append(quantity)
+            self.recipe_offsets.append(len(self.material_nodes))
+
+    def _load_type_materials(self) -> None:
+        by_node: Dict[int, List[Tuple[int, int]]] = {}
+        for type_id, material_id, quantity in EveTypeMaterial.objects.order_by(
+            "id"
+        ).values_list("eve_type_id", "material_eve_type_id", "quantity"):
+            node = self._node.get(type_id)
+            material_node = self._node.get(material_id)
+            if node is None or material_node is None:
+                continue
+            by_node.setdefault(node, []).append((material_node, quantity))
+
+        self.type_material_offsets.append(0)
+        for node in range(len(self.type_ids)):
+            for material_node, quantity in by_node.get(node, ()):
+                self.type_material_nodes.append(material_node)
+                self.type_material_quantities.append(quantity)
+            self.type_material_offsets.append(len(self.type_material_nodes))
+
+    def __contains__(self, type_id: int) -> bool:
+        return type_id in self._node
+
+    def recipe(self, type_id: int) -> Optional[GraphRecipe]:
+        node = self._node.get(type_id)
+        if node is None:
+            return None
+        index = self.recipe_of[node]
+        if index < 0:
+            return None
+        start = self.recipe_offsets[index]
+        end = self.recipe_offsets[index + 1]
+        return GraphRecipe(
+            blueprint_type_id=self.recipe_blueprint[index],
+            activity_id=self.recipe_activity[index],
+            product_quantity=self.recipe_output[index],
+            base_time=self.recipe_time[index],
+            materials=tuple(
+                (
+                    self.type_ids[self.material_nodes[i]],
+                    self.material_quantities[i],
+                )
+                for i in range(start, end)
+            ),
+        )
+
+    def type_materials(self, type_id: int) -> Tuple[Tuple[int, int], ...]:
+        node = self._node.get(type_id)
+        if node is None:
+            return ()
+        start = self.type_material_offsets[node]
+        end = self.type_material_offsets[node + 1]
+        return tuple(
+            (
+                self.type_ids[self.type_material_nodes[i]],
+                self.type_material_quantities[i],
+            )
+            for i in range(start, end)
+        )
+
+    def has_recipe(self, type_id: int) -> bool:
+        node = self._node.get(type_id)
+        return node is not None and self.recipe_of[node] >= 0
+
+    def has_breakdown(self, type_id: int) -> bool:
+        node = self._node.get(type_id)
+        if node is None:
+            return False
+        return self.recipe_of[node] >= 0 or (
+            self.type_material_offsets[node + 1]
+            > self.type_material_offsets[node]
+        )
+
+    def name(self, type_id: int) -> Optional[str]:
+        node = self._node.get(type_id)
+        return None if node is None else self.names[node]
+
+    def group_id(self, type_id: int) -> Optional[int]:
+        node = self._node.get(type_id)
+        if node is None:
+            return None
+        return self.group_ids[node] or None
+
+    def category_id(self, type_id: int) -> Optional[int]:
+        node = self._node.get(type_id)
+        if node is None:
+            return None
+        return self.category_ids[node] or None
+
+    def type_ids_in_group(self, group_id: int) -> Set[int]:
+        return {
+            type_id
+            for type_id, type_group_id in zip(self.type_ids, self.group_ids)
+            if type_group_id == group_id
+        }
+
+    def eve_type(self, type_id: int) -> Optional[EveType]:
+        """
+        Unsaved EveType carrying id, name and group, for tree nodes and
+        callers that only read those fields.
+        """
+        eve_type = self._eve_types.get(type_id)
+        if eve_type is not None:
+            return eve_type
+        node = self._node.get(type_id)
+        if node is None:
+            return None
+        eve_type = EveType(
+            id=type_id,
+            name=self.names[node],
+            eve_group_id=self.group_ids[node] or None,
+        )
+        self._eve_types[type_id] = eve_type
+        return eve_type
+
+
+_recipe_graph: SharedIndex[RecipeGraph] = SharedIndex(
+    RECIPE_GRAPH_VERSION_KEY,
+    RecipeGraph.load,
+    RECIPE_GRAPH_VERSION_CHECK_SECONDS,
+)
+# Connected to the EveType signals in IndustryConfig
+recipe_type_watch = EveTypeFieldsWatch(
+    "recipe_graph", RECIPE_GRAPH_TYPE_FIELDS, RECIPE_GRAPH_TYPE_UPDATE_FIELDS
+)
+
+_sde_product_blueprints: Optional[Dict[int, int]] = None
+_sde_product_blueprints_loaded_at = 0.0
+# Products already resolved against the current SDE product map
+_sde_lookups_done: Set[int] = set()
+
+
+def get_recipe_graph() -> RecipeGraph:
+    """The shared recipe graph, (re)built when missing or out of date."""
+    return _recipe_graph.get()
+
+
+def invalidate_recipe_graph() -> None:
+    """Drop the local graph and tell other processes to rebuild theirs."""
+    _recipe_graph.invalidate()
+
+
+def _sde_blueprint_for_product(product_type_id: int) -> Optional[int]:
+    """Blueprint/reaction type id producing this type per the SDE blob."""
+    global _sde_product_blueprints, _sde_product_blueprints_loaded_at  # pylint: disable=global-statement
+    now = time.monotonic()
+    if (
+        _sde_product_blueprints is None
+        or now - _sde_product_blueprints_loaded_at
+        > SDE_PRODUCT_MAP_TTL_SECONDS
+    ):
+        data_all = (
+            EveIndustryActivityProduct.objects._fetch_sde_data_cached()  # pylint: disable=protected-access
+        )
+        product_blueprints: Dict[int, int] = {}
+        for blueprint_type_id, products_list in data_all.items():
+            for row in products_list:
+                try:
+                    if int(row.get("activityID")) not in (
+                        ACTIVITY_MANUFACTURING,
+                        ACTIVITY_REACTION,
+                    ):
+                        continue
+                    product_id = int(row.get("productTypeID"))
+                except (TypeError, ValueError):
+                    continue
+                product_blueprints.setdefault(
+                    product_id, int(blueprint_type_id)
+                )
+        _sde_product_blueprints = product_blueprints
+        _sde_product_blueprints_loaded_at = now
+        _sde_lookups_done.clear()
+    return _sde_product_blueprints.get(product_type_id)
+
+
+def ensure_recipe_loaded(type_id: int) -> RecipeGraph:
+    """
+    Graph in which this type's recipe is present if the SDE has one.
+
+    A type without a recipe is looked up in the SDE blob once per product
+    map; when a blueprint is found it is loaded through ESI and the graph
+    rebuilt.
+    """
+    graph = get_recipe_graph()
+    if graph.has_recipe(type_id) or type_id in _sde_lookups_done:
+        return graph
+    try:
+        blueprint_type_id = _sde_blueprint_for_product(type_id)
+    except Exception:  # pylint: disable=broad-except
+        return graph
+    _sde_lookups_done.add(type_id)
+    if blueprint_type_id is None:
+        return graph
+    EveType.objects.get_or_create_esi(
+        id=blueprint_type_id,
+        enabled_sections=[EveType.Section.INDUSTRY_ACTIVITIES],
+    )
+    invalidate_recipe_graph()
+    return get_recipe_graph()
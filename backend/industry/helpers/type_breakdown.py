@@ -5,8 +5,9 @@ Components come from: EveTypeMaterial (e.g. reprocessing), blueprint
 manufacturing (activity_id=1), or reactions (activity_id=11). Components
 that are themselves built from blueprints/reactions are expanded recursively.
 
-Blueprint/reaction data is loaded from the SDE on demand when breaking down
-a product type (e.g. a ship).
+Recipes come from the shared in-memory recipe graph (see recipe_graph);
+blueprint/reaction data is loaded from the SDE on demand when breaking down
+a product type (e.g. a ship) whose recipe is not in the graph yet.
 
 IndustryProduct.breakdown stores the full tree (all the way to leaves) so
 callers can traverse to any depth; use get_breakdown_for_industry_product()
@@ -24,59 +25,21 @@ import copy
 from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional, Set, Tuple
 
-from eveuniverse.models import (
-    EveIndustryActivityMaterial,
-    EveIndustryActivityProduct,
-    EveType,
-    EveTypeMaterial,
-)
+from eveuniverse.models import EveType
 
+from industry.helpers.recipe_graph import (
+    ACTIVITY_REACTION,
+    ensure_recipe_loaded,
+    get_recipe_graph,
+)
 from industry.models import IndustryOrder, IndustryProduct, Strategy
 
-ACTIVITY_MANUFACTURING = 1
-ACTIVITY_REACTION = 11
-
 # Strategy.PRODUCED = we build it; expand to direct components (all import unless they are also produced).
 
 # Cap recursion depth to avoid stack overflow and long-running requests (e.g. gunicorn worker exit).
 MAX_BREAKDOWN_DEPTH_DEFAULT = 30
 
 
-def _ensure_industry_data_loaded_for_product(
-    product_eve_type: EveType,
-) -> None:
-    """Load blueprint/reaction industry data from SDE if this type is a product."""
-    if EveIndustryActivityProduct.objects.filter(
-        product_eve_type_id=product_eve_type.id,
-        activity_id__in=(ACTIVITY_MANUFACTURING, ACTIVITY_REACTION),
-    ).exists():
-        return
-    try:
-        data_all = (
-            EveIndustryActivityProduct.objects._fetch_sde_data_cached()  # pylint: disable=protected-access
-        )
-    except Exception:
-        return
-    product_id = product_eve_type.id
-    for blueprint_type_id, products_list in data_all.items():
-        for row in products_list:
-            try:
-                if int(row.get("productTypeID")) != product_id:
-                    continue
-                if int(row.get("activityID")) not in (
-                    ACTIVITY_MANUFACTURING,
-                    ACTIVITY_REACTION,
-                ):
-                    continue
-            except (TypeError, ValueError):
-                continue
-            EveType.objects.get_or_create_esi(
-                id=blueprint_type_id,
-                enabled_sections=[EveType.Section.INDUSTRY_ACTIVITIES],
-            )
-            return
-
-
 @dataclass
 class ComponentNode:
     """One node in the breakdown tree."""
@@ -97,24 +60,19 @@ def _get_blueprint_or_reaction_materials(
     """Return (blueprint_type, activity_id, source_label, product_quantity) or None.
     product_quantity is output units per run (1 for manufacturing, often >1 for reactions).
     """
-    _ensure_industry_data_loaded_for_product(product_eve_type)
-    products = EveIndustryActivityProduct.objects.filter(
-        product_eve_type_id=product_eve_type.id,
-        activity_id__in=(ACTIVITY_MANUFACTURING, ACTIVITY_REACTION),
-    ).select_related("eve_type", "activity")
-
-    for prod in products:
-        product_qty = prod.quantity or 1
-        if prod.activity_id == ACTIVITY_MANUFACTURING:
-            return (
-                prod.eve_type,
-                ACTIVITY_MANUFACTURING,
-                "blueprint",
-                product_qty,
-            )
-        if prod.activity_id == ACTIVITY_REACTION:
-            return (prod.eve_type, ACTIVITY_REACTION, "reaction", product_qty)
-    return None
+    graph = ensure_recipe_loaded(product_eve_type.id)
+    recipe = graph.recipe(product_eve_type.id)
+    if recipe is None:
+        return None
+    source_label = (
+        "reaction" if recipe.activity_id == ACTIVITY_REACTION else "blueprint"
+    )
+    return (
+        graph.eve_type(recipe.blueprint_type_id),
+        recipe.activity_id,
+        source_label,
+        recipe.product_quantity,
+    )
 
 
 def get_blueprint_or_reaction_type_id(eve_type: EveType) -> Optional[int]:
@@ -122,8 +80,8 @@ def get_blueprint_or_reaction_type_id(eve_type: EveType) -> Optional[int]:
     Return the Eve type ID of the blueprint or reaction that produces this type,
     or None if this type has no manufacturing/reaction recipe (e.g. ore, mineral).
     """
-    result = _get_blueprint_or_reaction_materials(eve_type)
-    return result[0].id if result else None
+    recipe = ensure_recipe_loaded(eve_type.id).recipe(eve_type.id)
+    return recipe.blueprint_type_id if recipe else None
 
 
 def _get_direct_components(
@@ -132,28 +90,28 @@ def _get_direct_components(
     """Direct components as (EveType, quantity_per_run, source, product_quantity).
     product_quantity: output units per run for this recipe (1 for manufacturing/type_material).
     """
-    result: List[Tuple[EveType, int, str, int]] = []
-
-    blueprint_or_reaction = _get_blueprint_or_reaction_materials(eve_type)
-    if blueprint_or_reaction is not None:
-        source_type, activity_id, source_label, product_qty = (
-            blueprint_or_reaction
+    graph = ensure_recipe_loaded(eve_type.id)
+    recipe = graph.recipe(eve_type.id)
+    if recipe is not None:
+        source_label = (
+            "reaction"
+            if recipe.activity_id == ACTIVITY_REACTION
+            else "blueprint"
         )
-        materials = EveIndustryActivityMaterial.objects.filter(
-            eve_type_id=source_type.id,
-            activity_id=activity_id,
-        ).select_related("material_eve_type")
-        for m in materials:
-            result.append(
-                (m.material_eve_type, m.quantity, source_label, product_qty)
+        return [
+            (
+                graph.eve_type(material_id),
+                quantity,
+                source_label,
+                recipe.product_quantity,
             )
-        return result
+            for material_id, quantity in recipe.materials
+        ]
 
-    for m in EveTypeMaterial.objects.filter(
-        eve_type_id=eve_type.id
-    ).select_related("material_eve_type"):
-        result.append((m.material_eve_type, m.quantity, "type_material", 1))
-    return result
+    return [
+        (graph.eve_type(material_id), quantity, "type_material", 1)
+        for material_id, quantity in graph.type_materials(eve_type.id)
+    ]
 
 
 def get_direct_components(
@@ -226,10 +184,9 @@ def break_down_type(
                 )
             )
             continue
-        child_has_breakdown = (
-            _get_blueprint_or_reaction_materials(material_type) is not None
-            or EveTypeMaterial.objects.filter(eve_type=material_type).exists()
-        )
+        child_has_breakdown = ensure_recipe_loaded(
+            material_type.id
+        ).has_breakdown(material_type.id)
         if child_has_breakdown:
             child_node = break_down_type(
                 material_type,
@@ -285,9 +242,10 @@ def get_flat_breakdown(
         max_depth = MAX_BREAKDOWN_DEPTH_DEFAULT
     tree = break_down_type(eve_type, quantity=quantity, max_depth=max_depth)
     agg = flatten_components(tree)
-    type_ids = list(agg.keys())
-    types = {t.id: t for t in EveType.objects.filter(id__in=type_ids)}
-    return [(types[tid], agg[tid]) for tid in type_ids if tid in types]
+    graph = get_recipe_graph()
+    return [
+        (graph.eve_type(tid), qty) for tid, qty in agg.items() if tid in graph
+    ]
 
 
 def tree_to_nested(node: ComponentNode) -> Dict[str, Any]:
@@ -490,39 +448,37 @@ def enrich_breakdown_with_industry_product_ids(
     return data
 
 
+def _produced_type_ids() -> Set[int]:
+    return set(
+        IndustryProduct.objects.filter(strategy=Strategy.PRODUCED).values_list(
+            "eve_type_id", flat=True
+        )
+    )
+
+
 def _resolve_product_to_imports_impl(
     eve_type: EveType,
     quantity: int,
     agg: Dict[int, int],
     visited: Set[int],
+    produced: Set[int],
 ) -> None:
     """
     Resolve one product (eve_type, quantity) into a flat type_id -> quantity
     map of imports. Mutates agg. BUILD/INTEGRATED: expand to direct components
     (each import unless its strategy is also BUILD/INTEGRATED). IMPORT/EXPORT
     or no product: add (eve_type.id, quantity) to agg. Uses visited to break
-    cycles.
+    cycles. produced holds the type ids whose strategy is PRODUCED.
     """
-    if eve_type.id in visited:
-        agg[eve_type.id] = agg.get(eve_type.id, 0) + quantity
-        return
-    product = IndustryProduct.objects.filter(eve_type=eve_type).first()
-    if not product or product.strategy != Strategy.PRODUCED:
+    if eve_type.id in visited or eve_type.id not in produced:
         agg[eve_type.id] = agg.get(eve_type.id, 0) + quantity
         return
     visited.add(eve_type.id)
     try:
         for comp_type, comp_qty in get_direct_components(eve_type, quantity):
-            comp_product = IndustryProduct.objects.filter(
-                eve_type=comp_type
-            ).first()
-            if (
-                comp_product
-                and comp_product.strategy == Strategy.PRODUCED
-                and comp_type.id not in visited
-            ):
+            if comp_type.id in produced and comp_type.id not in visited:
                 _resolve_product_to_imports_impl(
-                    comp_type, comp_qty, agg, visited
+                    comp_type, comp_qty, agg, visited, produced
                 )
             else:
                 agg[comp_type.id] = agg.get(comp_type.id, 0) + comp_qty
@@ -541,7 +497,9 @@ def resolve_product_to_imports(
     Build, then recurse).
     """
     agg: Dict[int, int] = {}
-    _resolve_product_to_imports_impl(eve_type, quantity, agg, set())
+    _resolve_product_to_imports_impl(
+        eve_type, quantity, agg, set(), _produced_type_ids()
+    )
     return agg
 
 
@@ -552,8 +510,9 @@ def resolve_order_to_imports(order: IndustryOrder) -> Dict[int, int]:
     flow (Import = leaf, Build = expand to direct components, then recurse).
     """
     agg: Dict[int, int] = {}
+    produced = _produced_type_ids()
     for item in order.items.select_related("eve_type"):
         _resolve_product_to_imports_impl(
-            item.eve_type, item.quantity, agg, set()
+            item.eve_type, item.quantity, agg, set(), produced
         )
     return agg
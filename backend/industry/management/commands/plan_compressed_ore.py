@@ -11,6 +11,10 @@ Examples:
     pipenv run python manage.py plan_compressed_ore \\
       --materials '{"Tritanium": 8000000, "Hydrocarbons": 9200}' \\
       --facility amamake --refine-rate 0.84
+
+    # Minimum-m3 solver blend, with the greedy heuristic for comparison
+    pipenv run python manage.py plan_compressed_ore --from-plan Typhoon \\
+      --blend volume --compare
 """
 
 from __future__ import annotations
@@ -21,7 +25,11 @@ from typing import Dict, Optional
 from django.core.management.base import BaseCommand, CommandError
 
 from industry.helpers.build_planner import plan_build
-from industry.helpers.compressed_ore import build_compressed_ore_plan
+from industry.helpers.compressed_ore import (
+    BLEND_GREEDY,
+    BLEND_MODES,
+    build_compressed_ore_plan,
+)
 from industry.helpers.facility_profiles import (
     get_facility_refine_rate,
     get_facility_reprocessing_tax,
@@ -81,6 +89,20 @@ def _write_mineral_balance_section(stdout, style, plan):
         )
 
 
+def _write_volume_section(stdout, style, plan, greedy_volume):
+    stdout.write("")
+    stdout.write(style.MIGRATE_HEADING("Compressed volume"))
+    stdout.write(f"  {plan.blend}\t{plan.compressed_volume_m3:,.1f} m3")
+    if greedy_volume is None:
+        return
+    saved = greedy_volume - plan.compressed_volume_m3
+    share = saved / greedy_volume if greedy_volume else 0.0
+    stdout.write(
+        f"  greedy\t{greedy_volume:,.1f} m3\tsaved={saved:,.1f} m3 "
+        f"({share:.2%})"
+    )
+
+
 class Command(BaseCommand):
     help = (
         "Convert leaf minerals/PI into compressed highsec belt and moon ore "
@@ -119,6 +141,20 @@ class Command(BaseCommand):
             action="store_true",
             help="Do not convert PI P0 into compressed moon ore.",
         )
+        parser.add_argument(
+            "--blend",
+            choices=BLEND_MODES,
+            default=BLEND_GREEDY,
+            help=(
+                "Ore/ice blend: greedy (fixed-order heuristic), volume "
+                "(minimum compressed m3) or cost (minimum market ISK)."
+            ),
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also build the greedy blend and report m3 saved.",
+        )
         parser.add_argument(
             "--format",
             choices=("summary", "tsv", "json"),
@@ -152,12 +188,19 @@ class Command(BaseCommand):
             rate_source = facility
 
         materials = self._load_materials(options)
+        plan_kwargs = {
+            "refine_rate": refine,
+            "use_moon_ore": not options["no_moon_ore"],
+            "reprocessing_tax": reprocessing_tax,
+        }
         plan = build_compressed_ore_plan(
-            materials,
-            refine_rate=refine,
-            use_moon_ore=not options["no_moon_ore"],
-            reprocessing_tax=reprocessing_tax,
+            materials, blend=options["blend"], **plan_kwargs
         )
+        greedy_volume = None
+        if options["compare"]:
+            greedy_volume = build_compressed_ore_plan(
+                materials, blend=BLEND_GREEDY, **plan_kwargs
+            ).compressed_volume_m3
 
         fmt = options["output_format"]
         if fmt == "tsv":
@@ -171,6 +214,9 @@ class Command(BaseCommand):
                         "refine_rate_source": rate_source,
                         "reprocessing_tax": plan.reprocessing_tax,
                         "includes_compressed_ore": plan.includes_compressed_ore,
+                        "blend": plan.blend,
+                        "compressed_volume_m3": plan.compressed_volume_m3,
+                        "greedy_volume_m3": greedy_volume,
                         "moon_ore_compressed": plan.moon_ore_compressed,
                         "belt_ore_compressed": plan.belt_ore_compressed,
                         "ice_compressed": plan.ice_compressed,
@@ -193,6 +239,7 @@ class Command(BaseCommand):
             )
         else:
             self._write_summary(plan, materials, facility, rate_source)
+            _write_volume_section(self.stdout, self.style, plan, greedy_volume)
 
     def _load_materials(self, options) -> Dict[str, int]:
         if options["materials"] and options["from_plan"]:
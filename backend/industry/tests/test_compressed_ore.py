@@ -6,6 +6,9 @@ from django.test import TestCase
 
 from eveonline.models import EveCharacter, EveCharacterSkill
 from industry.helpers.compressed_ore import (
+    BLEND_COST,
+    BLEND_GREEDY,
+    BLEND_VOLUME,
     COMPRESSION_COVERED_MINERALS,
     PRIMARY_BELT_ORE_FOR_MINERAL,
     MaterialBuckets,
@@ -22,6 +25,7 @@ from industry.helpers.compressed_ore import (
     to_compressed_units,
 )
 from industry.helpers.facility_profiles import get_facility_refine_rate
+from industry.helpers.ore_blend_solver import solve_blend
 from industry.helpers.reprocessing_skills import resolve_refine_rate
 
 
@@ -761,3 +765,111 @@ class CompressedIcePlanTestCase(TestCase):
         self.assertIn("Strontium Clathrates", covered)
         self.assertNotIn("Helium Isotopes", covered)
         self.assertIn("Tritanium", covered)
+
+
+class OreBlendSolverTestCase(TestCase):
+    """Volume/cost blend modes against the greedy heuristic."""
+
+    needs = {
+        "Tritanium": 8_000_001,
+        "Pyerite": 4_000_000,
+        "Mexallon": 600_001,
+        "Isogen": 50_000,
+    }
+
+    def _covers(self, plan):
+        for mineral in COMPRESSION_COVERED_MINERALS:
+            self.assertGreaterEqual(
+                plan.expected_minerals.get(mineral, 0)
+                + plan.mineral_imports.get(mineral, 0),
+                plan.mineral_needs.get(mineral, 0),
+                msg=mineral,
+            )
+
+    def test_volume_blend_never_hauls_more_than_greedy(self):
+        greedy = build_compressed_ore_plan(
+            self.needs, refine_rate=0.84, require_market=False
+        )
+        solved = build_compressed_ore_plan(
+            self.needs,
+            refine_rate=0.84,
+            require_market=False,
+            blend=BLEND_VOLUME,
+        )
+        self.assertEqual(BLEND_GREEDY, greedy.blend)
+        self.assertEqual(BLEND_VOLUME, solved.blend)
+        self.assertLessEqual(
+            solved.compressed_volume_m3, greedy.compressed_volume_m3
+        )
+        self._covers(solved)
+        for name, qty in solved.belt_ore_compressed.items():
+            self.assertEqual(qty % 100, 0, msg=f"{name}: {qty}")
+        # Uncovered minerals still import what ore byproducts do not cover.
+        self.assertEqual(
+            50_000,
+            solved.mineral_imports["Isogen"]
+            + solved.expected_minerals.get("Isogen", 0),
+        )
+
+    @patch("industry.helpers.compressed_ore.base_compression_ice_yields")
+    def test_ice_blend_covers_at_fewer_units(self, mock_yields):
+        mock_yields.return_value = _standard_ice_yields(0.84)
+        needs = {
+            "Heavy Water": 146_000,
+            "Liquid Ozone": 300_000,
+            "Helium Isotopes": 386_000,
+            "Strontium Clathrates": 18_000,
+        }
+        greedy = build_compressed_ore_plan(
+            needs, refine_rate=0.84, require_market=False
+        )
+        solved = build_compressed_ore_plan(
+            needs, refine_rate=0.84, require_market=False, blend=BLEND_VOLUME
+        )
+        # Dark Glitter's Heavy Water byproduct makes Glare Crust redundant.
+        self.assertNotIn("Compressed Glare Crust", solved.ice_compressed)
+        self.assertLess(
+            solved.compressed_volume_m3, greedy.compressed_volume_m3
+        )
+        self.assertEqual(386_000, solved.ice_imports["Helium Isotopes"])
+        for product in ("Heavy Water", "Liquid Ozone", "Strontium Clathrates"):
+            self.assertGreaterEqual(
+                solved.expected_ice_products.get(product, 0)
+                + solved.ice_imports.get(product, 0),
+                needs[product],
+            )
+
+    def test_cost_blend_without_prices_falls_back_to_greedy(self):
+        greedy = build_compressed_ore_plan(
+            self.needs, refine_rate=0.84, require_market=False
+        )
+        plan = build_compressed_ore_plan(
+            self.needs,
+            refine_rate=0.84,
+            require_market=False,
+            blend=BLEND_COST,
+        )
+        self.assertEqual(BLEND_GREEDY, plan.blend)
+        self.assertEqual(greedy.belt_ore_compressed, plan.belt_ore_compressed)
+
+    def test_unknown_blend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_compressed_ore_plan({"Tritanium": 1000}, blend="fastest")
+
+    def test_solver_prefers_cheaper_isk_over_denser_ore(self):
+        materials = {
+            "Veldspar": {"Tritanium": 400},
+            "Scordite": {"Tritanium": 150, "Pyerite": 99},
+        }
+        needs = {"Tritanium": 100_000}
+        by_volume = solve_blend(
+            needs, materials, 0.84, {"Veldspar": 0.1, "Scordite": 0.15}
+        )
+        by_isk = solve_blend(
+            needs, materials, 0.84, {"Veldspar": 4000.0, "Scordite": 1000.0}
+        )
+        self.assertEqual({"Veldspar"}, set(by_volume))
+        self.assertEqual({"Scordite"}, set(by_isk))
+        # Minimal whole portions: ceil(100_000 / 336) and ceil(100_000 / 126)
+        self.assertEqual(298, by_volume["Veldspar"])
+        self.assertEqual(794, by_isk["Scordite"])
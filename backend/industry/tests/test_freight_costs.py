@@ -22,7 +22,7 @@ from industry.helpers.freight_costs import (
     materials_volume_m3_from_type_qtys,
 )
 from industry.helpers.industry_formulas import JobCostBreakdown
-from industry.helpers.type_breakdown import ACTIVITY_MANUFACTURING
+from industry.helpers.recipe_graph import ACTIVITY_MANUFACTURING
 
 
 def _empty_plan(*, facility_key: str = "amamake", leaf=None) -> BuildPlan:
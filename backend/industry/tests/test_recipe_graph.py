@@ -0,0 +1,180 @@
+"""Tests for industry.helpers.recipe_graph."""
+
+from unittest.mock import patch
+
+from django.test import TestCase
+from eveuniverse.models import (
+    EveCategory,
+    EveGroup,
+    EveIndustryActivity,
+    EveIndustryActivityDuration,
+    EveIndustryActivityMaterial,
+    EveIndustryActivityProduct,
+    EveType,
+    EveTypeMaterial,
+)
+
+from industry.helpers.build_planner import plan_build
+from industry.helpers.facility_profiles import AMAMAKE_SYSTEM_ID
+from industry.helpers.recipe_graph import (
+    ACTIVITY_MANUFACTURING,
+    ACTIVITY_REACTION,
+    get_recipe_graph,
+    invalidate_recipe_graph,
+)
+from industry.helpers.type_breakdown import (
+    break_down_type,
+    flatten_components,
+    resolve_product_to_imports,
+)
+from industry.models import IndustryProduct, Strategy
+
+
+class RecipeGraphTestCase(TestCase):
+    """Recipes, reprocessing materials and type metadata from one load."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = EveCategory.objects.create(
+            id=9101, name="Graph Cat", published=True
+        )
+        group = EveGroup.objects.create(
+            id=9101, name="Graph Group", published=True, eve_category=category
+        )
+        for activity_id, name in (
+            (ACTIVITY_MANUFACTURING, "Manufacturing"),
+            (ACTIVITY_REACTION, "Reaction"),
+        ):
+            EveIndustryActivity.objects.get_or_create(
+                id=activity_id, defaults={"name": name, "description": name}
+            )
+
+        def make_type(type_id, name):
+            return EveType.objects.create(
+                id=type_id, name=name, published=True, eve_group=group
+            )
+
+        cls.mineral = make_type(910001, "Graph Mineral")
+        cls.ore = make_type(910002, "Graph Ore")
+        cls.composite = make_type(910003, "Graph Composite")
+        cls.hull = make_type(910004, "Graph Hull")
+        reaction = make_type(910011, "Graph Composite Reaction")
+        blueprint = make_type(910012, "Graph Hull Blueprint")
+
+        EveTypeMaterial.objects.create(
+            eve_type=cls.ore, material_eve_type=cls.mineral, quantity=40
+        )
+        EveIndustryActivityProduct.objects.create(
+            eve_type=reaction,
+            activity_id=ACTIVITY_REACTION,
+            product_eve_type=cls.composite,
+            quantity=200,
+        )
+        EveIndustryActivityDuration.objects.create(
+            eve_type=reaction, activity_id=ACTIVITY_REACTION, time=10800
+        )
+        EveIndustryActivityMaterial.objects.create(
+            eve_type=reaction,
+            activity_id=ACTIVITY_REACTION,
+            material_eve_type=cls.mineral,
+            quantity=100,
+        )
+        EveIndustryActivityProduct.objects.create(
+            eve_type=blueprint,
+            activity_id=ACTIVITY_MANUFACTURING,
+            product_eve_type=cls.hull,
+            quantity=1,
+        )
+        EveIndustryActivityDuration.objects.create(
+            eve_type=blueprint, activity_id=ACTIVITY_MANUFACTURING, time=600
+        )
+        for material, quantity in ((cls.composite, 300), (cls.ore, 5)):
+            EveIndustryActivityMaterial.objects.create(
+                eve_type=blueprint,
+                activity_id=ACTIVITY_MANUFACTURING,
+                material_eve_type=material,
+                quantity=quantity,
+            )
+
+    def setUp(self):
+        # Rolled-back rows from other tests never send delete signals
+        invalidate_recipe_graph()
+
+    def test_graph_holds_recipes_and_type_materials(self):
+        graph = get_recipe_graph()
+
+        hull = graph.recipe(self.hull.id)
+        self.assertEqual(910012, hull.blueprint_type_id)
+        self.assertEqual(ACTIVITY_MANUFACTURING, hull.activity_id)
+        self.assertEqual(600, hull.base_time)
+        self.assertEqual(
+            {(self.composite.id, 300), (self.ore.id, 5)}, set(hull.materials)
+        )
+        self.assertEqual(200, graph.recipe(self.composite.id).product_quantity)
+        self.assertEqual(
+            ((self.mineral.id, 40),), graph.type_materials(self.ore.id)
+        )
+        self.assertTrue(graph.has_breakdown(self.ore.id))
+        self.assertFalse(graph.has_breakdown(self.mineral.id))
+        self.assertEqual(9101, graph.category_id(self.hull.id))
+
+    def test_warm_breakdown_runs_no_queries(self):
+        get_recipe_graph()
+
+        with self.assertNumQueries(0):
+            tree = break_down_type(self.hull, quantity=2)
+
+        # 2 runs need 600 composite -> 3 reaction runs -> 300 minerals,
+        # plus 10 ore -> 400 minerals
+        self.assertEqual({self.mineral.id: 700}, flatten_components(tree))
+
+    def test_import_resolution_reads_strategies_once(self):
+        IndustryProduct.objects.create(
+            eve_type=self.hull, strategy=Strategy.PRODUCED
+        )
+        get_recipe_graph()
+
+        with self.assertNumQueries(1):
+            imports = resolve_product_to_imports(self.hull, quantity=1)
+
+        self.assertEqual({self.composite.id: 300, self.ore.id: 5}, imports)
+
+    @patch("industry.helpers.build_planner.resolve_cost_indices")
+    def test_warm_plan_only_queries_prices(self, resolve_indices):
+        resolve_indices.return_value = (0.05, 0.05, AMAMAKE_SYSTEM_ID)
+        get_recipe_graph()
+
+        with self.assertNumQueries(1):
+            plan = plan_build(self.hull, quantity=1, facility="amamake")
+
+        self.assertEqual(
+            {self.hull.id, self.composite.id},
+            {job.product_type_id for job in plan.jobs},
+        )
+
+    def test_new_sde_rows_invalidate_graph(self):
+        graph = get_recipe_graph()
+        self.assertIsNone(graph.recipe(self.mineral.id))
+
+        EveIndustryActivityProduct.objects.create(
+            eve_type=self.composite,
+            activity_id=ACTIVITY_MANUFACTURING,
+            product_eve_type=self.mineral,
+            quantity=1,
+        )
+
+        self.assertIsNotNone(get_recipe_graph().recipe(self.mineral.id))
+
+    def test_only_recipe_type_changes_invalidate_graph(self):
+        graph = get_recipe_graph()
+
+        self.hull.description = "Refreshed from ESI"
+        self.hull.save()
+        self.assertIs(graph, get_recipe_graph())
+
+        self.hull.name = "Graph Hull II"
+        self.hull.save(update_fields=["name"])
+        self.assertIsNot(graph, get_recipe_graph())
+        self.assertEqual(
+            "Graph Hull II", get_recipe_graph().name(self.hull.id)
+        )
@@ -4,9 +4,11 @@ from django.test import TestCase
 
 from eveuniverse.models import EveCategory, EveGroup, EveType
 
-from industry.helpers.type_breakdown import (
+from industry.helpers.recipe_graph import (
     ACTIVITY_MANUFACTURING,
     ACTIVITY_REACTION,
+)
+from industry.helpers.type_breakdown import (
     ComponentNode,
     break_down_type,
     flatten_components,
@@ -18,6 +18,7 @@ from market.models import (
     EveMarketItemHistory,
     EveMarketItemLocationPrice,
     EveMarketItemOrder,
+    EveMarketItemOrderSync,
     EveMarketItemTransaction,
     EveTypeWithSellOrders,
 )
@@ -557,6 +558,8 @@ class EveMarketItemLocationPriceAdmin(admin.ModelAdmin):
         "sell_price",
         "buy_price",
         "split_price",
+        "sell_volume",
+        "sell_depth_10pct",
         "updated_at",
     )
     list_display_links = ("item", "location")
@@ -674,6 +677,28 @@ class EveMarketItemOrderAdmin(admin.ModelAdmin):
         return super().change_view(request, object_id, form_url, extra_context)
 
 
+@admin.register(EveMarketItemOrderSync)
+class EveMarketItemOrderSyncAdmin(admin.ModelAdmin):
+    """Structure order sync runs with per-location insert/update/delete counts."""
+
+    list_display = (
+        "location",
+        "started_at",
+        "completed_at",
+        "total_pages",
+        "pages_failed",
+        "inserted",
+        "updated",
+        "deleted",
+    )
+    list_filter = ("location",)
+    list_per_page = 50
+    ordering = ("-started_at",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("location")
+
+
 @admin.register(EveMarketItemTransaction)
 class EveMarketItemTransactionAdmin(admin.ModelAdmin):
     """Market transactions (for future use)."""
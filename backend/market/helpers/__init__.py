@@ -5,10 +5,13 @@ from market.helpers.contract_fetch import (
 from market.helpers.history import update_region_market_history_for_type
 from market.helpers.location_price import (
     fetch_and_update_market_location_prices,
+    sweep_market_location_prices,
 )
 from market.helpers.orders import (
-    clear_structure_sell_orders_for_location,
+    close_stale_structure_sell_orders_syncs,
+    finish_structure_sell_orders_sync,
     process_structure_sell_orders_page,
+    start_structure_sell_orders_sync,
 )
 from market.helpers.contracts import (
     MarketContractHistoricalQuantity,
@@ -31,8 +34,9 @@ from market.helpers.entity_resolution import entity_name_by_id
 
 __all__ = [
     "MarketContractHistoricalQuantity",
-    "clear_structure_sell_orders_for_location",
+    "close_stale_structure_sell_orders_syncs",
     "fetch_and_update_market_location_prices",
+    "finish_structure_sell_orders_sync",
     "create_or_update_contract",
     "create_or_update_contract_from_db_contract",
     "entity_name_by_id",
@@ -47,6 +51,8 @@ __all__ = [
     "get_qualified_sell_fittings",
     "known_contract_issuer_ids",
     "process_structure_sell_orders_page",
+    "start_structure_sell_orders_sync",
+    "sweep_market_location_prices",
     "update_completed_contracts",
     "update_expired_contracts",
     "update_region_market_history_for_type",
@@ -7,10 +7,12 @@ from eveuniverse.models import EveType
 from fittings.models import EveFitting
 
 from market.helpers.contract_stock import MATCH_THRESHOLD
-from market.models.item import parse_eft_items
-
-# Hull, modules, subsystems, and rigs — exclude charges/drones/paste/fuel.
-_STRUCTURAL_CATEGORIES = frozenset({"Ship", "Module", "Subsystem"})
+from market.helpers.fitting_signatures import (
+    FittingSignature,
+    FittingSignatureIndex,
+    fitting_signature,
+    fitting_signatures,
+)
 
 _TAG_PREFIX = re.compile(r"^\[[^\]]+\]\s*")
 
@@ -34,19 +36,7 @@ def normalize_contract_items(raw_items: list[dict]) -> dict[int, int]:
 
 def fitting_type_quantities(fitting: EveFitting) -> dict[int, int]:
     """Full EFT type quantities including consumables (for missing/extra display)."""
-    per_name = parse_eft_items(fitting.eft_format)
-    if not per_name:
-        return {}
-    names = list(per_name.keys())
-    name_to_id = dict(
-        EveType.objects.filter(name__in=names).values_list("name", "id")
-    )
-    aggregated = defaultdict(int)
-    for name, qty in per_name.items():
-        type_id = name_to_id.get(name)
-        if type_id:
-            aggregated[type_id] += qty
-    return dict(aggregated)
+    return dict(fitting_signature(fitting).display)
 
 
 def fitting_structural_type_quantities(fitting: EveFitting) -> dict[int, int]:
@@ -56,26 +46,7 @@ def fitting_structural_type_quantities(fitting: EveFitting) -> dict[int, int]:
     Bulk charges and other consumables dominate FAX fits and erase Active vs
     Buffer discrimination if left in the match score.
     """
-    per_name = parse_eft_items(fitting.eft_format)
-    if not per_name:
-        return {}
-    names = list(per_name.keys())
-    type_rows = EveType.objects.filter(name__in=names).values_list(
-        "name", "id", "eve_group__eve_category__name"
-    )
-    name_to_meta = {
-        name: (type_id, category) for name, type_id, category in type_rows
-    }
-    aggregated = defaultdict(int)
-    for name, qty in per_name.items():
-        meta = name_to_meta.get(name)
-        if not meta:
-            continue
-        type_id, category = meta
-        if category not in _STRUCTURAL_CATEGORIES:
-            continue
-        aggregated[type_id] += qty
-    return dict(aggregated)
+    return dict(fitting_signature(fitting).structural)
 
 
 def _type_names_for_ids(type_ids: set[int]) -> dict[int, str]:
@@ -87,30 +58,16 @@ def _type_names_for_ids(type_ids: set[int]) -> dict[int, str]:
     }
 
 
-def score_contract_against_fitting(
-    contract_items: dict[int, int], fitting: EveFitting
-) -> tuple[float, list[tuple[str, int]], list[tuple[str, int]]]:
-    """
-    Module-weighted coverage of fitting requirements.
-
-    Score uses structural items only. Missing/extra lists still include the
-    full EFT (consumables) for admin display.
-    """
-    score_items = fitting_structural_type_quantities(fitting)
-    display_items = fitting_type_quantities(fitting)
-    if not score_items and not display_items:
-        return 0.0, [], []
+def _missing_and_extra(
+    contract_items: dict[int, int], signature: FittingSignature
+) -> tuple[list[tuple[str, int]], list[tuple[str, int]]]:
+    display_items = signature.display
+    type_names = dict(signature.type_names)
+    type_names.update(
+        _type_names_for_ids(set(contract_items) - set(type_names))
+    )
 
-    total_required = sum(score_items.values())
-    matched = 0
     missing = []
-    fit_type_ids = set(display_items.keys())
-    type_names = _type_names_for_ids(fit_type_ids | set(contract_items.keys()))
-
-    for type_id, required in score_items.items():
-        have = contract_items.get(type_id, 0)
-        matched += min(have, required)
-
     for type_id, required in display_items.items():
         have = contract_items.get(type_id, 0)
         if have < required:
@@ -123,11 +80,27 @@ def score_contract_against_fitting(
         if have > required:
             name = type_names.get(type_id, str(type_id))
             extra.append((name, have - required))
-        elif type_id not in fit_type_ids:
+        elif type_id not in display_items:
             name = type_names.get(type_id, str(type_id))
             extra.append((name, have))
+    return missing, extra
+
+
+def score_contract_against_fitting(
+    contract_items: dict[int, int], fitting: EveFitting
+) -> tuple[float, list[tuple[str, int]], list[tuple[str, int]]]:
+    """
+    Module-weighted coverage of fitting requirements.
 
-    score = matched / total_required if total_required else 0.0
+    Score uses structural items only. Missing/extra lists still include the
+    full EFT (consumables) for admin display.
+    """
+    signature = fitting_signature(fitting)
+    if not signature.structural and not signature.display:
+        return 0.0, [], []
+
+    (score,) = FittingSignatureIndex([signature]).scores(contract_items)
+    missing, extra = _missing_and_extra(contract_items, signature)
     return score, missing, extra
 
 
@@ -138,40 +111,49 @@ def match_contract_to_fitting(
 ) -> tuple[
     EveFitting | None, float, list[tuple[str, int]], list[tuple[str, int]]
 ]:
-    """Pick the highest-scoring candidate; ties prefer preferred_fitting."""
+    """
+    Pick the highest-scoring candidate; ties prefer preferred_fitting.
+
+    All candidates are scored in one pass over a signature index; missing
+    and extra items are only worked out for the winner.
+    """
+    candidates = list(candidates)
+    signatures = fitting_signatures(candidates)
+    index = FittingSignatureIndex(
+        signatures[fitting.pk] for fitting in candidates
+    )
+    scores = index.scores(contract_items)
+
     best_fitting = None
     best_score = -1.0
-    best_missing: list[tuple[str, int]] = []
-    best_extra: list[tuple[str, int]] = []
     preferred_pk = preferred_fitting.pk if preferred_fitting else None
 
-    for fitting in candidates:
-        score, missing, extra = score_contract_against_fitting(
-            contract_items, fitting
-        )
+    for fitting, signature, score in zip(candidates, index.signatures, scores):
+        if not signature.structural and not signature.display:
+            score = 0.0
         if score > best_score:
             best_score = score
             best_fitting = fitting
-            best_missing = missing
-            best_extra = extra
             continue
         if score < best_score or best_fitting is None:
             continue
         if preferred_pk is not None and fitting.pk == preferred_pk:
             best_fitting = fitting
-            best_missing = missing
-            best_extra = extra
         elif preferred_pk is None and fitting.ship_id:
             if (
                 fitting.ship_id in contract_items
                 and best_fitting.ship_id not in contract_items
             ):
                 best_fitting = fitting
-                best_missing = missing
-                best_extra = extra
 
     if best_score < 0:
         return None, 0.0, [], []
+    best_signature = signatures[best_fitting.pk]
+    if not best_signature.structural and not best_signature.display:
+        return best_fitting, best_score, [], []
+    best_missing, best_extra = _missing_and_extra(
+        contract_items, best_signature
+    )
     return best_fitting, best_score, best_missing, best_extra
 
 
@@ -0,0 +1,172 @@
+"""
+Compiled fitting signatures for contract content matching.
+
+A signature is a fitting's EFT resolved to sparse ``{type_id: quantity}``
+vectors: structural (hull, modules, subsystems, rigs) for the match score
+and display (everything, consumables included) for missing/extra lists.
+Signatures are compiled in one EveType query per batch of fittings and
+cached per process and in the Django cache (Redis), keyed by fitting id
+and checked against a hash of the EFT, so an edited fitting recompiles.
+Approving a fitting change request drops the fitting's signature.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from django.core.cache import cache
+from eveuniverse.models import EveType
+
+from market.models.item import parse_eft_items
+
+# Hull, modules, subsystems, and rigs — exclude charges/drones/paste/fuel.
+STRUCTURAL_CATEGORIES = frozenset({"Ship", "Module", "Subsystem"})
+
+SIGNATURE_CACHE_KEY = "market:fitting_signature:{}"
+SIGNATURE_CACHE_SECONDS = 24 * 60 * 60
+
+# fitting id -> signature, like contracts.fitting_cache
+_signatures: dict[int, "FittingSignature"] = {}
+
+
+@dataclass(frozen=True)
+class FittingSignature:
+    fitting_id: int
+    eft_hash: str
+    structural: dict[int, int] = field(default_factory=dict)
+    display: dict[int, int] = field(default_factory=dict)
+    type_names: dict[int, str] = field(default_factory=dict)
+
+    @property
+    def total_required(self) -> int:
+        return sum(self.structural.values())
+
+
+def eft_hash(eft_format: str) -> str:
+    return hashlib.sha1((eft_format or "").encode()).hexdigest()
+
+
+def compile_fitting_signatures(fittings) -> dict[int, FittingSignature]:
+    """Compile fittings with one EveType query for all of their items."""
+    parsed = {
+        fitting.pk: (fitting, parse_eft_items(fitting.eft_format or ""))
+        for fitting in fittings
+    }
+    names = {name for _, per_name in parsed.values() for name in per_name}
+    name_to_meta = {}
+    if names:
+        name_to_meta = {
+            name: (type_id, category)
+            for name, type_id, category in EveType.objects.filter(
+                name__in=names
+            ).values_list("name", "id", "eve_group__eve_category__name")
+        }
+
+    signatures = {}
+    for fitting_id, (fitting, per_name) in parsed.items():
+        structural = defaultdict(int)
+        display = defaultdict(int)
+        type_names = {}
+        for name, qty in per_name.items():
+            meta = name_to_meta.get(name)
+            if not meta:
+                continue
+            type_id, category = meta
+            display[type_id] += qty
+            type_names[type_id] = name
+            if category in STRUCTURAL_CATEGORIES:
+                structural[type_id] += qty
+        signatures[fitting_id] = FittingSignature(
+            fitting_id=fitting_id,
+            eft_hash=eft_hash(fitting.eft_format),
+            structural=dict(structural),
+            display=dict(display),
+            type_names=type_names,
+        )
+    return signatures
+
+
+def fitting_signatures(fittings) -> dict[int, FittingSignature]:
+    """Signatures by fitting id, compiling only those not cached."""
+    fittings = list(fittings)
+    hashes = {fitting.pk: eft_hash(fitting.eft_format) for fitting in fittings}
+    signatures = {
+        fitting_id: _signatures[fitting_id]
+        for fitting_id, digest in hashes.items()
+        if fitting_id in _signatures
+        and _signatures[fitting_id].eft_hash == digest
+    }
+
+    missing = [
+        fitting_id for fitting_id in hashes if fitting_id not in signatures
+    ]
+    if missing:
+        cached = cache.get_many(
+            [SIGNATURE_CACHE_KEY.format(fitting_id) for fitting_id in missing]
+        )
+        for fitting_id in missing:
+            signature = cached.get(SIGNATURE_CACHE_KEY.format(fitting_id))
+            if signature and signature.eft_hash == hashes[fitting_id]:
+                signatures[fitting_id] = _signatures[fitting_id] = signature
+
+    to_compile = [
+        fitting for fitting in fittings if fitting.pk not in signatures
+    ]
+    if to_compile:
+        compiled = compile_fitting_signatures(to_compile)
+        _signatures.update(compiled)
+        signatures.update(compiled)
+        cache.set_many(
+            {
+                SIGNATURE_CACHE_KEY.format(fitting_id): signature
+                for fitting_id, signature in compiled.items()
+            },
+            SIGNATURE_CACHE_SECONDS,
+        )
+    return signatures
+
+
+def fitting_signature(fitting) -> FittingSignature:
+    return fitting_signatures([fitting])[fitting.pk]
+
+
+def invalidate_fitting_signature(fitting_id: int) -> None:
+    _signatures.pop(fitting_id, None)
+    cache.delete(SIGNATURE_CACHE_KEY.format(fitting_id))
+
+
+def clear_fitting_signatures() -> None:
+    """Drop the per-process signatures (tests)."""
+    _signatures.clear()
+
+
+class FittingSignatureIndex:
+    """
+    Structural signatures of many fittings as an inverted index
+    (type_id -> [(column, required)]), so a contract is scored against
+    every fitting in one pass over its own items.
+    """
+
+    def __init__(self, signatures: Iterable[FittingSignature]):
+        self.signatures = list(signatures)
+        self.totals = [
+            signature.total_required for signature in self.signatures
+        ]
+        self._postings: dict[int, list[tuple[int, int]]] = defaultdict(list)
+        for column, signature in enumerate(self.signatures):
+            for type_id, required in signature.structural.items():
+                self._postings[type_id].append((column, required))
+
+    def scores(self, contract_items: dict[int, int]) -> list[float]:
+        """Module-weighted coverage per signature, in index order."""
+        matched = [0] * len(self.signatures)
+        for type_id, have in contract_items.items():
+            for column, required in self._postings.get(type_id, ()):
+                matched[column] += min(have, required)
+        return [
+            matched[column] / total if total else 0.0
+            for column, total in enumerate(self.totals)
+        ]
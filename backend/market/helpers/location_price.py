@@ -4,15 +4,26 @@ Supports both Upwell structures (structure markets API) and NPC stations
 (region orders API). Does not touch EveMarketItemOrder. Fetches orders in
 memory, computes lowest sell / highest buy (station-range only) / split
 per item, and writes only to EveMarketItemLocationPrice.
+
+sweep_market_location_prices() downloads each region's order book once
+and fans the orders out to every NPC station location in that region.
 """
 
 import logging
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass
 from decimal import Decimal
 
 from django.db import transaction
 from django.utils import timezone
 
-from eveonline.client import EsiClient, get_region_market_orders_pages
+from eveonline.client import (
+    EsiClient,
+    get_region_market_orders_pages,
+    region_market_orders_etags,
+)
+from eveonline.esi_pages import EsiPagesNotModified
 from eveonline.models import EveLocation
 from eveuniverse.models import EveType
 
@@ -23,6 +34,25 @@ logger = logging.getLogger(__name__)
 # Only station-range buy orders count for buy_price (exclude region-wide lowballs)
 BUY_RANGE_OK = frozenset({"", "station"})
 
+# Type sweeps for up to this many types query each region once per type
+# (usually one page) instead of downloading the whole order book
+TYPE_FILTERED_FETCH_MAX_TYPES = 10
+
+# Sell depth: volume listed within this fraction above the best sell price
+DEPTH_5PCT = 0.05
+DEPTH_10PCT = 0.10
+
+PERSISTED_PRICE_FIELDS = [
+    "sell_price",
+    "buy_price",
+    "split_price",
+    "sell_volume",
+    "sell_order_count",
+    "sell_depth_5pct",
+    "sell_depth_10pct",
+    "updated_at",
+]
+
 
 def _ensure_eve_types(type_ids, types_cache):
     missing = [tid for tid in type_ids if tid not in types_cache]
@@ -36,48 +66,95 @@ def _ensure_eve_types(type_ids, types_cache):
             types_cache[type_id] = eve_type
 
 
-def _aggregate_orders_into_prices(page_orders, location_id: int | None):
+@dataclass
+class TypePriceStats:
+    """Order book statistics for one type at one location."""
+
+    sell_price: Decimal
+    buy_price: Decimal | None
+    sell_volume: int
+    sell_order_count: int
+    sell_depth_5pct: int
+    sell_depth_10pct: int
+
+
+class OrderBookAggregate:
     """
-    Build sell_min and buy_max dicts from a sequence of order dicts.
-    If location_id is set, only include orders with order['location_id'] == location_id (for region/station).
+    Columnar per-type accumulator for one location's order book.
+
+    Sell orders are appended to per-type float price / int volume arrays
+    and buy orders are reduced to a per-type maximum (station range only),
+    so no Decimal is built per order. type_stats() computes best prices and
+    depth in one grouped pass at the end.
     """
-    sell_min: dict[int, Decimal] = {}
-    buy_max: dict[int, Decimal] = {}
-    for o in page_orders:
-        if location_id is not None and o.get("location_id") != location_id:
-            continue
-        type_id = o["type_id"]
-        price = Decimal(str(o["price"]))
-        is_buy = bool(o.get("is_buy_order", True))
-        raw_range = o.get("range")
-        order_range = str(raw_range).lower() if raw_range is not None else ""
-
-        if is_buy:
-            if order_range in BUY_RANGE_OK:
-                if type_id not in buy_max or price > buy_max[type_id]:
-                    buy_max[type_id] = price
-        else:
-            if type_id not in sell_min or price < sell_min[type_id]:
-                sell_min[type_id] = price
-    return sell_min, buy_max
 
+    def __init__(self):
+        self._sell_prices: dict[int, array] = {}
+        self._sell_volumes: dict[int, array] = {}
+        self._buy_max: dict[int, float] = {}
 
-def _merge_aggregates(acc_sell, acc_buy, sell_min, buy_max):
-    """Merge (sell_min, buy_max) into (acc_sell, acc_buy) in place."""
-    for tid, price in sell_min.items():
-        if tid not in acc_sell or price < acc_sell[tid]:
-            acc_sell[tid] = price
-    for tid, price in buy_max.items():
-        if tid not in acc_buy or price > acc_buy[tid]:
-            acc_buy[tid] = price
+    def __len__(self) -> int:
+        return len(self._sell_prices)
+
+    def add_orders(self, page_orders, location_id: int | None = None):
+        """
+        Add a sequence of ESI order dicts. If location_id is set, only
+        orders with order['location_id'] == location_id are included.
+        """
+        sell_prices = self._sell_prices
+        sell_volumes = self._sell_volumes
+        buy_max = self._buy_max
+        for o in page_orders:
+            if location_id is not None and o.get("location_id") != location_id:
+                continue
+            type_id = o["type_id"]
+            price = float(o["price"])
+            if o.get("is_buy_order", True):
+                raw_range = o.get("range")
+                if (
+                    raw_range is None or str(raw_range).lower() in BUY_RANGE_OK
+                ) and price > buy_max.get(type_id, -1.0):
+                    buy_max[type_id] = price
+                continue
+            prices = sell_prices.get(type_id)
+            if prices is None:
+                prices = sell_prices[type_id] = array("d")
+                sell_volumes[type_id] = array("q")
+            prices.append(price)
+            sell_volumes[type_id].append(int(o.get("volume_remain") or 0))
+
+    def type_stats(self) -> dict[int, TypePriceStats]:
+        """Per-type stats for every type with at least one sell order."""
+        stats = {}
+        for type_id, prices in self._sell_prices.items():
+            volumes = self._sell_volumes[type_id]
+            best = min(prices)
+            limit_5pct = best * (1 + DEPTH_5PCT)
+            limit_10pct = best * (1 + DEPTH_10PCT)
+            depth_5pct = 0
+            depth_10pct = 0
+            for price, volume in zip(prices, volumes):
+                if price <= limit_10pct:
+                    depth_10pct += volume
+                    if price <= limit_5pct:
+                        depth_5pct += volume
+            buy = self._buy_max.get(type_id)
+            stats[type_id] = TypePriceStats(
+                sell_price=Decimal(str(best)),
+                buy_price=Decimal(str(buy)) if buy is not None else None,
+                sell_volume=sum(volumes),
+                sell_order_count=len(prices),
+                sell_depth_5pct=depth_5pct,
+                sell_depth_10pct=depth_10pct,
+            )
+        return stats
 
 
 def _fetch_orders_into_aggregates(
     location, character_id: int | None, filter_type_id: int | None
-) -> tuple[dict[int, Decimal], dict[int, Decimal]] | None:
-    """Fetch ESI orders for location into sell_min and buy_max. Returns None on failure."""
-    sell_min: dict[int, Decimal] = {}
-    buy_max: dict[int, Decimal] = {}
+) -> OrderBookAggregate | None:
+    """Fetch ESI orders for location into an OrderBookAggregate. Returns None on failure."""
+    book = OrderBookAggregate()
     if location.is_structure:
         if character_id is None:
             logger.warning(
@@ -108,13 +185,12 @@ def _fetch_orders_into_aggregates(
                 location.location_id,
                 len(page_data),
             )
-            s, b = _aggregate_orders_into_prices(page_data, location_id=None)
-            _merge_aggregates(sell_min, buy_max, s, b)
+            book.add_orders(page_data)
         logger.info(
             "Finished structure market orders: location_id=%s total_pages=%s types_seen=%s",
             location.location_id,
             page_num,
-            len(sell_min),
+            len(book),
         )
     else:
         if location.region_id is None:
@@ -148,42 +224,38 @@ def _fetch_orders_into_aggregates(
                 location.location_id,
                 len(page_data),
             )
-            s, b = _aggregate_orders_into_prices(
-                page_data, location_id=location.location_id
-            )
-            _merge_aggregates(sell_min, buy_max, s, b)
+            book.add_orders(page_data, location_id=location.location_id)
         logger.info(
             "Finished region market orders: location_id=%s total_pages=%s types_seen=%s",
             location.location_id,
             page_num,
-            len(sell_min),
+            len(book),
         )
-    return sell_min, buy_max
+    return book
 
 
 def _persist_location_prices(
     location_id: int,
-    type_ids: list[int],
-    sell_min: dict,
-    buy_max: dict,
-    filter_type_id: int | None,
+    stats: dict[int, TypePriceStats],
+    filter_type_ids: list[int] | None,
 ) -> int:
-    """Delete stale rows, create/update EveMarketItemLocationPrice. Returns count of rows written."""
+    """
+    Delete stale rows, create/update EveMarketItemLocationPrice. With
+    filter_type_ids only those types are replaced. Returns count of rows
+    written.
+    """
+    type_ids = list(stats.keys())
     logger.info(
-        "Persisting location prices: location_id=%s type_count=%s filter_type_id=%s",
+        "Persisting location prices: location_id=%s type_count=%s filter_type_ids=%s",
         location_id,
         len(type_ids),
-        filter_type_id,
+        filter_type_ids,
     )
+    stale = EveMarketItemLocationPrice.objects.filter(location_id=location_id)
+    if filter_type_ids is not None:
+        stale = stale.filter(item_id__in=filter_type_ids)
+    stale.exclude(item_id__in=type_ids).delete()
     if not type_ids:
-        if filter_type_id is not None:
-            EveMarketItemLocationPrice.objects.filter(
-                location_id=location_id, item_id=filter_type_id
-            ).delete()
-        else:
-            EveMarketItemLocationPrice.objects.filter(
-                location_id=location_id
-            ).delete()
         return 0
 
     types_cache: dict[int, EveType] = {}
@@ -193,38 +265,40 @@ def _persist_location_prices(
     to_create = []
     to_update = []
 
-    if filter_type_id is None:
-        EveMarketItemLocationPrice.objects.filter(
-            location_id=location_id
-        ).exclude(item_id__in=type_ids).delete()
-
+    existing_by_type = {
+        row.item_id: row
+        for row in EveMarketItemLocationPrice.objects.filter(
+            location_id=location_id, item_id__in=type_ids
+        )
+    }
     for tid in type_ids:
         if tid not in types_cache:
             continue
-        sell_price = sell_min[tid]
-        buy_price = buy_max.get(tid)
-        split_price = (
-            (sell_price + buy_price) / 2 if buy_price is not None else None
-        )
+        type_stats = stats[tid]
+        fields = {
+            "sell_price": type_stats.sell_price,
+            "buy_price": type_stats.buy_price,
+            "split_price": (
+                (type_stats.sell_price + type_stats.buy_price) / 2
+                if type_stats.buy_price is not None
+                else None
+            ),
+            "sell_volume": type_stats.sell_volume,
+            "sell_order_count": type_stats.sell_order_count,
+            "sell_depth_5pct": type_stats.sell_depth_5pct,
+            "sell_depth_10pct": type_stats.sell_depth_10pct,
+            "updated_at": now,
+        }
 
-        existing = EveMarketItemLocationPrice.objects.filter(
-            location_id=location_id, item_id=tid
-        ).first()
+        existing = existing_by_type.get(tid)
         if existing:
-            existing.sell_price = sell_price
-            existing.buy_price = buy_price
-            existing.split_price = split_price
-            existing.updated_at = now
+            for name, value in fields.items():
+                setattr(existing, name, value)
             to_update.append(existing)
         else:
             to_create.append(
                 EveMarketItemLocationPrice(
-                    location_id=location_id,
-                    item_id=tid,
-                    sell_price=sell_price,
-                    buy_price=buy_price,
-                    split_price=split_price,
-                    updated_at=now,
+                    location_id=location_id, item_id=tid, **fields
                 )
             )
 
@@ -232,7 +306,7 @@ def _persist_location_prices(
         if to_update:
             EveMarketItemLocationPrice.objects.bulk_update(
                 to_update,
-                ["sell_price", "buy_price", "split_price", "updated_at"],
+                PERSISTED_PRICE_FIELDS,
             )
         if to_create:
             EveMarketItemLocationPrice.objects.bulk_create(to_create)
@@ -288,13 +362,197 @@ def fetch_and_update_market_location_prices(
             location_id,
         )
         return 0
-    sell_min, buy_max = aggregates
-    type_ids = list(sell_min.keys())
+    stats = aggregates.type_stats()
     logger.info(
         "fetch_and_update_market_location_prices: location_id=%s — got %s type(s), persisting",
         location_id,
-        len(type_ids),
+        len(stats),
     )
     return _persist_location_prices(
-        location_id, type_ids, sell_min, buy_max, type_id
+        location_id, stats, [type_id] if type_id is not None else None
+    )
+
+
+def _region_order_pages(region_id: int, type_ids: set[int] | None, etags):
+    """
+    Region order pages covering type_ids: one type-filtered query per type
+    for small sets, else the whole order book (revalidated with etags).
+    """
+    if type_ids and len(type_ids) <= TYPE_FILTERED_FETCH_MAX_TYPES:
+        for type_id in sorted(type_ids):
+            yield from get_region_market_orders_pages(
+                region_id, type_id=type_id
+            )
+    else:
+        yield from get_region_market_orders_pages(region_id, etags=etags)
+
+
+def _fetch_region_orders_into_location_aggregates(
+    region_id: int,
+    location_ids: list[int],
+    type_ids: set[int] | None,
+    etags=None,
+) -> dict[int, OrderBookAggregate] | None:
+    """
+    Fetch the region's orders once and aggregate them per location, keeping
+    only orders for type_ids when given.
+    Returns {location_id: OrderBookAggregate}, or None on failure or when
+    the order book is unchanged since etags were last saved.
+    """
+    aggregates = {
+        location_id: OrderBookAggregate() for location_id in location_ids
+    }
+    page_num = 0
+    try:
+        for page_data in _region_order_pages(region_id, type_ids, etags):
+            if page_data is None:
+                logger.warning(
+                    "Region market orders returned None for region_id=%s",
+                    region_id,
+                )
+                return None
+            page_num += 1
+            orders_by_location = defaultdict(list)
+            for order in page_data:
+                location_id = order.get("location_id")
+                if location_id in aggregates and (
+                    type_ids is None or order["type_id"] in type_ids
+                ):
+                    orders_by_location[location_id].append(order)
+            for location_id, orders in orders_by_location.items():
+                aggregates[location_id].add_orders(orders)
+    except EsiPagesNotModified:
+        logger.info(
+            "Region market orders unchanged since last sweep: region_id=%s",
+            region_id,
+        )
+        return None
+    logger.info(
+        "Finished region market orders: region_id=%s type_count=%s total_pages=%s locations=%s",
+        region_id,
+        len(type_ids) if type_ids is not None else None,
+        page_num,
+        len(location_ids),
+    )
+    return aggregates
+
+
+def _persist_location_aggregates(
+    location, book: OrderBookAggregate, filter_type_ids: list[int] | None
+) -> int | None:
+    """Rows written, or None if the location's prices could not be saved"""
+    try:
+        return _persist_location_prices(
+            location.location_id, book.type_stats(), filter_type_ids
+        )
+    except Exception as e:
+        logger.exception(
+            "Failed to update location prices for %s: %s",
+            location.location_name,
+            e,
+        )
+        return None
+
+
+def _sweep_region(
+    region_id: int, region_locations: list, type_filter: set[int] | None
+) -> int:
+    """
+    Fetch one region's orders and persist them for its station locations.
+    A full sweep skips a region whose order book is unchanged since it was
+    last persisted for this same set of locations.
+    """
+    location_ids = sorted(loc.location_id for loc in region_locations)
+    etags = (
+        region_market_orders_etags(
+            region_id, scope=",".join(map(str, location_ids))
+        )
+        if type_filter is None
+        else None
+    )
+    try:
+        aggregates = _fetch_region_orders_into_location_aggregates(
+            region_id, location_ids, type_filter, etags
+        )
+    except Exception as e:
+        logger.exception(
+            "Failed to fetch region orders for region_id=%s: %s",
+            region_id,
+            e,
+        )
+        return 0
+    if aggregates is None:
+        return 0
+
+    written = [
+        _persist_location_aggregates(
+            location,
+            aggregates[location.location_id],
+            sorted(type_filter) if type_filter else None,
+        )
+        for location in region_locations
+    ]
+    if etags is not None and None not in written:
+        etags.save()
+    return sum(count or 0 for count in written)
+
+
+def sweep_market_location_prices(
+    character_id: int | None,
+    locations: list[EveLocation],
+    type_ids: list[int] | None = None,
+) -> int:
+    """
+    Update EveMarketItemLocationPrice for all the given locations.
+
+    NPC station locations are grouped by region and each region's orders
+    are fetched once for all of its locations; with type_ids only those
+    types are kept and replaced, and a few types are fetched with one
+    type-filtered query each rather than the whole order book. Structure locations are fetched once each;
+    as the structure API cannot filter by type, they always get a full
+    refresh.
+
+    Returns the number of EveMarketItemLocationPrice rows created or updated.
+    """
+    total = 0
+    locations_by_region = defaultdict(list)
+    for location in locations:
+        if not location.is_structure:
+            if location.region_id is None:
+                logger.warning(
+                    "Region required for station location %s (%s), skipping",
+                    location.location_id,
+                    location.location_name,
+                )
+            else:
+                locations_by_region[location.region_id].append(location)
+            continue
+
+        try:
+            aggregates = _fetch_orders_into_aggregates(
+                location, character_id, None
+            )
+        except Exception as e:
+            logger.exception(
+                "Failed to fetch structure orders for %s: %s",
+                location.location_name,
+                e,
+            )
+            continue
+        if aggregates is not None:
+            total += (
+                _persist_location_aggregates(location, aggregates, None) or 0
+            )
+
+    type_filter = set(type_ids) if type_ids else None
+    for region_id, region_locations in locations_by_region.items():
+        total += _sweep_region(region_id, region_locations, type_filter)
+
+    logger.info(
+        "sweep_market_location_prices: %s location(s), %s region(s), type_ids=%s — %s price row(s)",
+        len(locations),
+        len(locations_by_region),
+        type_ids,
+        total,
     )
+    return total
@@ -1,19 +1,29 @@
 """Helpers for syncing market sell orders used by item seeding."""
 
 import logging
+from datetime import timedelta
 from decimal import Decimal
 
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F
+from django.utils import timezone
 
 from eveonline.client import EsiClient
 from eveonline.models import EveLocation
 from eveuniverse.models import EveType
 
-from market.models import EveMarketItemOrder
+from market.models import EveMarketItemOrder, EveMarketItemOrderSync
 
 logger = logging.getLogger(__name__)
 
+# Order ids seen per page, kept until the run's last page completes
+SEEN_ORDERS_CACHE_TTL = 6 * 3600
+# Runs still open after this are closed without deleting anything
+SYNC_RUN_TIMEOUT = timedelta(seconds=SEEN_ORDERS_CACHE_TTL)
+DELETE_BATCH_SIZE = 1000
+PRICE_QUANTUM = Decimal("0.01")
+
 
 def _ensure_eve_types(type_ids, types_cache):
     """
@@ -32,39 +42,213 @@ def _ensure_eve_types(type_ids, types_cache):
     return types_cache
 
 
-def clear_structure_sell_orders_for_location(
-    location_id: int, task_uid: str
-) -> int:
+def start_structure_sell_orders_sync(
+    location_id: int, task_uid: str, total_pages: int
+) -> EveMarketItemOrderSync:
+    """Record the start of a structure order sync run of total_pages pages."""
+    return EveMarketItemOrderSync.objects.create(
+        location_id=location_id, task_uid=task_uid, total_pages=total_pages
+    )
+
+
+def _seen_orders_cache_key(task_uid: str, page: int) -> str:
+    return f"market:structure_orders:{task_uid}:page:{page}"
+
+
+def _record_page_result(
+    task_uid: str,
+    page: int,
+    order_ids: list[int] | None,
+    inserted: int = 0,
+    updated: int = 0,
+) -> bool:
     """
-    Delete EveMarketItemOrder rows for the given location that were not
-    imported by the given task_uid (i.e. from previous runs or other tasks).
-    Returns the number deleted.
+    Add one page's counts to the sync run and remember which order_ids it
+    contained (order_ids None = page failed). Returns True for the call
+    that completes the last page of the run.
     """
-    qs = EveMarketItemOrder.objects.filter(location_id=location_id).filter(
-        Q(imported_by_task_uid__isnull=True)
-        | ~Q(imported_by_task_uid=task_uid)
+    if order_ids is not None:
+        cache.set(
+            _seen_orders_cache_key(task_uid, page),
+            order_ids,
+            timeout=SEEN_ORDERS_CACHE_TTL,
+        )
+    EveMarketItemOrderSync.objects.filter(task_uid=task_uid).update(
+        pages_done=F("pages_done") + 1,
+        pages_failed=F("pages_failed") + (1 if order_ids is None else 0),
+        inserted=F("inserted") + inserted,
+        updated=F("updated") + updated,
+    )
+    return EveMarketItemOrderSync.objects.filter(
+        task_uid=task_uid,
+        pages_done__gte=F("total_pages"),
+        completed_at__isnull=True,
+    ).exists()
+
+
+def finish_structure_sell_orders_sync(task_uid: str) -> int:
+    """
+    Delete orders at the run's location that no page of the run returned
+    (filled, cancelled or expired), then mark the run complete. Nothing is
+    deleted if any page failed, so a partial fetch never drops live orders.
+    Returns the number of orders deleted.
+    """
+    # Claim completion so only one page task finalizes the run
+    now = timezone.now()
+    if not EveMarketItemOrderSync.objects.filter(
+        task_uid=task_uid, completed_at__isnull=True
+    ).update(completed_at=now):
+        return 0
+    sync = EveMarketItemOrderSync.objects.get(task_uid=task_uid)
+
+    page_keys = [
+        _seen_orders_cache_key(task_uid, page)
+        for page in range(1, sync.total_pages + 1)
+    ]
+    seen_pages = cache.get_many(page_keys)
+    cache.delete_many(page_keys)
+    if (
+        sync.pages_failed
+        or sync.pages_done < sync.total_pages
+        or len(seen_pages) < len(page_keys)
+    ):
+        logger.warning(
+            "Structure order sync incomplete, keeping existing orders: "
+            "location_id=%s pages_failed=%s pages_missing=%s task_uid=%s",
+            sync.location_id,
+            sync.pages_failed,
+            len(page_keys) - len(seen_pages),
+            task_uid[:8],
+        )
+        return 0
+
+    seen_order_ids = set()
+    for order_ids in seen_pages.values():
+        seen_order_ids.update(order_ids)
+    vanished_ids = [
+        pk
+        for pk, order_id in EveMarketItemOrder.objects.filter(
+            location_id=sync.location_id
+        ).values_list("pk", "order_id")
+        if order_id not in seen_order_ids
+    ]
+    deleted = 0
+    for i in range(0, len(vanished_ids), DELETE_BATCH_SIZE):
+        batch_deleted, _ = EveMarketItemOrder.objects.filter(
+            pk__in=vanished_ids[i : i + DELETE_BATCH_SIZE]
+        ).delete()
+        deleted += batch_deleted
+    EveMarketItemOrderSync.objects.filter(pk=sync.pk).update(deleted=deleted)
+
+    logger.info(
+        "Structure order sync complete: location_id=%s pages=%s "
+        "inserted=%s updated=%s deleted=%s task_uid=%s",
+        sync.location_id,
+        sync.total_pages,
+        sync.inserted,
+        sync.updated,
+        deleted,
+        task_uid[:8],
     )
-    deleted, _ = qs.delete()
     return deleted
 
 
-def process_structure_sell_orders_page(
+def close_stale_structure_sell_orders_syncs() -> int:
+    """
+    Close runs that never completed (a page task died without recording
+    its page) once SYNC_RUN_TIMEOUT has passed, keeping existing orders.
+    Returns the number of runs closed.
+    """
+    stale = EveMarketItemOrderSync.objects.filter(
+        completed_at__isnull=True,
+        started_at__lt=timezone.now() - SYNC_RUN_TIMEOUT,
+    ).values_list("task_uid", flat=True)
+    closed = 0
+    for task_uid in stale:
+        finish_structure_sell_orders_sync(task_uid)
+        closed += 1
+    return closed
+
+
+def _diff_page_orders(
+    page_data: list[dict], location, page: int, task_uid: str, types_cache
+) -> tuple[list, list, list[int], int]:
+    """
+    Compare a page of ESI orders with stored orders by order_id. Returns
+    (to_create, to_update, order_ids, total_volume); unchanged orders are
+    neither created nor updated.
+    """
+    incoming = {}
+    for o in page_data:
+        order_id = o.get("order_id")
+        if order_id is None or o["type_id"] not in types_cache:
+            continue
+        incoming[order_id] = o
+
+    existing = {
+        row.order_id: row
+        for row in EveMarketItemOrder.objects.filter(
+            order_id__in=incoming.keys()
+        ).only("pk", "order_id", "price", "quantity")
+    }
+
+    to_create = []
+    to_update = []
+    total_volume = 0
+    for order_id, o in incoming.items():
+        price = Decimal(str(o["price"])).quantize(PRICE_QUANTUM)
+        quantity = int(o.get("volume_remain", o.get("volume_total", 0)))
+        total_volume += quantity
+        row = existing.get(order_id)
+        if row is None:
+            to_create.append(
+                EveMarketItemOrder(
+                    order_id=order_id,
+                    item_id=o["type_id"],
+                    location=location,
+                    price=price,
+                    quantity=quantity,
+                    is_buy_order=bool(o.get("is_buy_order", False)),
+                    issuer_external_id=o.get("issuer"),
+                    imported_by_task_uid=task_uid,
+                    imported_page=page,
+                )
+            )
+        elif row.price != price or row.quantity != quantity:
+            row.price = price
+            row.quantity = quantity
+            row.imported_by_task_uid = task_uid
+            row.imported_page = page
+            to_update.append(row)
+    return to_create, to_update, list(incoming.keys()), total_volume
+
+
+def _insert_new_orders(to_create: list, task_uid: str, page: int) -> int:
+    """
+    Insert new orders, skipping order_ids another page task inserted
+    first. Returns the number of rows this page actually inserted.
+    """
+    EveMarketItemOrder.objects.bulk_create(to_create, ignore_conflicts=True)
+    return EveMarketItemOrder.objects.filter(
+        order_id__in=[order.order_id for order in to_create],
+        imported_by_task_uid=task_uid,
+        imported_page=page,
+    ).count()
+
+
+def _sync_structure_orders_page(
     character_id: int, location_id: int, page: int, task_uid: str
-) -> tuple[int, int]:
+) -> tuple[list[int], int, int, int] | None:
     """
-    Fetch a single page of structure market orders and insert sell orders
-    for that page with imported_by_task_uid=task_uid. Before inserting,
-    deletes existing orders for the same (location, items on this page)
-    that were not imported by this task_uid. Uses ignore_conflicts so
-    parallel page tasks do not raise on duplicate order_id. Returns
-    (orders_attempted, total_volume) for the batch.
+    Fetch and sync one page. Returns (order_ids, inserted, updated,
+    total_volume), or None if the page could not be fetched.
     """
     location = EveLocation.objects.filter(location_id=location_id).first()
     if not location:
         logger.warning(
             "Location %s not found, skipping page %s", location_id, page
         )
-        return 0, 0
+        return None
 
     client = EsiClient(character_id)
     response = client.get_structure_market_orders_page(location_id, page)
@@ -75,59 +259,69 @@ def process_structure_sell_orders_page(
             page,
             response.response_code,
         )
-        return 0, 0
+        return None
 
     page_data = response.results() or []
-    if not page_data:
-        return 0, 0
-
-    type_ids_page = {o["type_id"] for o in page_data}
     types_cache = {}
-    _ensure_eve_types(type_ids_page, types_cache)
-
-    to_create = []
-    for o in page_data:
-        if o["type_id"] not in types_cache:
-            continue
-        order_id = o.get("order_id")
-        to_create.append(
-            EveMarketItemOrder(
-                order_id=order_id,
-                item_id=o["type_id"],
-                location=location,
-                price=Decimal(str(o["price"])),
-                quantity=int(o.get("volume_remain", o.get("volume_total", 0))),
-                is_buy_order=bool(o.get("is_buy_order", False)),
-                issuer_external_id=o.get("issuer"),
-                imported_by_task_uid=task_uid,
-                imported_page=page,
-            )
-        )
-
-    if not to_create:
-        return 0, 0
+    _ensure_eve_types({o["type_id"] for o in page_data}, types_cache)
+    to_create, to_update, order_ids, total_volume = _diff_page_orders(
+        page_data, location, page, task_uid, types_cache
+    )
 
-    type_ids_inserting = {obj.item_id for obj in to_create}
+    inserted = 0
     with transaction.atomic():
-        EveMarketItemOrder.objects.filter(
-            location_id=location_id,
-            item_id__in=type_ids_inserting,
-        ).filter(
-            Q(imported_by_task_uid__isnull=True)
-            | ~Q(imported_by_task_uid=task_uid)
-        ).delete()
-        EveMarketItemOrder.objects.bulk_create(
-            to_create, ignore_conflicts=True
-        )
+        if to_update:
+            EveMarketItemOrder.objects.bulk_update(
+                to_update,
+                ["price", "quantity", "imported_by_task_uid", "imported_page"],
+            )
+        if to_create:
+            inserted = _insert_new_orders(to_create, task_uid, page)
 
-    total_volume = sum(obj.quantity for obj in to_create)
     logger.info(
         "Structure market orders page complete: location_id=%s page=%s "
-        "orders_created=%s total_volume=%s task_uid=%s",
+        "orders=%s inserted=%s updated=%s total_volume=%s task_uid=%s",
         location_id,
         page,
-        len(to_create),
+        len(order_ids),
+        inserted,
+        len(to_update),
         total_volume,
         task_uid[:8] if task_uid else None,
     )
-    return len(to_create), total_volume
+    return order_ids, inserted, len(to_update), total_volume
+
+
+def process_structure_sell_orders_page(
+    character_id: int, location_id: int, page: int, task_uid: str
+) -> tuple[int, int]:
+    """
+    Fetch a single page of structure market orders and sync it into
+    EveMarketItemOrder by order_id: new orders are inserted, orders whose
+    price or quantity changed are updated and unchanged orders are left
+    alone. The page's order_ids and counts are recorded on the sync run;
+    the task completing the last page deletes vanished orders (see
+    finish_structure_sell_orders_sync). A page that fails or raises is
+    recorded as failed, so the run still completes. Uses ignore_conflicts
+    so parallel page tasks do not raise on duplicate order_id. Returns
+    (orders_seen, total_volume) for the page.
+    """
+    try:
+        result = _sync_structure_orders_page(
+            character_id, location_id, page, task_uid
+        )
+    except Exception:
+        _finish_page(task_uid, page, None)
+        raise
+    if result is None:
+        _finish_page(task_uid, page, None)
+        return 0, 0
+
+    order_ids, inserted, updated, total_volume = result
+    _finish_page(task_uid, page, order_ids, inserted, updated)
+    return len(order_ids), total_volume
+
+
+def _finish_page(task_uid: str, page: int, order_ids, *counts) -> None:
+    if _record_page_result(task_uid, page, order_ids, *counts):
+        finish_structure_sell_orders_sync(task_uid)
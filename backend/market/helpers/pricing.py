@@ -13,7 +13,7 @@ JITA_REGION_ID = 10000002
 VOLUME_LOOKBACK_DAYS = 90
 
 
-def _baseline_region_id() -> int:
+def baseline_region_id() -> int:
     baseline = EveLocation.objects.filter(price_baseline=True).first()
     if baseline and baseline.region_id:
         return baseline.region_id
@@ -33,7 +33,7 @@ def get_prices_by_type_id(type_ids: list[int]) -> dict[int, int]:
     unique_ids = list({int(tid) for tid in type_ids})
     prices: dict[int, int] = {}
 
-    region_id = _baseline_region_id()
+    region_id = baseline_region_id()
 
     latest_date = (
         EveMarketItemHistory.objects.filter(
@@ -69,7 +69,7 @@ def get_volume_90d_by_type_id(type_ids: list[int]) -> dict[int, int]:
         return {}
 
     unique_ids = list({int(tid) for tid in type_ids})
-    region_id = _baseline_region_id()
+    region_id = baseline_region_id()
     cutoff = timezone.now().date() - timedelta(days=VOLUME_LOOKBACK_DAYS)
     rows = (
         EveMarketItemHistory.objects.filter(
@@ -1,4 +1,5 @@
 from collections import defaultdict
+from decimal import Decimal
 
 from django.contrib import admin
 from django.contrib.admin.views.main import PAGE_VAR, SEARCH_VAR
@@ -7,6 +8,7 @@ from django.utils.http import urlencode
 from eveuniverse.models import EveType
 
 from fittings.models import EveFittingRefit
+from market.helpers.location_price import DEPTH_5PCT, DEPTH_10PCT
 from market.helpers.price_viability import is_price_viable
 from market.helpers.pricing import (
     get_prices_by_type_id,
@@ -56,6 +58,25 @@ def _order_quantity_counts_as_reasonable(
     return is_price_viable(order_price, jita_sell_price)
 
 
+def _reasonable_depth_qty(location_price, jita_sell_price: int | None) -> int:
+    """
+    Within-reason listed stock from a location's aggregated order book
+    depth: the widest depth band whose top price still counts as
+    reasonable. Prices inside a band are not recorded, so this is a lower
+    bound on what per-order aggregation would count.
+    """
+    for band_pct, depth in (
+        (DEPTH_10PCT, location_price.sell_depth_10pct),
+        (DEPTH_5PCT, location_price.sell_depth_5pct),
+    ):
+        band_top = location_price.sell_price * Decimal(str(1 + band_pct))
+        if depth and _order_quantity_counts_as_reasonable(
+            band_top, jita_sell_price
+        ):
+            return depth
+    return 0
+
+
 def _aggregate_order_rows(
     order_rows: list[dict],
     jita_sell_by_type: dict[int, int],
@@ -441,13 +462,36 @@ def build_unified_sell_order_rows(  # noqa: C901
         **jita_for_orders,
         **(get_prices_by_type_id(extra_type_ids) if extra_type_ids else {}),
     }
-    location_sell_by_type = {
-        row.item_id: row.sell_price
-        for row in EveMarketItemLocationPrice.objects.filter(
+    location_prices = list(
+        EveMarketItemLocationPrice.objects.filter(
             location=location, item_id__in=all_type_ids
+        ).only(
+            "item_id",
+            "sell_price",
+            "sell_volume",
+            "sell_depth_5pct",
+            "sell_depth_10pct",
         )
+    )
+    location_sell_by_type = {
+        row.item_id: row.sell_price
+        for row in location_prices
         if row.sell_price is not None
     }
+    # Types with no synced orders here (e.g. NPC stations) fall back to the
+    # order book depth recorded with the location price.
+    location_depth_by_type = {
+        row.item_id: row for row in location_prices if row.sell_volume
+    }
+    for item_name, type_id in type_ids_by_name.items():
+        depth = location_depth_by_type.get(type_id)
+        if depth is None or type_id in current_by_type:
+            continue
+        row = rows_by_name[item_name]
+        row["current_qty"] = depth.sell_volume
+        row["reasonable_qty"] = _reasonable_depth_qty(
+            depth, jita_sell_by_type.get(type_id)
+        )
     volume_90d_by_type = (
         get_volume_90d_by_type_id(all_type_ids) if all_type_ids else {}
     )
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("market", "0030_remove_responsibilities"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="evemarketitemlocationprice",
+            name="sell_depth_10pct",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Sell volume priced within 10% of sell_price.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="evemarketitemlocationprice",
+            name="sell_depth_5pct",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Sell volume priced within 5% of sell_price.",
+            ),
+        ),
+        migrations.AddField(
+            model_name="evemarketitemlocationprice",
+            name="sell_order_count",
+            field=models.IntegerField(
+                default=0, help_text="Number of sell orders at this location."
+            ),
+        ),
+        migrations.AddField(
+            model_name="evemarketitemlocationprice",
+            name="sell_volume",
+            field=models.BigIntegerField(
+                default=0,
+                help_text="Total volume remaining across all sell orders.",
+            ),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 18:23
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveonline", "0097_industry_job_status_blueprint_id_idx"),
+        ("market", "0031_location_price_depth"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EveMarketItemOrderSync",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("task_uid", models.CharField(max_length=64, unique=True)),
+                ("total_pages", models.PositiveIntegerField()),
+                ("pages_done", models.PositiveIntegerField(default=0)),
+                (
+                    "pages_failed",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Pages that could not be fetched; vanished orders are not deleted when non-zero.",
+                    ),
+                ),
+                ("inserted", models.PositiveIntegerField(default=0)),
+                ("updated", models.PositiveIntegerField(default=0)),
+                ("deleted", models.PositiveIntegerField(default=0)),
+                (
+                    "started_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("completed_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "location",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="market_order_syncs",
+                        to="eveonline.evelocation",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["-started_at"],
+            },
+        ),
+    ]
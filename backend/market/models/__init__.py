@@ -11,6 +11,7 @@ from market.models.item import (
     EveMarketFittingExpectation,
     EveMarketItemExpectation,
     EveMarketItemOrder,
+    EveMarketItemOrderSync,
     EveMarketItemTransaction,
     EveTypeWithSellOrders,
     _get_consumable_items,
@@ -29,6 +30,7 @@ __all__ = [
     "EveMarketItemHistory",
     "EveMarketItemLocationPrice",
     "EveMarketItemOrder",
+    "EveMarketItemOrderSync",
     "EveMarketItemTransaction",
     "EveTypeWithSellOrders",
     "_get_consumable_items",
@@ -168,6 +168,39 @@ class EveMarketItemOrder(models.Model):
         return str(f"{self.item.name} - {self.location.location_name}")
 
 
+class EveMarketItemOrderSync(models.Model):
+    """
+    One row per structure order sync run (task_uid) for a location: page
+    progress and how many orders were inserted, updated and deleted.
+    """
+
+    location = models.ForeignKey(
+        EveLocation,
+        on_delete=models.CASCADE,
+        related_name="market_order_syncs",
+    )
+    task_uid = models.CharField(max_length=64, unique=True)
+    total_pages = models.PositiveIntegerField()
+    pages_done = models.PositiveIntegerField(default=0)
+    pages_failed = models.PositiveIntegerField(
+        default=0,
+        help_text="Pages that could not be fetched; vanished orders are not deleted when non-zero.",
+    )
+    inserted = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    deleted = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(default=timezone.now)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        return (
+            f"{self.location.location_name} {self.started_at:%Y-%m-%d %H:%M}"
+        )
+
+
 class EveMarketItemTransaction(models.Model):
     item = models.ForeignKey(EveType, on_delete=models.CASCADE)
     location = models.ForeignKey(EveLocation, on_delete=models.RESTRICT)
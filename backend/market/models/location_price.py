@@ -2,7 +2,8 @@
 Store derived sell, buy, and split prices per (location, eve type).
 
 Computed from EveMarketItemOrder: lowest sell price, highest buy price,
-and average of the two (split) for locations we fetch orders for.
+and average of the two (split) for locations we fetch orders for, plus
+sell-side depth (volume, order count, volume near the best price).
 """
 
 from django.db import models
@@ -49,6 +50,22 @@ class EveMarketItemLocationPrice(models.Model):
         blank=True,
         help_text="(sell_price + buy_price) / 2; null when buy_price is null.",
     )
+    sell_volume = models.BigIntegerField(
+        default=0,
+        help_text="Total volume remaining across all sell orders.",
+    )
+    sell_order_count = models.IntegerField(
+        default=0,
+        help_text="Number of sell orders at this location.",
+    )
+    sell_depth_5pct = models.BigIntegerField(
+        default=0,
+        help_text="Sell volume priced within 5% of sell_price.",
+    )
+    sell_depth_10pct = models.BigIntegerField(
+        default=0,
+        help_text="Sell volume priced within 10% of sell_price.",
+    )
     updated_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
@@ -1,10 +1,12 @@
 import logging
+import time
 import uuid
+from contextlib import contextmanager
 
 from django.core.cache import cache
 from django.db.models import Q
 from django.utils import timezone
-from celery import chain, group
+from celery import group
 
 from app.celery import app
 from eveonline.client import EsiClient
@@ -14,13 +16,14 @@ from eveonline.models import (
     EveLocation,
 )
 from market.helpers import (
-    clear_structure_sell_orders_for_location,
+    close_stale_structure_sell_orders_syncs,
     create_or_update_contract,
     create_or_update_contract_from_db_contract,
-    fetch_and_update_market_location_prices,
     get_character_with_structure_markets_scope,
     known_contract_issuer_ids,
     process_structure_sell_orders_page,
+    start_structure_sell_orders_sync,
+    sweep_market_location_prices,
     update_completed_contracts,
     update_expired_contracts,
     update_region_market_history_for_type,
@@ -40,6 +43,39 @@ CONTRACT_ITEMS_FETCH_CAP = 60
 CONTRACT_ITEMS_FETCH_INTERVAL_SECONDS = 6
 CONTRACT_ITEMS_SCHEDULE_CACHE_TTL = 3600
 
+# Per-type location price requests are coalesced into one delayed sweep
+PENDING_LOCATION_PRICE_TYPES_CACHE_KEY = "market:location_prices:pending_types"
+PENDING_LOCATION_PRICE_SWEEP_CACHE_KEY = (
+    "market:location_prices:sweep_scheduled"
+)
+PENDING_LOCATION_PRICE_SWEEP_DELAY_SECONDS = 60
+PENDING_LOCATION_PRICE_TYPES_TTL = 6 * 3600
+PENDING_LOCATION_PRICE_LOCK_KEY = "market:location_prices:pending_lock"
+PENDING_LOCATION_PRICE_LOCK_SECONDS = 10
+PENDING_LOCATION_PRICE_LOCK_POLL_SECONDS = 0.05
+
+
+@contextmanager
+def _pending_location_price_types_lock():
+    """
+    Serialize read-modify-writes of the pending type list across workers.
+    Waits at most one lock lifetime, after which a crashed holder's lock
+    has expired.
+    """
+    deadline = time.monotonic() + PENDING_LOCATION_PRICE_LOCK_SECONDS
+    while not cache.add(
+        PENDING_LOCATION_PRICE_LOCK_KEY,
+        1,
+        PENDING_LOCATION_PRICE_LOCK_SECONDS,
+    ):
+        if time.monotonic() >= deadline:
+            raise TimeoutError("Pending location price types lock is busy")
+        time.sleep(PENDING_LOCATION_PRICE_LOCK_POLL_SECONDS)
+    try:
+        yield
+    finally:
+        cache.delete(PENDING_LOCATION_PRICE_LOCK_KEY)
+
 
 @app.task()
 def expire_unknown_eve_market_contracts():
@@ -59,41 +95,26 @@ def expire_unknown_eve_market_contracts():
     logger.info("Expired %s market contracts with unknown issuers", updated)
 
 
-@app.task()
-def clear_structure_sell_orders_for_location_task(
-    location_id: int, task_uid: str
-) -> int:
-    """Celery task: delete sell orders for a structure that were not imported by task_uid."""
-    return clear_structure_sell_orders_for_location(location_id, task_uid)
-
-
 @app.task()
 def process_structure_sell_orders_page_task(
     character_id: int, location_id: int, page: int, task_uid: str
 ) -> tuple[int, int]:
-    """Celery task: fetch one page of structure market orders and insert sell orders."""
-    orders_created, total_volume = process_structure_sell_orders_page(
+    """Celery task: fetch one page of structure market orders and sync them by order_id."""
+    orders_seen, total_volume = process_structure_sell_orders_page(
         character_id, location_id, page, task_uid
     )
     logger.info(
         "Structure sell orders page task complete: location_id=%s page=%s "
-        "orders_created=%s total_volume=%s",
+        "orders_seen=%s total_volume=%s",
         location_id,
         page,
-        orders_created,
+        orders_seen,
         total_volume,
     )
-    return orders_created, total_volume
+    return orders_seen, total_volume
 
 
-@app.task()
-def fetch_market_location_prices():
-    """
-    For each market-active location, fetch market orders from ESI (structure
-    or region API per location.is_structure), compute lowest sell / highest
-    buy (station-range) / split per item, and update EveMarketItemLocationPrice.
-    Does not touch EveMarketItemOrder.
-    """
+def _market_location_sweep_inputs() -> tuple[list, int | None]:
     locations_list = list(EveLocation.objects.filter(market_active=True))
     has_structure = any(loc.is_structure for loc in locations_list)
     character_id = (
@@ -103,19 +124,24 @@ def fetch_market_location_prices():
         logger.warning(
             "No character with structure market scope; structure locations will be skipped"
         )
-    total = 0
-    for location in locations_list:
-        try:
-            n = fetch_and_update_market_location_prices(
-                character_id, location.location_id
-            )
-            total += n
-        except Exception as e:
-            logger.exception(
-                "Failed to update location prices for %s: %s",
-                location.location_name,
-                e,
-            )
+    return locations_list, character_id
+
+
+@app.task()
+def fetch_market_location_prices():
+    """
+    For each market-active location, fetch market orders from ESI (structure
+    or region API per location.is_structure), compute lowest sell / highest
+    buy (station-range) / split per item, and update EveMarketItemLocationPrice.
+    Each region's order book is downloaded once for all its stations.
+    Does not touch EveMarketItemOrder.
+    """
+    # A full sweep covers every type, so drop any coalesced per-type requests
+    with _pending_location_price_types_lock():
+        cache.delete(PENDING_LOCATION_PRICE_TYPES_CACHE_KEY)
+
+    locations_list, character_id = _market_location_sweep_inputs()
+    total = sweep_market_location_prices(character_id, locations_list)
     logger.info(
         "fetch_market_location_prices complete: %s location(s), %s price row(s)",
         len(locations_list),
@@ -126,76 +152,58 @@ def fetch_market_location_prices():
 @app.task()
 def fetch_market_location_prices_for_type(type_id: int) -> int:
     """
-    For each market-active location, fetch market orders for the given type_id
-    from ESI and update EveMarketItemLocationPrice for that item at that location.
-    Returns total price rows updated.
+    Request a location price refresh for the given type_id. Requests are
+    coalesced: the first one schedules fetch_pending_market_location_prices
+    after a short delay, which refreshes every type requested meanwhile for
+    all market-active locations, using type-filtered region queries when
+    only a few types are pending.
+    Returns the number of types now pending.
     """
-    logger.info(
-        "fetch_market_location_prices_for_type type_id=%s — starting",
-        type_id,
-    )
-    locations_list = list(EveLocation.objects.filter(market_active=True))
-    if not locations_list:
-        logger.info(
-            "fetch_market_location_prices_for_type type_id=%s — no market-active locations, skipping",
-            type_id,
+    with _pending_location_price_types_lock():
+        pending = set(cache.get(PENDING_LOCATION_PRICE_TYPES_CACHE_KEY) or [])
+        pending.add(type_id)
+        cache.set(
+            PENDING_LOCATION_PRICE_TYPES_CACHE_KEY,
+            sorted(pending),
+            timeout=PENDING_LOCATION_PRICE_TYPES_TTL,
+        )
+    if cache.add(
+        PENDING_LOCATION_PRICE_SWEEP_CACHE_KEY,
+        "1",
+        timeout=PENDING_LOCATION_PRICE_SWEEP_DELAY_SECONDS,
+    ):
+        fetch_pending_market_location_prices.apply_async(
+            countdown=PENDING_LOCATION_PRICE_SWEEP_DELAY_SECONDS
         )
-        return 0
     logger.info(
-        "fetch_market_location_prices_for_type type_id=%s — loaded %s market-active location(s): %s",
+        "fetch_market_location_prices_for_type type_id=%s — %s type(s) pending",
         type_id,
-        len(locations_list),
-        [
-            f"{loc.location_id}({loc.location_name}, structure={loc.is_structure})"
-            for loc in locations_list
-        ],
+        len(pending),
     )
-    has_structure = any(loc.is_structure for loc in locations_list)
-    character_id = (
-        get_character_with_structure_markets_scope() if has_structure else None
+    return len(pending)
+
+
+@app.task()
+def fetch_pending_market_location_prices() -> int:
+    """
+    Refresh location prices for every type requested through
+    fetch_market_location_prices_for_type since the last run.
+    Returns total price rows updated.
+    """
+    cache.delete(PENDING_LOCATION_PRICE_SWEEP_CACHE_KEY)
+    with _pending_location_price_types_lock():
+        type_ids = cache.get(PENDING_LOCATION_PRICE_TYPES_CACHE_KEY) or []
+        cache.delete(PENDING_LOCATION_PRICE_TYPES_CACHE_KEY)
+    if not type_ids:
+        return 0
+
+    locations_list, character_id = _market_location_sweep_inputs()
+    total = sweep_market_location_prices(
+        character_id, locations_list, type_ids=type_ids
     )
     logger.info(
-        "fetch_market_location_prices_for_type type_id=%s — has_structure=%s character_id=%s",
-        type_id,
-        has_structure,
-        character_id,
-    )
-    if has_structure and not character_id:
-        logger.warning(
-            "fetch_market_location_prices_for_type type_id=%s — no character with structure scope; structure locations will be skipped",
-            type_id,
-        )
-    total = 0
-    for idx, location in enumerate(locations_list):
-        logger.info(
-            "fetch_market_location_prices_for_type type_id=%s — processing location %s/%s location_id=%s %s",
-            type_id,
-            idx + 1,
-            len(locations_list),
-            location.location_id,
-            location.location_name,
-        )
-        try:
-            n = fetch_and_update_market_location_prices(
-                character_id, location.location_id, type_id=type_id
-            )
-            total += n
-            logger.info(
-                "fetch_market_location_prices_for_type type_id=%s location_id=%s — updated %s price row(s)",
-                type_id,
-                location.location_id,
-                n,
-            )
-        except Exception as e:
-            logger.exception(
-                "fetch_market_location_prices_for_type type_id=%s location_id=%s — %s",
-                type_id,
-                location.location_id,
-                e,
-            )
-    logger.info(
-        "fetch_market_location_prices_for_type type_id=%s — %s location(s), %s price row(s)",
-        type_id,
+        "fetch_pending_market_location_prices: type_ids=%s — %s location(s), %s price row(s)",
+        type_ids,
         len(locations_list),
         total,
     )
@@ -204,16 +212,17 @@ def fetch_market_location_prices_for_type(type_id: int) -> int:
 
 @app.task()
 def spawn_structure_sell_orders_pages(
-    _clear_result,  # pylint: disable=invalid-name
     character_id: int,
     location_id: int,
     total_pages: int,
     task_uid: str,
 ) -> None:
     """
-    Spawn a task per page for a structure (chained after clear). Ignores
-    _clear_result; runs the group of page tasks with the same task_uid.
+    Start a sync run for a structure and spawn a task per page with the
+    same task_uid. The page task that completes the run deletes orders no
+    page returned.
     """
+    start_structure_sell_orders_sync(location_id, task_uid, total_pages)
     page_tasks = group(
         process_structure_sell_orders_page_task.s(
             character_id, location_id, page, task_uid
@@ -227,13 +236,18 @@ def spawn_structure_sell_orders_pages(
 def fetch_structure_sell_orders():
     """
     Fetch structure market sell orders for all market-active locations. Gets
-    total pages from ESI (X-Pages), then for each structure fires: clear
-    orders, then one task per page to fetch and insert (structure + page).
+    total pages from ESI (X-Pages), then for each structure fires one task
+    per page that diffs the page against stored orders by order_id; orders
+    missing from every page are deleted once all pages are in.
     Requires a character with esi-markets.structure_markets.v1 and docking
     access to each structure.
     """
     logger.info("Starting fetch_structure_sell_orders")
 
+    closed = close_stale_structure_sell_orders_syncs()
+    if closed:
+        logger.warning("Closed %s stale structure order sync run(s)", closed)
+
     character_id = get_character_with_structure_markets_scope()
     if not character_id:
         logger.warning(
@@ -287,17 +301,12 @@ def fetch_structure_sell_orders():
             continue
 
         task_uid = uuid.uuid4().hex
-        chain(
-            clear_structure_sell_orders_for_location_task.si(
-                location.location_id, task_uid
-            ),
-            spawn_structure_sell_orders_pages.s(
-                character_id,
-                location.location_id,
-                total_pages,
-                task_uid,
-            ),
-        ).apply_async()
+        spawn_structure_sell_orders_pages.delay(
+            character_id,
+            location.location_id,
+            total_pages,
+            task_uid,
+        )
         scheduled += 1
         logger.info(
             "Scheduled location %s: %s page(s)",
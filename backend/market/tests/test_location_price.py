@@ -0,0 +1,292 @@
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from eveuniverse.models import EveCategory, EveGroup, EveType
+
+from app.test import TestCase
+from eveonline.esi_pages import EsiPagesNotModified
+from eveonline.models import EveLocation
+from market.helpers.location_price import (
+    OrderBookAggregate,
+    sweep_market_location_prices,
+)
+from market.models import EveMarketItemLocationPrice
+from market.tasks import (
+    fetch_market_location_prices,
+    fetch_market_location_prices_for_type,
+)
+
+REGION_A = 10000030
+REGION_B = 10000042
+
+
+def _make_eve_type(type_id, name):
+    cat, _ = EveCategory.objects.get_or_create(
+        id=1, defaults={"name": "Module", "published": True}
+    )
+    grp, _ = EveGroup.objects.get_or_create(
+        id=1,
+        defaults={"name": "General", "published": True, "eve_category": cat},
+    )
+    return EveType.objects.create(
+        id=type_id, name=name, published=True, eve_group=grp
+    )
+
+
+def _make_station(location_id, region_id):
+    return EveLocation.objects.create(
+        location_id=location_id,
+        location_name=f"Station {location_id}",
+        solar_system_id=30000001,
+        solar_system_name="Sys",
+        short_name=str(location_id),
+        region_id=region_id,
+        market_active=True,
+    )
+
+
+def _order(
+    location_id,
+    type_id,
+    price,
+    is_buy=False,
+    order_range="region",
+    volume=1,
+):
+    return {
+        "location_id": location_id,
+        "type_id": type_id,
+        "price": price,
+        "is_buy_order": is_buy,
+        "range": order_range,
+        "volume_remain": volume,
+    }
+
+
+class OrderBookAggregateTestCase(SimpleTestCase):
+    """Columnar order book accumulator"""
+
+    def test_prices_and_depth(self):
+        book = OrderBookAggregate()
+        book.add_orders(
+            [
+                _order(1, 34, 100.0, volume=10),
+                _order(1, 34, 104.0, volume=5),
+                _order(1, 34, 109.99, volume=7),
+                _order(1, 34, 150.0, volume=100),
+                _order(1, 34, 90.0, True, "station"),
+                _order(1, 34, 95.0, True, "solarsystem"),
+                _order(2, 34, 1.0, volume=1000),
+            ],
+            location_id=1,
+        )
+        book.add_orders([_order(1, 35, 3.3), _order(1, 34, 91.5, True, "")])
+
+        stats = book.type_stats()
+
+        self.assertEqual({34, 35}, set(stats))
+        tritanium = stats[34]
+        self.assertEqual(Decimal("100.0"), tritanium.sell_price)
+        self.assertEqual(Decimal("91.5"), tritanium.buy_price)
+        self.assertEqual(122, tritanium.sell_volume)
+        self.assertEqual(4, tritanium.sell_order_count)
+        self.assertEqual(15, tritanium.sell_depth_5pct)
+        self.assertEqual(22, tritanium.sell_depth_10pct)
+        self.assertEqual(Decimal("3.3"), stats[35].sell_price)
+        self.assertIsNone(stats[35].buy_price)
+
+    def test_buy_only_types_are_skipped(self):
+        book = OrderBookAggregate()
+        book.add_orders([_order(1, 34, 5.0, True, "station")])
+
+        self.assertEqual({}, book.type_stats())
+
+
+class RegionSweepTestCase(TestCase):
+    """Region order books are fetched once and fanned out per location"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        _make_eve_type(34, "Tritanium")
+        _make_eve_type(35, "Pyerite")
+        self.station_1 = _make_station(60000001, REGION_A)
+        self.station_2 = _make_station(60000002, REGION_A)
+        self.station_3 = _make_station(60000003, REGION_B)
+
+    def region_pages(self, region_id, type_id=None, etags=None):
+        orders = {
+            REGION_A: [
+                _order(60000001, 34, 5.0),
+                _order(60000001, 34, 4.5),
+                _order(60000001, 34, 4.0, True, "station"),
+                _order(60000001, 34, 4.4, True, "region"),
+                _order(60000002, 34, 6.0),
+                _order(60000002, 35, 9.0),
+                _order(60009999, 34, 1.0),
+            ],
+            REGION_B: [_order(60000003, 35, 11.0)],
+        }[region_id]
+        if type_id is not None:
+            orders = [o for o in orders if o["type_id"] == type_id]
+        yield orders[:3]
+        yield orders[3:]
+        if etags is not None:
+            etags.fetched = ['"1"', '"2"']
+
+    def price(self, location, type_id):
+        return EveMarketItemLocationPrice.objects.get(
+            location_id=location.location_id, item_id=type_id
+        )
+
+    def test_sweep_fetches_each_region_once(self):
+        with patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=self.region_pages,
+        ) as pages_mock:
+            written = sweep_market_location_prices(
+                None, [self.station_1, self.station_2, self.station_3]
+            )
+
+        self.assertEqual(2, pages_mock.call_count)
+        self.assertEqual(4, written)
+        price = self.price(self.station_1, 34)
+        self.assertEqual(Decimal("4.5"), price.sell_price)
+        self.assertEqual(Decimal("4"), price.buy_price)
+        self.assertEqual(2, price.sell_order_count)
+        self.assertEqual(2, price.sell_volume)
+        self.assertEqual(1, price.sell_depth_10pct)
+        self.assertEqual(
+            Decimal("6"), self.price(self.station_2, 34).sell_price
+        )
+        self.assertEqual(
+            Decimal("9"), self.price(self.station_2, 35).sell_price
+        )
+        self.assertEqual(
+            Decimal("11"), self.price(self.station_3, 35).sell_price
+        )
+
+    def test_per_type_requests_coalesce_into_one_sweep(self):
+        cache.add("market:location_prices:sweep_scheduled", "1")
+        fetch_market_location_prices_for_type(34)
+        fetch_market_location_prices_for_type(35)
+        cache.delete("market:location_prices:sweep_scheduled")
+
+        with patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=self.region_pages,
+        ) as pages_mock:
+            fetch_market_location_prices_for_type(34)
+
+        # A few pending types: one type-filtered query per type per region,
+        # shared by every station
+        self.assertEqual(4, pages_mock.call_count)
+        self.assertEqual(
+            [(REGION_A, 34), (REGION_A, 35), (REGION_B, 34), (REGION_B, 35)],
+            sorted(
+                (call.args[0], call.kwargs["type_id"])
+                for call in pages_mock.call_args_list
+            ),
+        )
+        self.assertEqual(
+            Decimal("9"), self.price(self.station_2, 35).sell_price
+        )
+        self.assertIsNone(cache.get("market:location_prices:pending_types"))
+
+    def test_type_sweep_only_replaces_requested_types(self):
+        with patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=self.region_pages,
+        ):
+            sweep_market_location_prices(None, [self.station_2])
+            EveMarketItemLocationPrice.objects.filter(
+                location_id=self.station_2.location_id
+            ).update(sell_price=Decimal("1"))
+
+            written = sweep_market_location_prices(
+                None, [self.station_2], type_ids=[35]
+            )
+
+        self.assertEqual(1, written)
+        self.assertEqual(
+            Decimal("9"), self.price(self.station_2, 35).sell_price
+        )
+        self.assertEqual(
+            Decimal("1"), self.price(self.station_2, 34).sell_price
+        )
+
+    def test_many_pending_types_share_one_order_book(self):
+        with patch(
+            "market.helpers.location_price.TYPE_FILTERED_FETCH_MAX_TYPES", 1
+        ), patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=self.region_pages,
+        ) as pages_mock:
+            sweep_market_location_prices(
+                None, [self.station_2], type_ids=[34, 35]
+            )
+
+        self.assertEqual(1, pages_mock.call_count)
+        self.assertIsNone(pages_mock.call_args.kwargs.get("type_id"))
+        self.assertEqual(
+            Decimal("9"), self.price(self.station_2, 35).sell_price
+        )
+
+    def test_full_sweep_clears_pending_types(self):
+        cache.add("market:location_prices:sweep_scheduled", "1")
+        fetch_market_location_prices_for_type(34)
+
+        with patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=self.region_pages,
+        ) as pages_mock:
+            fetch_market_location_prices()
+
+        self.assertEqual(2, pages_mock.call_count)
+        self.assertIsNone(cache.get("market:location_prices:pending_types"))
+
+    def full_sweep(self, locations):
+        with patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=self.region_pages,
+        ) as pages_mock:
+            sweep_market_location_prices(None, locations)
+        return pages_mock.call_args.kwargs["etags"]
+
+    def test_unchanged_order_book_keeps_prices(self):
+        etags = self.full_sweep([self.station_2])
+        self.assertEqual(['"1"', '"2"'], etags.saved())
+
+        def not_modified(region_id, type_id=None, etags=None):
+            raise EsiPagesNotModified(region_id)
+            yield  # pylint: disable=unreachable
+
+        with patch(
+            "market.helpers.location_price.get_region_market_orders_pages",
+            side_effect=not_modified,
+        ):
+            written = sweep_market_location_prices(None, [self.station_2])
+
+        self.assertEqual(0, written)
+        self.assertEqual(
+            Decimal("9"), self.price(self.station_2, 35).sell_price
+        )
+
+    def test_failed_persist_does_not_save_etags(self):
+        with patch(
+            "market.helpers.location_price._persist_location_prices",
+            side_effect=RuntimeError("db down"),
+        ):
+            etags = self.full_sweep([self.station_2])
+
+        self.assertIsNone(etags.saved())
+
+    def test_etags_are_scoped_to_region_locations(self):
+        etags = self.full_sweep([self.station_2])
+
+        self.assertNotEqual(
+            etags.cache_key,
+            self.full_sweep([self.station_1, self.station_2]).cache_key,
+        )
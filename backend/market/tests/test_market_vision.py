@@ -5,6 +5,7 @@ from unittest.mock import patch
 from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.cache import cache
 from django.test import RequestFactory
 from django.urls import reverse
 from django.utils import timezone
@@ -37,6 +38,11 @@ from market.helpers.contract_match import (
     score_contract_against_fitting,
 )
 from market.helpers.contract_stock import outstanding_stock_q
+from market.helpers.fitting_signatures import (
+    clear_fitting_signatures,
+    fitting_signature,
+    invalidate_fitting_signature,
+)
 from market.helpers.contracts import create_or_update_contract_from_db_contract
 from market.helpers.expectations_admin import (
     build_contract_expectation_rows,
@@ -82,6 +88,7 @@ from market.models import (
     EveMarketContractExpectation,
     EveMarketFittingExpectation,
     EveMarketItemExpectation,
+    EveMarketItemLocationPrice,
     EveMarketItemOrder,
     get_effective_item_expectations,
 )
@@ -268,6 +275,8 @@ class BuyOrderSyncTestCase(TestCase):
 
 class ContractMatchTestCase(TestCase):
     def setUp(self):
+        cache.clear()
+        clear_fitting_signatures()
         self.fitting = EveFitting.objects.create(
             name="[FL33T] Sabre",
             eft_format="""[Sabre, [FL33T] Sabre]
@@ -358,6 +367,57 @@ Hail S x2000
         self.assertEqual(1.0, score)
         self.assertTrue(missing)
 
+    def test_match_scores_all_candidates_in_one_pass(self):
+        candidates = [self.fitting] + [
+            EveFitting.objects.create(
+                name=f"[FL33T] Sabre v{i}",
+                eft_format=self.fitting.eft_format.replace(
+                    "125mm Gatling AutoCannon II\n", "", i % 5
+                ).replace("[FL33T] Sabre]", f"[FL33T] Sabre v{i}]", 1),
+                ship_id=22456,
+            )
+            for i in range(1, 20)
+        ]
+        contract_items = {22456: 1, 2605: 2, 2873: 5, 12608: 2000, 999: 1}
+
+        # Compile all signatures, then names of unknown contract items
+        with self.assertNumQueries(2):
+            fitting, score, missing, extra = match_contract_to_fitting(
+                contract_items, candidates, preferred_fitting=self.fitting
+            )
+        self.assertEqual(self.fitting, fitting)
+        self.assertEqual(1.0, score)
+        self.assertEqual([], missing)
+        self.assertEqual([("999", 1)], extra)
+
+        # Compiled signatures are reused
+        with self.assertNumQueries(1):
+            match_contract_to_fitting(contract_items, candidates)
+        clear_fitting_signatures()
+        with self.assertNumQueries(1):
+            match_contract_to_fitting(contract_items, candidates)
+
+    def test_signature_recompiles_when_fitting_changes(self):
+        contract_items = {22456: 1, 2605: 2, 2873: 5}
+        self.assertEqual(
+            1.0,
+            score_contract_against_fitting(contract_items, self.fitting)[0],
+        )
+
+        self.fitting.eft_format += "Nanofiber Internal Structure II\n"
+        self.fitting.save()
+        score, missing, _ = score_contract_against_fitting(
+            contract_items, self.fitting
+        )
+        self.assertEqual(8 / 9, score)
+        self.assertIn(("Nanofiber Internal Structure II", 1), missing)
+
+    def test_invalidate_fitting_signature(self):
+        fitting_signature(self.fitting)
+        invalidate_fitting_signature(self.fitting.pk)
+        with self.assertNumQueries(1):
+            fitting_signature(self.fitting)
+
     def test_highest_percent_wins_close_fits(self):
         """Named Buffer only keeps when items match Buffer (not Active)."""
         _make_typed_eve_type(37604, "Apostle", 6, "Ship")
@@ -837,6 +897,38 @@ class SellOrderRowsTestCase(TestCase):
         display = model_admin.display_current_qty(SellOrderListItem(fusion))
         self.assertEqual(display, "11 (100)")
 
+    def test_depth_fallback_counts_only_reasonable_bands(self):
+        EveMarketItemOrder.objects.filter(
+            location=self.location, item=self.ammo_type
+        ).delete()
+        EveMarketItemExpectation.objects.create(
+            item=self.ammo_type, location=self.location, quantity=100
+        )
+        EveMarketItemLocationPrice.objects.create(
+            location=self.location,
+            item=self.ammo_type,
+            sell_price=2_200_000,
+            sell_volume=100,
+            sell_order_count=3,
+            sell_depth_5pct=30,
+            sell_depth_10pct=60,
+        )
+        with patch(
+            "market.helpers.sell_orders.get_prices_by_type_id",
+            return_value={self.ammo_type.pk: 2_000_000},
+        ), patch(
+            "market.helpers.sell_orders.get_volume_90d_by_type_id",
+            return_value={},
+        ):
+            rows = {
+                row["item_name"]: row
+                for row in build_unified_sell_order_rows(self.location)
+            }
+        fusion = rows["Fusion S"]
+        self.assertEqual(fusion["current_qty"], 100)
+        # +10% band tops out above Jita +20%; the +5% band does not
+        self.assertEqual(fusion["reasonable_qty"], 30)
+
     def test_filter_source_and_markup_filters(self):
         rows = [
             {
@@ -0,0 +1,162 @@
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from app.test import TestCase
+from eveonline.client import EsiResponse
+from market.helpers.orders import (
+    SYNC_RUN_TIMEOUT,
+    _insert_new_orders,
+    close_stale_structure_sell_orders_syncs,
+    start_structure_sell_orders_sync,
+)
+from market.models import EveMarketItemOrder, EveMarketItemOrderSync
+from market.tasks import spawn_structure_sell_orders_pages
+from market.tests.test_location_price import _make_eve_type, _make_station
+
+STRUCTURE_ID = 1035466617946
+
+
+def _esi_order(order_id, price, volume, type_id=34):
+    return {
+        "order_id": order_id,
+        "type_id": type_id,
+        "price": price,
+        "volume_remain": volume,
+        "is_buy_order": False,
+    }
+
+
+class StructureOrderDiffSyncTestCase(TestCase):
+    """Structure orders are synced by order_id instead of re-inserted"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        _make_eve_type(34, "Tritanium")
+        _make_eve_type(35, "Pyerite")
+        self.location = _make_station(STRUCTURE_ID, 10000030)
+
+    def run_sync(self, pages):
+        """Run the page fan-out for the given {page: orders or None}."""
+
+        def get_page(location_id, page):
+            del location_id
+            if isinstance(pages[page], Exception):
+                raise pages[page]
+            if pages[page] is None:
+                return EsiResponse(response_code=502)
+            return EsiResponse(response_code=200, data=pages[page])
+
+        task_uid = uuid.uuid4().hex
+        with patch("market.helpers.orders.EsiClient") as client_mock:
+            client_mock.return_value.get_structure_market_orders_page.side_effect = (
+                get_page
+            )
+            spawn_structure_sell_orders_pages(
+                1, STRUCTURE_ID, len(pages), task_uid
+            )
+        return EveMarketItemOrderSync.objects.get(task_uid=task_uid)
+
+    def test_first_run_inserts_all_pages(self):
+        sync = self.run_sync(
+            {
+                1: [_esi_order(1, 5.0, 10), _esi_order(2, 6.0, 20)],
+                2: [_esi_order(3, 7.0, 30, type_id=35)],
+            }
+        )
+
+        self.assertIsNotNone(sync.completed_at)
+        self.assertEqual(
+            (3, 0, 0), (sync.inserted, sync.updated, sync.deleted)
+        )
+        self.assertEqual(
+            [1, 2, 3],
+            sorted(
+                EveMarketItemOrder.objects.values_list("order_id", flat=True)
+            ),
+        )
+
+    def test_second_run_applies_diff(self):
+        self.run_sync(
+            {
+                1: [_esi_order(1, 5.0, 10), _esi_order(2, 6.0, 20)],
+                2: [_esi_order(3, 7.0, 30)],
+            }
+        )
+        unchanged = EveMarketItemOrder.objects.get(order_id=1)
+
+        sync = self.run_sync(
+            {
+                1: [_esi_order(1, 5.0, 10), _esi_order(2, 5.5, 15)],
+                2: [_esi_order(4, 8.0, 40)],
+            }
+        )
+
+        self.assertEqual(
+            (1, 1, 1), (sync.inserted, sync.updated, sync.deleted)
+        )
+        orders = {o.order_id: o for o in EveMarketItemOrder.objects.all()}
+        self.assertEqual([1, 2, 4], sorted(orders))
+        self.assertEqual(unchanged.pk, orders[1].pk)
+        self.assertEqual(
+            unchanged.imported_by_task_uid, orders[1].imported_by_task_uid
+        )
+        self.assertEqual(Decimal("5.50"), orders[2].price)
+        self.assertEqual(15, orders[2].quantity)
+
+    def test_failed_page_keeps_existing_orders(self):
+        self.run_sync({1: [_esi_order(1, 5.0, 10)], 2: [_esi_order(2, 6, 1)]})
+
+        sync = self.run_sync({1: [_esi_order(1, 5.0, 10)], 2: None})
+
+        self.assertEqual(1, sync.pages_failed)
+        self.assertEqual(0, sync.deleted)
+        self.assertEqual(2, EveMarketItemOrder.objects.count())
+
+    def test_raising_page_still_completes_run(self):
+        self.run_sync({1: [_esi_order(1, 5.0, 10)], 2: [_esi_order(2, 6, 1)]})
+
+        with self.assertRaises(RuntimeError):
+            self.run_sync(
+                {1: [_esi_order(1, 5.0, 10)], 2: RuntimeError("boom")}
+            )
+
+        sync = EveMarketItemOrderSync.objects.get(pages_failed=1)
+        self.assertIsNotNone(sync.completed_at)
+        self.assertEqual(2, sync.pages_done)
+        self.assertEqual(2, EveMarketItemOrder.objects.count())
+
+    def test_inserted_count_skips_conflicting_orders(self):
+        self.run_sync({1: [_esi_order(1, 5.0, 10)]})
+        new_orders = [
+            EveMarketItemOrder(
+                order_id=order_id,
+                item_id=34,
+                location=self.location,
+                price=Decimal("5"),
+                quantity=1,
+                imported_by_task_uid="other",
+                imported_page=1,
+            )
+            for order_id in (1, 2)
+        ]
+
+        self.assertEqual(1, _insert_new_orders(new_orders, "other", 1))
+
+    def test_stale_run_is_closed_without_deleting(self):
+        self.run_sync({1: [_esi_order(1, 5.0, 10)]})
+        start_structure_sell_orders_sync(STRUCTURE_ID, "stale", 2)
+        EveMarketItemOrderSync.objects.filter(task_uid="stale").update(
+            started_at=timezone.now() - SYNC_RUN_TIMEOUT
+        )
+
+        self.assertEqual(1, close_stale_structure_sell_orders_syncs())
+
+        sync = EveMarketItemOrderSync.objects.get(task_uid="stale")
+        self.assertIsNotNone(sync.completed_at)
+        self.assertEqual(0, sync.deleted)
+        self.assertEqual(1, EveMarketItemOrder.objects.count())
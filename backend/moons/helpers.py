@@ -27,15 +27,19 @@ def get_metanox_yield():
     }
 
 
+# Metanox drill: 40% of an Athanor's 30k m3/hour, in units of 1000 m3
+METANOX_YIELD_FACTOR = decimal.Decimal(0.4 * 30000 / 1000)
+
+
 def calc_metanox_yield(distributions):
     """Returns the product yields from a Metanox drill using the specified moon ore distributions."""
     yields = {}
-    yield_factor = decimal.Decimal(0.4 * 30000 / 1000)
     for distr in distributions:
         yield_map = ore_yield_map[distr.ore]
         for product in yield_map:
-            yields[product] = (
-                distr.yield_percent * yield_factor * yield_map[product]
+            # Ores can share products (e.g. Pyerite), so accumulate
+            yields[product] = yields.get(product, 0) + (
+                distr.yield_percent * METANOX_YIELD_FACTOR * yield_map[product]
             )
 
     return yields
@@ -0,0 +1,205 @@
+"""
+Moon revenue engine.
+
+Every moon's distribution is loaded in one query into a moon x ore share
+matrix. It is multiplied by a fixed ore x product yield matrix (Metanox drill
+output per hour at 100% share) and by a product price vector, giving each
+moon's monthly revenue. Prices are a recent average of the baseline region's
+market history, falling back to EveMarketPrice, and are cached so the
+scheduled update and what-if rankings share them.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List, Mapping, Optional
+
+from django.core.cache import cache
+from django.db.models import Avg
+from django.utils import timezone
+from eveuniverse.models import EveMarketPrice, EveType
+
+from market.helpers.pricing import baseline_region_id
+from market.models import EveMarketItemHistory
+from moons.helpers import METANOX_YIELD_FACTOR
+from moons.models import EveMoon, EveMoonDistribution, ore_yield_map
+
+logger = logging.getLogger(__name__)
+
+HOURS_PER_MONTH = 24 * 30
+PRICE_LOOKBACK_DAYS = 7
+
+PRODUCT_PRICES_CACHE_KEY = "moons:product_prices"
+# EveMarketPrice refreshes every two hours, market history daily
+PRODUCT_PRICES_CACHE_SECONDS = 2 * 60 * 60
+
+ORES = tuple(ore_yield_map)
+PRODUCTS = tuple(
+    sorted(
+        {product for yields in ore_yield_map.values() for product in yields}
+    )
+)
+
+# ore x product: units per hour from a Metanox drill on a 100% moon
+YIELD_MATRIX = tuple(
+    tuple(
+        float(METANOX_YIELD_FACTOR) * ore_yield_map[ore].get(product, 0)
+        for product in PRODUCTS
+    )
+    for ore in ORES
+)
+
+
+def load_product_prices() -> Dict[str, Decimal]:
+    """
+    Average of the last PRICE_LOOKBACK_DAYS of daily averages in the price
+    baseline region, else EveMarketPrice.average_price. Products with
+    neither are left out.
+    """
+    type_ids = dict(
+        EveType.objects.filter(name__in=PRODUCTS).values_list("name", "id")
+    )
+    cutoff = timezone.now().date() - timedelta(days=PRICE_LOOKBACK_DAYS)
+    by_type_id = {
+        row["item_id"]: row["price"]
+        for row in EveMarketItemHistory.objects.filter(
+            region_id=baseline_region_id(),
+            item_id__in=type_ids.values(),
+            date__gte=cutoff,
+        )
+        .values("item_id")
+        .annotate(price=Avg("average"))
+    }
+    missing = [tid for tid in type_ids.values() if tid not in by_type_id]
+    if missing:
+        by_type_id.update(
+            EveMarketPrice.objects.filter(
+                eve_type_id__in=missing, average_price__isnull=False
+            ).values_list("eve_type_id", "average_price")
+        )
+
+    prices = {}
+    for product in PRODUCTS:
+        price = by_type_id.get(type_ids.get(product))
+        if price is None:
+            logger.warning("No price for moon product %s", product)
+            continue
+        prices[product] = Decimal(str(price))
+    return prices
+
+
+def product_prices(refresh: bool = False) -> Dict[str, Decimal]:
+    """Cached product prices by name."""
+    prices = None if refresh else cache.get(PRODUCT_PRICES_CACHE_KEY)
+    if prices is None:
+        prices = load_product_prices()
+        cache.set(
+            PRODUCT_PRICES_CACHE_KEY, prices, PRODUCT_PRICES_CACHE_SECONDS
+        )
+    return prices
+
+
+def ore_values(prices: Mapping[str, Decimal]) -> List[float]:
+    """Monthly ISK per ore at 100% share: YIELD_MATRIX x price vector."""
+    vector = [float(prices.get(product) or 0) for product in PRODUCTS]
+    return [
+        HOURS_PER_MONTH * sum(y * p for y, p in zip(row, vector) if y)
+        for row in YIELD_MATRIX
+    ]
+
+
+def load_share_matrix(moon_ids=None) -> Dict[int, List[float]]:
+    """moon id -> ore shares (ORES order), from one distribution query."""
+    ore_index = {ore: column for column, ore in enumerate(ORES)}
+    distributions = EveMoonDistribution.objects.all()
+    if moon_ids is not None:
+        distributions = distributions.filter(moon_id__in=moon_ids)
+    matrix: Dict[int, List[float]] = {}
+    for moon_id, ore, share in distributions.values_list(
+        "moon_id", "ore", "yield_percent"
+    ):
+        column = ore_index.get(ore)
+        if column is None:
+            continue
+        row = matrix.setdefault(moon_id, [0.0] * len(ORES))
+        row[column] += float(share)
+    return matrix
+
+
+def moon_revenues(
+    prices: Mapping[str, Decimal], moon_ids=None
+) -> Dict[int, int]:
+    """Monthly revenue by moon id for the given product prices."""
+    values = ore_values(prices)
+    return {
+        moon_id: int(sum(s * v for s, v in zip(shares, values) if s))
+        for moon_id, shares in load_share_matrix(moon_ids).items()
+    }
+
+
+def update_moon_revenues(prices: Optional[Mapping[str, Decimal]] = None):
+    """
+    Write monthly_revenue for every moon; returns the number changed.
+    Raises ValueError, writing nothing, if any product has no price.
+    """
+    if prices is None:
+        prices = product_prices()
+    unpriced = [product for product in PRODUCTS if prices.get(product) is None]
+    if unpriced:
+        raise ValueError(f"No price for moon products: {', '.join(unpriced)}")
+    revenues = moon_revenues(prices)
+    changed = []
+    for moon in EveMoon.objects.only("id", "monthly_revenue"):
+        revenue = revenues.get(moon.pk, 0)
+        if moon.monthly_revenue != revenue:
+            moon.monthly_revenue = revenue
+            changed.append(moon)
+    EveMoon.objects.bulk_update(changed, ["monthly_revenue"], batch_size=500)
+    return len(changed)
+
+
+@dataclass(frozen=True)
+class RankedMoon:
+    moon_id: int
+    system: str
+    planet: str
+    moon: int
+    monthly_revenue: int
+
+
+def rank_moons(
+    price_overrides: Optional[Mapping[str, float]] = None,
+    limit: Optional[int] = None,
+    system: Optional[str] = None,
+) -> List[RankedMoon]:
+    """
+    Moons by monthly revenue, highest first, at cached prices with any
+    product prices in price_overrides replaced (what-if scenarios).
+    Unpriced products count as 0. Nothing is written.
+    """
+    prices = dict(product_prices())
+    for product, price in (price_overrides or {}).items():
+        if product not in PRODUCTS:
+            raise ValueError(f"Unknown moon product: {product!r}")
+        prices[product] = Decimal(str(price))
+
+    moons = EveMoon.objects.all()
+    if system:
+        moons = moons.filter(system=system)
+    moons = {
+        row[0]: row
+        for row in moons.values_list("id", "system", "planet", "moon")
+    }
+    revenues = moon_revenues(prices, moon_ids=list(moons) if system else None)
+    ranked = sorted(
+        (
+            RankedMoon(*moons[moon_id], revenues.get(moon_id, 0))
+            for moon_id in moons
+        ),
+        key=lambda ranked_moon: (
+            -ranked_moon.monthly_revenue,
+            ranked_moon.moon_id,
+        ),
+    )
+    return ranked[:limit] if limit else ranked
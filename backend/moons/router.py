@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from ninja import Router
 from pydantic import BaseModel
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from app.errors import ErrorResponse
 from authentication import AuthBearer
 from moons.models import EveMoon
+from moons.revenue import rank_moons
 
 from .parser import MoonParsingResult, process_moon_paste
 from groups.helpers.feature_access import can_use_feature
@@ -62,6 +63,22 @@ class MoonSummaryResponse(BaseModel):
     scanned_moons: int
 
 
+class MoonRevenueScenarioRequest(BaseModel):
+    """Product price overrides (ISK per unit) by product name"""
+
+    prices: Dict[str, float] = {}
+    system: Optional[str] = None
+    limit: Optional[int] = 100
+
+
+class RankedMoonResponse(BaseModel):
+    id: int
+    system: str
+    planet: str
+    moon: int
+    monthly_revenue: int
+
+
 @moons_paste_router.post(
     "",
     response={
@@ -166,3 +183,39 @@ def get_moons(request, system: str = None):
 
         response.append(moon_response)
     return response
+
+
+@moons_router.post(
+    "/revenue_ranking",
+    response={
+        200: List[RankedMoonResponse],
+        400: ErrorResponse,
+        403: ErrorResponse,
+    },
+    auth=AuthBearer(),
+)
+def get_moon_revenue_ranking(request, scenario: MoonRevenueScenarioRequest):
+    """Rank moons by monthly revenue, optionally at what-if product prices."""
+    if not can_use_feature(request.user, "moons.view"):
+        return 403, ErrorResponse(
+            detail="You do not have permission to view moons"
+        )
+
+    try:
+        ranked = rank_moons(
+            price_overrides=scenario.prices,
+            limit=scenario.limit,
+            system=scenario.system,
+        )
+    except ValueError as exc:
+        return 400, ErrorResponse(detail=str(exc))
+    return [
+        RankedMoonResponse(
+            id=moon.moon_id,
+            system=moon.system,
+            planet=moon.planet,
+            moon=moon.moon,
+            monthly_revenue=moon.monthly_revenue,
+        )
+        for moon in ranked
+    ]
@@ -1,11 +1,18 @@
 # flake8: noqa
+from datetime import timedelta
 from decimal import Decimal
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import Client
+from django.utils import timezone
+from eveuniverse.models import EveCategory, EveGroup, EveMarketPrice, EveType
 
 from app.test import TestCase
+from market.helpers.pricing import JITA_REGION_ID
+from market.models import EveMarketItemHistory
+from moons import revenue
 from moons.helpers import calc_metanox_yield
 from moons.models import EveMoon, EveMoonDistribution
 from moons.router import count_scanned_moons
@@ -81,9 +88,7 @@ class EveMoonYieldTestCase(TestCase):
     @patch("moons.tasks.get_prices")
     def test_moon_revenue(self, mock_get_prices):
         mock_get_prices.return_value = {
-            "Hydrocarbons": Decimal("100"),
-            "Pyerite": Decimal("100"),
-            "Mexallon": Decimal("100"),
+            product: Decimal("100") for product in revenue.PRODUCTS
         }
         moon = EveMoon.objects.create(
             system="Jita",
@@ -103,6 +108,114 @@ class EveMoonYieldTestCase(TestCase):
         self.assertGreater(updated_moon.monthly_revenue, 500000000)
 
 
+class MoonRevenueEngineTestCase(TestCase):
+    """Tests for the matrix moon revenue engine"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.rich = EveMoon.objects.create(system="Jita", planet="IV", moon=4)
+        self.poor = EveMoon.objects.create(system="Hek", planet="I", moon=1)
+        EveMoonDistribution.objects.create(
+            moon=self.rich, ore="Bitumens", yield_percent=Decimal("0.5")
+        )
+        EveMoonDistribution.objects.create(
+            moon=self.rich, ore="Coesite", yield_percent=Decimal("0.25")
+        )
+        EveMoonDistribution.objects.create(
+            moon=self.poor, ore="Cobaltite", yield_percent=Decimal("0.1")
+        )
+        self.prices = {
+            **{product: Decimal(0) for product in revenue.PRODUCTS},
+            "Pyerite": Decimal("10"),
+            "Cobalt": Decimal("100"),
+        }
+
+    def test_shared_products_are_summed(self):
+        yields = calc_metanox_yield(
+            EveMoonDistribution.objects.filter(moon=self.rich)
+        )
+        # 12 units/hour per 1000 m3 share: 0.5 * 6000 + 0.25 * 2000
+        self.assertEqual(Decimal(12 * 3500), yields["Pyerite"].quantize(1))
+
+    def test_update_writes_changed_moons_in_bulk(self):
+        with self.assertNumQueries(3):
+            self.assertEqual(2, revenue.update_moon_revenues(self.prices))
+
+        self.rich.refresh_from_db()
+        self.poor.refresh_from_db()
+        self.assertEqual(12 * 3500 * 10 * 720, self.rich.monthly_revenue)
+        self.assertEqual(
+            int(0.1 * 12 * 40 * 100 * 720), self.poor.monthly_revenue
+        )
+        # Nothing changed, nothing written
+        with self.assertNumQueries(2):
+            self.assertEqual(0, revenue.update_moon_revenues(self.prices))
+
+    def test_update_writes_nothing_when_a_price_is_missing(self):
+        revenue.update_moon_revenues(self.prices)
+        prices = dict(self.prices)
+        del prices["Cobalt"]
+
+        with self.assertRaises(ValueError):
+            revenue.update_moon_revenues(prices)
+        self.poor.refresh_from_db()
+        self.assertEqual(
+            int(0.1 * 12 * 40 * 100 * 720), self.poor.monthly_revenue
+        )
+
+    def test_prices_average_recent_history(self):
+        category = EveCategory.objects.create(
+            id=4, name="Material", published=True
+        )
+        group = EveGroup.objects.create(
+            id=18, name="Mineral", published=True, eve_category=category
+        )
+        pyerite = EveType.objects.create(
+            id=35, name="Pyerite", published=True, eve_group=group
+        )
+        cobalt = EveType.objects.create(
+            id=16640, name="Cobalt", published=True, eve_group=group
+        )
+        today = timezone.now().date()
+        for days_ago, average in ((1, 10), (2, 12), (30, 100)):
+            EveMarketItemHistory.objects.create(
+                region_id=JITA_REGION_ID,
+                item=pyerite,
+                date=today - timedelta(days=days_ago),
+                average=average,
+                highest=average,
+                lowest=average,
+            )
+        EveMarketPrice.objects.create(eve_type=cobalt, average_price=250)
+
+        prices = revenue.product_prices()
+
+        self.assertEqual(Decimal(11), prices["Pyerite"])
+        self.assertEqual(Decimal(250), prices["Cobalt"])
+        self.assertNotIn("Mexallon", prices)
+        # Served from the cache
+        with self.assertNumQueries(0):
+            self.assertEqual(prices, revenue.product_prices())
+
+    def test_rank_moons_with_price_scenario(self):
+        cache.set(revenue.PRODUCT_PRICES_CACHE_KEY, self.prices)
+
+        ranked = revenue.rank_moons()
+        self.assertEqual(
+            [self.rich.pk, self.poor.pk], [m.moon_id for m in ranked]
+        )
+
+        ranked = revenue.rank_moons({"Cobalt": 1_000_000}, limit=1)
+        self.assertEqual([self.poor.pk], [m.moon_id for m in ranked])
+        # What-if prices are not written
+        self.poor.refresh_from_db()
+        self.assertEqual(0, self.poor.monthly_revenue)
+
+        with self.assertRaises(ValueError):
+            revenue.rank_moons({"Veldspar": 1})
+
+
 class EveMoonQueryTest(TestCase):
     """Test case for moon queries"""
 
@@ -148,3 +261,40 @@ class EveMoonRouterTest(TestCase):
         self.assertEqual(200, response.status_code)
         moons = response.json()
         self.assertEqual(1, len(moons))
+
+    def test_revenue_ranking(self):
+        cache.set(revenue.PRODUCT_PRICES_CACHE_KEY, {"Cobalt": Decimal(100)})
+        moon = EveMoon.objects.create(system="Hek", planet="1", moon=1)
+        EveMoonDistribution.objects.create(
+            moon=moon, ore="Cobaltite", yield_percent=Decimal("0.1")
+        )
+        url = f"{BASE_URL}/revenue_ranking"
+
+        response = self.client.post(
+            url,
+            {"prices": {"Cobalt": 200}},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(403, response.status_code)
+
+        self.make_superuser()
+        response = self.client.post(
+            url,
+            {"prices": {"Cobalt": 200}},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            int(0.1 * 12 * 40 * 200 * 720),
+            response.json()[0]["monthly_revenue"],
+        )
+
+        response = self.client.post(
+            url,
+            {"prices": {"Veldspar": 1}},
+            content_type="application/json",
+            HTTP_AUTHORIZATION=f"Bearer {self.token}",
+        )
+        self.assertEqual(400, response.status_code)
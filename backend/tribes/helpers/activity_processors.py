@@ -1,14 +1,26 @@
 """
 Activity processors: scan source models and create TribeGroupActivityRecord rows
 for tribe members when their activity matches an active TribeGroupActivity config.
+
+Processing is incremental. Each activity keeps a high-water mark per source
+model in ``processed_marks``: the highest id seen for append-only tables, or
+the run's start time for tables whose rows change state later (matched on
+``updated_at``, rescanning MARK_OVERLAP to cover late commits). Characters
+committed since the last run have their whole history scanned. Source rows
+are streamed with ``values().iterator()`` and records are inserted in
+batches, skipping references that already exist.
+
+Run with ``full_rebuild=True`` to rescan everything, e.g. after importing
+historical data or tagging an industry order to a tribe group.
 """
 
+from datetime import datetime as dt_datetime, time as dt_time, timedelta
+from typing import NamedTuple
+
 from django.db import transaction
-from django.db.models import F
+from django.db.models import F, Max, Q
 from django.utils import timezone
 
-from datetime import datetime as dt_datetime, time as dt_time
-
 from eveonline.models import (
     EveCharacterContract,
     EveCharacterIndustryJob,
@@ -29,58 +41,138 @@ from tribes.models import (
     TribeGroupMembershipCharacter,
 )
 
+# Records inserted per bulk_create
+RECORD_BATCH_SIZE = 500
+# Source rows fetched per round trip while streaming
+SCAN_CHUNK_SIZE = 2000
+# Timestamp marks rescan this far back, for rows committed late
+MARK_OVERLAP = timedelta(minutes=15)
+
+
+class Member(NamedTuple):
+    character_pk: int
+    character_id: int
+    user_id: int
+
 
 def _get_member_characters(activity):
     """
-    Return list of (character, user) for all characters currently committed to
-    an active membership in the activity's tribe group.
+    Return list of Member(character_pk, character_id, user_id) for all
+    characters currently committed to an active membership in the activity's
+    tribe group.
     """
-    memberships = TribeGroupMembership.objects.filter(
-        tribe_group=activity.tribe_group,
-        status=TribeGroupMembership.STATUS_ACTIVE,
-    ).values_list("id", "user_id")
-    membership_ids = [m[0] for m in memberships]
-
-    commitments = TribeGroupMembershipCharacter.objects.filter(
-        membership_id__in=membership_ids
-    ).select_related("character", "membership")
-
     return [
-        (c.character, c.membership.user)
-        for c in commitments
-        if c.character_id and c.membership.user_id
+        Member(*row)
+        for row in TribeGroupMembershipCharacter.objects.filter(
+            membership__tribe_group_id=activity.tribe_group_id,
+            membership__status=TribeGroupMembership.STATUS_ACTIVE,
+            character__isnull=False,
+            membership__user__isnull=False,
+        ).values_list(
+            "character_id", "character__character_id", "membership__user_id"
+        )
     ]
 
 
-def _create_record(
-    activity,
-    reference_type,
-    reference_id,
-    character=None,
-    user=None,
-    source_type_id=None,
-    target_type_id=None,
-    quantity=None,
-    unit="",
-    occurred_at=None,
-):
-    """Create a TribeGroupActivityRecord if one does not exist (dedupe by ref)."""
-    defaults = {
-        "character": character,
-        "user": user,
-        "source_type_id": source_type_id,
-        "target_type_id": target_type_id,
-        "quantity": quantity,
-        "unit": unit or "",
-        "occurred_at": occurred_at,
-    }
-    _, created = TribeGroupActivityRecord.objects.get_or_create(
-        tribe_group_activity=activity,
-        reference_type=reference_type,
-        reference_id=reference_id,
-        defaults=defaults,
-    )
-    return created
+def _config_key(activity):
+    return [activity.source_eve_type_id, activity.target_eve_type_id]
+
+
+class ScanMarks:
+    """
+    High-water marks for one activity. ``scan`` narrows a source queryset to
+    rows not yet processed and remembers the new mark; ``as_json`` is what
+    process_activity stores once the records are written. Marks from a run
+    with a different source/target filter are ignored.
+    """
+
+    def __init__(self, activity, full_rebuild=False):
+        stored = activity.processed_marks or {}
+        if full_rebuild or stored.get("config") != _config_key(activity):
+            stored = {}
+        self.previous = stored.get("sources", {})
+        self.config = _config_key(activity)
+        self.sources = {}
+
+    def scan(self, source, qs, key_field, keys, mark_field="id"):
+        """
+        Rows of qs for keys (values of key_field) that are new since the last
+        mark of source. mark_field is "id" for append-only tables, otherwise
+        a timestamp that moves whenever a row changes.
+        """
+        keys = set(keys)
+        previous = self.previous.get(source) or {}
+        since = previous.get("mark")
+        covered = set()
+        if since is not None:
+            covered = keys & set(previous.get("keys", ()))
+
+        if mark_field == "id":
+            mark = qs.model.objects.aggregate(Max("id"))["id__max"] or 0
+            qs = qs.filter(id__lte=mark)
+            lookup = {"id__gt": since}
+        else:
+            mark = timezone.now().isoformat()
+            if since is not None:
+                since = dt_datetime.fromisoformat(since) - MARK_OVERLAP
+            lookup = {f"{mark_field}__gte": since}
+        self.sources[source] = {"mark": mark, "keys": sorted(keys)}
+
+        condition = Q(**{f"{key_field}__in": keys - covered})
+        if covered:
+            condition |= Q(**{f"{key_field}__in": covered}, **lookup)
+        return qs.filter(condition)
+
+    def as_json(self):
+        return {"config": self.config, "sources": self.sources}
+
+
+class RecordWriter:
+    """
+    Buffers TribeGroupActivityRecords and inserts them in batches, skipping
+    any (activity, reference_type, reference_id) that already exists.
+    """
+
+    def __init__(self, activity):
+        self.activity = activity
+        self.pending = []
+        self.count_before = None
+
+    def add(self, reference_type, reference_id, **fields):
+        if self.count_before is None:
+            self.count_before = self.activity.records.count()
+        self.pending.append(
+            TribeGroupActivityRecord(
+                tribe_group_activity=self.activity,
+                reference_type=reference_type,
+                reference_id=reference_id,
+                **fields,
+            )
+        )
+        if len(self.pending) >= RECORD_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            TribeGroupActivityRecord.objects.bulk_create(
+                self.pending, ignore_conflicts=True
+            )
+            self.pending = []
+
+    def created(self):
+        """Flush and return how many records were actually inserted."""
+        if self.count_before is None:
+            return 0
+        self.flush()
+        return self.activity.records.count() - self.count_before
+
+
+def _stream(qs, *fields):
+    return qs.values(*fields).iterator(chunk_size=SCAN_CHUNK_SIZE)
+
+
+def _float(value):
+    return float(value) if value is not None else 0
 
 
 def _datetime_from_date(d):
@@ -90,452 +182,457 @@ def _datetime_from_date(d):
 
 
 # ---------------------------------------------------------------------------
-# Per-activity-type processors (each returns count of new records created)
+# Per-activity-type processors (each returns count of new records created).
+# Called without marks they scan all history.
 # ---------------------------------------------------------------------------
 
 
-def process_killmail(activity):
+def process_killmail(activity, marks=None):
     """Kills: member was attacker. source = attacker ship, target = victim ship."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_eve_ids = {c.character_id for c, _ in members}
-    char_by_eve_id = {c.character_id: c for c, _ in members}
-    user_by_eve_id = {c.character_id: u for c, u in members}
-
-    attacker_qs = EveCharacterKillmailAttacker.objects.filter(
-        character_id__in=char_eve_ids,
-    ).select_related("killmail")
+    by_eve_id = {m.character_id: m for m in members}
 
+    attacker_qs = EveCharacterKillmailAttacker.objects.exclude(
+        killmail__victim_character_id=F("character_id")
+    )
     if activity.source_eve_type_id is not None:
         attacker_qs = attacker_qs.filter(
             ship_type_id=activity.source_eve_type_id
         )
-
     if activity.target_eve_type_id is not None:
         attacker_qs = attacker_qs.filter(
             killmail__ship_type_id=activity.target_eve_type_id
         )
+    attacker_qs = marks.scan(
+        "EveCharacterKillmailAttacker",
+        attacker_qs,
+        "character_id",
+        by_eve_id,
+    )
 
-    created = 0
-    for att in attacker_qs:
-        killmail = att.killmail
-        if killmail.victim_character_id == att.character_id:
-            continue
-        character = char_by_eve_id.get(att.character_id)
-        if not character:
-            continue
-        ref_id = f"{killmail.pk}-{att.character_id}"
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for att in _stream(
+        attacker_qs,
+        "character_id",
+        "ship_type_id",
+        "killmail_id",
+        "killmail__ship_type_id",
+        "killmail__killmail_time",
+    ):
+        member = by_eve_id[att["character_id"]]
+        writer.add(
             "EveCharacterKillmail",
-            ref_id,
-            character=character,
-            user=user_by_eve_id.get(att.character_id),
-            source_type_id=att.ship_type_id,
-            target_type_id=killmail.ship_type_id,
-            occurred_at=killmail.killmail_time,
-        ):
-            created += 1
-    return created
+            f"{att['killmail_id']}-{att['character_id']}",
+            character_id=member.character_pk,
+            user_id=member.user_id,
+            source_type_id=att["ship_type_id"],
+            target_type_id=att["killmail__ship_type_id"],
+            occurred_at=att["killmail__killmail_time"],
+        )
+    return writer.created()
 
 
-def process_lossmail(activity):
+def process_lossmail(activity, marks=None):
     """Losses: member was victim. source = victim ship (the one they lost)."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
     # EveCharacterKillmail.character_id is FK to EveCharacter (Django pk), not EVE character_id
-    char_pks = {c.id for c, _ in members}
-    char_user = {c.id: u for c, u in members}
+    user_by_pk = {m.character_pk: m.user_id for m in members}
 
     qs = EveCharacterKillmail.objects.filter(
-        character_id__in=char_pks,
         victim_character_id=F("character__character_id"),
-    ).select_related("character")
-
+    )
     if activity.source_eve_type_id is not None:
         qs = qs.filter(ship_type_id=activity.source_eve_type_id)
+    # Killmail ids come from ESI, so new rows are found by updated_at
+    qs = marks.scan(
+        "EveCharacterKillmail", qs, "character_id", user_by_pk, "updated_at"
+    )
 
-    created = 0
-    for killmail in qs:
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for killmail in _stream(
+        qs, "id", "character_id", "ship_type_id", "killmail_time"
+    ):
+        writer.add(
             "EveCharacterKillmail",
-            str(killmail.pk),
-            character=killmail.character,
-            user=char_user.get(killmail.character_id),
-            source_type_id=killmail.ship_type_id,
-            target_type_id=None,
-            occurred_at=killmail.killmail_time,
-        ):
-            created += 1
-    return created
+            str(killmail["id"]),
+            character_id=killmail["character_id"],
+            user_id=user_by_pk[killmail["character_id"]],
+            source_type_id=killmail["ship_type_id"],
+            occurred_at=killmail["killmail_time"],
+        )
+    return writer.created()
 
 
-def process_fleet_participation(activity):
+def process_fleet_participation(activity, marks=None):
     """Fleet instance members: match by character_id (bare int)."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_ids = {c.character_id for c, _ in members}
-    # Resolve character_id -> (EveCharacter, User) for records
-    char_to_pair = {c.character_id: (c, u) for c, u in members}
+    by_eve_id = {m.character_id: m for m in members}
 
-    qs = EveFleetInstanceMember.objects.filter(character_id__in=char_ids)
+    qs = EveFleetInstanceMember.objects.all()
     if activity.source_eve_type_id is not None:
         qs = qs.filter(ship_type_id=activity.source_eve_type_id)
+    # Ship type can be filled in after the member row is created
+    qs = marks.scan(
+        "EveFleetInstanceMember", qs, "character_id", by_eve_id, "updated_at"
+    )
 
-    created = 0
-    for member in qs:
-        pair = char_to_pair.get(member.character_id)
-        if not pair:
-            continue
-        character, user = pair
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for member in _stream(
+        qs, "id", "character_id", "ship_type_id", "join_time"
+    ):
+        pair = by_eve_id[member["character_id"]]
+        writer.add(
             "EveFleetInstanceMember",
-            str(member.pk),
-            character=character,
-            user=user,
-            source_type_id=member.ship_type_id,
-            target_type_id=None,
-            occurred_at=member.join_time,
-        ):
-            created += 1
-    return created
+            str(member["id"]),
+            character_id=pair.character_pk,
+            user_id=pair.user_id,
+            source_type_id=member["ship_type_id"],
+            occurred_at=member["join_time"],
+        )
+    return writer.created()
 
 
-def process_mining(activity):
+def process_mining(activity, marks=None):
     """Mining ledger: one row per (character, eve_type, date, solar_system). Quantity in m³ for leaderboard summing."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_ids = [c.id for c, _ in members]
-    char_user = {c.id: u for c, u in members}
+    user_by_pk = {m.character_pk: m.user_id for m in members}
 
-    qs = EveCharacterMiningEntry.objects.filter(
-        character_id__in=char_ids
-    ).select_related("character", "eve_type")
+    qs = EveCharacterMiningEntry.objects.all()
     if activity.source_eve_type_id is not None:
         qs = qs.filter(eve_type_id=activity.source_eve_type_id)
-
-    created = 0
-    for entry in qs:
-        ref_id = f"{entry.character_id}-{entry.eve_type_id}-{entry.date}-{entry.solar_system_id}"
+    qs = marks.scan("EveCharacterMiningEntry", qs, "character_id", user_by_pk)
+
+    writer = RecordWriter(activity)
+    for entry in _stream(
+        qs,
+        "character_id",
+        "eve_type_id",
+        "date",
+        "solar_system_id",
+        "quantity",
+        "eve_type__volume",
+    ):
+        ref_id = f"{entry['character_id']}-{entry['eve_type_id']}-{entry['date']}-{entry['solar_system_id']}"
         # Store quantity in m³ (units * volume per unit) for consistent leaderboard summing
-        volume_per_unit = (
-            float(entry.eve_type.volume)
-            if entry.eve_type and entry.eve_type.volume is not None
-            else 0.0
-        )
-        quantity_m3 = float(entry.quantity) * volume_per_unit
-        if _create_record(
-            activity,
+        volume_per_unit = _float(entry["eve_type__volume"])
+        writer.add(
             "EveCharacterMiningEntry",
             ref_id,
-            character=entry.character,
-            user=char_user.get(entry.character_id),
-            source_type_id=entry.eve_type_id,
-            target_type_id=None,
-            quantity=quantity_m3,
+            character_id=entry["character_id"],
+            user_id=user_by_pk[entry["character_id"]],
+            source_type_id=entry["eve_type_id"],
+            quantity=float(entry["quantity"]) * volume_per_unit,
             unit="m3",
-            occurred_at=_datetime_from_date(entry.date),
-        ):
-            created += 1
-    return created
+            occurred_at=_datetime_from_date(entry["date"]),
+        )
+    return writer.created()
 
 
-def process_planetary_interaction(activity):
+def process_planetary_interaction(activity, marks=None):
     """PI tax: corp wallet journal entries; character = first_party_id."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_ids = {c.character_id for c, _ in members}
-    char_by_id = {c.character_id: c for c, _ in members}
-    user_by_char_id = {c.character_id: u for c, u in members}
+    by_eve_id = {m.character_id: m for m in members}
 
-    qs = EveCorporationWalletJournalEntry.objects.filter(
-        ref_type__in=["planetary_export_tax", "planetary_import_tax"],
-        first_party_id__in=char_ids,
+    qs = marks.scan(
+        "EveCorporationWalletJournalEntry",
+        EveCorporationWalletJournalEntry.objects.filter(
+            ref_type__in=["planetary_export_tax", "planetary_import_tax"],
+        ),
+        "first_party_id",
+        by_eve_id,
     )
 
-    created = 0
-    for entry in qs:
-        character = char_by_id.get(entry.first_party_id)
-        if not character:
-            continue
-        amount = float(entry.amount) if entry.amount is not None else 0
-        ref_id = f"{entry.corporation_id}-{entry.division}-{entry.ref_id}"
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for entry in _stream(
+        qs,
+        "corporation_id",
+        "division",
+        "ref_id",
+        "first_party_id",
+        "amount",
+        "date",
+    ):
+        member = by_eve_id[entry["first_party_id"]]
+        writer.add(
             "EveCorporationWalletJournalEntry",
-            ref_id,
-            character=character,
-            user=user_by_char_id.get(entry.first_party_id),
-            source_type_id=None,
-            target_type_id=None,
-            quantity=amount,
+            f"{entry['corporation_id']}-{entry['division']}-{entry['ref_id']}",
+            character_id=member.character_pk,
+            user_id=member.user_id,
+            quantity=_float(entry["amount"]),
             unit="ISK",
-            occurred_at=entry.date,
-        ):
-            created += 1
-    return created
+            occurred_at=entry["date"],
+        )
+    return writer.created()
 
 
-def process_industry(activity):
+def process_industry(activity, marks=None):
     """Industry jobs: status=delivered. When source_eve_type_id is set (blueprint type), only those jobs are recorded."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_ids = [c.id for c, _ in members]
-    char_user = {c.id: u for c, u in members}
+    user_by_pk = {m.character_pk: m.user_id for m in members}
 
-    qs = EveCharacterIndustryJob.objects.filter(
-        character_id__in=char_ids,
-        status="delivered",
-    )
+    qs = EveCharacterIndustryJob.objects.filter(status="delivered")
     # Respect config: filter by blueprint type when set (e.g. specific ship or module blueprint)
     if activity.source_eve_type_id is not None:
         qs = qs.filter(blueprint_type_id=activity.source_eve_type_id)
+    # Jobs become delivered after they are first synced
+    qs = marks.scan(
+        "EveCharacterIndustryJob", qs, "character_id", user_by_pk, "updated_at"
+    )
 
-    created = 0
-    for job in qs:
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for job in _stream(
+        qs, "job_id", "character_id", "blueprint_type_id", "runs", "end_date"
+    ):
+        writer.add(
             "EveCharacterIndustryJob",
-            str(job.job_id),
-            character=job.character,
-            user=char_user.get(job.character_id),
-            source_type_id=job.blueprint_type_id,
-            target_type_id=None,
-            quantity=float(job.runs),
+            str(job["job_id"]),
+            character_id=job["character_id"],
+            user_id=user_by_pk[job["character_id"]],
+            source_type_id=job["blueprint_type_id"],
+            quantity=float(job["runs"]),
             unit="runs",
-            occurred_at=job.end_date,
-        ):
-            created += 1
-    return created
+            occurred_at=job["end_date"],
+        )
+    return writer.created()
 
 
-def process_contract(activity):
+def process_contract(activity, marks=None):
     """Contracts posted by member (issuer_id)."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_ids = {c.character_id for c, _ in members}
-    char_by_id = {c.character_id: c for c, _ in members}
-    user_by_char_id = {c.character_id: u for c, u in members}
+    by_eve_id = {m.character_id: m for m in members}
 
-    qs = EveCharacterContract.objects.filter(issuer_id__in=char_ids)
+    qs = marks.scan(
+        "EveCharacterContract",
+        EveCharacterContract.objects.all(),
+        "issuer_id",
+        by_eve_id,
+        "updated_at",
+    )
 
-    created = 0
-    for contract in qs:
-        character = char_by_id.get(contract.issuer_id)
-        if not character:
-            continue
-        price = float(contract.price) if contract.price is not None else 0
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for contract in _stream(
+        qs,
+        "contract_id",
+        "issuer_id",
+        "price",
+        "date_completed",
+        "date_issued",
+    ):
+        member = by_eve_id[contract["issuer_id"]]
+        writer.add(
             "EveCharacterContract",
-            str(contract.contract_id),
-            character=character,
-            user=user_by_char_id.get(contract.issuer_id),
-            source_type_id=None,
-            target_type_id=None,
-            quantity=price,
+            str(contract["contract_id"]),
+            character_id=member.character_pk,
+            user_id=member.user_id,
+            quantity=_float(contract["price"]),
             unit="ISK",
-            occurred_at=contract.date_completed or contract.date_issued,
-        ):
-            created += 1
-    return created
+            occurred_at=contract["date_completed"] or contract["date_issued"],
+        )
+    return writer.created()
 
 
-def process_courier_contract(activity):
+def process_courier_contract(activity, marks=None):
     """Courier deliveries: character contracts (acceptor) + corp contracts (acceptor)."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
+
+    by_eve_id = {m.character_id: m for m in members}
+    fields = (
+        "contract_id",
+        "acceptor_id",
+        "volume",
+        "date_completed",
+        "date_accepted",
+    )
 
-    char_ids = {c.character_id for c, _ in members}
-    char_by_id = {c.character_id: c for c, _ in members}
-    user_by_char_id = {c.character_id: u for c, u in members}
-
-    created = 0
+    writer = RecordWriter(activity)
 
     # Character-level: contracts where this character is the acceptor
-    char_contracts = EveCharacterContract.objects.filter(
-        type="courier",
-        status="finished",
-        acceptor_id__in=char_ids,
+    char_contracts = marks.scan(
+        "EveCharacterContract",
+        EveCharacterContract.objects.filter(type="courier", status="finished"),
+        "acceptor_id",
+        by_eve_id,
+        "updated_at",
     )
-    for contract in char_contracts:
-        character = char_by_id.get(contract.acceptor_id)
-        if not character:
-            continue
-        volume = float(contract.volume) if contract.volume is not None else 0
-        if _create_record(
-            activity,
-            "EveCharacterContract",
-            str(contract.contract_id),
-            character=character,
-            user=user_by_char_id.get(contract.acceptor_id),
-            source_type_id=None,
-            target_type_id=None,
-            quantity=volume,
-            unit="m3",
-            occurred_at=contract.date_completed or contract.date_accepted,
-        ):
-            created += 1
-
     # Corp-level: acceptor_id is bare int
-    corp_contracts = EveCorporationContract.objects.filter(
-        type="courier",
-        status="finished",
-        for_corporation=True,
-        acceptor_id__in=char_ids,
+    corp_contracts = marks.scan(
+        "EveCorporationContract",
+        EveCorporationContract.objects.filter(
+            type="courier", status="finished", for_corporation=True
+        ),
+        "acceptor_id",
+        by_eve_id,
+        "updated_at",
     )
-    for contract in corp_contracts:
-        character = char_by_id.get(contract.acceptor_id)
-        if not character:
-            continue
-        volume = float(contract.volume) if contract.volume is not None else 0
-        ref_id = f"corp-{contract.contract_id}"
-        if _create_record(
-            activity,
-            "EveCorporationContract",
-            ref_id,
-            character=character,
-            user=user_by_char_id.get(contract.acceptor_id),
-            source_type_id=None,
-            target_type_id=None,
-            quantity=volume,
-            unit="m3",
-            occurred_at=contract.date_completed or contract.date_accepted,
-        ):
-            created += 1
-
-    return created
-
-
-def process_market_order(activity):
+    for reference_type, prefix, qs in (
+        ("EveCharacterContract", "", char_contracts),
+        ("EveCorporationContract", "corp-", corp_contracts),
+    ):
+        for contract in _stream(qs, *fields):
+            member = by_eve_id[contract["acceptor_id"]]
+            writer.add(
+                reference_type,
+                f"{prefix}{contract['contract_id']}",
+                character_id=member.character_pk,
+                user_id=member.user_id,
+                quantity=_float(contract["volume"]),
+                unit="m3",
+                occurred_at=contract["date_completed"]
+                or contract["date_accepted"],
+            )
+    return writer.created()
+
+
+def process_market_order(activity, marks=None):
     """Market sell transactions: issuer_external_id = character_id."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_ids = {c.character_id for c, _ in members}
-    char_by_id = {c.character_id: c for c, _ in members}
-    user_by_char_id = {c.character_id: u for c, u in members}
+    by_eve_id = {m.character_id: m for m in members}
 
-    qs = EveMarketItemTransaction.objects.filter(
-        issuer_external_id__in=char_ids
-    )
+    qs = EveMarketItemTransaction.objects.all()
     if activity.source_eve_type_id is not None:
         qs = qs.filter(item_id=activity.source_eve_type_id)
+    qs = marks.scan(
+        "EveMarketItemTransaction", qs, "issuer_external_id", by_eve_id
+    )
 
-    created = 0
-    for txn in qs:
-        character = char_by_id.get(txn.issuer_external_id)
-        if not character:
-            continue
+    writer = RecordWriter(activity)
+    for txn in _stream(
+        qs,
+        "id",
+        "issuer_external_id",
+        "item_id",
+        "price",
+        "quantity",
+        "sell_date",
+    ):
+        member = by_eve_id[txn["issuer_external_id"]]
         isk_value = (
-            float(txn.price * txn.quantity)
-            if txn.price and txn.quantity
+            float(txn["price"] * txn["quantity"])
+            if txn["price"] and txn["quantity"]
             else 0
         )
-        ref_id = str(txn.pk)
-        if _create_record(
-            activity,
+        writer.add(
             "EveMarketItemTransaction",
-            ref_id,
-            character=character,
-            user=user_by_char_id.get(txn.issuer_external_id),
-            source_type_id=txn.item_id,
-            target_type_id=None,
+            str(txn["id"]),
+            character_id=member.character_pk,
+            user_id=member.user_id,
+            source_type_id=txn["item_id"],
             quantity=isk_value,
             unit="ISK",
-            occurred_at=txn.sell_date,
-        ):
-            created += 1
-    return created
+            occurred_at=txn["sell_date"],
+        )
+    return writer.created()
 
 
-def process_industry_order(activity):
+def process_industry_order(activity, marks=None):
     """Delivered industry order assignments tagged to this tribe group."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    char_pks = [c.id for c, _ in members]
-    char_user = {c.id: u for c, u in members}
+    user_by_pk = {m.character_pk: m.user_id for m in members}
 
     qs = IndustryOrderItemAssignment.objects.filter(
-        character_id__in=char_pks,
-        order_item__order__tribe_groups=activity.tribe_group,
+        order_item__order__tribe_groups=activity.tribe_group_id,
         delivered_at__isnull=False,
-    ).select_related("order_item", "order_item__order", "character")
-
+    )
     if activity.source_eve_type_id is not None:
         qs = qs.filter(order_item__eve_type_id=activity.source_eve_type_id)
+    # Assignments are marked delivered after they are created
+    qs = marks.scan(
+        "IndustryOrderItemAssignment",
+        qs,
+        "character_id",
+        user_by_pk,
+        "delivered_at",
+    )
 
-    created = 0
-    for assignment in qs:
-        occurred_at = (
-            assignment.delivered_at or assignment.order_item.order.fulfilled_at
-        )
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for assignment in _stream(
+        qs,
+        "id",
+        "character_id",
+        "quantity",
+        "delivered_at",
+        "order_item__eve_type_id",
+        "order_item__order__fulfilled_at",
+    ):
+        writer.add(
             "IndustryOrderItemAssignment",
-            str(assignment.pk),
-            character=assignment.character,
-            user=char_user.get(assignment.character_id),
-            source_type_id=assignment.order_item.eve_type_id,
-            target_type_id=None,
-            quantity=float(assignment.quantity),
+            str(assignment["id"]),
+            character_id=assignment["character_id"],
+            user_id=user_by_pk[assignment["character_id"]],
+            source_type_id=assignment["order_item__eve_type_id"],
+            quantity=float(assignment["quantity"]),
             unit="units",
-            occurred_at=occurred_at,
-        ):
-            created += 1
-    return created
+            occurred_at=assignment["delivered_at"]
+            or assignment["order_item__order__fulfilled_at"],
+        )
+    return writer.created()
 
 
-def process_fleet_commanded(activity):
+def process_fleet_commanded(activity, marks=None):
     """Fleets led by roster members (created_by), excluding cancelled."""
     members = _get_member_characters(activity)
     if not members:
         return 0
+    marks = marks or ScanMarks(activity, full_rebuild=True)
 
-    user_ids = {u.id for _, u in members}
-    user_by_id = {u.id: u for _, u in members}
+    user_ids = {m.user_id for m in members}
 
-    qs = EveFleet.objects.filter(
-        created_by_id__in=user_ids,
-    ).exclude(status="cancelled")
+    qs = marks.scan(
+        "EveFleet",
+        EveFleet.objects.exclude(status="cancelled"),
+        "created_by_id",
+        user_ids,
+        "updated_at",
+    )
 
-    created = 0
-    for fleet in qs:
-        user = user_by_id.get(fleet.created_by_id)
-        if not user:
-            continue
-        if _create_record(
-            activity,
+    writer = RecordWriter(activity)
+    for fleet in _stream(qs, "id", "created_by_id", "start_time"):
+        writer.add(
             "EveFleet",
-            str(fleet.pk),
-            character=None,
-            user=user,
-            source_type_id=None,
-            target_type_id=None,
-            occurred_at=fleet.start_time,
-        ):
-            created += 1
-    return created
+            str(fleet["id"]),
+            user_id=fleet["created_by_id"],
+            occurred_at=fleet["start_time"],
+        )
+    return writer.created()
 
 
 PROCESSORS = {
@@ -553,18 +650,27 @@ PROCESSORS = {
 }
 
 
-def process_activity(activity):
-    """Run the processor for this activity config; return count of new records."""
+def process_activity(activity, full_rebuild=False):
+    """
+    Run the processor for this activity config; return count of new records.
+    With full_rebuild, ignore the stored marks and rescan all history.
+    """
     if not activity.is_active:
         return 0
     processor = PROCESSORS.get(activity.activity_type)
     if not processor:
         return 0
+    marks = ScanMarks(activity, full_rebuild=full_rebuild)
     with transaction.atomic():
-        return processor(activity)
+        created = processor(activity, marks)
+        activity.processed_marks = marks.as_json()
+        TribeGroupActivity.objects.filter(pk=activity.pk).update(
+            processed_marks=activity.processed_marks
+        )
+    return created
 
 
-def process_all_for_tribe_group(tribe_group):
+def process_all_for_tribe_group(tribe_group, full_rebuild=False):
     """Process all active TribeGroupActivity configs for this group; return total new records."""
     activities = TribeGroupActivity.objects.filter(
         tribe_group=tribe_group,
@@ -572,5 +678,5 @@ def process_all_for_tribe_group(tribe_group):
     )
     total = 0
     for activity in activities:
-        total += process_activity(activity)
+        total += process_activity(activity, full_rebuild=full_rebuild)
     return total
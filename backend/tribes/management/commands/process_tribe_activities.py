@@ -0,0 +1,28 @@
+"""Process tribe group activities, optionally rescanning all history."""
+
+from django.core.management.base import BaseCommand
+
+from tribes.tasks import process_tribe_group_activities
+
+
+class Command(BaseCommand):
+    help = "Create TribeGroupActivityRecords from source data."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tribe-group",
+            type=int,
+            help="Only process this tribe group id.",
+        )
+        parser.add_argument(
+            "--full-rebuild",
+            action="store_true",
+            help="Ignore stored high-water marks and rescan all history.",
+        )
+
+    def handle(self, *args, **options):
+        created = process_tribe_group_activities(
+            tribe_group_id=options["tribe_group"],
+            full_rebuild=options["full_rebuild"],
+        )
+        self.stdout.write(f"Created {created} record(s).")
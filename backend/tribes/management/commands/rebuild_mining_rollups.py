@@ -0,0 +1,13 @@
+"""Rebuild MiningDailyRollup rows from the mining ledger."""
+
+from django.core.management.base import BaseCommand
+
+from tribes.reports.rollups import rebuild_mining_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute daily mining rollups used by town hall reports."
+
+    def handle(self, *args, **options):
+        changed = rebuild_mining_rollups()
+        self.stdout.write(f"Changed {changed} rollup row(s).")
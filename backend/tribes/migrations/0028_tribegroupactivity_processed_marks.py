@@ -0,0 +1,26 @@
+# Per-source high-water marks for incremental activity processing.
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tribes", "0027_tribegrouprank_group"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tribegroupactivity",
+            name="processed_marks",
+            field=models.JSONField(
+                blank=True,
+                default=dict,
+                editable=False,
+                help_text=(
+                    "High-water marks per source model from the last "
+                    "processing run; cleared by a full rebuild."
+                ),
+            ),
+        ),
+    ]
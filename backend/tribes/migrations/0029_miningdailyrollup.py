@@ -0,0 +1,120 @@
+# Daily mining ledger rollups for town hall reports.
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+ROLLUP_BATCH_SIZE = 1000
+
+
+def backfill_mining_rollups(apps, schema_editor):
+    """Roll up the existing mining ledger so reports keep their history."""
+    EveCharacterMiningEntry = apps.get_model(
+        "eveonline", "EveCharacterMiningEntry"
+    )
+    MiningDailyRollup = apps.get_model("tribes", "MiningDailyRollup")
+
+    totals = EveCharacterMiningEntry.objects.values(
+        "character_id", "character__user_id", "eve_type_id", "date"
+    ).annotate(
+        total_quantity=Sum("quantity"),
+        total_volume=Sum(
+            F("quantity") * Coalesce("eve_type__volume", 0.0),
+            output_field=FloatField(),
+        ),
+    )
+    batch = []
+    for row in totals.order_by().iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        batch.append(
+            MiningDailyRollup(
+                user_id=row["character__user_id"],
+                character_id=row["character_id"],
+                eve_type_id=row["eve_type_id"],
+                day=row["date"],
+                quantity=row["total_quantity"],
+                volume_m3=row["total_volume"],
+            )
+        )
+        if len(batch) >= ROLLUP_BATCH_SIZE:
+            MiningDailyRollup.objects.bulk_create(batch)
+            batch = []
+    MiningDailyRollup.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveonline", "0097_industry_job_status_blueprint_id_idx"),
+        ("eveuniverse", "0012_alter_evebloodline_eve_ship_type"),
+        ("tribes", "0028_tribegroupactivity_processed_marks"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MiningDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("quantity", models.BigIntegerField(default=0)),
+                ("volume_m3", models.FloatField(default=0.0)),
+                (
+                    "character",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="mining_daily_rollups",
+                        to="eveonline.evecharacter",
+                    ),
+                ),
+                (
+                    "eve_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="eveuniverse.evetype",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="mining_daily_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["day", "user"],
+                        name="tribes_miningrollup_day_user",
+                    ),
+                    models.Index(
+                        fields=["character", "day"],
+                        name="tribes_miningrollup_char_day",
+                    ),
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("character", "eve_type", "day"),
+                        name="tribes_miningdailyrollup_unique_day",
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(
+            backfill_mining_rollups, migrations.RunPython.noop
+        ),
+    ]
@@ -18,6 +18,7 @@ from tribes.models.tribe_group_membership_history import (
 )
 from tribes.models.tribe_group_activity import TribeGroupActivity
 from tribes.models.tribe_group_activity_record import TribeGroupActivityRecord
+from tribes.models.mining_daily_rollup import MiningDailyRollup
 
 __all__ = [
     "Tribe",
@@ -32,4 +33,5 @@ __all__ = [
     "TribeGroupMembershipCharacterHistory",
     "TribeGroupActivity",
     "TribeGroupActivityRecord",
+    "MiningDailyRollup",
 ]
@@ -0,0 +1,51 @@
+from django.db import models
+
+
+class MiningDailyRollup(models.Model):
+    """
+    Mining ledger summed per (character, ore type, day) across solar systems,
+    with the owning user denormalized so town hall reports can GROUP BY user.
+    Maintained after each character mining sync (tribes.reports.rollups).
+    """
+
+    user = models.ForeignKey(
+        "auth.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="mining_daily_rollups",
+    )
+    character = models.ForeignKey(
+        "eveonline.EveCharacter",
+        on_delete=models.CASCADE,
+        related_name="mining_daily_rollups",
+    )
+    eve_type = models.ForeignKey(
+        "eveuniverse.EveType",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    day = models.DateField()
+    quantity = models.BigIntegerField(default=0)
+    volume_m3 = models.FloatField(default=0.0)
+
+    def __str__(self):
+        return f"{self.character_id} {self.eve_type_id} {self.day}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["character", "eve_type", "day"],
+                name="tribes_miningdailyrollup_unique_day",
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["day", "user"],
+                name="tribes_miningrollup_day_user",
+            ),
+            models.Index(
+                fields=["character", "day"],
+                name="tribes_miningrollup_char_day",
+            ),
+        ]
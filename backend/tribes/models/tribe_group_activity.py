@@ -70,6 +70,15 @@ class TribeGroupActivity(models.Model):
         blank=True,
         help_text="Points per unit of quantity (e.g. mining m³, industry ISK).",
     )
+    processed_marks = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=(
+            "High-water marks per source model from the last processing run; "
+            "cleared by a full rebuild."
+        ),
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
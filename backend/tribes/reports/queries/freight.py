@@ -21,11 +21,20 @@ def run_freight_report(
         datetime.combine(period.end, datetime.max.time())
     )
 
+    # Medians need every contract's durations; fetch only those columns
     contracts = list(
-        FreightContract.objects.finished().filter(
+        FreightContract.objects.finished()
+        .filter(
             date_completed__gte=start_dt,
             date_completed__lte=end_dt,
         )
+        .values_list(
+            "reward",
+            "volume",
+            "date_issued",
+            "date_accepted",
+            "date_completed",
+        )
     )
 
     if not contracts:
@@ -36,16 +45,14 @@ def run_freight_report(
     total_reward = 0.0
     total_volume = 0.0
 
-    for c in contracts:
-        reward = float(c.reward or 0)
-        volume = float(c.volume or 0)
-        total_reward += reward
-        total_volume += volume
-        if c.date_issued and c.date_completed:
-            delta = c.date_completed - c.date_issued
+    for reward, volume, issued, accepted, completed in contracts:
+        total_reward += float(reward or 0)
+        total_volume += float(volume or 0)
+        if issued and completed:
+            delta = completed - issued
             completion_hours.append(delta.total_seconds() / 3600.0)
-        if c.date_accepted and c.date_completed:
-            delta = c.date_completed - c.date_accepted
+        if accepted and completed:
+            delta = completed - accepted
             accept_to_complete_hours.append(delta.total_seconds() / 3600.0)
 
     def stats(hours_list):
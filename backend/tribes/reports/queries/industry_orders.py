@@ -1,10 +1,11 @@
 """Industry order assignment reports (committed vs delivered)."""
 
-from collections import defaultdict
 from decimal import Decimal
 
 from datetime import datetime
 
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce, NullIf
 from django.utils import timezone
 
 from eveonline.models import EveCharacter
@@ -42,37 +43,26 @@ def run_industry_orders_report(
     assignments = IndustryOrderItemAssignment.objects.filter(
         character_id__in=char_pks,
         order_item__order__tribe_groups=tribe_group,
-    ).select_related("order_item", "order_item__order", "character")
-
-    committed: dict[int, dict] = defaultdict(_metric_dict)
-    delivered: dict[int, dict] = defaultdict(_metric_dict)
-
-    for a in assignments:
-        uid = a.character.user_id if a.character else None
-        if not uid:
-            continue
-        order = a.order_item.order
-        unit_price = _dec(
-            a.target_unit_price or a.order_item.target_unit_price or 0
-        )
-        unit_margin = _dec(
-            a.target_estimated_margin
-            or a.order_item.target_estimated_margin
-            or 0
+        character__user_id__isnull=False,
+    )
+    committed = _totals_by_user(
+        assignments.filter(order_item__order__fulfilled_at__isnull=True)
+    )
+    delivered = _totals_by_user(
+        assignments.annotate(
+            fulfilled_at=Coalesce(
+                "delivered_at", "order_item__order__fulfilled_at"
+            )
+        ).filter(
+            fulfilled_at__gte=period_start_dt,
+            fulfilled_at__lte=period_end_dt,
         )
-        qty = Decimal(a.quantity)
-
-        if order.fulfilled_at is None:
-            _add(committed[uid], qty, unit_price, unit_margin)
-
-        fulfilled_at = a.delivered_at or order.fulfilled_at
-        if fulfilled_at and period_start_dt <= fulfilled_at <= period_end_dt:
-            _add(delivered[uid], qty, unit_price, unit_margin)
+    )
 
     rows = []
     for uid in user_ids:
-        c = committed[uid]
-        d = delivered[uid]
+        c = committed.get(uid) or _metric_dict()
+        d = delivered.get(uid) or _metric_dict()
         rows.append(
             {
                 "primary_character": _primary_name(uid),
@@ -99,10 +89,36 @@ def _metric_dict():
     return {"units": Decimal(0), "estimate": Decimal(0), "margin": Decimal(0)}
 
 
-def _add(bucket, qty, unit_price, unit_margin):
-    bucket["units"] += qty
-    bucket["estimate"] += qty * unit_price
-    bucket["margin"] += qty * unit_margin
+def _unit_value(field):
+    """Assignment override, else the order line's value, else 0."""
+    return Coalesce(
+        NullIf(field, Value(0)),
+        NullIf(f"order_item__{field}", Value(0)),
+        Value(0),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+
+
+def _totals_by_user(assignments) -> dict[int, dict]:
+    """units / estimate / margin per user, summed in the database."""
+    return {
+        row["character__user_id"]: {
+            "units": _dec(row["units"]),
+            "estimate": _dec(row["estimate"]),
+            "margin": _dec(row["margin"]),
+        }
+        for row in assignments.values("character__user_id").annotate(
+            units=Sum("quantity"),
+            estimate=Sum(
+                F("quantity") * _unit_value("target_unit_price"),
+                output_field=DecimalField(max_digits=30, decimal_places=2),
+            ),
+            margin=Sum(
+                F("quantity") * _unit_value("target_estimated_margin"),
+                output_field=DecimalField(max_digits=30, decimal_places=2),
+            ),
+        )
+    }
 
 
 def _dec(val):
@@ -1,10 +1,13 @@
-"""Mining ledger reports by site user."""
+"""Mining ledger reports by site user, read from daily rollups."""
 
 from collections import defaultdict
 
-from eveonline.models import EveCharacter, EveCharacterMiningEntry
+from django.db.models import Count, Sum
+
+from eveonline.models import EveCharacter
 from eveonline.models.characters import EvePlayer
 from eveuniverse.models import EveMarketPrice
+from tribes.models import MiningDailyRollup
 from tribes.reports.roster import roster_character_pks, roster_user_ids
 from tribes.reports.types import PeriodBounds, ReportScope
 
@@ -19,56 +22,45 @@ COLUMNS = [
 def run_mining_report(
     tribe_group, period: PeriodBounds, scope: ReportScope, params
 ):
+    rollups = MiningDailyRollup.objects.filter(
+        day__gte=period.start,
+        day__lte=period.end,
+        user_id__isnull=False,
+    )
+    user_ids = set()
     if scope == ReportScope.ROSTER:
         char_pks = roster_character_pks(tribe_group)
         if not char_pks:
             return [], _empty_totals(), COLUMNS
-        entries = EveCharacterMiningEntry.objects.filter(
-            character_id__in=char_pks,
-            date__gte=period.start,
-            date__lte=period.end,
-        ).select_related("character", "character__user", "eve_type")
-        user_ids = {
-            e.character.user_id
-            for e in entries
-            if e.character and e.character.user_id
-        }
+        rollups = rollups.filter(character_id__in=char_pks)
         # Include roster users with zero activity
-        user_ids |= roster_user_ids(tribe_group)
-    else:
-        entries = EveCharacterMiningEntry.objects.filter(
-            date__gte=period.start,
-            date__lte=period.end,
-            character__user_id__isnull=False,
-        ).select_related("character", "character__user", "eve_type")
-        user_ids = {e.character.user_id for e in entries if e.character}
+        user_ids = roster_user_ids(tribe_group)
 
-    type_ids = {e.eve_type_id for e in entries if e.eve_type_id}
-    prices = {
-        p.eve_type_id: p.average_price
-        for p in EveMarketPrice.objects.filter(eve_type_id__in=type_ids)
+    by_user_type = list(
+        rollups.values("user_id", "eve_type_id").annotate(
+            quantity=Sum("quantity"), volume_m3=Sum("volume_m3")
+        )
+    )
+    chars_by_user = {
+        row["user_id"]: row["characters"]
+        for row in rollups.values("user_id").annotate(
+            characters=Count("character_id", distinct=True)
+        )
     }
+    prices = dict(
+        EveMarketPrice.objects.filter(
+            eve_type_id__in={row["eve_type_id"] for row in by_user_type}
+        ).values_list("eve_type_id", "average_price")
+    )
 
     vol_by_user: dict[int, float] = defaultdict(float)
     isk_by_user: dict[int, float] = defaultdict(float)
-    chars_by_user: dict[int, set] = defaultdict(set)
-
-    for entry in entries:
-        uid = entry.character.user_id
-        if not uid:
-            continue
-        vol_per = float(entry.eve_type.volume or 0) if entry.eve_type else 0
-        qty = float(entry.quantity)
-        volume_m3 = qty * vol_per
-        price = float(prices.get(entry.eve_type_id) or 0)
-        vol_by_user[uid] += volume_m3
-        isk_by_user[uid] += qty * price
-        chars_by_user[uid].add(entry.character_id)
-
-    if scope == ReportScope.ROSTER:
-        for uid in roster_user_ids(tribe_group):
-            user_ids.add(uid)
-            chars_by_user.setdefault(uid, set())
+    for row in by_user_type:
+        uid = row["user_id"]
+        price = float(prices.get(row["eve_type_id"]) or 0)
+        vol_by_user[uid] += row["volume_m3"] or 0.0
+        isk_by_user[uid] += float(row["quantity"] or 0) * price
+    user_ids |= set(chars_by_user)
 
     rows = _build_user_rows(user_ids, chars_by_user, vol_by_user, isk_by_user)
     totals = {
@@ -89,26 +81,27 @@ def _build_user_rows(user_ids, chars_by_user, vol_by_user, isk_by_user):
             "primary_character"
         )
     }
-    # Fallback character names per user
-    char_names = {}
-    for uid in user_ids:
-        pc = players.get(uid)
-        if pc and pc.primary_character:
-            char_names[uid] = pc.primary_character.character_name or ""
-        else:
-            c = (
-                EveCharacter.objects.filter(user_id=uid)
-                .order_by("character_name")
-                .first()
-            )
-            char_names[uid] = c.character_name if c else ""
+    char_names = {
+        uid: pc.primary_character.character_name or ""
+        for uid, pc in players.items()
+        if pc.primary_character
+    }
+    # Fallback: first character name per user without a primary
+    for uid, name in (
+        EveCharacter.objects.filter(
+            user_id__in=[uid for uid in user_ids if uid not in char_names]
+        )
+        .order_by("user_id", "character_name")
+        .values_list("user_id", "character_name")
+    ):
+        char_names.setdefault(uid, name or "")
 
     rows = []
     for uid in user_ids:
         rows.append(
             {
                 "primary_character_name": char_names.get(uid, ""),
-                "number_of_characters": len(chars_by_user.get(uid, set())),
+                "number_of_characters": chars_by_user.get(uid, 0),
                 "volume_m3": round(vol_by_user.get(uid, 0.0), 2),
                 "isk_ore_market_estimate": round(isk_by_user.get(uid, 0.0), 2),
             }
@@ -0,0 +1,98 @@
+"""
+Daily rollups behind the town hall reports.
+
+The mining ledger has one row per (character, ore, day, solar system) and
+grows with every sync; reports read MiningDailyRollup instead, summed per
+(character, ore, day) with the owning user alongside, so a report is one
+GROUP BY over the period whatever its length. refresh_mining_rollups runs
+after each character's mining sync; rebuild_mining_rollups backfills.
+"""
+
+from django.db.models import F, FloatField, Sum
+from django.db.models.functions import Coalesce
+
+from eveonline.helpers.db_sync import apply_bulk_changes
+from eveonline.models import EveCharacter, EveCharacterMiningEntry
+from tribes.models import MiningDailyRollup
+
+
+def refresh_mining_rollups(character, days=None) -> tuple[int, int, int]:
+    """
+    Recompute character's rollups from its ledger, for days when given
+    (the dates a sync touched) else its whole history.
+    Returns (created, updated, deleted).
+    """
+    entries = EveCharacterMiningEntry.objects.filter(character=character)
+    rollups = MiningDailyRollup.objects.filter(character=character)
+    if days is not None:
+        entries = entries.filter(date__in=days)
+        rollups = rollups.filter(day__in=days)
+
+    totals = {
+        (row["eve_type_id"], row["date"]): row
+        for row in entries.values("eve_type_id", "date").annotate(
+            total_quantity=Sum("quantity"),
+            total_volume=Sum(
+                F("quantity") * Coalesce("eve_type__volume", 0.0),
+                output_field=FloatField(),
+            ),
+        )
+    }
+
+    create, update, delete_ids = [], [], []
+    for rollup in rollups:
+        row = totals.pop((rollup.eve_type_id, rollup.day), None)
+        if row is None:
+            delete_ids.append(rollup.pk)
+            continue
+        if (
+            rollup.quantity != row["total_quantity"]
+            or rollup.volume_m3 != row["total_volume"]
+            or rollup.user_id != character.user_id
+        ):
+            rollup.quantity = row["total_quantity"]
+            rollup.volume_m3 = row["total_volume"]
+            rollup.user_id = character.user_id
+            update.append(rollup)
+    for (eve_type_id, day), row in totals.items():
+        create.append(
+            MiningDailyRollup(
+                user_id=character.user_id,
+                character=character,
+                eve_type_id=eve_type_id,
+                day=day,
+                quantity=row["total_quantity"],
+                volume_m3=row["total_volume"],
+            )
+        )
+
+    if days is not None:
+        # The character may have moved to another user since older days
+        # were rolled up
+        MiningDailyRollup.objects.filter(character=character).exclude(
+            user_id=character.user_id
+        ).update(user_id=character.user_id)
+    if not (create or update or delete_ids):
+        return 0, 0, 0
+    return apply_bulk_changes(
+        model=MiningDailyRollup,
+        create=create,
+        update=update,
+        update_fields=("quantity", "volume_m3", "user"),
+        delete_ids=delete_ids,
+    )
+
+
+def rebuild_mining_rollups() -> int:
+    """Recompute rollups for every character with ledger rows."""
+    characters = EveCharacter.objects.filter(
+        pk__in=EveCharacterMiningEntry.objects.values("character_id")
+    ).only("id", "user_id")
+    changed = 0
+    for character in characters.iterator():
+        changed += sum(refresh_mining_rollups(character))
+    stale = MiningDailyRollup.objects.exclude(
+        character_id__in=EveCharacterMiningEntry.objects.values("character_id")
+    )
+    deleted, _ = stale.delete()
+    return changed + deleted
@@ -177,13 +177,14 @@ def remove_tribe_members_without_permission():
 
 
 @app.task()
-def process_tribe_group_activities(tribe_group_id=None):
+def process_tribe_group_activities(tribe_group_id=None, full_rebuild=False):
     """
     Scan source models and write TribeGroupActivityRecords for all active
     TribeGroupActivity configs.
 
     If tribe_group_id is given, only that group is processed; otherwise
-    all active configs across all groups are processed.
+    all active configs across all groups are processed. Only rows added or
+    changed since the last run are scanned unless full_rebuild is set.
     """
     if tribe_group_id is not None:
         try:
@@ -191,7 +192,9 @@ def process_tribe_group_activities(tribe_group_id=None):
         except TribeGroup.DoesNotExist:
             logger.warning("TribeGroup pk=%s not found", tribe_group_id)
             return 0
-        total = process_all_for_tribe_group(tribe_group)
+        total = process_all_for_tribe_group(
+            tribe_group, full_rebuild=full_rebuild
+        )
         logger.info(
             "Processed tribe group %s: %s new activity records",
             tribe_group,
@@ -204,7 +207,9 @@ def process_tribe_group_activities(tribe_group_id=None):
     ).distinct()
     total = 0
     for tribe_group in tribe_groups:
-        total += process_all_for_tribe_group(tribe_group)
+        total += process_all_for_tribe_group(
+            tribe_group, full_rebuild=full_rebuild
+        )
     if total:
         logger.info(
             "Processed all tribe group activities: %s new records", total
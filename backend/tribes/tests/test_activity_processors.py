@@ -1,5 +1,7 @@
 """Tests for tribe activity processors (occurred_at, killmail attacker logic)."""
 
+from datetime import timedelta
+
 import factory
 from django.contrib.auth.models import Group, User
 from django.db.models import signals as django_signals
@@ -109,3 +111,125 @@ class KillmailProcessorTestCase(TestCase):
     def test_process_activity_entry_point(self):
         created = process_activity(self.activity)
         self.assertEqual(created, 1)
+
+
+class IncrementalProcessingTestCase(KillmailProcessorTestCase):
+    def add_attacker(self, killmail_id, character):
+        killmail = EveCharacterKillmail.objects.create(
+            id=killmail_id,
+            killmail_id=killmail_id,
+            killmail_hash="def",
+            killmail_time=timezone.now(),
+            solar_system_id=30001,
+            ship_type_id=587,
+            victim_character_id=99999,
+            victim_corporation_id=1,
+            victim_alliance_id=1,
+            attackers="[]",
+            items="[]",
+            character=self.owner_char,
+        )
+        EveCharacterKillmailAttacker.objects.create(
+            killmail=killmail,
+            character_id=character.character_id,
+            ship_type_id=23773,
+        )
+
+    def test_second_run_only_scans_new_rows(self):
+        self.assertEqual(1, process_activity(self.activity))
+        self.activity.refresh_from_db()
+        marks = self.activity.processed_marks["sources"]
+        self.assertEqual(
+            [self.attacker_char.character_id],
+            marks["EveCharacterKillmailAttacker"]["keys"],
+        )
+
+        self.assertEqual(0, process_activity(self.activity))
+        self.add_attacker(2, self.attacker_char)
+        self.assertEqual(1, process_activity(self.activity))
+        self.assertEqual(2, TribeGroupActivityRecord.objects.count())
+
+    def test_rows_below_mark_are_skipped_until_full_rebuild(self):
+        process_activity(self.activity)
+        self.activity.refresh_from_db()
+        TribeGroupActivityRecord.objects.all().delete()
+
+        self.assertEqual(0, process_activity(self.activity))
+        self.assertEqual(1, process_activity(self.activity, full_rebuild=True))
+
+    @factory.django.mute_signals(
+        django_signals.pre_save, django_signals.post_save
+    )
+    def test_newly_committed_character_history_is_scanned(self):
+        process_activity(self.activity)
+        self.activity.refresh_from_db()
+        self.add_attacker(2, self.owner_char)
+        # Not a member yet; the mark moves past the new row
+        self.assertEqual(0, process_activity(self.activity))
+        self.activity.refresh_from_db()
+
+        membership = TribeGroupMembership.objects.create(
+            tribe_group=self.group,
+            user=self.owner_user,
+            status=TribeGroupMembership.STATUS_ACTIVE,
+        )
+        TribeGroupMembershipCharacter.objects.create(
+            membership=membership,
+            character=self.owner_char,
+        )
+        self.assertEqual(1, process_activity(self.activity))
+        record = TribeGroupActivityRecord.objects.get(user=self.owner_user)
+        self.assertEqual("2-10002", record.reference_id)
+
+    def test_changed_filter_rescans(self):
+        process_activity(self.activity)
+        self.activity.refresh_from_db()
+        TribeGroupActivityRecord.objects.all().delete()
+
+        self.activity.target_eve_type_id = 587
+        self.activity.save()
+        self.assertEqual(1, process_activity(self.activity))
+
+    def test_timestamp_marks_rescan_overlap(self):
+        lossmail = TribeGroupActivity.objects.create(
+            tribe_group=self.group,
+            activity_type=TribeGroupActivity.LOSSMAIL,
+        )
+        EveCharacterKillmail.objects.create(
+            id=3,
+            killmail_id=3,
+            killmail_hash="ghi",
+            killmail_time=timezone.now(),
+            solar_system_id=30001,
+            ship_type_id=587,
+            victim_character_id=self.attacker_char.character_id,
+            victim_corporation_id=1,
+            victim_alliance_id=1,
+            attackers="[]",
+            items="[]",
+            character=self.attacker_char,
+        )
+        self.assertEqual(1, process_activity(lossmail))
+        lossmail.refresh_from_db()
+        TribeGroupActivityRecord.objects.all().delete()
+
+        # Inside the overlap window the loss is scanned again
+        self.assertEqual(1, process_activity(lossmail))
+        lossmail.refresh_from_db()
+        TribeGroupActivityRecord.objects.all().delete()
+
+        EveCharacterKillmail.objects.filter(id=3).update(
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(0, process_activity(lossmail))
+
+    def test_every_processor_records_marks(self):
+        for activity_type, _ in TribeGroupActivity.ACTIVITY_TYPE_CHOICES:
+            activity = TribeGroupActivity.objects.create(
+                tribe_group=self.group, activity_type=activity_type
+            )
+            process_activity(activity)
+            activity.refresh_from_db()
+            self.assertTrue(activity.processed_marks["sources"])
+            # Nothing new on the second run
+            self.assertEqual(0, process_activity(activity))
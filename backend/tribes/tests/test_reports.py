@@ -2,9 +2,11 @@
 
 import json
 from datetime import date, timedelta
+from importlib import import_module
 from pathlib import Path
 
 import factory
+from django.apps import apps as django_apps
 from django.contrib.auth.models import Group, User
 from django.db.models import signals as django_signals
 from django.utils import timezone
@@ -33,6 +35,7 @@ from industry.models import (
 from tribes.helpers.group_code import make_tribe_group_code
 from tribes.models import (
     Tribe,
+    MiningDailyRollup,
     TribeGroup,
     TribeGroupMembership,
     TribeGroupMembershipCharacter,
@@ -45,6 +48,7 @@ from tribes.reports.queries.fleet_commanders import run_fleet_commanders_report
 from tribes.reports.queries.industry_orders import run_industry_orders_report
 from tribes.reports.queries.mining import run_mining_report
 from tribes.reports.registry import REPORT_BINDINGS, get_binding
+from tribes.reports.rollups import refresh_mining_rollups
 from tribes.reports.runner import ReportError, run_group_report
 from tribes.reports.types import ReportScope, ReportView
 
@@ -194,6 +198,7 @@ class MiningReportTestCase(TestCase):
             quantity=1000,
             solar_system_id=30001,
         )
+        refresh_mining_rollups(self.character)
 
     def test_roster_mining_totals(self):
         period = parse_period("30d")
@@ -222,6 +227,7 @@ class MiningReportTestCase(TestCase):
             quantity=2000,
             solar_system_id=30001,
         )
+        refresh_mining_rollups(outsider_char)
 
         period = parse_period("30d")
         roster_result = run_group_report(
@@ -243,6 +249,59 @@ class MiningReportTestCase(TestCase):
             alliance_result.totals["total_volume_m3"], 450.0
         )
 
+    def test_rollup_sums_systems_per_day(self):
+        ore = EveType.objects.get(id=1228)
+        day = timezone.now().date() - timedelta(days=3)
+        EveCharacterMiningEntry.objects.create(
+            character=self.character,
+            eve_type=ore,
+            date=day,
+            quantity=500,
+            solar_system_id=30002,
+        )
+
+        self.assertEqual(
+            (0, 1, 0), refresh_mining_rollups(self.character, days={day})
+        )
+        rollup = MiningDailyRollup.objects.get()
+        self.assertEqual(1500, rollup.quantity)
+        self.assertAlmostEqual(225.0, rollup.volume_m3)
+        self.assertEqual(self.user.pk, rollup.user_id)
+        # Unchanged ledger, no writes
+        with self.assertNumQueries(2):
+            self.assertEqual((0, 0, 0), refresh_mining_rollups(self.character))
+
+    def test_rollup_follows_character_owner(self):
+        other = User.objects.create_user(username="new-owner")
+        EveCharacter.objects.filter(pk=self.character.pk).update(user=other)
+        self.character.refresh_from_db()
+
+        refresh_mining_rollups(self.character, days=set())
+        self.assertEqual(other.pk, MiningDailyRollup.objects.get().user_id)
+
+    def test_rollup_drops_days_without_ledger_rows(self):
+        EveCharacterMiningEntry.objects.all().delete()
+        self.assertEqual((0, 0, 1), refresh_mining_rollups(self.character))
+        self.assertFalse(MiningDailyRollup.objects.exists())
+
+    def test_migration_backfills_existing_ledger(self):
+        migration = import_module("tribes.migrations.0029_miningdailyrollup")
+        MiningDailyRollup.objects.all().delete()
+
+        migration.backfill_mining_rollups(django_apps, None)
+        rows, _, _ = run_mining_report(
+            self.group, parse_period("30d"), ReportScope.ROSTER, {}
+        )
+        self.assertAlmostEqual(rows[0]["volume_m3"], 150.0)
+        self.assertEqual(self.user.pk, MiningDailyRollup.objects.get().user_id)
+
+    def test_report_queries_do_not_grow_with_period(self):
+        for period in ("30d", "12m"):
+            with self.assertNumQueries(6):
+                run_mining_report(
+                    self.group, parse_period(period), ReportScope.ROSTER, {}
+                )
+
 
 class FleetCommandersReportTestCase(TestCase):
     @factory.django.mute_signals(